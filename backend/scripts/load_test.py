@@ -0,0 +1,261 @@
+"""
+接続負荷テストモジュール
+
+起動中のサーバーへ映像ストリーム（MJPEG）の視聴者と Socket.IO のステータス購読者を
+段階的に接続し、1 プロセスで保持できる同時接続数を計測します。
+サーバーモードごとに同じ段階で実行して結果を比較します::
+
+    # ターミナル1: 計測対象のサーバー
+    python src/main.py                          # threading（従来）
+    python src/main.py --server-mode eventlet   # 協調モード
+
+    # ターミナル2: 負荷テスト（backend で実行）
+    python scripts/load_test.py --url http://localhost:8000 \\
+        --video-clients 10,25,50,100 --status-clients 50,100,200,400 --duration 30
+
+各段階の保持判定: 全クライアントが接続でき、視聴者ごとの受信 FPS が --min-fps 以上、
+購読者ごとのステータス受信レートが --min-status-rate 以上であること。
+要 requests（映像）・python-socketio のクライアント（ステータス）。
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import requests  # type: ignore
+except Exception:  # noqa: BLE001
+    requests = None  # optional dependency (video clients disabled)
+
+try:
+    import socketio as socketio_client  # type: ignore
+except Exception:  # noqa: BLE001
+    socketio_client = None  # optional dependency (status clients disabled)
+
+FRAME_BOUNDARY = b'--frame'
+STATUS_EVENTS = ('status_update', 'status_v2')
+
+
+class VideoLoadClient:
+    """映像ストリームの視聴者 1 接続（受信したフレームの時刻を記録）"""
+
+    def __init__(self, url: str, stop_event: threading.Event):
+        self.url = url
+        self.stop_event = stop_event
+        self.connected = False
+        self.error: Optional[str] = None
+        self.frame_times: List[float] = []
+        self.received_bytes = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def join(self, timeout: float) -> None:
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            with requests.get(self.url, stream=True, timeout=(5.0, 10.0)) as response:
+                if response.status_code != 200:
+                    self.error = f"HTTP {response.status_code}"
+                    return
+                self.connected = True
+                tail = b''
+                for chunk in response.iter_content(chunk_size=16384):
+                    if self.stop_event.is_set():
+                        break
+                    self.received_bytes += len(chunk)
+                    # チャンク境界をまたぐ区切り文字を数え落とさないよう末尾を持ち越す
+                    data = tail + chunk
+                    now = time.time()
+                    self.frame_times.extend([now] * data.count(FRAME_BOUNDARY))
+                    tail = data[-(len(FRAME_BOUNDARY) - 1):]
+        except Exception as e:  # noqa: BLE001
+            if not self.stop_event.is_set():
+                self.error = str(e)
+
+
+class StatusLoadClient:
+    """Socket.IO のステータス購読者 1 接続（受信イベント数を記録）"""
+
+    def __init__(self, url: str, transports: List[str], topics: Optional[List[str]]):
+        self.url = url
+        self.transports = transports
+        self.topics = topics
+        self.connected = False
+        self.error: Optional[str] = None
+        self.event_count = 0
+        self.client = socketio_client.Client(reconnection=False)
+        for event in STATUS_EVENTS:
+            self.client.on(event, self._on_status)
+
+    def _on_status(self, *_args) -> None:
+        self.event_count += 1
+
+    def start(self) -> None:
+        try:
+            self.client.connect(self.url, transports=self.transports, wait_timeout=10)
+            self.connected = True
+            if self.topics:
+                self.client.emit('subscribe', {'topics': self.topics})
+        except Exception as e:  # noqa: BLE001
+            self.error = str(e)
+
+    def stop(self) -> None:
+        try:
+            self.client.disconnect()
+        except Exception:  # noqa: BLE001
+            pass
+
+
+def run_level(args: argparse.Namespace, video_count: int, status_count: int) -> Dict[str, Any]:
+    """
+    1 段階分の負荷を掛けて計測する
+
+    Args:
+        args: コマンドライン引数
+        video_count: 映像ストリームの同時視聴者数
+        status_count: ステータス購読者数
+
+    Returns:
+        Dict[str, Any]: 段階の計測結果
+    """
+    base_url = args.url.rstrip('/')
+    video_url = f"{base_url}/api/v1/video_feed"
+    if args.profile:
+        video_url += f"?profile={args.profile}"
+    stop_event = threading.Event()
+
+    videos = [VideoLoadClient(video_url, stop_event) for _ in range(video_count)]
+    for video in videos:
+        video.start()
+    statuses = [StatusLoadClient(base_url, args.transports.split(','), args.status_topics)
+                for _ in range(status_count)]
+    connect_start = time.time()
+    for status in statuses:
+        status.start()
+    connect_time = time.time() - connect_start
+
+    # 接続直後の立ち上がりを除いて計測
+    time.sleep(args.warmup)
+    window_start = time.time()
+    status_start_counts = [status.event_count for status in statuses]
+    time.sleep(args.duration)
+    window_end = time.time()
+    status_rates = [(status.event_count - start_count) / args.duration
+                    for status, start_count in zip(statuses, status_start_counts) if status.connected]
+
+    stop_event.set()
+    for status in statuses:
+        status.stop()
+    for video in videos:
+        video.join(timeout=2.0)
+
+    video_fps = []
+    max_gaps = []
+    for video in videos:
+        if not video.connected:
+            continue
+        times = [t for t in video.frame_times if window_start <= t <= window_end]
+        video_fps.append(len(times) / args.duration)
+        gaps = np.diff(times) if len(times) > 1 else np.array([args.duration])
+        max_gaps.append(float(gaps.max()))
+
+    video_connected = sum(1 for video in videos if video.connected)
+    status_connected = sum(1 for status in statuses if status.connected)
+    min_fps = min(video_fps) if video_fps else None
+    min_status_rate = min(status_rates) if status_rates else None
+    held = (video_connected == video_count and status_connected == status_count
+            and (min_fps is None or min_fps >= args.min_fps)
+            and (min_status_rate is None or min_status_rate >= args.min_status_rate))
+
+    errors = [client.error for client in videos + statuses if client.error]
+    return {
+        'video_clients': video_count,
+        'status_clients': status_count,
+        'video_connected': video_connected,
+        'status_connected': status_connected,
+        'video_fps_mean': float(np.mean(video_fps)) if video_fps else None,
+        'video_fps_min': min_fps,
+        'video_max_gap_p95_s': float(np.percentile(max_gaps, 95)) if max_gaps else None,
+        'video_mbps': sum(video.received_bytes for video in videos) * 8 / 1e6 / max(window_end - connect_start, 1e-6),
+        'status_rate_mean': float(np.mean(status_rates)) if status_rates else None,
+        'status_rate_min': min_status_rate,
+        'status_connect_time_s': connect_time,
+        'errors': len(errors),
+        'sample_errors': errors[:3],
+        'held': held,
+    }
+
+
+def _parse_levels(value: str) -> List[int]:
+    return [int(level) for level in value.split(',') if level.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="KanshiChan concurrent client load test")
+    parser.add_argument('--url', default='http://localhost:8000', help="サーバーのベースURL")
+    parser.add_argument('--video-clients', default='10,25,50', help="段階ごとの映像視聴者数（カンマ区切り）")
+    parser.add_argument('--status-clients', default='50,100,200', help="段階ごとのステータス購読者数（カンマ区切り）")
+    parser.add_argument('--duration', type=float, default=20.0, help="段階ごとの計測秒数")
+    parser.add_argument('--warmup', type=float, default=3.0, help="接続後、計測開始までの秒数")
+    parser.add_argument('--profile', default=None, help="映像の配信プロファイル（未指定はサーバー既定）")
+    parser.add_argument('--transports', default='websocket,polling', help="Socket.IO のトランスポート")
+    parser.add_argument('--status-topics', nargs='*', default=None,
+                        help="subscribe するトピック（未指定は全トピックを受信する従来の接続）")
+    parser.add_argument('--min-fps', type=float, default=5.0, help="保持判定: 視聴者ごとの最低 FPS")
+    parser.add_argument('--min-status-rate', type=float, default=0.5, help="保持判定: 購読者ごとの最低受信レート（回/秒）")
+    parser.add_argument('--json', dest='json_path', default=None, help="結果を JSON で保存するパス")
+    args = parser.parse_args(argv)
+
+    video_levels = _parse_levels(args.video_clients)
+    status_levels = _parse_levels(args.status_clients)
+    level_count = max(len(video_levels), len(status_levels))
+    # 段階数が異なる場合は短い方の最後の値を使い続ける
+    video_levels += [video_levels[-1] if video_levels else 0] * (level_count - len(video_levels))
+    status_levels += [status_levels[-1] if status_levels else 0] * (level_count - len(status_levels))
+    if any(video_levels) and requests is None:
+        print("requests is required for video clients", file=sys.stderr)
+        return 2
+    if any(status_levels) and socketio_client is None:
+        print("python-socketio client is required for status clients", file=sys.stderr)
+        return 2
+
+    results = []
+    print(f"{'video':>6} {'status':>7} {'v_conn':>7} {'s_conn':>7} {'fps_mean':>9} {'fps_min':>8} "
+          f"{'gap_p95':>8} {'st_rate':>8} {'errors':>7}  held")
+    for video_count, status_count in zip(video_levels, status_levels):
+        result = run_level(args, video_count, status_count)
+        results.append(result)
+
+        def fmt(value, spec='.2f'):
+            return format(value, spec) if value is not None else '-'
+
+        print(f"{video_count:>6} {status_count:>7} {result['video_connected']:>7} {result['status_connected']:>7} "
+              f"{fmt(result['video_fps_mean']):>9} {fmt(result['video_fps_min']):>8} "
+              f"{fmt(result['video_max_gap_p95_s']):>8} {fmt(result['status_rate_mean']):>8} "
+              f"{result['errors']:>7}  {'yes' if result['held'] else 'NO'}")
+        if not result['held']:
+            break
+
+    held_levels = [result for result in results if result['held']]
+    if held_levels:
+        best = held_levels[-1]
+        print(f"Max held level: {best['video_clients']} video + {best['status_clients']} status clients")
+    else:
+        print("No level held")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'url': args.url, 'levels': results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
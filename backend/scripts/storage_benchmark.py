@@ -0,0 +1,209 @@
+"""
+SQLite ストレージのマイクロベンチマーク
+
+一時ファイルの SQLite に対して、従来構成（既定のジャーナル・書き込みスレッドごとの
+コミット）と新構成（WAL・PRAGMA 調整・単一ライタースレッドでのまとめてコミット）で、
+並行する書き込みと集計クエリのスループットを比較します::
+
+    # リポジトリのルートで実行（backend/src を import パスへ追加する）
+    python backend/scripts/storage_benchmark.py --writers 3 --readers 2 --duration 10
+
+書き込みスレッドは DataCollector（バッチ）・ObjectDetector（行ごと）・Monitor（1 行）を
+模した頻度で行動ログ相当の行を挿入し、読み出しスレッドは分析ルート相当の
+時間別集計を繰り返します。"database is locked" の発生数も計測します。
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, Integer, MetaData, String, Table, Text,
+    create_engine, func, insert, select
+)
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
+
+BACKEND_SRC_PATH = str(Path(__file__).resolve().parent.parent / 'src')
+if BACKEND_SRC_PATH not in sys.path:
+    sys.path.insert(0, BACKEND_SRC_PATH)
+
+from models.storage_engine import DatabaseWriter, build_sqlite_pragmas, install_sqlite_pragmas  # noqa: E402
+
+metadata = MetaData()
+bench_logs = Table(
+    'behavior_logs',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('timestamp', DateTime, nullable=False, index=True),
+    Column('focus_level', Float),
+    Column('smartphone_detected', Boolean, default=False),
+    Column('presence_status', String(20)),
+    Column('session_id', String(50), index=True),
+    Column('detected_objects', Text),
+)
+
+
+def _make_rows(count: int) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    return [{
+        'timestamp': now - timedelta(seconds=random.randint(0, 7 * 86400)),
+        'focus_level': random.random(),
+        'smartphone_detected': random.random() < 0.2,
+        'presence_status': 'present' if random.random() < 0.8 else 'absent',
+        'session_id': now.strftime('%Y%m%d'),
+        'detected_objects': '[{"class": "person", "confidence": 0.95}]',
+    } for _ in range(count)]
+
+
+def _read_query():
+    hour = func.strftime('%Y-%m-%d %H', bench_logs.c.timestamp)
+    since = datetime.utcnow() - timedelta(days=7)
+    return (select(hour, func.count(), func.avg(bench_logs.c.focus_level),
+                   func.sum(bench_logs.c.smartphone_detected))
+            .where(bench_logs.c.timestamp >= since)
+            .group_by(hour))
+
+
+def _is_locked_error(error: Exception) -> bool:
+    return isinstance(error, OperationalError) and 'locked' in str(error).lower()
+
+
+def run_scenario(mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    1 構成分の計測を行う
+
+    Args:
+        mode: 'baseline'（従来構成）または 'tuned'（WAL + 単一ライター）
+        args: コマンドライン引数
+
+    Returns:
+        Dict[str, Any]: 計測結果
+    """
+    workdir = tempfile.mkdtemp(prefix='kanshichan_bench_')
+    url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    pragmas = build_sqlite_pragmas()
+    engine = create_engine(url, poolclass=QueuePool, pool_size=args.readers + args.writers, max_overflow=0,
+                           connect_args={'check_same_thread': False, 'timeout': args.busy_timeout})
+    writer: Optional[DatabaseWriter] = None
+    if mode == 'tuned':
+        install_sqlite_pragmas(engine, pragmas)
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(bench_logs), _make_rows(args.seed_rows))
+    if mode == 'tuned':
+        writer = DatabaseWriter(url, pragmas=pragmas)
+        writer.start()
+
+    stop_event = threading.Event()
+    lock = threading.Lock()
+    write_latencies: List[float] = []
+    read_latencies: List[float] = []
+    counters = {'rows': 0, 'locked': 0, 'errors': 0}
+
+    def writer_loop(rows_per_write: int, interval: float) -> None:
+        while not stop_event.is_set():
+            rows = _make_rows(rows_per_write)
+            start = time.perf_counter()
+            try:
+                if writer is not None:
+                    writer.submit(lambda session, rows=rows: session.execute(insert(bench_logs), rows)).result()
+                else:
+                    with engine.begin() as connection:
+                        connection.execute(insert(bench_logs), rows)
+                with lock:
+                    write_latencies.append(time.perf_counter() - start)
+                    counters['rows'] += len(rows)
+            except Exception as e:  # noqa: BLE001
+                with lock:
+                    counters['locked' if _is_locked_error(e) else 'errors'] += 1
+            if interval:
+                stop_event.wait(interval)
+
+    def reader_loop() -> None:
+        query = _read_query()
+        while not stop_event.is_set():
+            start = time.perf_counter()
+            try:
+                with engine.connect() as connection:
+                    connection.execute(query).fetchall()
+                with lock:
+                    read_latencies.append(time.perf_counter() - start)
+            except Exception as e:  # noqa: BLE001
+                with lock:
+                    counters['locked' if _is_locked_error(e) else 'errors'] += 1
+
+    # DataCollector 相当（バッチ）・ObjectDetector 相当（行ごと）・Monitor 相当（1 行）を順に割り当て
+    writer_profiles = [(args.batch_rows, args.write_interval), (1, 0.0), (1, args.write_interval)]
+    threads = [threading.Thread(target=writer_loop, args=writer_profiles[i % len(writer_profiles)], daemon=True)
+               for i in range(args.writers)]
+    threads += [threading.Thread(target=reader_loop, daemon=True) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop_event.set()
+    for thread in threads:
+        thread.join(timeout=args.busy_timeout + 5)
+
+    writer_stats = writer.get_stats() if writer is not None else None
+    if writer is not None:
+        writer.stop()
+    with engine.connect() as connection:
+        journal_mode = connection.exec_driver_sql('PRAGMA journal_mode').scalar()
+    engine.dispose()
+
+    def p95(values: List[float]) -> Optional[float]:
+        return float(np.percentile(values, 95) * 1000) if values else None
+
+    return {
+        'mode': mode,
+        'journal_mode': journal_mode,
+        'insert_rows_per_s': counters['rows'] / args.duration,
+        'write_p95_ms': p95(write_latencies),
+        'reads_per_s': len(read_latencies) / args.duration,
+        'read_p95_ms': p95(read_latencies),
+        'locked_errors': counters['locked'],
+        'other_errors': counters['errors'],
+        'writer': writer_stats,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="KanshiChan SQLite storage micro-benchmark")
+    parser.add_argument('--writers', type=int, default=3, help="並行する書き込みスレッド数")
+    parser.add_argument('--readers', type=int, default=2, help="並行する集計クエリのスレッド数")
+    parser.add_argument('--duration', type=float, default=10.0, help="構成ごとの計測秒数")
+    parser.add_argument('--seed-rows', type=int, default=50000, help="計測前に投入する行数")
+    parser.add_argument('--batch-rows', type=int, default=50, help="バッチ書き込みの行数")
+    parser.add_argument('--write-interval', type=float, default=0.01, help="バッチ・1 行書き込みの間隔（秒）")
+    parser.add_argument('--busy-timeout', type=float, default=5.0, help="従来構成のロック待ち秒数")
+    parser.add_argument('--json', dest='json_path', default=None, help="結果を JSON で保存するパス")
+    args = parser.parse_args(argv)
+
+    results = [run_scenario(mode, args) for mode in ('baseline', 'tuned')]
+    print(f"{'mode':>9} {'journal':>8} {'rows/s':>10} {'write_p95':>10} {'reads/s':>9} {'read_p95':>9} {'locked':>7}")
+    for result in results:
+        def fmt(value, spec='.1f'):
+            return format(value, spec) if value is not None else '-'
+
+        print(f"{result['mode']:>9} {result['journal_mode']:>8} {fmt(result['insert_rows_per_s']):>10} "
+              f"{fmt(result['write_p95_ms']):>10} {fmt(result['reads_per_s']):>9} "
+              f"{fmt(result['read_p95_ms']):>9} {result['locked_errors']:>7}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
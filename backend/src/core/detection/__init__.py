@@ -8,10 +8,12 @@ from .object_detector import ObjectDetector
 from .detector import Detector
 from .detection import DetectionManager
 from .detection_smoother import DetectionSmoother
+from .yolo_backend import OnnxYOLOModel
 
 __all__ = [
     'ObjectDetector',
     'Detector',
     'DetectionManager',
     'DetectionSmoother',
+    'OnnxYOLOModel',
 ]
@@ -12,7 +12,7 @@ Typical usage example:
 
 # backend/src/core/detection.py
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 import numpy as np
 
 # Detectorクラスのインポート (依存関係を明確にするため)
@@ -40,6 +40,8 @@ class DetectionManager:
             logger.error("Detector instance is required for DetectionManager.")
             raise ValueError("Detector instance cannot be None.")
         self.detector = detector
+        # 直近の Detector 出力（ランドマーク等を含む辞書形式）。FrameBus 配信用に保持する
+        self.last_detector_results: Optional[Dict[str, Any]] = None
         logger.info("DetectionManager initialized.")
 
     def detect(self, frame: np.ndarray) -> List[Dict[str, Any]]:
@@ -59,18 +61,44 @@ class DetectionManager:
             logger.warning("Received None frame for detection.")
             return []
 
-        unified_detections_list = []
         try:
             # Detectorを使用して辞書形式の検出結果を取得
             detector_results = self.detector.detect_objects(frame)
+        except Exception as e:
+            logger.error(f"Error during object detection or formatting: {e}", exc_info=True)
+            self.last_detector_results = None
+            return [] # エラー発生時は空の結果を返す
+
+        return self.convert_detector_results(detector_results)
+
+    def convert_detector_results(self, detector_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Detector の辞書形式の結果をリスト形式に変換します。
+
+        パイプライン実行時など、検出を別スレッドで済ませた結果を
+        detect() と同じ形式に揃えるためにも使用します。
+
+        Args:
+            detector_results (Dict[str, Any]): ObjectDetector.detect_objects() 形式の結果。
+
+        Returns:
+            List[Dict[str, Any]]: 検出結果のリスト（detect() と同形式）。
+        """
+        unified_detections_list = []
+        try:
+            self.last_detector_results = detector_results
 
             # --- 結果をリスト形式に変換 ---
             # 1. 人物検出結果を追加 (MediaPipeまたはYOLOで検出された場合)
             if detector_results.get('person_detected'):
-                # person の bbox は detector_results から直接は取れないため、
-                # 必要であれば detect_objects 内で bbox を抽出して返すようにするか、
-                # ここでは bbox なしの情報を追加する。今回は label のみ追加。
-                 unified_detections_list.append({'label': 'person', 'confidence': None, 'box': None}) # box情報は不明
+                # YOLO で人物ボックスが得られた場合のみ bbox を付与（MediaPipe のみの検出では None）
+                person_bbox = detector_results.get('person_bbox')
+                unified_detections_list.append({
+                    'label': 'person',
+                    'confidence': detector_results.get('person_confidence'),
+                    'box': person_bbox,
+                    'bbox': person_bbox # FrameProcessorとの互換性のため'bbox'キーも設定
+                })
 
             # 2. その他の物体検出結果を追加 (YOLOの結果)
             if 'detections' in detector_results and isinstance(detector_results['detections'], dict):
@@ -121,7 +149,17 @@ class DetectionManager:
 
         except Exception as e:
             logger.error(f"Error during object detection or formatting: {e}", exc_info=True)
+            self.last_detector_results = None
             return [] # エラー発生時は空の結果を返す
 
+    def get_last_detector_results(self) -> Dict[str, Any]:
+        """
+        直近の detect() 呼び出しで得た Detector の生結果を返します。
+
+        Returns:
+            Dict[str, Any]: ObjectDetector.detect_objects() 形式の結果。未実行時は空の辞書。
+        """
+        return self.last_detector_results or {}
+
     # 将来的に、検出結果に基づいた追加処理（例：特定のオブジェクトの追跡など）
     # を担うメソッドを追加することも考えられます。 
\ No newline at end of file
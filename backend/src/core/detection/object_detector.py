@@ -14,7 +14,10 @@ import numpy as np
 import asyncio
 import threading
 import time
-from typing import Dict, Any, Optional, List, Tuple
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, Optional, List, Tuple, Callable
 from datetime import datetime
 from utils.logger import setup_logger
 from utils.config_manager import ConfigManager
@@ -25,6 +28,7 @@ from utils.exceptions import (
 )
 from core.optimization import AIOptimizer
 from .detection_smoother import DetectionSmoother
+from .yolo_backend import BACKEND_ONNX, BACKEND_TORCH, load_onnx_model
 import shutil
 from pathlib import Path
 from ultralytics.utils import SETTINGS
@@ -42,6 +46,14 @@ class ObjectDetector:
     - 検出結果のデータベース保存
     """
     
+    # モデル名 → 結果辞書内でそのモデルが書き込むキー（実行周期で省略した際に前回出力を補う）
+    MODEL_OUTPUT_KEYS = {
+        'pose': ('pose_landmarks',),
+        'hands': ('hands_landmarks',),
+        'face': ('face_landmarks',),
+        'yolo': ('detections', 'person_bbox', 'person_confidence'),
+    }
+    
     def __init__(self, config_manager: Optional[ConfigManager] = None):
         """
         初期化
@@ -51,6 +63,17 @@ class ObjectDetector:
         """
         try:
             self.config_manager = config_manager
+            self._inference_executor: Optional[ThreadPoolExecutor] = None
+            # YOLOモデル呼び出しの排他（メインカメラと複数カメラのバッチ推論でモデルを共有）
+            self._yolo_lock = threading.Lock()
+            
+            # モデル別の直近出力（実行周期で省略したモデルの出力を補う）
+            self._model_outputs: Dict[str, Dict[str, Any]] = {}
+            
+            # 直近の推論結果（静止フレーム・スキップ時に再利用）
+            self._last_results: Optional[Dict[str, Any]] = None
+            self._last_results_time = 0.0
+            self.carried_over_count = 0
             
             # 設定からランドマークと検出オブジェクトの設定を取得
             self.landmark_settings = {}
@@ -68,6 +91,7 @@ class ObjectDetector:
             
             # YOLO初期化
             self._setup_yolo()
+            self._build_yolo_class_filters()
             
             # AI最適化システムの初期化
             try:
@@ -101,6 +125,15 @@ class ObjectDetector:
                 logger.warning(f"DetectionSmoother error: {smoothing_error.to_dict()}")
                 self.detection_smoother = None
             
+            # 並列推論設定（MediaPipe各ソリューションとYOLOを同一フレームで同時実行）
+            if config_manager and config_manager.get('detector.parallel_inference.enabled', False):
+                max_workers = config_manager.get('detector.parallel_inference.max_workers', 4)
+                self._inference_executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix='detector-inference'
+                )
+                logger.info(f"Parallel inference enabled (max_workers={max_workers})")
+            
             # 検出ログ保存設定
             self.log_detections = config_manager.get('detector.log_detections', False) if config_manager else False
             self.camera_id = config_manager.get('camera.id', 'main') if config_manager else 'main'
@@ -262,12 +295,6 @@ class ObjectDetector:
             else:
                 logger.info(f"既存のYOLOモデルを読み込みます: {model_path}")
 
-            # モデルをインスタンス化（ローカルパスから）
-            self.model = YOLO(str(model_path))
-            
-            # YOLOモデルの最適化設定
-            self.model.verbose = False
-            
             # NMS処理最適化 - 警告軽減のための設定
             self.yolo_predict_args = {
                 'verbose': False,           # 詳細ログ無効化
@@ -283,6 +310,18 @@ class ObjectDetector:
                 'half': False,             # 半精度計算（CPUでは無効）
             }
             
+            # 推論バックエンドの選択（torch: ultralytics / onnx: ONNX Runtime）
+            self.yolo_backend = self.config_manager.get('models.yolo.backend', BACKEND_TORCH) if self.config_manager else BACKEND_TORCH
+            if self.yolo_backend == BACKEND_ONNX and self._setup_onnx_backend(model_path):
+                return
+            self.yolo_backend = BACKEND_TORCH
+            
+            # モデルをインスタンス化（ローカルパスから）
+            self.model = YOLO(str(model_path))
+            
+            # YOLOモデルの最適化設定
+            self.model.verbose = False
+            
             # デバイスの設定
             if torch.backends.mps.is_built():
                 self.device = torch.device("mps")
@@ -320,6 +359,69 @@ class ObjectDetector:
                 # recoverable エラーの場合は次フレームで再試行
                 logger.warning("Recoverable YOLO data error; keeping YOLO enabled.")
 
+    def _build_yolo_class_filters(self) -> None:
+        """
+        検出対象設定から YOLO 後処理用のクラスフィルタを事前計算
+        
+        - クラスID → 信頼度閾値の表（対象外クラスは無限大）
+        - 有効な検出対象ごとの (キー, クラスID, 閾値, 表示名)
+        - predict に渡す対象クラスIDのリスト（NMS を対象クラスに限定）
+        """
+        self._yolo_person_class_id: Optional[int] = None
+        self._yolo_object_filters: List[Tuple[str, int, float, str]] = []
+        self._yolo_filter_classes: Optional[List[int]] = None
+        self._yolo_threshold_table = np.full(1, np.inf)
+        
+        names = getattr(getattr(self, 'model', None), 'names', None)
+        if not names:
+            return
+        
+        name_to_id = {name: int(class_id) for class_id, name in names.items()}
+        self._yolo_person_class_id = name_to_id.get('person')
+        self._yolo_threshold_table = np.full(max(name_to_id.values()) + 1, np.inf)
+        
+        for obj_key, obj_settings in self.detection_objects.items():
+            if not obj_settings.get('enabled', False):
+                continue
+            class_name = obj_settings.get('class_name')
+            class_id = name_to_id.get(class_name)
+            if class_id is None:
+                logger.warning(f"Detection object '{obj_key}' refers to unknown YOLO class: {class_name}")
+                continue
+            threshold = float(obj_settings.get('confidence_threshold', 0.5))
+            self._yolo_object_filters.append((obj_key, class_id, threshold, obj_settings.get('name')))
+            self._yolo_threshold_table[class_id] = min(self._yolo_threshold_table[class_id], threshold)
+        
+        target_classes = {class_id for _, class_id, _, _ in self._yolo_object_filters}
+        if self._yolo_person_class_id is not None:
+            target_classes.add(self._yolo_person_class_id)
+        self._yolo_filter_classes = sorted(target_classes) or None
+        logger.info(f"YOLO class filter prepared: classes={self._yolo_filter_classes}")
+
+    def _setup_onnx_backend(self, model_path: Path) -> bool:
+        """
+        ONNX Runtime バックエンドの初期化（失敗時は torch バックエンドへフォールバック）
+        
+        Args:
+            model_path: ultralytics の ``.pt`` モデルのパス（ONNX は同じディレクトリにキャッシュ）
+            
+        Returns:
+            bool: 初期化に成功した場合True
+        """
+        try:
+            self.model = load_onnx_model(model_path, self.config_manager)
+            self.device = f"onnxruntime:{self.model.providers[0]}"
+            logger.info(f"YOLO initialized with ONNX Runtime backend ({self.device})")
+            return True
+        except Exception as e:
+            onnx_error = wrap_exception(
+                e, ModelInitializationError,
+                "ONNX Runtime backend initialization failed, falling back to torch",
+                details={'model_path': str(model_path), 'fallback_backend': BACKEND_TORCH}
+            )
+            logger.error(f"ONNX backend error: {onnx_error.to_dict()}")
+            return False
+
     def detect_objects(self, frame: np.ndarray) -> Dict[str, Any]:
         """
         フレーム内の物体を検出
@@ -335,52 +437,32 @@ class ObjectDetector:
             return self._create_empty_results()
             
         try:
-            # AIオプティマイザーがある場合、最適化処理を適用
-            if self.ai_optimizer:
-                # フレームスキップ判定
-                if self.ai_optimizer.should_skip_frame():
-                    return self._create_empty_results()
-                    
-                # パフォーマンスモニタリング開始
-                self.ai_optimizer.start_inference_timer()
-                
-            # 結果格納用辞書
-            results = {
-                'detections': {},             # クラス名 → List[detection]
-                'timestamp': datetime.now().isoformat(),
-                'frame_id': id(frame),
-                'mediapipe_results': {},
-                'yolo_results': {},
-                'person_detected': False     # 人物検出フラグを明示的に初期化
-            }
+            results = self.begin_detection(frame)
+            if results is None:
+                return self.carry_over_results()
             
-            # MediaPipe検出（有効な場合）
-            if self.use_mediapipe:
-                # RGB変換（MediaPipeはRGBを使用）
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                self._detect_with_mediapipe(rgb_frame, results)
+            # ROIトラッキング: 直近の被写体周辺のみを YOLO で推論（全体再走査フレームはNone）
+            roi = self.get_tracking_roi(frame.shape)
+            yolo_frame = self._crop_roi(frame, roi)
             
-            # YOLO検出（有効な場合）
-            if self.use_yolo:
-                self._detect_with_yolo_bgr(frame, results)
+            # RGB変換（MediaPipeはRGBを使用）。MediaPipe の追跡・平滑化は入力画像の座標で行われるため、
+            # 原点・大きさが毎回変わる切り出しではなく常にフレーム全体を渡す
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) if self.use_mediapipe else None
+            model_tasks = self._collect_model_tasks(yolo_frame, rgb_frame, roi_active=roi is not None)
+            # モデル別の実行周期: このフレームで実行しないモデルは前回の出力を再利用
+            model_tasks, cadence_skipped = self._schedule_model_tasks(model_tasks)
             
-            # 検出結果の平滑化処理（有効な場合）
-            if self.detection_smoother:
-                results = self.detection_smoother.smooth_detections(results)
+            if self._inference_executor is not None and len(model_tasks) > 1:
+                # MediaPipe各ソリューションとYOLOを並列実行
+                model_timings, person_flags = self._run_model_tasks_parallel(model_tasks, results)
+            else:
+                # MediaPipe → YOLO の順に逐次実行
+                model_timings, person_flags = self._run_model_tasks_serial(model_tasks, results)
+            results['model_timings'] = model_timings
             
-            # AIオプティマイザーがある場合、パフォーマンス測定終了
-            if self.ai_optimizer:
-                self.ai_optimizer.end_inference_timer()
-                
-                # パフォーマンス情報を結果に追加
-                performance_metrics = self.ai_optimizer.get_performance_metrics()
-                results['performance'] = performance_metrics
-                
-            # 検出ログ保存（設定が有効な場合）
-            if self.log_detections and results.get('detections'):
-                self._queue_detection_logs(results)
-                
-            return results
+            self._complete_tracking(results, frame.shape, roi, person_flags, cadence_skipped)
+            
+            return self.finish_detection(results)
             
         except Exception as e:
             detection_error = wrap_exception(
@@ -391,75 +473,569 @@ class ObjectDetector:
             logger.error(f"Detection error: {detection_error.to_dict()}")
             return self._create_empty_results()
 
-    def _detect_with_mediapipe(self, rgb_frame: np.ndarray, results: Dict[str, Any]) -> None:
+    def begin_detection(self, frame: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        検出処理の開始（フレームスキップ判定・計測開始・結果辞書の作成）
+        
+        パイプライン実行時は各ステージがこの結果辞書に書き込みます。
+        
+        Args:
+            frame: 検出対象の画像フレーム
+            
+        Returns:
+            Optional[Dict[str, Any]]: 結果格納用辞書、静止フレーム・フレームスキップ時はNone
+                （呼び出し側は carry_over_results() で前回結果を再利用する）
+        """
+        # AIオプティマイザーがある場合、最適化処理を適用
+        if self.ai_optimizer:
+            # 静止フレーム判定（モーションゲート）
+            if self.ai_optimizer.is_static_frame(frame):
+                return None
+            
+            # フレームスキップ判定
+            if self.ai_optimizer.should_skip_frame():
+                return None
+                
+            # パフォーマンスモニタリング開始
+            self.ai_optimizer.start_inference_timer()
+            
+        # 結果格納用辞書
+        return {
+            'detections': {},             # クラス名 → List[detection]
+            'timestamp': datetime.now().isoformat(),
+            'frame_id': id(frame),
+            'mediapipe_results': {},
+            'yolo_results': {},
+            'person_detected': False     # 人物検出フラグを明示的に初期化
+        }
+
+    def finish_detection(self, results: Dict[str, Any],
+                         inference_start: Optional[float] = None) -> Dict[str, Any]:
         """
-        MediaPipeを使用した検出処理
+        検出処理の終了（平滑化・パフォーマンス計測・ログ保存）
+        
+        Args:
+            results: MediaPipe/YOLO の結果が格納された辞書
+            inference_start: 推論開始時刻（パイプライン実行時にフレームごとに指定）
+            
+        Returns:
+            Dict[str, Any]: 後処理済みの検出結果
+        """
+        model_timings = results.pop('model_timings', None)
+        cadence_skipped = results.pop('cadence_skipped_models', [])
+        
+        # 検出結果の平滑化処理（有効な場合）
+        if self.detection_smoother:
+            results = self.detection_smoother.smooth_detections(results)
+        
+        # AIオプティマイザーがある場合、パフォーマンス測定終了
+        if self.ai_optimizer:
+            self.ai_optimizer.end_inference_timer(inference_start)
+            
+            # パフォーマンス情報を結果に追加
+            performance_metrics = self.ai_optimizer.get_performance_metrics()
+            results['performance'] = performance_metrics
+        
+        # モデル別の推論時間を追加
+        if model_timings is not None:
+            performance = results.setdefault('performance', {})
+            performance['model_timings_ms'] = model_timings
+            performance['parallel_inference'] = self._inference_executor is not None
+            performance['cadence_skipped_models'] = cadence_skipped
+            
+        # 検出ログ保存（設定が有効な場合）
+        if self.log_detections and results.get('detections'):
+            self._queue_detection_logs(results)
+        
+        # 静止フレーム・スキップ時の再利用用に保持（平滑化済みの結果）
+        self._last_results = results
+        self._last_results_time = time.time()
+            
+        return results
+
+    def carry_over_results(self) -> Dict[str, Any]:
+        """
+        推論を省略したフレーム用に前回の結果を再利用
+        
+        平滑化済みの結果をそのまま返すため DetectionSmoother には再投入しない。
+        StateManager には毎フレーム結果が届くため、不在・スマホ使用の時間計測が途切れない。
+        最大経過時間を超えた場合は空の結果を返す。
+        
+        Returns:
+            Dict[str, Any]: carried_over フラグ付きの前回結果、または空の結果
+        """
+        max_age = self.ai_optimizer.get_carry_over_max_age() if self.ai_optimizer else 0.0
+        age = time.time() - self._last_results_time
+        if self._last_results is None or age > max_age:
+            return self._create_empty_results()
+        
+        self.carried_over_count += 1
+        carried = dict(self._last_results)
+        carried['carried_over'] = True
+        carried['carried_over_age_ms'] = age * 1000
+        return carried
+
+    def get_tracking_roi(self, frame_shape: Tuple[int, ...]) -> Optional[Tuple[int, int, int, int]]:
+        """
+        このフレームで YOLO を推論する ROI を取得（ROIトラッキング）
+        
+        Args:
+            frame_shape: フレーム形状
+            
+        Returns:
+            Optional[Tuple[int, int, int, int]]: (x1, y1, x2, y2)、全体走査・無効時はNone
+        """
+        if not self.use_yolo or not self.ai_optimizer:
+            return None
+        return self.ai_optimizer.get_tracking_roi(frame_shape)
+
+    def preprocess_for_yolo(self, frame: np.ndarray,
+                            roi: Optional[Tuple[int, int, int, int]] = None) -> Optional[np.ndarray]:
+        """
+        YOLO 用の前処理済みフレームを作成する（パイプラインの前処理段）
+        
+        Args:
+            frame: BGR形式のフレーム
+            roi: get_tracking_roi() の戻り値（指定時は切り出し領域を前処理する）
+            
+        Returns:
+            Optional[np.ndarray]: 前処理済みフレーム。YOLO・AIオプティマイザーが無効の場合はNone
+                （run_yolo_stage() が必要に応じて前処理する）
+        """
+        if not self.use_yolo or not self.ai_optimizer:
+            return None
+        return self.ai_optimizer._optimize_frame_preprocessing(self._crop_roi(frame, roi))
+
+    def schedule_stage_models(self, results: Dict[str, Any]) -> List[str]:
+        """
+        モデル別の実行周期に従い、このフレームでパイプラインの各段が実行するモデルを決める
+        
+        フレームカウンタと同じスレッド（前処理段）で begin_detection() の直後に呼ぶ。
+        前回出力を再利用するモデルは results の 'cadence_skipped_models' に記録し、
+        各段はそのモデルを実行しない（complete_stages() で前回出力を補う）。
+        
+        Args:
+            results: begin_detection() の結果辞書
+            
+        Returns:
+            List[str]: このフレームで実行するモデル名
+        """
+        # 判定はモデル名のみを使うため、フレームを渡さずにタスクを列挙する
+        tasks = self._collect_mediapipe_tasks(None) if self.use_mediapipe else []
+        if self.use_yolo:
+            tasks.append(('yolo', self._detect_with_yolo_bgr, ()))
+        scheduled, skipped = self._schedule_model_tasks(tasks)
+        if skipped:
+            results['cadence_skipped_models'] = skipped
+        return [name for name, _, _ in scheduled]
+
+    def run_mediapipe_stage(self, rgb_frame: np.ndarray, results: Dict[str, Any]) -> None:
+        """
+        パイプラインの MediaPipe 段（有効な各ソリューションを実行して results へ書き込む）
         
         Args:
             rgb_frame: RGB形式のフレーム
-            results: 検出結果を格納する辞書
+            results: begin_detection() の結果辞書
+        """
+        if self.use_mediapipe:
+            self._run_stage_tasks(self._collect_mediapipe_tasks(rgb_frame), results)
+
+    def run_yolo_stage(self, frame: np.ndarray, results: Dict[str, Any],
+                       preprocessed_frame: Optional[np.ndarray] = None,
+                       roi: Optional[Tuple[int, int, int, int]] = None) -> None:
+        """
+        パイプラインの YOLO 段（結果は results へ書き込む）
+        
+        ROI指定時の検出結果は ROI 座標のまま。complete_stages() でフレーム座標へ変換する。
+        
+        Args:
+            frame: BGR形式のフレーム全体
+            results: begin_detection() の結果辞書
+            preprocessed_frame: preprocess_for_yolo() の戻り値（同じ roi で作成したもの）
+            roi: get_tracking_roi() の戻り値
+        """
+        if not self.use_yolo:
+            return
+        yolo_frame = self._crop_roi(frame, roi)
+        task = partial(self._detect_with_yolo_bgr, preprocessed_frame=preprocessed_frame,
+                       imgsz=self._roi_imgsz(yolo_frame.shape) if roi is not None else None)
+        self._run_stage_tasks([('yolo', task, (yolo_frame,))], results)
+
+    def _run_stage_tasks(self, tasks: List[Tuple[str, Callable, tuple]], results: Dict[str, Any]) -> None:
+        """
+        パイプラインの段で推論タスクを実行（schedule_stage_models() で再利用と決めたモデルは除く）
+        
+        推論時間と人物検出フラグは results に蓄積し、complete_stages() / finish_detection() で取り出す。
+        
+        Args:
+            tasks: 推論タスクのリスト
+            results: begin_detection() の結果辞書
+        """
+        skipped = results.get('cadence_skipped_models', ())
+        model_timings, person_flags = self._run_model_tasks_serial(
+            [task for task in tasks if task[0] not in skipped], results
+        )
+        results.setdefault('model_timings', {}).update(model_timings)
+        results.setdefault('model_person_flags', {}).update(person_flags)
+
+    def complete_stages(self, results: Dict[str, Any], frame_shape: Tuple[int, ...],
+                        roi: Optional[Tuple[int, int, int, int]] = None) -> None:
+        """
+        パイプラインの各段の結果をまとめる（finish_detection() の前に呼ぶ）
+        
+        ROI座標の YOLO 結果をフレーム座標へ変換し、実行周期で再利用したモデルの前回出力を補って、
+        ROIトラッキングの推論領域を更新する。
+        
+        Args:
+            results: 各段が書き込んだ結果辞書
+            frame_shape: フレーム形状
+            roi: run_yolo_stage() に渡した ROI
+        """
+        person_flags = results.pop('model_person_flags', {})
+        cadence_skipped = results.pop('cadence_skipped_models', [])
+        self._complete_tracking(results, frame_shape, roi, person_flags, cadence_skipped)
+
+    def _complete_tracking(self, results: Dict[str, Any], frame_shape: Tuple[int, ...],
+                           roi: Optional[Tuple[int, int, int, int]],
+                           person_flags: Dict[str, bool],
+                           cadence_skipped: List[str]) -> None:
+        """
+        ROI座標の変換・モデル別実行周期の補完・ROIトラッキングの更新
+        
+        Args:
+            results: 検出結果（その場で書き換える）
+            frame_shape: フレーム形状
+            roi: YOLO を推論した ROI（全体走査時はNone）
+            person_flags: 実行したモデル名 → 人物検出フラグ
+            cadence_skipped: 前回出力を再利用するモデル名
+        """
+        if not self.ai_optimizer:
+            return
+        if roi is not None:
+            # ROI座標 → フレーム座標（YOLO の検出結果のみ）
+            self._map_roi_results(results, roi)
+        results['roi'] = roi
+        self._apply_model_cadence(results, person_flags, cadence_skipped)
+        self.ai_optimizer.update_tracking_roi(
+            self._collect_tracking_boxes(results, frame_shape),
+            results.get('person_confidence'),
+            frame_shape
+        )
+
+    @staticmethod
+    def _crop_roi(frame: np.ndarray, roi: Optional[Tuple[int, int, int, int]]) -> np.ndarray:
+        """ROI を切り出す（None はフレーム全体）"""
+        return frame if roi is None else frame[roi[1]:roi[3], roi[0]:roi[2]]
+
+    @staticmethod
+    def _roi_imgsz(shape: Tuple[int, ...]) -> int:
+        """切り出し領域を 640 へ拡大せず、領域サイズ（stride 32 の倍数）で推論する入力サイズ"""
+        return int(min(640, max(64, np.ceil(max(shape[:2]) / 32) * 32)))
+
+    def _map_roi_results(self, results: Dict[str, Any],
+                         roi: Tuple[int, int, int, int]) -> None:
+        """
+        ROI内で得たYOLOの検出結果をフレーム座標へ変換
+        
+        YOLOのボックスは scale_x/scale_y で ROI 画素座標に戻っているため原点オフセットを加算する。
+        MediaPipe はフレーム全体で推論するため、ランドマークは変換しない。
+        
+        Args:
+            results: 検出結果（その場で書き換える）
+            roi: (x1, y1, x2, y2)
+        """
+        offset_x, offset_y = roi[0], roi[1]
+        for detections in results.get('detections', {}).values():
+            for detection in detections:
+                x1, y1, x2, y2 = detection['bbox']
+                detection['bbox'] = (x1 + offset_x, y1 + offset_y, x2 + offset_x, y2 + offset_y)
+        if results.get('person_bbox'):
+            x1, y1, x2, y2 = results['person_bbox']
+            results['person_bbox'] = (x1 + offset_x, y1 + offset_y, x2 + offset_x, y2 + offset_y)
+
+    def _collect_tracking_boxes(self, results: Dict[str, Any],
+                                frame_shape: Tuple[int, ...]) -> List[Tuple[int, int, int, int]]:
+        """
+        ROIトラッキングの追従対象（人物・スマートフォン）のボックスを収集
+        
+        Args:
+            results: フレーム座標の検出結果
+            frame_shape: フレーム形状
+            
+        Returns:
+            List[Tuple[int, int, int, int]]: (x1, y1, x2, y2) のリスト
+        """
+        boxes = []
+        if results.get('person_bbox'):
+            boxes.append(results['person_bbox'])
+        for detection in results.get('detections', {}).get('smartphone', []):
+            boxes.append(detection['bbox'])
+        
+        # YOLOで人物が得られない場合は姿勢ランドマークの外接矩形を使用
+        pose_landmarks = results.get('pose_landmarks')
+        if not results.get('person_bbox') and pose_landmarks:
+            height, width = frame_shape[:2]
+            xs = [lm.x for lm in pose_landmarks.landmark]
+            ys = [lm.y for lm in pose_landmarks.landmark]
+            boxes.append((int(min(xs) * width), int(min(ys) * height),
+                          int(max(xs) * width), int(max(ys) * height)))
+        return boxes
+
+    def _collect_model_tasks(self, frame: np.ndarray,
+                             rgb_frame: Optional[np.ndarray],
+                             roi_active: bool = False) -> List[Tuple[str, Callable, tuple]]:
+        """
+        このフレームで実行するモデル推論タスクを列挙
+        
+        Args:
+            frame: YOLO に渡す BGR 形式のフレーム（ROIトラッキング時は切り出し領域）
+            rgb_frame: MediaPipe に渡す RGB 形式のフレーム全体（MediaPipe無効時はNone）
+            roi_active: YOLO が切り出し領域での推論か（入力サイズを領域に合わせる）
+            
+        Returns:
+            List[Tuple[str, Callable, tuple]]: (モデル名, 推論関数, 引数) のリスト。
+                推論関数は引数の末尾に結果辞書を受け取る
+        """
+        tasks = []
+        if self.use_mediapipe and rgb_frame is not None:
+            tasks.extend(self._collect_mediapipe_tasks(rgb_frame))
+        if self.use_yolo:
+            if roi_active:
+                imgsz = self._roi_imgsz(frame.shape)
+                tasks.append(('yolo', partial(self._detect_with_yolo_bgr, imgsz=imgsz), (frame,)))
+            else:
+                tasks.append(('yolo', self._detect_with_yolo_bgr, (frame,)))
+        return tasks
+
+    def _collect_mediapipe_tasks(self, rgb_frame: np.ndarray) -> List[Tuple[str, Callable, tuple]]:
+        """
+        有効な MediaPipe ソリューションの推論タスクを列挙
+        
+        Args:
+            rgb_frame: RGB形式のフレーム
+            
+        Returns:
+            List[Tuple[str, Callable, tuple]]: (モデル名, 推論関数, 引数) のリスト
         """
-        # Pose検出
+        tasks = []
         if hasattr(self, 'pose'):
-            try:
-                # AI最適化を使用した推論
-                if self.ai_optimizer:
-                    pose_results = self.ai_optimizer.optimize_mediapipe_pipeline(self.pose, rgb_frame)
+            tasks.append(('pose', self._detect_pose, (rgb_frame,)))
+        if hasattr(self, 'hands') and self.landmark_settings.get('hands', {}).get('enabled', False):
+            tasks.append(('hands', self._detect_hands, (rgb_frame,)))
+        if hasattr(self, 'face_mesh') and self.landmark_settings.get('face', {}).get('enabled', False):
+            tasks.append(('face', self._detect_face, (rgb_frame,)))
+        return tasks
+
+    def _run_model_tasks_parallel(self, tasks: List[Tuple[str, Callable, tuple]],
+                                  results: Dict[str, Any]) -> Tuple[Dict[str, float], Dict[str, bool]]:
+        """
+        推論タスクをワーカープールで並列実行し、結果をマージ
+        
+        各タスクは専用の部分結果辞書に書き込み、完了後に呼び出しスレッドで
+        results へ統合する（人物検出フラグはOR、その他は上書き）。
+        
+        Args:
+            tasks: _collect_model_tasks() の戻り値
+            results: 検出結果を格納する辞書
+            
+        Returns:
+            Tuple[Dict[str, float], Dict[str, bool]]: (モデル名 → 推論時間（ミリ秒）, モデル名 → 人物検出フラグ)。
+                人物検出フラグはそのモデルの部分結果が人物を検出したか（モデル別実行周期の判定に使う）
+        """
+        def run_task(task: Callable, args: tuple) -> Tuple[Dict[str, Any], float]:
+            partial = {'detections': {}, 'person_detected': False}
+            start_time = time.perf_counter()
+            task(*args, partial)
+            return partial, (time.perf_counter() - start_time) * 1000
+
+        futures = [
+            (name, self._inference_executor.submit(run_task, task, args))
+            for name, task, args in tasks
+        ]
+        
+        model_timings, person_flags = {}, {}
+        for name, future in futures:
+            partial, elapsed_ms = future.result()
+            model_timings[name] = elapsed_ms
+            person_flags[name] = self._merge_partial_results(results, partial)
+        return model_timings, person_flags
+
+    def _run_model_tasks_serial(self, tasks: List[Tuple[str, Callable, tuple]],
+                                results: Dict[str, Any]) -> Tuple[Dict[str, float], Dict[str, bool]]:
+        """
+        推論タスクを順に実行し、結果をマージ
+        
+        Args:
+            tasks: 推論タスクのリスト
+            results: 検出結果を格納する辞書
+            
+        Returns:
+            Tuple[Dict[str, float], Dict[str, bool]]: _run_model_tasks_parallel() と同じ
+        """
+        model_timings, person_flags = {}, {}
+        for name, task, args in tasks:
+            partial_results = {'detections': {}, 'person_detected': False}
+            start_time = time.perf_counter()
+            task(*args, partial_results)
+            model_timings[name] = (time.perf_counter() - start_time) * 1000
+            person_flags[name] = self._merge_partial_results(results, partial_results)
+        return model_timings, person_flags
+
+    @staticmethod
+    def _merge_partial_results(results: Dict[str, Any], partial: Dict[str, Any]) -> bool:
+        """
+        モデル 1 つ分の部分結果を results へ統合（人物検出フラグはOR、その他は上書き）
+        
+        Returns:
+            bool: このモデルが人物を検出したか
+        """
+        person_detected = partial.pop('person_detected')
+        results['person_detected'] = results['person_detected'] or person_detected
+        results['detections'].update(partial.pop('detections'))
+        results.update(partial)
+        return person_detected
+
+    def _schedule_model_tasks(self, tasks: List[Tuple[str, Callable, tuple]]
+                              ) -> Tuple[List[Tuple[str, Callable, tuple]], List[str]]:
+        """
+        モデル別の実行周期に従い、このフレームで実行するタスクを選別
+        
+        前回の出力が無い・再利用期限を過ぎたモデルは周期に関係なく実行する。
+        
+        Args:
+            tasks: _collect_model_tasks() の戻り値
+            
+        Returns:
+            Tuple[List, List[str]]: (実行するタスク, 前回出力を再利用するモデル名)
+        """
+        if not self.ai_optimizer:
+            return tasks, []
+        max_age = self.ai_optimizer.get_carry_over_max_age()
+        now = time.time()
+        scheduled, skipped = [], []
+        for task in tasks:
+            cached = self._model_outputs.get(task[0])
+            reusable = cached is not None and now - cached['time'] <= max_age
+            if reusable and not self.ai_optimizer.should_run_model(task[0]):
+                skipped.append(task[0])
+            else:
+                scheduled.append(task)
+        return scheduled, skipped
+
+    def _apply_model_cadence(self, results: Dict[str, Any],
+                             person_flags: Dict[str, bool],
+                             skipped: List[str]) -> None:
+        """
+        実行したモデルの出力を保持し、実行しなかったモデルの前回出力を結果へ補う
+        
+        ROI座標からの変換後（フレーム座標）に呼ぶため、再利用時に再変換は不要。
+        
+        Args:
+            results: フレーム座標の検出結果
+            person_flags: 実行したモデル名 → 人物検出フラグ
+            skipped: 前回出力を再利用するモデル名
+        """
+        now = time.time()
+        for name, person_detected in person_flags.items():
+            self._model_outputs[name] = {
+                'time': now,
+                'person_detected': person_detected,
+                'values': {key: copy.copy(results.get(key)) for key in self.MODEL_OUTPUT_KEYS.get(name, ())},
+            }
+        for name in skipped:
+            cached = self._model_outputs[name]
+            results['person_detected'] = results['person_detected'] or cached['person_detected']
+            for key, value in cached['values'].items():
+                if value is None:
+                    continue
+                if key == 'detections':
+                    results['detections'].update(value)
                 else:
-                    # 標準推論
-                    pose_results = self.pose.process(rgb_frame)
-                if pose_results and pose_results.pose_landmarks:
-                    results['person_detected'] = True
-                    if self.landmark_settings.get('pose', {}).get('enabled', False):
-                        results['pose_landmarks'] = pose_results.pose_landmarks
-                        logger.debug(f"Pose landmarks detected and added to results")
-            except Exception as e:
-                pose_error = wrap_exception(
-                    e, MediaPipeError,
-                    "MediaPipe pose detection failed",
-                    details={'detection_type': 'pose'}
-                )
-                logger.error(f"Pose detection error: {pose_error.to_dict()}")
+                    results[key] = value
+        if skipped:
+            results['cadence_skipped_models'] = skipped
+
+    def _detect_pose(self, rgb_frame: np.ndarray, results: Dict[str, Any]) -> None:
+        """
+        MediaPipe Pose 検出
         
-        # Hands検出
-        if (hasattr(self, 'hands') and 
-            self.landmark_settings.get('hands', {}).get('enabled', False)):
-            try:
-                hands_results = self.hands.process(rgb_frame)
-                if hands_results and hands_results.multi_hand_landmarks:
-                    results['hands_landmarks'] = hands_results.multi_hand_landmarks
-                    logger.debug(f"Hands landmarks detected and added to results")
-            except Exception as e:
-                hands_error = wrap_exception(
-                    e, MediaPipeError,
-                    "MediaPipe hands detection failed",
-                    details={'detection_type': 'hands'}
-                )
-                logger.error(f"Hands detection error: {hands_error.to_dict()}")
+        Args:
+            rgb_frame: RGB形式のフレーム
+            results: 検出結果を格納する辞書
+        """
+        try:
+            # AI最適化を使用した推論
+            if self.ai_optimizer:
+                pose_results = self.ai_optimizer.optimize_mediapipe_pipeline(self.pose, rgb_frame)
+            else:
+                # 標準推論
+                pose_results = self.pose.process(rgb_frame)
+            if pose_results and pose_results.pose_landmarks:
+                results['person_detected'] = True
+                if self.landmark_settings.get('pose', {}).get('enabled', False):
+                    results['pose_landmarks'] = pose_results.pose_landmarks
+                    logger.debug(f"Pose landmarks detected and added to results")
+        except Exception as e:
+            pose_error = wrap_exception(
+                e, MediaPipeError,
+                "MediaPipe pose detection failed",
+                details={'detection_type': 'pose'}
+            )
+            logger.error(f"Pose detection error: {pose_error.to_dict()}")
+
+    def _detect_hands(self, rgb_frame: np.ndarray, results: Dict[str, Any]) -> None:
+        """
+        MediaPipe Hands 検出
         
-        # Face検出
-        if (hasattr(self, 'face_mesh') and 
-            self.landmark_settings.get('face', {}).get('enabled', False)):
-            try:
-                face_results = self.face_mesh.process(rgb_frame)
-                if face_results and face_results.multi_face_landmarks:
-                    results['face_landmarks'] = face_results.multi_face_landmarks
-                    logger.debug(f"Face landmarks detected and added to results")
-            except Exception as e:
-                face_error = wrap_exception(
-                    e, MediaPipeError,
-                    "MediaPipe face detection failed",
-                    details={'detection_type': 'face'}
-                )
-                logger.error(f"Face detection error: {face_error.to_dict()}")
+        Args:
+            rgb_frame: RGB形式のフレーム
+            results: 検出結果を格納する辞書
+        """
+        try:
+            hands_results = self.hands.process(rgb_frame)
+            if hands_results and hands_results.multi_hand_landmarks:
+                results['hands_landmarks'] = hands_results.multi_hand_landmarks
+                logger.debug(f"Hands landmarks detected and added to results")
+        except Exception as e:
+            hands_error = wrap_exception(
+                e, MediaPipeError,
+                "MediaPipe hands detection failed",
+                details={'detection_type': 'hands'}
+            )
+            logger.error(f"Hands detection error: {hands_error.to_dict()}")
+
+    def _detect_face(self, rgb_frame: np.ndarray, results: Dict[str, Any]) -> None:
+        """
+        MediaPipe Face Mesh 検出
+        
+        Args:
+            rgb_frame: RGB形式のフレーム
+            results: 検出結果を格納する辞書
+        """
+        try:
+            face_results = self.face_mesh.process(rgb_frame)
+            if face_results and face_results.multi_face_landmarks:
+                results['face_landmarks'] = face_results.multi_face_landmarks
+                logger.debug(f"Face landmarks detected and added to results")
+        except Exception as e:
+            face_error = wrap_exception(
+                e, MediaPipeError,
+                "MediaPipe face detection failed",
+                details={'detection_type': 'face'}
+            )
+            logger.error(f"Face detection error: {face_error.to_dict()}")
 
-    def _detect_with_yolo_bgr(self, frame: np.ndarray, results: Dict[str, Any]) -> None:
+    def _detect_with_yolo_bgr(self, frame: np.ndarray, results: Dict[str, Any],
+                              preprocessed_frame: Optional[np.ndarray] = None,
+                              imgsz: Optional[int] = None) -> None:
         """
         YOLOを使用した物体検出処理（座標統一版）
         
         Args:
             frame: BGR形式のフレーム
             results: 検出結果を格納する辞書
+            preprocessed_frame: 前処理済みフレーム（パイプラインの前処理ステージで作成済みの場合）
+            imgsz: 推論入力サイズ（ROIトラッキング時に領域サイズを指定。Noneはモデル既定）
         """
         try:
             # オリジナルフレームサイズを保持
@@ -471,64 +1047,35 @@ class ObjectDetector:
             scale_x, scale_y = 1.0, 1.0
             
             if self.ai_optimizer:
-                # MediaPipeと同じフレーム最適化を適用
-                yolo_frame = self.ai_optimizer._optimize_frame_preprocessing(frame)
+                # MediaPipeと同じフレーム最適化を適用（前処理済みなら再利用）
+                if preprocessed_frame is not None:
+                    yolo_frame = preprocessed_frame
+                else:
+                    yolo_frame = self.ai_optimizer._optimize_frame_preprocessing(frame)
                 # スケール比を計算
                 yolo_height, yolo_width = yolo_frame.shape[:2]
                 scale_x = original_width / yolo_width
                 scale_y = original_height / yolo_height
                 
                 # YOLO推論（最適化設定適用）
-                yolo_results = self.ai_optimizer.optimize_yolo_inference(self.model, yolo_frame)
-                # フレームスキップされた場合はNoneが返される
+                predict_args = {'classes': self._yolo_filter_classes}
+                if imgsz:
+                    predict_args['imgsz'] = imgsz
+                with self._yolo_lock:
+                    yolo_results = self.ai_optimizer.optimize_yolo_inference(
+                        self.model, yolo_frame, predict_args=predict_args
+                    )
                 if yolo_results is None:
                     return
                 yolo_results = yolo_results[0]
             else:
                 # 標準推論（NMS最適化設定適用）
-                yolo_results = self.model(yolo_frame, **self.yolo_predict_args)[0]
-            
-            # YOLOでの人物検出（MediaPipeで未検出の場合のみチェック）
-            if not results['person_detected']:
-                for det in yolo_results.boxes.data.tolist():
-                    x1, y1, x2, y2, conf, cls = det
-                    class_name = yolo_results.names[int(cls)]
-                    if class_name == 'person' and conf > 0.5:
-                        results['person_detected'] = True
-                        break
-            
-            # その他の物体検出
-            for obj_key, obj_settings in self.detection_objects.items():
-                if not obj_settings.get('enabled', False):
-                    continue
-                    
-                detections = []
-                for det in yolo_results.boxes.data.tolist():
-                    x1, y1, x2, y2, conf, cls = det
-                    detected_class = yolo_results.names[int(cls)]
-                    
-                    if (detected_class == obj_settings.get('class_name') and 
-                        conf > obj_settings.get('confidence_threshold', 0.5)):
-                        
-                        # 座標をオリジナルフレームサイズにスケールバック
-                        scaled_x1 = int(x1 * scale_x)
-                        scaled_y1 = int(y1 * scale_y)
-                        scaled_x2 = int(x2 * scale_x)
-                        scaled_y2 = int(y2 * scale_y)
-                        
-                        # スマートフォン検出時は特別にINFOレベルでログ出力
-                        if obj_key == 'smartphone':
-                            logger.debug(f"📱 スマートフォン検出: {obj_settings.get('name')} (信頼度: {conf:.3f}, 座標: ({scaled_x1}, {scaled_y1}, {scaled_x2}, {scaled_y2}))")
-                        else:
-                            logger.debug(f"物体を検出: {obj_settings.get('name')} (confidence: {conf:.3f}, bbox: ({scaled_x1}, {scaled_y1}, {scaled_x2}, {scaled_y2}))")
-                        
-                        detections.append({
-                            'bbox': (scaled_x1, scaled_y1, scaled_x2, scaled_y2),
-                            'confidence': conf
-                        })
-                        
-                if detections:
-                    results['detections'][obj_key] = detections
+                extra_args = {'imgsz': imgsz} if imgsz else {}
+                with self._yolo_lock:
+                    yolo_results = self.model(yolo_frame, classes=self._yolo_filter_classes,
+                                              **self.yolo_predict_args, **extra_args)[0]
+            
+            self._parse_yolo_result(yolo_results, results, scale_x, scale_y)
                     
         except Exception as e:
             yolo_runtime_error = wrap_exception(
@@ -546,6 +1093,118 @@ class ObjectDetector:
             self.use_yolo = False
             logger.warning("Disabling YOLO due to runtime error.")
 
+    def _parse_yolo_result(self, yolo_result: Any, results: Dict[str, Any],
+                           scale_x: float = 1.0, scale_y: float = 1.0) -> None:
+        """
+        YOLO推論結果（1 フレーム分）を検出結果辞書へ書き込む
+        
+        Args:
+            yolo_result: ``boxes.data`` を持つ推論結果
+            results: 検出結果を格納する辞書
+            scale_x: 推論フレーム → オリジナルフレームの横方向スケール
+            scale_y: 推論フレーム → オリジナルフレームの縦方向スケール
+        """
+        # 検出テンソルを一度だけ numpy 化し、マスクで一括フィルタ
+        data = yolo_result.boxes.data
+        data = data.cpu().numpy() if hasattr(data, 'cpu') else np.asarray(data)
+        if data.size == 0:
+            return
+        class_ids = data[:, 5].astype(np.int64)
+        confidences = data[:, 4]
+        
+        # 座標をオリジナルフレームサイズにスケールバック
+        scaled_boxes = (data[:, :4] * np.array([scale_x, scale_y, scale_x, scale_y])).astype(np.int64)
+        
+        # YOLOでの人物検出（最も信頼度の高い人物ボックスを保持）
+        if self._yolo_person_class_id is not None:
+            person_mask = (class_ids == self._yolo_person_class_id) & (confidences > 0.5)
+            if person_mask.any():
+                results['person_detected'] = True
+                best = np.flatnonzero(person_mask)[confidences[person_mask].argmax()]
+                results['person_bbox'] = tuple(scaled_boxes[best].tolist())
+                results['person_confidence'] = float(confidences[best])
+        
+        # その他の物体検出（クラス別閾値表で対象外・閾値未満を一括除外）
+        if not self._yolo_object_filters:
+            return
+        candidate_mask = confidences > self._yolo_threshold_table[class_ids]
+        if not candidate_mask.any():
+            return
+        
+        for obj_key, class_id, threshold, display_name in self._yolo_object_filters:
+            mask = candidate_mask & (class_ids == class_id) & (confidences > threshold)
+            if not mask.any():
+                continue
+            
+            detections = [
+                {'bbox': tuple(bbox), 'confidence': conf}
+                for bbox, conf in zip(scaled_boxes[mask].tolist(), confidences[mask].tolist())
+            ]
+            for detection in detections:
+                # スマートフォン検出時は特別にINFOレベルでログ出力
+                if obj_key == 'smartphone':
+                    logger.debug(f"📱 スマートフォン検出: {display_name} (信頼度: {detection['confidence']:.3f}, 座標: {detection['bbox']})")
+                else:
+                    logger.debug(f"物体を検出: {display_name} (confidence: {detection['confidence']:.3f}, bbox: {detection['bbox']})")
+            results['detections'][obj_key] = detections
+
+    def detect_objects_batch(self, frames: List[np.ndarray]) -> List[Dict[str, Any]]:
+        """
+        複数フレーム（複数カメラ）をまとめて YOLO で検出
+        
+        1 回のモデル呼び出しで全フレームを推論し、フレームごとの結果辞書に分配します。
+        MediaPipe は使用しません（ソリューションがフレーム間の追跡状態を持つため）。
+        平滑化はソースごとに呼び出し側で行います（このインスタンスの平滑化器は
+        メインカメラ用のため使用しない）。
+        
+        Args:
+            frames: BGR形式のフレームのリスト
+            
+        Returns:
+            List[Dict[str, Any]]: フレームごとの検出結果（入力と同じ順序）
+        """
+        batch_results = []
+        timestamp = datetime.now().isoformat()
+        for frame in frames:
+            results = self._create_empty_results()
+            results['timestamp'] = timestamp
+            results['frame_id'] = id(frame)
+            batch_results.append(results)
+        if not frames or not self.use_yolo or getattr(self, 'model', None) is None:
+            return batch_results
+        
+        try:
+            with self._yolo_lock:
+                if self.ai_optimizer:
+                    yolo_results = self.ai_optimizer.optimize_yolo_batch(
+                        self.model, frames, predict_args={'classes': self._yolo_filter_classes}
+                    )
+                else:
+                    yolo_results = self.model(list(frames), classes=self._yolo_filter_classes,
+                                              **self.yolo_predict_args)
+            
+            for frame, yolo_result, results in zip(frames, yolo_results, batch_results):
+                # 推論入力（前処理でリサイズ済み）→ オリジナルフレームの座標に統一
+                scale_x, scale_y = 1.0, 1.0
+                orig_shape = getattr(yolo_result, 'orig_shape', None)
+                if orig_shape is not None:
+                    scale_x = frame.shape[1] / orig_shape[1]
+                    scale_y = frame.shape[0] / orig_shape[0]
+                self._parse_yolo_result(yolo_result, results, scale_x, scale_y)
+                
+        except Exception as e:
+            batch_error = wrap_exception(
+                e, YOLOError,
+                "Batched YOLO detection failed",
+                details={
+                    'batch_size': len(frames),
+                    'device': str(self.device) if hasattr(self, 'device') else 'unknown'
+                }
+            )
+            logger.error(f"Batched YOLO error: {batch_error.to_dict()}")
+        
+        return batch_results
+
     def get_detection_status(self) -> Dict[str, Any]:
         """
         検出システムの状態情報を取得
@@ -561,6 +1220,9 @@ class ObjectDetector:
             'has_face_model': hasattr(self, 'face_mesh') if self.use_mediapipe else False,
             'has_yolo_model': hasattr(self, 'model') if self.use_yolo else False,
             'device': str(self.device) if hasattr(self, 'device') else 'unknown',
+            'yolo_backend': getattr(self, 'yolo_backend', BACKEND_TORCH),
+            'carried_over_count': getattr(self, 'carried_over_count', 0),
+            'parallel_inference': self._inference_executor is not None,
             'landmark_settings': self.landmark_settings,
             'detection_objects': self.detection_objects
         }
@@ -581,6 +1243,7 @@ class ObjectDetector:
             self.detection_objects = self.config_manager.get_detection_objects()
             self.use_mediapipe = self.config_manager.get('detector.use_mediapipe', False)
             self.use_yolo = self.config_manager.get('detector.use_yolo', True)
+            self._build_yolo_class_filters()
             logger.info(f"Settings reloaded: MediaPipe={'enabled' if self.use_mediapipe else 'disabled'}, YOLO={'enabled' if self.use_yolo else 'disabled'}")
         else:
             logger.warning("ConfigManager not available, cannot reload settings.") 
@@ -683,30 +1346,17 @@ class ObjectDetector:
     
     def _save_logs_to_db(self, log_entries: List[Dict[str, Any]]) -> None:
         """
-        検出ログをデータベースに保存
+        検出ログをデータベースに一括保存（ライタースレッドへ登録し、完了を待たない）
         
         Args:
             log_entries: 保存する検出ログエントリのリスト
         """
         try:
-            # モデルのインポート（循環インポート回避のため）
-            from models.detection_log import DetectionLog
+            # 循環インポート回避のため遅延インポート
+            from services.data.storage_service import bulk_insert_detection_logs
             
-            # 各ログエントリをDBに保存
-            for entry in log_entries:
-                log = DetectionLog.create_from_detection(
-                    camera_id=entry['camera_id'],
-                    frame_id=entry['frame_id'],
-                    object_class=entry['object_class'],
-                    confidence=entry['confidence'],
-                    bbox=entry['bbox'],
-                    is_smoothed=entry['is_smoothed'],
-                    is_interpolated=entry['is_interpolated'],
-                    additional_data=entry['additional_data']
-                )
-                log.save()
-                
-            logger.debug(f"Saved {len(log_entries)} detection logs to database")
+            queued_count = bulk_insert_detection_logs(log_entries)
+            logger.debug(f"Queued {queued_count} detection logs for database")
             
         except Exception as e:
             logger.error(f"Error saving detection logs to database: {str(e)}")
@@ -775,12 +1425,21 @@ class ObjectDetector:
                     'detection_smoother_enabled': self.detection_smoother is not None
                 }
             )
-            summary.save()
+            log_ids = [log.id for log in logs]
             
-            # サマリーに関連するログを関連付け
-            for log in logs:
-                log.summary_id = summary.id
-                log.save()
+            def _save_summary(session):
+                # サマリーを挿入し、関連するログを 1 文の UPDATE で関連付ける（1 トランザクション）
+                from sqlalchemy import update
+                session.add(summary)
+                session.flush()
+                session.execute(
+                    update(DetectionLog.__table__)
+                    .where(DetectionLog.__table__.c.id.in_(log_ids))
+                    .values(summary_id=summary.id, updated_at=datetime.utcnow())
+                )
+            
+            from models.storage_engine import submit_write
+            submit_write(_save_summary, description='detection summary')
                 
             logger.info(f"Created detection summary for period {start_time} to {end_time}")
             
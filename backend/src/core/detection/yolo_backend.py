@@ -0,0 +1,409 @@
+"""
+YOLO推論バックエンドモジュール
+
+ultralytics (PyTorch) の `.pt` モデルを一度だけ ONNX へエクスポートして
+`model_artifacts/` にキャッシュし、ONNX Runtime で CPU 推論するバックエンドを提供します。
+ボックスのデコードと NMS は numpy でベクトル化しており、結果は ultralytics の
+`Results` と同じく `boxes.data`（[x1, y1, x2, y2, conf, cls] の N×6 配列）と
+`names` を持つため、ObjectDetector の後処理をそのまま利用できます。
+"""
+
+import ast
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from utils.logger import setup_logger
+from utils.exceptions import ModelInitializationError, ModelInferenceError, wrap_exception
+
+try:
+    import onnxruntime as ort  # type: ignore
+except Exception:  # noqa: BLE001
+    ort = None  # optional backend
+
+logger = setup_logger(__name__)
+
+BACKEND_TORCH = 'torch'
+BACKEND_ONNX = 'onnx'
+
+# ultralytics の letterbox と同じパディング値
+LETTERBOX_PAD_VALUE = 114
+# クラス別 NMS のためのクラスごとの座標オフセット（ultralytics と同値）
+CLASS_OFFSET = 7680
+
+
+class YOLOBoxes:
+    """ultralytics ``Boxes`` 互換の最小実装（``data`` のみ）"""
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class YOLOResult:
+    """ultralytics ``Results`` 互換の最小実装（``boxes`` と ``names``）"""
+
+    def __init__(self, data: np.ndarray, names: Dict[int, str], orig_shape: Tuple[int, int]):
+        self.boxes = YOLOBoxes(data)
+        self.names = names
+        self.orig_shape = orig_shape
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray,
+                        iou_threshold: float, max_det: int) -> np.ndarray:
+    """
+    numpy による NMS（スコア降順の貪欲法、IoU 計算は候補全体でベクトル化）
+
+    Args:
+        boxes: (N, 4) の xyxy 座標
+        scores: (N,) のスコア
+        iou_threshold: 抑制する IoU 閾値
+        max_det: 最大保持数
+
+    Returns:
+        np.ndarray: 保持するインデックス（スコア降順）
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    order = scores.argsort()[::-1]
+    keep = []
+
+    while order.size > 0 and len(keep) < max_det:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        inter_w = (np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest])).clip(0)
+        inter_h = (np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest])).clip(0)
+        inter = inter_w * inter_h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+
+    return np.asarray(keep, dtype=np.int64)
+
+
+class OnnxYOLOModel:
+    """
+    ONNX Runtime で YOLOv8 を実行するモデル
+    - ultralytics ``YOLO`` と同じ呼び出し方（``model(frame, conf=..., iou=...)``）
+    - letterbox 用キャンバスと入力テンソルを事前確保して再利用
+    - 出力デコードと NMS は numpy でベクトル化
+    """
+
+    def __init__(self,
+                 onnx_path: Path,
+                 providers: Optional[Sequence[str]] = None,
+                 intra_op_threads: int = 0,
+                 inter_op_threads: int = 0):
+        """
+        Args:
+            onnx_path: ONNX モデルのパス
+            providers: 使用する実行プロバイダ（利用可能なもののみ採用。例: OpenVINOExecutionProvider）
+            intra_op_threads: 演算内スレッド数（0 は ONNX Runtime の既定値）
+            inter_op_threads: 演算間スレッド数（0 は ONNX Runtime の既定値）
+        """
+        if ort is None:
+            raise ModelInitializationError("onnxruntime is not installed",
+                                           details={'onnx_path': str(onnx_path)})
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            session_options.intra_op_num_threads = int(intra_op_threads)
+        if inter_op_threads:
+            session_options.inter_op_num_threads = int(inter_op_threads)
+
+        available = ort.get_available_providers()
+        requested = list(providers or ['CPUExecutionProvider'])
+        selected = [p for p in requested if p in available] or ['CPUExecutionProvider']
+        if len(selected) != len(requested):
+            logger.warning(f"Unavailable ONNX Runtime providers ignored: {set(requested) - set(selected)}")
+
+        self.onnx_path = Path(onnx_path)
+        self.session = ort.InferenceSession(str(self.onnx_path), sess_options=session_options, providers=selected)
+        self.providers = self.session.get_providers()
+        self.input_name = self.session.get_inputs()[0].name
+        input_shape = self.session.get_inputs()[0].shape
+        self.imgsz = (int(input_shape[2]), int(input_shape[3]))
+        # バッチ次元が可変（dynamic エクスポート）なら複数フレームを 1 回で推論できる
+        self.dynamic_batch = not isinstance(input_shape[0], int)
+        self.names = self._load_names()
+        self.verbose = False
+
+        # 前処理バッファ（フレームごとに確保しない）
+        self._canvas = np.full((self.imgsz[0], self.imgsz[1], 3), LETTERBOX_PAD_VALUE, dtype=np.uint8)
+        self._blob = np.empty((1, 3, self.imgsz[0], self.imgsz[1]), dtype=np.float32)
+        self._batch_blob = self._blob
+        self._lock = threading.Lock()
+
+        logger.info(f"ONNX YOLO model loaded: {self.onnx_path.name} (imgsz={self.imgsz}, "
+                    f"dynamic_batch={self.dynamic_batch}, providers={self.providers})")
+
+    def _load_names(self) -> Dict[int, str]:
+        """ultralytics がエクスポート時に埋め込むクラス名メタデータを読み込む"""
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        try:
+            return {int(k): v for k, v in ast.literal_eval(metadata['names']).items()}
+        except Exception as e:
+            logger.warning(f"Class names metadata not found in ONNX model, using class ids: {e}")
+            num_classes = self.session.get_outputs()[0].shape[1] - 4
+            return {i: str(i) for i in range(int(num_classes))}
+
+    def to(self, device: Any) -> 'OnnxYOLOModel':
+        """ultralytics ``YOLO.to()`` 互換（デバイスは実行プロバイダで決まるため何もしない）"""
+        return self
+
+    def __call__(self,
+                 frame: Union[np.ndarray, Sequence[np.ndarray]],
+                 conf: float = 0.25,
+                 iou: float = 0.7,
+                 max_det: int = 300,
+                 classes: Optional[Sequence[int]] = None,
+                 agnostic_nms: bool = False,
+                 **_ignored: Any) -> List[YOLOResult]:
+        """
+        推論を実行する
+
+        Args:
+            frame: BGR形式のフレーム（uint8、または 0-1 に正規化済みの float）、またはそのリスト
+            conf: 信頼度閾値
+            iou: NMS の IoU 閾値
+            max_det: 最大検出数
+            classes: 対象クラスIDのリスト（None は全クラス）
+            agnostic_nms: クラスを区別しない NMS を行うか
+
+        Returns:
+            List[YOLOResult]: フレームごとの結果（単一フレームの場合は 1 要素。ultralytics と同じ形）
+        """
+        frames = list(frame) if isinstance(frame, (list, tuple)) else [frame]
+        try:
+            with self._lock:
+                if len(frames) == 1 or not self.dynamic_batch:
+                    # 固定バッチ（1）のモデルはフレームごとに実行
+                    outputs, letterboxes = [], []
+                    for item in frames:
+                        letterboxes.append(self._letterbox(item, self._blob[0]))
+                        outputs.append(self.session.run(None, {self.input_name: self._blob})[0][0])
+                else:
+                    if self._batch_blob.shape[0] != len(frames):
+                        self._batch_blob = np.empty((len(frames), 3, self.imgsz[0], self.imgsz[1]), dtype=np.float32)
+                    letterboxes = [self._letterbox(item, self._batch_blob[i]) for i, item in enumerate(frames)]
+                    outputs = self.session.run(None, {self.input_name: self._batch_blob})[0]
+            return [
+                YOLOResult(self._postprocess(output, ratio, pad, item.shape[:2],
+                                             conf, iou, max_det, classes, agnostic_nms),
+                           self.names, item.shape[:2])
+                for item, output, (ratio, pad) in zip(frames, outputs, letterboxes)
+            ]
+        except Exception as e:
+            raise wrap_exception(
+                e, ModelInferenceError,
+                "ONNX YOLO inference failed",
+                details={'frame_shapes': [item.shape if item is not None else None for item in frames],
+                         'providers': self.providers}
+            )
+
+    def _letterbox(self, frame: np.ndarray, out: np.ndarray) -> Tuple[float, Tuple[int, int]]:
+        """
+        アスペクト比を保ったまま入力サイズへ縮小し、事前確保した入力テンソルへ書き込む
+
+        Args:
+            frame: 入力フレーム
+            out: 書き込み先の (3, H, W) 入力テンソル
+
+        Returns:
+            Tuple[float, Tuple[int, int]]: (縮小率, (左パディング, 上パディング))
+        """
+        if frame.dtype != np.uint8:
+            # 0-1 に正規化済みのフレーム（AIOptimizer の normalize 設定）
+            frame = np.clip(frame * 255.0, 0, 255).astype(np.uint8)
+
+        height, width = frame.shape[:2]
+        target_h, target_w = self.imgsz
+        ratio = min(target_h / height, target_w / width)
+        new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+        left = int(round((target_w - new_w) / 2 - 0.1))
+        top = int(round((target_h - new_h) / 2 - 0.1))
+
+        self._canvas.fill(LETTERBOX_PAD_VALUE)
+        region = self._canvas[top:top + new_h, left:left + new_w]
+        if (new_w, new_h) != (width, height):
+            np.copyto(region, cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR))
+        else:
+            np.copyto(region, frame)
+
+        # BGR → RGB, HWC → CHW, 0-255 → 0-1
+        np.multiply(self._canvas[:, :, ::-1].transpose(2, 0, 1), 1.0 / 255.0, out=out, casting='unsafe')
+        return ratio, (left, top)
+
+    def _postprocess(self,
+                     output: np.ndarray,
+                     ratio: float,
+                     pad: Tuple[int, int],
+                     orig_shape: Tuple[int, int],
+                     conf: float,
+                     iou: float,
+                     max_det: int,
+                     classes: Optional[Sequence[int]],
+                     agnostic_nms: bool) -> np.ndarray:
+        """
+        (4 + クラス数, アンカー数) の出力を [x1, y1, x2, y2, conf, cls] へデコード
+
+        Returns:
+            np.ndarray: (N, 6) の検出結果（元フレーム座標）
+        """
+        predictions = output.T
+        class_scores = predictions[:, 4:]
+        class_ids = np.arange(class_scores.shape[1])
+        if classes is not None:
+            class_ids = np.asarray(classes, dtype=np.int64)
+            class_scores = class_scores[:, class_ids]
+
+        best = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(best)), best]
+        mask = scores > conf
+        if not mask.any():
+            return np.empty((0, 6), dtype=np.float32)
+
+        boxes_cxcywh = predictions[mask, :4]
+        scores = scores[mask]
+        cls = class_ids[best[mask]].astype(np.float32)
+
+        boxes = np.empty_like(boxes_cxcywh)
+        boxes[:, :2] = boxes_cxcywh[:, :2] - boxes_cxcywh[:, 2:] / 2
+        boxes[:, 2:] = boxes_cxcywh[:, :2] + boxes_cxcywh[:, 2:] / 2
+
+        offsets = 0.0 if agnostic_nms else (cls * CLASS_OFFSET)[:, None]
+        keep = non_max_suppression(boxes + offsets, scores, iou, max_det)
+        boxes, scores, cls = boxes[keep], scores[keep], cls[keep]
+
+        # letterbox を取り除いて元フレーム座標へ戻す
+        boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - pad[0]) / ratio).clip(0, orig_shape[1])
+        boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - pad[1]) / ratio).clip(0, orig_shape[0])
+
+        return np.column_stack([boxes, scores, cls]).astype(np.float32)
+
+
+def export_onnx(pt_path: Path, imgsz: int = 640, opset: int = 12, dynamic: bool = False) -> Path:
+    """
+    ``.pt`` モデルを ONNX へエクスポートする（同じディレクトリにキャッシュ）
+
+    既に ``.pt`` より新しい ``.onnx`` が存在する場合は再エクスポートしない。
+
+    Args:
+        pt_path: ultralytics の ``.pt`` モデルのパス
+        imgsz: 入力画像サイズ
+        opset: ONNX opset バージョン
+        dynamic: バッチ次元を可変にするか（複数カメラのバッチ推論用。別ファイルにキャッシュ）
+
+    Returns:
+        Path: ONNX モデルのパス
+    """
+    pt_path = Path(pt_path)
+    onnx_path = pt_path.with_name(f"{pt_path.stem}_dynamic.onnx") if dynamic else pt_path.with_suffix('.onnx')
+    if onnx_path.exists() and (not pt_path.exists() or onnx_path.stat().st_mtime >= pt_path.stat().st_mtime):
+        logger.info(f"Using cached ONNX model: {onnx_path}")
+        return onnx_path
+
+    from ultralytics import YOLO
+
+    logger.info(f"Exporting {pt_path.name} to ONNX (imgsz={imgsz}, opset={opset}, dynamic={dynamic})...")
+    exported = YOLO(str(pt_path)).export(format='onnx', imgsz=imgsz, opset=opset, dynamic=dynamic, simplify=False)
+    exported_path = Path(exported)
+    if exported_path.resolve() != onnx_path.resolve():
+        exported_path.replace(onnx_path)
+    logger.info(f"ONNX model exported: {onnx_path}")
+    return onnx_path
+
+
+def load_onnx_model(pt_path: Path, config_manager=None) -> OnnxYOLOModel:
+    """
+    設定に従って ONNX モデルを（必要ならエクスポートして）読み込む
+
+    Args:
+        pt_path: ultralytics の ``.pt`` モデルのパス
+        config_manager: 設定管理インスタンス
+
+    Returns:
+        OnnxYOLOModel: 読み込んだモデル
+    """
+    get = config_manager.get if config_manager else (lambda key, default=None: default)
+    onnx_path = export_onnx(pt_path,
+                            imgsz=get('models.yolo.onnx.imgsz', 640),
+                            dynamic=get('models.yolo.onnx.dynamic_batch', False))
+    return OnnxYOLOModel(
+        onnx_path,
+        providers=get('models.yolo.onnx.providers', ['CPUExecutionProvider']),
+        intra_op_threads=get('models.yolo.onnx.intra_op_threads', 0),
+        inter_op_threads=get('models.yolo.onnx.inter_op_threads', 0),
+    )
+
+
+def benchmark_backends(pt_path: Path,
+                       config_manager=None,
+                       iterations: int = 50,
+                       warmup: int = 5,
+                       frame_shape: Tuple[int, int, int] = (480, 640, 3)) -> Dict[str, Any]:
+    """
+    torch (ultralytics) と ONNX Runtime の推論時間を同一フレームで比較する
+
+    Args:
+        pt_path: ultralytics の ``.pt`` モデルのパス
+        config_manager: 設定管理インスタンス
+        iterations: 計測回数
+        warmup: 計測前のウォームアップ回数
+        frame_shape: ベンチマーク用フレームの形状
+
+    Returns:
+        Dict[str, Any]: バックエンド名 → {mean_ms, p50_ms, p95_ms, fps, detections}
+    """
+    from ultralytics import YOLO
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, size=frame_shape, dtype=np.uint8)
+    predict_args = {'conf': 0.5, 'iou': 0.7, 'max_det': 10, 'verbose': False}
+
+    models = {
+        BACKEND_TORCH: YOLO(str(pt_path)),
+        BACKEND_ONNX: load_onnx_model(pt_path, config_manager),
+    }
+
+    report = {}
+    for name, model in models.items():
+        for _ in range(warmup):
+            model(frame, **predict_args)
+        timings = []
+        for _ in range(iterations):
+            start_time = time.perf_counter()
+            result = model(frame, **predict_args)[0]
+            timings.append((time.perf_counter() - start_time) * 1000)
+        timings_arr = np.asarray(timings)
+        report[name] = {
+            'mean_ms': float(timings_arr.mean()),
+            'p50_ms': float(np.percentile(timings_arr, 50)),
+            'p95_ms': float(np.percentile(timings_arr, 95)),
+            'fps': float(1000.0 / timings_arr.mean()),
+            'detections': len(result.boxes.data),
+        }
+        logger.info(f"YOLO backend benchmark [{name}]: {report[name]}")
+    return report
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='YOLO backend benchmark (torch vs onnxruntime)')
+    parser.add_argument('--model', default=str(Path(__file__).resolve().parent.parent.parent.parent / 'model_artifacts' / 'yolov8n.pt'))
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    for backend_name, stats in benchmark_backends(Path(args.model), iterations=args.iterations).items():
+        print(f"{backend_name:>6}: mean={stats['mean_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms fps={stats['fps']:.1f}")
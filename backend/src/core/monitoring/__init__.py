@@ -9,10 +9,32 @@ from .monitor import Monitor
 from .status_broadcaster import StatusBroadcaster
 from .threshold_manager import ThresholdManager
 from .camera import Camera
+from .frame_bus import FrameBus, FramePacket, FrameSubscription
+from .frame_ring_buffer import FrameRingBuffer
+from .frame_pool import FramePool, SharedFrame
+from .detection_pipeline import DetectionPipeline, PipelineStage
+from .multi_camera import MultiCameraMonitor, CameraSource
+from .stream_encoder import MJPEGStreamEncoder, StreamClient, StreamProfile
+from .h264_stream import H264StreamEncoder, H264StreamClient
 
 __all__ = [
     'Monitor',
     'StatusBroadcaster', 
     'ThresholdManager',
     'Camera',
+    'FrameBus',
+    'FramePacket',
+    'FrameSubscription',
+    'FrameRingBuffer',
+    'FramePool',
+    'SharedFrame',
+    'DetectionPipeline',
+    'PipelineStage',
+    'MultiCameraMonitor',
+    'CameraSource',
+    'MJPEGStreamEncoder',
+    'StreamClient',
+    'StreamProfile',
+    'H264StreamEncoder',
+    'H264StreamClient',
 ]
@@ -19,27 +19,53 @@ from utils.exceptions import (
 )
 import threading
 import os
+from .frame_ring_buffer import FrameRingBuffer
 
 logger = setup_logger(__name__)
 
 class Camera:
-    _instance = None
+    # デバイスごとのインスタンス（None は設定ファイルの camera.device_index を使うメインカメラ）
+    _instances = {}
     _lock = threading.Lock()
 
-    def __new__(cls, *args, **kwargs):
+    def __new__(cls, config_manager=None, device_index=None):
         with cls._lock:
-            if cls._instance is None:
-                cls._instance = super().__new__(cls)
-        return cls._instance
+            instance = cls._instances.get(device_index)
+            if instance is None:
+                instance = super().__new__(cls)
+                cls._instances[device_index] = instance
+        return instance
 
-    def __init__(self, config_manager=None):
-        """カメラの初期化とウィンドウのセットアップを行う"""
+    def __init__(self, config_manager=None, device_index=None):
+        """
+        カメラの初期化とウィンドウのセットアップを行う
+
+        Args:
+            config_manager: 設定管理インスタンス
+            device_index: デバイス番号（複数カメラモードの追加カメラ用。None は設定値を使用）
+        """
         with self._lock:
             if hasattr(self, '_initialized') and self._initialized:
                 return
             
             self.frame_lock = threading.Lock()
 
+            # キャプチャスレッド（リングバッファ）関連
+            self._capture_thread = None
+            self._capture_stop_event = threading.Event()
+            self._capture_failures = 0
+            self._raw_capture_buffer = None
+            self._direct_capture_shape = None  # リサイズ不要時にプールへ直接読み取る形状
+            self._output_size_cache = None  # ((入力幅, 入力高さ), (出力幅, 出力高さ))
+            self.use_capture_thread = True
+            ring_size = 4
+            self.capture_wait_timeout = 0.2
+            if config_manager:
+                self.use_capture_thread = config_manager.get('camera.capture_thread.enabled', True)
+                ring_size = config_manager.get('camera.capture_thread.ring_size', 4)
+                self.capture_wait_timeout = config_manager.get('camera.capture_thread.wait_timeout_ms', 200) / 1000.0
+            self.ring_buffer = FrameRingBuffer(ring_size)
+
             try:
                 # 設定の読み込み
                 self.config_manager = config_manager
@@ -48,6 +74,10 @@ class Camera:
                 if config_manager:
                     self.show_window = config_manager.get('display.show_opencv_window', False)
                     self.device_index = config_manager.get('camera.device_index', 0)
+                if device_index is not None:
+                    # 追加カメラはヘッドレス（表示ウィンドウはメインカメラのみ）
+                    self.device_index = device_index
+                    self.show_window = False
                 
                 # カメラの初期化を試みる
                 self.cap = self._initialize_camera()
@@ -62,6 +92,10 @@ class Camera:
                 
                 # ウィンドウのセットアップは共通
                 self._setup_window()
+
+                # 実カメラの場合はバックグラウンドキャプチャを開始
+                if not self._use_dummy_camera and self.use_capture_thread:
+                    self._start_capture_thread()
             except Exception as e:
                 logger.error(f"Camera initialization failed: {e}")
                 # ダミーカメラモードを有効化
@@ -140,8 +174,79 @@ class Camera:
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.screen_width)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.screen_height)
         self.cap.set(cv2.CAP_PROP_FPS, 15)
+        # ドライバ側のバッファリングを最小化し、古いフレームの滞留を防ぐ
+        try:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        except Exception:
+            pass
         logger.info("Camera properties set successfully")
 
+    def _start_capture_thread(self):
+        """バックグラウンドキャプチャスレッドを開始する"""
+        if self._capture_thread and self._capture_thread.is_alive():
+            return
+        self._capture_stop_event.clear()
+        self._capture_thread = threading.Thread(target=self._capture_loop, name=f'CameraCapture-{self.device_index}', daemon=True)
+        self._capture_thread.start()
+        logger.info(f"Camera capture thread started (ring size: {self.ring_buffer.capacity})")
+
+    def _stop_capture_thread(self):
+        """バックグラウンドキャプチャスレッドを停止する"""
+        self._capture_stop_event.set()
+        if self._capture_thread and self._capture_thread.is_alive() \
+                and self._capture_thread is not threading.current_thread():
+            self._capture_thread.join(timeout=2.0)
+        self._capture_thread = None
+
+    def _capture_loop(self):
+        """キャプチャスレッド本体: 読み取り→リサイズをプールのバッファへ直接書き込む"""
+        while not self._capture_stop_event.is_set():
+            cap = self.cap
+            if cap is None or not cap.isOpened():
+                break
+            try:
+                direct_shape = self._direct_capture_shape
+                if direct_shape is not None:
+                    # リサイズ不要な解像度: プールのバッファへ直接読み取る（コピーなし）
+                    slot = self.ring_buffer.acquire_write_slot(direct_shape, np.uint8)
+                    ret, raw = cap.read(slot)
+                else:
+                    # 生フレーム用バッファを再利用して読み取り
+                    slot = None
+                    ret, raw = cap.read(self._raw_capture_buffer)
+                if not ret or raw is None:
+                    self._capture_failures += 1
+                    self._capture_stop_event.wait(0.01)
+                    continue
+                if slot is not None and raw is slot:
+                    self.ring_buffer.commit_write()
+                    continue
+
+                # 解像度が変わった場合・リサイズが必要な場合
+                out_width, out_height = self._get_output_size(raw.shape[1], raw.shape[0])
+                slot = self.ring_buffer.acquire_write_slot((out_height, out_width) + raw.shape[2:], raw.dtype)
+                if (out_width, out_height) == (raw.shape[1], raw.shape[0]):
+                    np.copyto(slot, raw)
+                    # 次回からプールのバッファへ直接読み取る
+                    self._direct_capture_shape = raw.shape if raw.dtype == np.uint8 else None
+                    self._raw_capture_buffer = None
+                else:
+                    # リサイズは1回のみ、プールのバッファへ直接出力
+                    cv2.resize(raw, (out_width, out_height), dst=slot)
+                    self._direct_capture_shape = None
+                    self._raw_capture_buffer = raw
+                self.ring_buffer.commit_write()
+            except Exception as e:
+                self._capture_failures += 1
+                frame_error = wrap_exception(
+                    e, CameraFrameError,
+                    "Error in camera capture thread",
+                    details={'capture_failures': self._capture_failures}
+                )
+                logger.error(f"Capture thread error: {frame_error.to_dict()}")
+                self._capture_stop_event.wait(0.1)
+        logger.info("Camera capture thread stopped")
+
     def _setup_window(self):
         """表示ウィンドウの設定を行う"""
         self.window_name = 'KanshiChan Monitor'
@@ -189,7 +294,18 @@ class Camera:
             logger.info("Display window setup disabled per configuration")
 
     def get_frame(self):
-        """カメラからフレームを取得する"""
+        """カメラからフレームを取得する
+
+        キャプチャスレッド稼働時は、リングバッファの最新フレームをコピーなしで返す。
+        返却フレームは読み取り専用ビューで、参照している間は上書きされない（書き換える場合はコピーすること）。
+        """
+        if self._capture_thread is not None and self._capture_thread.is_alive():
+            # 前回より新しいフレームを短時間待ち、届かなければ最新フレームを重複として返す
+            sequence, frame = self.ring_buffer.get_latest(timeout=self.capture_wait_timeout)
+            if frame is None:
+                return False, self._create_dummy_frame()
+            return True, frame
+
         with self.frame_lock:
             if self._use_dummy_camera:
                 # ダミーモード - 黒い画像を生成
@@ -218,18 +334,37 @@ class Camera:
                 logger.error(f"Frame capture error: {frame_error.to_dict()}")
                 return False, self._create_dummy_frame()
 
-    def _resize_frame(self, frame):
-        """フレームをアスペクト比を維持しながらリサイズする"""
-        aspect_ratio = frame.shape[1] / frame.shape[0]
+    def _get_output_size(self, width, height):
+        """アスペクト比を維持した出力サイズを返す（入力サイズごとにキャッシュ）"""
+        if self._output_size_cache and self._output_size_cache[0] == (width, height):
+            return self._output_size_cache[1]
+
+        aspect_ratio = width / height
         if self.screen_width / self.screen_height > aspect_ratio:
             new_width = int(self.screen_height * aspect_ratio)
             new_height = self.screen_height
         else:
             new_width = self.screen_width
             new_height = int(self.screen_width / aspect_ratio)
-        
+
+        self._output_size_cache = ((width, height), (new_width, new_height))
+        return new_width, new_height
+
+    def _resize_frame(self, frame):
+        """フレームをアスペクト比を維持しながらリサイズする"""
+        new_width, new_height = self._get_output_size(frame.shape[1], frame.shape[0])
         return cv2.resize(frame, (new_width, new_height))
 
+    def get_capture_stats(self):
+        """キャプチャ統計（リングバッファのドロップ・重複数など）を取得する"""
+        stats = self.ring_buffer.get_stats()
+        stats.update({
+            'capture_thread_running': self._capture_thread is not None and self._capture_thread.is_alive(),
+            'capture_failures': self._capture_failures,
+            'dummy_mode': self._use_dummy_camera,
+        })
+        return stats
+
     def show_frame(self, frame):
         """フレームを表示する"""
         if frame is None:
@@ -260,6 +395,8 @@ class Camera:
 
     def release(self):
         """カメラリソースを解放する"""
+        # キャプチャスレッドを先に停止（cap 解放中の read を防ぐ）
+        self._stop_capture_thread()
         with self.frame_lock:
             try:
                 if self.cap is not None:
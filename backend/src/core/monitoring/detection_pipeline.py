@@ -0,0 +1,318 @@
+"""
+検出パイプラインモジュール
+
+キャプチャ → 前処理 → MediaPipe → YOLO → 描画/配信 の各段を専用スレッドで実行し、
+有界キューで接続して異なるフレームの処理を重ね合わせます。
+下流が詰まった場合は上流のキュー投入がブロックされ（バックプレッシャー）、
+キャプチャ段が自然に減速します。各段のレイテンシ・キュー占有率を計測し、
+ボトルネックとなっている段を特定できます。
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from utils.logger import setup_logger
+from utils.exceptions import PerformanceError, wrap_exception
+
+logger = setup_logger(__name__)
+
+
+class PipelineStage:
+    """
+    パイプラインの 1 段（専用スレッド）
+    - 入力キューから取り出した項目を handler で処理し、出力キューへ渡す
+    - 入力キューが None の段はソース段（handler(None) が新しい項目を生成）
+    - 出力キューが None の段はシンク段
+    - handler が None を返した項目は下流へ渡さない
+    """
+
+    def __init__(self,
+                 name: str,
+                 handler: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]],
+                 input_queue: Optional[queue.Queue],
+                 output_queue: Optional[queue.Queue],
+                 stop_event: threading.Event,
+                 throttle: Optional[Callable[[], None]] = None,
+                 stats_window: int = 100):
+        """
+        Args:
+            name: 段の名前（統計表示・スレッド名に使用）
+            handler: 項目を処理する関数
+            input_queue: 入力キュー（ソース段は None）
+            output_queue: 出力キュー（シンク段は None）
+            stop_event: パイプライン全体の停止イベント
+            throttle: handler 呼び出し前の待機処理（ソース段のFPS制御用。レイテンシには含めない）
+            stats_window: レイテンシ統計の移動窓サイズ
+        """
+        self.name = name
+        self.handler = handler
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self._stop_event = stop_event
+        self._throttle = throttle
+        self._thread: Optional[threading.Thread] = None
+
+        # 統計
+        self._latencies: Deque[float] = deque(maxlen=stats_window)
+        self._occupancy: Deque[int] = deque(maxlen=stats_window)
+        self.processed_count = 0
+        self.dropped_count = 0
+        self.error_count = 0
+        self.busy_time = 0.0
+        self.blocked_time = 0.0
+        self.started_at: Optional[float] = None
+
+    def start(self) -> None:
+        """段のスレッドを開始する"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name=f"pipeline-{self.name}", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """段のスレッド終了を待つ"""
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        """段のメインループ"""
+        while not self._stop_event.is_set():
+            item = None
+            if self.input_queue is not None:
+                self._occupancy.append(self.input_queue.qsize())
+                try:
+                    item = self.input_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            elif self._throttle is not None:
+                self._throttle()
+
+            start_time = time.perf_counter()
+            try:
+                output = self.handler(item)
+            except Exception as e:
+                self.error_count += 1
+                stage_error = wrap_exception(
+                    e, PerformanceError,
+                    "Pipeline stage failed",
+                    details={'stage': self.name}
+                )
+                logger.error(f"Pipeline stage error: {stage_error.to_dict()}")
+                continue
+            finally:
+                elapsed = time.perf_counter() - start_time
+                self.busy_time += elapsed
+
+            if output is None:
+                self.dropped_count += 1
+                continue
+
+            self._latencies.append(elapsed * 1000)
+            self.processed_count += 1
+            if self.output_queue is not None:
+                self._put(output)
+
+    def _put(self, item: Dict[str, Any]) -> None:
+        """出力キューへ投入する（満杯の間はブロックしてバックプレッシャーをかける）"""
+        blocked_start = time.perf_counter()
+        while not self._stop_event.is_set():
+            try:
+                self.output_queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.blocked_time += time.perf_counter() - blocked_start
+
+    def get_stats(self) -> Dict[str, Any]:
+        """段の統計を取得"""
+        latencies = list(self._latencies)
+        occupancy = list(self._occupancy)
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        maxsize = self.input_queue.maxsize if self.input_queue is not None else 0
+        return {
+            'name': self.name,
+            'alive': self.is_alive(),
+            'processed': self.processed_count,
+            'dropped': self.dropped_count,
+            'errors': self.error_count,
+            'avg_latency_ms': float(np.mean(latencies)) if latencies else 0.0,
+            'max_latency_ms': float(np.max(latencies)) if latencies else 0.0,
+            'queue_size': self.input_queue.qsize() if self.input_queue is not None else None,
+            'queue_capacity': maxsize or None,
+            'avg_queue_occupancy': (float(np.mean(occupancy)) / maxsize) if occupancy and maxsize else None,
+            'utilization': self.busy_time / elapsed if elapsed > 0 else 0.0,
+            'blocked_ms': self.blocked_time * 1000,
+        }
+
+
+class DetectionPipeline:
+    """
+    検出処理のパイプライン実行（オプトイン）
+    - capture: カメラからフレームを取得（カメラのリングバッファからコピーして保持）
+    - preprocess: フレームスキップ判定・モデル別実行周期・ROI決定・AI最適化前処理・RGB変換
+    - mediapipe: MediaPipe 推論
+    - yolo: YOLO 推論（前処理済みフレーム・ROIトラッキングの推論領域を再利用）
+    - render: 後処理・結果変換の後、on_result コールバック（状態更新・配信・描画）
+    """
+
+    STAGE_NAMES = ('capture', 'preprocess', 'mediapipe', 'yolo', 'render')
+
+    def __init__(self,
+                 camera,
+                 object_detector,
+                 detection_manager,
+                 on_result: Callable[[np.ndarray, List[Dict[str, Any]]], None],
+                 queue_size: int = 1,
+                 target_fps: float = 15.0):
+        """
+        Args:
+            camera: カメラインスタンス
+            object_detector: ObjectDetector インスタンス
+            detection_manager: DetectionManager インスタンス
+            on_result: 1 フレーム分の処理完了時に呼ばれるコールバック (frame, detections_list)
+            queue_size: 段間キューの最大長
+            target_fps: キャプチャ段の目標FPS
+        """
+        self.camera = camera
+        self.object_detector = object_detector
+        self.detection_manager = detection_manager
+        self.on_result = on_result
+        self.queue_size = max(1, int(queue_size))
+        self.frame_time = 1.0 / target_fps if target_fps > 0 else 0.0
+
+        self._stop_event = threading.Event()
+        self._last_capture_time = 0.0
+        self._end_to_end: Deque[float] = deque(maxlen=100)
+        self._completed_count = 0
+        self._started_at: Optional[float] = None
+
+        handlers = {
+            'capture': self._capture,
+            'preprocess': self._preprocess,
+            'mediapipe': self._run_mediapipe,
+            'yolo': self._run_yolo,
+            'render': self._render,
+        }
+        queues: List[Optional[queue.Queue]] = [None] + [
+            queue.Queue(maxsize=self.queue_size) for _ in range(len(self.STAGE_NAMES) - 1)
+        ] + [None]
+        self.stages = [
+            PipelineStage(name, handlers[name], queues[i], queues[i + 1], self._stop_event,
+                          throttle=self._pace_capture if name == 'capture' else None)
+            for i, name in enumerate(self.STAGE_NAMES)
+        ]
+        logger.info(f"DetectionPipeline initialized: stages={list(self.STAGE_NAMES)}, queue_size={self.queue_size}")
+
+    def start(self) -> None:
+        """全段のスレッドを開始する"""
+        self._stop_event.clear()
+        self._started_at = time.time()
+        for stage in self.stages:
+            stage.start()
+        logger.info("DetectionPipeline started.")
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """全段を停止する"""
+        self._stop_event.set()
+        for stage in self.stages:
+            stage.join(timeout=timeout)
+        logger.info("DetectionPipeline stopped.")
+
+    def is_running(self) -> bool:
+        return not self._stop_event.is_set() and all(stage.is_alive() for stage in self.stages)
+
+    # ---- 各段の処理 ----
+
+    def _pace_capture(self) -> None:
+        """キャプチャ段のFPS制御"""
+        wait = self.frame_time - (time.time() - self._last_capture_time)
+        if wait > 0:
+            time.sleep(wait)
+        self._last_capture_time = time.time()
+
+    def _capture(self, _item: None) -> Optional[Dict[str, Any]]:
+        """キャプチャ段: カメラからフレームを取得"""
+        ret, frame = self.camera.get_frame()
+        if not ret or frame is None:
+            return None
+        # カメラのフレームは読み取り専用の共有バッファで、参照中は上書きされないためコピー不要
+        return {'frame': frame, 'captured_at': time.perf_counter()}
+
+    def _preprocess(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """前処理段: スキップ判定・推論開始・前処理フレームの作成"""
+        detector = self.object_detector
+        frame = item['frame']
+        results = detector.begin_detection(frame)
+        if results is None:
+            # 静止フレーム・スキップ時は逐次実行と同じく前回結果を再利用して流す
+            item['results'] = detector.carry_over_results()
+            item['skipped'] = True
+            return item
+
+        item['results'] = results
+        item['skipped'] = False
+        item['inference_start'] = time.time()
+        # モデル別の実行周期: フレームカウンタと同じこの段で決め、再利用するモデルは後段で実行しない
+        models = detector.schedule_stage_models(results)
+        # ROIトラッキング: 推論領域は前段で決め、描画段で結果をフレーム座標へ戻して追従を更新する
+        # （パイプライン実行中は直前の数フレームの結果が反映される前に次の領域が決まる）
+        item['roi'] = detector.get_tracking_roi(frame.shape)
+        if 'yolo' in models:
+            item['yolo_frame'] = detector.preprocess_for_yolo(frame, item['roi'])
+        if any(name != 'yolo' for name in models):
+            item['rgb_frame'] = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return item
+
+    def _run_mediapipe(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """MediaPipe段"""
+        if not item['skipped'] and 'rgb_frame' in item:
+            self.object_detector.run_mediapipe_stage(item.pop('rgb_frame'), item['results'])
+        return item
+
+    def _run_yolo(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """YOLO段"""
+        if not item['skipped']:
+            self.object_detector.run_yolo_stage(
+                item['frame'], item['results'],
+                preprocessed_frame=item.pop('yolo_frame', None), roi=item['roi']
+            )
+        return item
+
+    def _render(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """描画/配信段: 後処理・リスト形式変換・コールバック"""
+        results = item['results']
+        if not item['skipped']:
+            self.object_detector.complete_stages(results, item['frame'].shape, item['roi'])
+            results = self.object_detector.finish_detection(results, inference_start=item['inference_start'])
+        detections_list = self.detection_manager.convert_detector_results(results)
+        self.on_result(item['frame'], detections_list)
+
+        self._end_to_end.append((time.perf_counter() - item['captured_at']) * 1000)
+        self._completed_count += 1
+        return item
+
+    def get_stats(self) -> Dict[str, Any]:
+        """パイプライン統計（段ごとのレイテンシ・占有率とボトルネック）を取得"""
+        stage_stats = [stage.get_stats() for stage in self.stages]
+        bottleneck = max(stage_stats, key=lambda s: s['avg_latency_ms'])['name'] if stage_stats else None
+        end_to_end = list(self._end_to_end)
+        elapsed = time.time() - self._started_at if self._started_at else 0.0
+        return {
+            'running': self.is_running(),
+            'queue_size': self.queue_size,
+            'completed': self._completed_count,
+            'throughput_fps': self._completed_count / elapsed if elapsed > 0 else 0.0,
+            'avg_end_to_end_ms': float(np.mean(end_to_end)) if end_to_end else 0.0,
+            'bottleneck': bottleneck,
+            'stages': stage_stats,
+        }
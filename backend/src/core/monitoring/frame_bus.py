@@ -0,0 +1,240 @@
+"""
+フレームバスモジュール
+
+監視ループが 1 回だけ実行した検出結果を、フレーム・状態スナップショットと
+まとめて複数の購読者（DataCollector, StatusBroadcaster など）へ配信します。
+購読者は各自のペースで最新値または有界キューとして結果を受け取り、
+検出処理を再実行する必要がありません。
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+POLICY_LATEST = 'latest'
+POLICY_QUEUE = 'queue'
+
+
+@dataclass(frozen=True)
+class FramePacket:
+    """監視ループ 1 フレーム分の配信単位
+
+    フレームは購読者間で共有されるため、読み取り専用として扱うこと。
+    描画などで書き換える場合は購読者側でコピーする。
+    """
+    sequence: int
+    timestamp: float
+    frame: np.ndarray
+    detection_results: Dict[str, Any]
+    detections_list: List[Dict[str, Any]]
+    state_snapshot: Dict[str, Any]
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+
+class FrameSubscription:
+    """フレームバスの購読ハンドル
+
+    - latest: 常に最新の 1 パケットのみ保持（未読の古いパケットは破棄）
+    - queue: 最大 ``maxsize`` 件を保持し、溢れた場合は最古を破棄
+    """
+
+    def __init__(self, name: str, policy: str = POLICY_LATEST, maxsize: int = 1):
+        """
+        Args:
+            name: 購読者名（統計表示用）
+            policy: 'latest' または 'queue'
+            maxsize: queue ポリシー時の最大保持数
+        """
+        if policy not in (POLICY_LATEST, POLICY_QUEUE):
+            raise ValueError(f"Unknown subscription policy: {policy}")
+        self.name = name
+        self.policy = policy
+        self.maxsize = max(1, int(maxsize)) if policy == POLICY_QUEUE else 1
+        self._buffer: Deque[FramePacket] = deque(maxlen=self.maxsize)
+        self._latest: Optional[FramePacket] = None
+        self._condition = threading.Condition()
+        self._closed = False
+
+        # 統計
+        self.delivered_count = 0
+        self.received_count = 0
+        self.dropped_count = 0
+
+    def _offer(self, packet: FramePacket) -> None:
+        """バスからパケットを受け取る（バス内部用）"""
+        with self._condition:
+            if self._closed:
+                return
+            if len(self._buffer) == self._buffer.maxlen:
+                # latest は未読の上書き、queue は最古の破棄をドロップとして数える
+                self.dropped_count += 1
+            self._buffer.append(packet)
+            self._latest = packet
+            self.delivered_count += 1
+            self._condition.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[FramePacket]:
+        """未読パケットを 1 件取得する（到着まで最大 ``timeout`` 秒待機）
+
+        Args:
+            timeout: 待機秒数。None の場合は無期限、0 の場合は待機しない
+
+        Returns:
+            Optional[FramePacket]: 未読パケット、タイムアウト・クローズ時はNone
+        """
+        with self._condition:
+            if not self._buffer and not self._closed and timeout != 0:
+                self._condition.wait_for(lambda: self._buffer or self._closed, timeout=timeout)
+            if not self._buffer:
+                return None
+            self.received_count += 1
+            return self._buffer.popleft()
+
+    def peek_latest(self) -> Optional[FramePacket]:
+        """既読・未読に関わらず最新のパケットを返す（消費しない）"""
+        with self._condition:
+            return self._latest
+
+    def close(self) -> None:
+        """購読を終了し、待機中の get() を解放する"""
+        with self._condition:
+            self._closed = True
+            self._buffer.clear()
+            self._condition.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """購読統計を取得"""
+        with self._condition:
+            return {
+                'name': self.name,
+                'policy': self.policy,
+                'maxsize': self.maxsize,
+                'pending': len(self._buffer),
+                'delivered': self.delivered_count,
+                'received': self.received_count,
+                'dropped': self.dropped_count,
+                'latest_sequence': self._latest.sequence if self._latest else None,
+            }
+
+
+class FrameBus:
+    """
+    フレーム・検出結果の publish/subscribe バス
+    - 監視ループが publish() で 1 回だけ配信
+    - 購読者は subscribe() で取得したハンドルから各自のペースで読み出す
+    """
+
+    def __init__(self):
+        self._subscriptions: Dict[str, FrameSubscription] = {}
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._latest: Optional[FramePacket] = None
+        self._last_publish_time = 0.0
+        logger.info("FrameBus initialized.")
+
+    def subscribe(self, name: str, policy: str = POLICY_LATEST, maxsize: int = 1) -> FrameSubscription:
+        """
+        購読を登録する
+
+        同名の購読が既にある場合は古いハンドルをクローズして置き換える。
+
+        Args:
+            name: 購読者名
+            policy: 'latest' または 'queue'
+            maxsize: queue ポリシー時の最大保持数
+
+        Returns:
+            FrameSubscription: 購読ハンドル
+        """
+        subscription = FrameSubscription(name, policy=policy, maxsize=maxsize)
+        with self._lock:
+            previous = self._subscriptions.pop(name, None)
+            self._subscriptions[name] = subscription
+        if previous is not None:
+            previous.close()
+        logger.info(f"FrameBus subscriber registered: {name} (policy={subscription.policy}, maxsize={subscription.maxsize})")
+        return subscription
+
+    def unsubscribe(self, name: str) -> None:
+        """購読を解除する"""
+        with self._lock:
+            subscription = self._subscriptions.pop(name, None)
+        if subscription is not None:
+            subscription.close()
+            logger.info(f"FrameBus subscriber removed: {name}")
+
+    def publish(self,
+                frame: np.ndarray,
+                detection_results: Optional[Dict[str, Any]] = None,
+                detections_list: Optional[List[Dict[str, Any]]] = None,
+                state_snapshot: Optional[Dict[str, Any]] = None,
+                **extras: Any) -> FramePacket:
+        """
+        1 フレーム分の結果を全購読者へ配信する
+
+        Args:
+            frame: カメラフレーム（購読者間で共有される）
+            detection_results: ObjectDetector.detect_objects() の結果辞書
+            detections_list: DetectionManager.detect() のリスト形式結果
+            state_snapshot: StateManager.get_status_summary() のスナップショット
+            **extras: 追加情報
+
+        Returns:
+            FramePacket: 配信したパケット
+        """
+        with self._lock:
+            self._sequence += 1
+            packet = FramePacket(
+                sequence=self._sequence,
+                timestamp=time.time(),
+                frame=frame,
+                detection_results=detection_results or {},
+                detections_list=detections_list or [],
+                state_snapshot=state_snapshot or {},
+                extras=extras,
+            )
+            self._latest = packet
+            self._last_publish_time = packet.timestamp
+            subscriptions = list(self._subscriptions.values())
+
+        for subscription in subscriptions:
+            subscription._offer(packet)
+        return packet
+
+    def latest(self) -> Optional[FramePacket]:
+        """最後に配信されたパケットを返す"""
+        with self._lock:
+            return self._latest
+
+    @property
+    def sequence(self) -> int:
+        """最後に配信したパケットのシーケンス番号"""
+        return self._sequence
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """バス全体の統計を取得"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+            last_publish_time = self._last_publish_time
+            sequence = self._sequence
+        return {
+            'sequence': sequence,
+            'last_publish_age_ms': (time.time() - last_publish_time) * 1000 if last_publish_time else None,
+            'subscribers': [s.get_stats() for s in subscriptions],
+        }
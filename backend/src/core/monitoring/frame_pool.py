@@ -0,0 +1,192 @@
+"""
+フレームバッファプールモジュール
+
+フレームサイズの numpy バッファを形状ごとにプールし、参照が無くなったバッファを
+再利用します。参照の数え上げには CPython の参照カウントを使い、バッファ（または
+そのビュー）を保持している読み手がいる間は再利用されません。読み手は
+明示的な解放をしなくても、参照を捨てた時点でバッファがプールへ戻ります。
+
+SharedFrame はプールのバッファを読み取り専用ビューとして包んだ不変のフレームで、
+単調増加のシーケンス番号を持ちます。読み取りだけの消費者はコピーせずに共有し、
+描画などの書き込みはプールから取得した作業用バッファへ行います。
+"""
+
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def _reference_count(buffer: np.ndarray) -> int:
+    return sys.getrefcount(buffer)
+
+
+def _calibrate_free_references() -> int:
+    """
+    プール内部の参照（リスト・ループ変数・引数）だけを持つバッファの参照数を測る
+
+    インタプリタのバージョンで参照の数え方が異なるため、判定と同じ呼び出し形で実測する。
+    """
+    buffers = [np.empty(0)]
+    for buffer in buffers:
+        return _reference_count(buffer)
+    return 0
+
+
+_FREE_REFERENCES = _calibrate_free_references()
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    """
+    不変の共有フレーム
+
+    array は読み取り専用ビューで、保持している間は元のプールバッファが再利用されない。
+    書き換えが必要な場合はコピー（またはプールの作業用バッファ）へ描画すること。
+    """
+    sequence: int
+    timestamp: float
+    array: np.ndarray
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.array.shape
+
+
+def freeze(buffer: np.ndarray) -> np.ndarray:
+    """
+    バッファの読み取り専用ビューを返す（元バッファへの参照を保持する）
+
+    Args:
+        buffer: 書き込み済みのバッファ
+
+    Returns:
+        np.ndarray: 読み取り専用ビュー
+    """
+    view = buffer.view()
+    view.flags.writeable = False
+    return view
+
+
+class FramePool:
+    """
+    形状・dtype ごとのフレームバッファプール
+    - acquire(): 参照の残っていないバッファを再利用し、無ければ新規確保
+    - 形状ごとの保持数は max_buffers まで（超過分はプール外の一時バッファとして確保）
+    - 参照の判定は sys.getrefcount による（ビュー・SharedFrame が生きている間は使用中）
+    """
+
+    def __init__(self, name: str, max_buffers: int = 8):
+        """
+        Args:
+            name: プール名（統計表示用）
+            max_buffers: 形状ごとにプールするバッファ数の上限
+        """
+        self.name = name
+        self.max_buffers = max(1, int(max_buffers))
+        self._lock = threading.Lock()
+        self._buffers: Dict[Tuple[Tuple[int, ...], str], List[np.ndarray]] = defaultdict(list)
+
+        # 統計
+        self.allocated_count = 0
+        self.reused_count = 0
+        self.overflow_count = 0
+
+    def acquire(self, shape: Tuple[int, ...], dtype: Any = np.uint8) -> np.ndarray:
+        """
+        書き込み用のバッファを取得する（内容は未初期化）
+
+        Args:
+            shape: バッファの形状
+            dtype: データ型
+
+        Returns:
+            np.ndarray: 書き込み可能なバッファ。参照を捨てるとプールへ戻る
+        """
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            buffers = self._buffers[key]
+            for buffer in buffers:
+                if _reference_count(buffer) <= _FREE_REFERENCES:
+                    self.reused_count += 1
+                    return buffer
+            buffer = np.empty(shape, dtype=dtype)
+            if len(buffers) < self.max_buffers:
+                buffers.append(buffer)
+                self.allocated_count += 1
+                if len(buffers) == 1 and len(self._buffers) > 1:
+                    # 形状が変わった場合、使われなくなった形状のバッファを手放す
+                    self._trim_locked(key)
+            else:
+                # 全バッファが使用中（読み手が長く保持している）: プール外で確保
+                self.overflow_count += 1
+            return buffer
+
+    def _trim_locked(self, keep_key: Tuple[Tuple[int, ...], str]) -> None:
+        """keep_key 以外の形状のうち、使用中でないバッファをプールから外す"""
+        for key in list(self._buffers):
+            if key == keep_key:
+                continue
+            in_use = []
+            for buffer in self._buffers[key]:
+                if _reference_count(buffer) > _FREE_REFERENCES:
+                    in_use.append(buffer)
+            self._buffers[key] = in_use
+            if not in_use:
+                del self._buffers[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """プール統計を取得"""
+        with self._lock:
+            shapes = {}
+            for (shape, dtype), buffers in self._buffers.items():
+                in_use = 0
+                for buffer in buffers:
+                    if _reference_count(buffer) > _FREE_REFERENCES:
+                        in_use += 1
+                shapes[f"{'x'.join(map(str, shape))}:{dtype}"] = {'pooled': len(buffers), 'in_use': in_use}
+            pooled_bytes = sum(buffer.nbytes for buffers in self._buffers.values() for buffer in buffers)
+        total = self.allocated_count + self.reused_count + self.overflow_count
+        return {
+            'name': self.name,
+            'max_buffers': self.max_buffers,
+            'allocated': self.allocated_count,
+            'reused': self.reused_count,
+            'overflow': self.overflow_count,
+            'reuse_ratio': self.reused_count / total if total else 0.0,
+            'pooled_bytes': pooled_bytes,
+            'shapes': shapes,
+        }
+
+
+def share_frame(pool: FramePool, source: np.ndarray, sequence: int,
+                timestamp: Optional[float] = None) -> SharedFrame:
+    """
+    書き込み可能な配列をプールのバッファへコピーして SharedFrame にする
+
+    既に読み取り専用のフレーム（他の SharedFrame のビューなど）はコピーせずに包む。
+
+    Args:
+        pool: コピー先のプール
+        source: 元フレーム
+        sequence: シーケンス番号
+        timestamp: 時刻（None は現在時刻）
+
+    Returns:
+        SharedFrame: 共有フレーム
+    """
+    if not source.flags.writeable:
+        array = source
+    else:
+        buffer = pool.acquire(source.shape, source.dtype)
+        np.copyto(buffer, source)
+        array = freeze(buffer)
+    return SharedFrame(sequence=sequence, timestamp=time.time() if timestamp is None else timestamp, array=array)
@@ -0,0 +1,164 @@
+"""
+フレームリングバッファモジュール
+
+フレームバッファプールから取得したバッファにキャプチャスレッドが書き込み、
+読み出し側はシーケンス番号で最新フレームを不変の共有フレーム（読み取り専用ビュー）
+としてコピーなしで取得します。読み手が参照を保持している間、そのバッファは
+プールで再利用されないため、保持期間の制約はありません。
+未読のまま次のフレームに置き換わったフレーム（ドロップ）と、新規フレームが無いまま
+同じフレームを返した回数（重複）を計測します。
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import setup_logger
+from .frame_pool import FramePool, SharedFrame, freeze
+
+logger = setup_logger(__name__)
+
+
+class FrameRingBuffer:
+    """
+    プール型フレームリング（単一ライター・最新値のみ公開）
+
+    読み出したフレームは SharedFrame（読み取り専用ビュー）で、参照している間は
+    ライターに上書きされない。全バッファが読み手に保持されている場合、
+    プールは一時バッファを確保する（overflow として計測）。
+    """
+
+    def __init__(self, capacity: int = 4):
+        """
+        Args:
+            capacity: プールするバッファ数（最新・書き込み中に加え、読み手が同時に保持できる数）
+        """
+        self.capacity = max(2, int(capacity))
+        self.pool = FramePool('camera', max_buffers=self.capacity)
+        self._shape: Optional[Tuple[int, ...]] = None
+        self._condition = threading.Condition()
+
+        # 書き込み中バッファと公開済みの最新フレーム
+        self._writing: Optional[np.ndarray] = None
+        self._latest: Optional[SharedFrame] = None
+
+        # 書き込み済みの最新シーケンス（0 は未書き込み）
+        self._sequence = 0
+        self._last_read_sequence = 0
+
+        # 統計
+        self.written_count = 0
+        self.read_count = 0
+        self.dropped_count = 0
+        self.duplicated_count = 0
+
+    def acquire_write_slot(self, shape: Tuple[int, ...], dtype: Any = np.uint8) -> np.ndarray:
+        """
+        次に書き込むバッファを返す（ライタースレッド専用）
+
+        最新フレームと読み手が保持中のバッファは選ばれない。
+
+        Args:
+            shape: フレーム形状
+            dtype: フレームのデータ型
+
+        Returns:
+            np.ndarray: 書き込み先バッファ（commit_write() で公開される）
+        """
+        if self._shape != tuple(shape):
+            self._shape = tuple(shape)
+            logger.info(f"FrameRingBuffer frame shape: {shape} ({np.dtype(dtype)}), pool size {self.capacity}")
+        # 未公開のまま放棄されたバッファ（読み取り失敗時）を先にプールへ戻す
+        self._writing = None
+        self._writing = self.pool.acquire(shape, dtype)
+        return self._writing
+
+    def commit_write(self) -> int:
+        """
+        acquire_write_slot() で得たバッファへの書き込み完了を公開する
+
+        Returns:
+            int: 公開したフレームのシーケンス番号
+        """
+        with self._condition:
+            if self._writing is None:
+                return self._sequence
+            self._sequence += 1
+            self._latest = SharedFrame(sequence=self._sequence, timestamp=time.time(), array=freeze(self._writing))
+            self._writing = None
+            self.written_count += 1
+            self._condition.notify_all()
+            return self._sequence
+
+    def get_latest_frame(self,
+                         after_sequence: Optional[int] = None,
+                         timeout: Optional[float] = None) -> Optional[SharedFrame]:
+        """
+        最新フレームを共有フレームとして取得する
+
+        Args:
+            after_sequence: このシーケンスより新しいフレームを待つ（None の場合は前回読み出し位置）
+            timeout: 新しいフレームを待つ最大秒数。0 の場合は待機しない
+
+        Returns:
+            Optional[SharedFrame]: 最新フレーム。未書き込み時はNone
+        """
+        with self._condition:
+            threshold = self._last_read_sequence if after_sequence is None else after_sequence
+            if self._sequence <= threshold and timeout != 0:
+                self._condition.wait_for(lambda: self._sequence > threshold, timeout=timeout)
+
+            latest = self._latest
+            if latest is None:
+                return None
+
+            if latest.sequence <= self._last_read_sequence:
+                # 新しいフレームが届かず同じフレームを再配布
+                self.duplicated_count += 1
+            else:
+                if self._last_read_sequence:
+                    self.dropped_count += latest.sequence - self._last_read_sequence - 1
+                self._last_read_sequence = latest.sequence
+            self.read_count += 1
+            return latest
+
+    def get_latest(self,
+                   after_sequence: Optional[int] = None,
+                   timeout: Optional[float] = None) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        最新フレームをコピーなしで取得する
+
+        Args:
+            after_sequence: このシーケンスより新しいフレームを待つ（None の場合は前回読み出し位置）
+            timeout: 新しいフレームを待つ最大秒数。0 の場合は待機しない
+
+        Returns:
+            Tuple[int, Optional[np.ndarray]]: (シーケンス番号, 読み取り専用フレーム)。未書き込み時は (0, None)
+        """
+        latest = self.get_latest_frame(after_sequence=after_sequence, timeout=timeout)
+        if latest is None:
+            return 0, None
+        return latest.sequence, latest.array
+
+    @property
+    def sequence(self) -> int:
+        """最新の書き込み済みシーケンス番号"""
+        return self._sequence
+
+    def get_stats(self) -> Dict[str, Any]:
+        """リングバッファ統計を取得"""
+        with self._condition:
+            stats = {
+                'capacity': self.capacity,
+                'frame_shape': self._shape,
+                'sequence': self._sequence,
+                'last_read_sequence': self._last_read_sequence,
+                'written': self.written_count,
+                'read': self.read_count,
+                'dropped': self.dropped_count,
+                'duplicated': self.duplicated_count,
+            }
+        stats['pool'] = self.pool.get_stats()
+        return stats
@@ -0,0 +1,518 @@
+"""
+H.264 ストリームエンコーダモジュール
+
+FrameBus に配信された新しいフレームを描画し、PyAV（libx264, ultrafast / zerolatency）で
+1 回だけエンコードして、フラグメント化 MP4（fMP4）として全視聴者へ同じバイト列を配信します。
+机上のようにほとんど動かないシーンではフレーム間予測により、MJPEG より帯域・エンコード負荷が
+小さくなります。
+
+配信形式:
+    初期化セグメント（ftyp + moov）に続いて 1 フレームごとのフラグメント（moof + mdat）。
+    新しい視聴者の参加時はキーフレームを強制し、初期化セグメントの直後にキーフレームから送る。
+    視聴者が追いつかない場合は滞留分を破棄して次のキーフレームから再開する。
+
+PyAV（av）は任意依存。未インストールの場合は本ストリームのみ無効になります。
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+from fractions import Fraction
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from utils.logger import setup_logger
+from utils.exceptions import RenderingError, ServiceUnavailableError, wrap_exception
+from .frame_bus import FrameBus, FramePacket
+
+try:
+    import av  # type: ignore
+except Exception:  # noqa: BLE001
+    av = None  # optional dependency (H.264 stream disabled)
+
+logger = setup_logger(__name__)
+
+# 1 フレーム 1 フラグメント、moov は空（ライブ配信用）
+FMP4_MOVFLAGS = 'empty_moov+default_base_moof+frag_every_frame'
+PTS_TIME_BASE = Fraction(1, 1000)
+
+
+class _FragmentSink:
+    """
+    PyAV の出力先（シーク不可のファイルライクオブジェクト）
+    - 書き込まれたバイト列を MP4 のトップレベルボックス単位に切り出す
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.boxes: List[Tuple[bytes, bytes]] = []
+
+    def write(self, data: bytes) -> int:
+        self._buffer.extend(data)
+        while len(self._buffer) >= 8:
+            size = int.from_bytes(self._buffer[:4], 'big')
+            if size < 8 or len(self._buffer) < size:
+                break
+            box = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            self.boxes.append((box[4:8], box))
+        return len(data)
+
+    def take(self) -> List[Tuple[bytes, bytes]]:
+        boxes, self.boxes = self.boxes, []
+        return boxes
+
+
+class H264StreamClient:
+    """
+    H.264（fMP4）ストリームの視聴クライアント（HTTP 接続 1 本分）
+    - next_chunk() で未送信のフラグメントをまとめて受け取る（初回は初期化セグメントを先頭に付ける）
+    - 滞留が max_backlog を超えた場合は破棄して次のキーフレームから再開
+    """
+
+    def __init__(self, encoder: 'H264StreamEncoder', client_id: int, name: str):
+        self._encoder = encoder
+        self.client_id = client_id
+        self.name = name
+        self.connected_at = time.time()
+        self.last_fetch_time = self.connected_at
+        self.closed = False
+        self.close_reason: Optional[str] = None
+
+        self._queue: Deque[bytes] = deque()
+        self._needs_init = True
+        self._waiting_keyframe = True
+
+        # 統計
+        self.sent_count = 0
+        self.sent_bytes = 0
+        self.dropped_count = 0
+
+    def next_chunk(self, timeout: float = 1.0) -> Optional[bytes]:
+        """
+        未送信のフラグメントを取得する
+
+        Args:
+            timeout: 新しいフラグメントを待つ最大秒数
+
+        Returns:
+            Optional[bytes]: fMP4 のバイト列。タイムアウト・切断時は None
+        """
+        return self._encoder._wait_for_client(self, timeout)
+
+    def close(self, reason: str = 'closed') -> None:
+        """視聴を終了する"""
+        self._encoder._remove_client(self, reason)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'client_id': self.client_id,
+            'name': self.name,
+            'connected_seconds': time.time() - self.connected_at,
+            'sent_chunks': self.sent_count,
+            'sent_bytes': self.sent_bytes,
+            'dropped_fragments': self.dropped_count,
+            'backlog': len(self._queue),
+        }
+
+
+class H264StreamEncoder:
+    """
+    共有 H.264 ストリームエンコーダ（オプトイン）
+    - 視聴者がいる間だけエンコードセッション（コンテナ・コーデック）を開く
+    - 新しいフレームを max_fps まで間引いて 1 回だけ描画・エンコードし、全視聴者で共有
+    - 解像度変更・エラーでセッションを作り直した場合、旧セッションの視聴者は切断（再接続で新しい初期化セグメント）
+    - 帯域（ビットレート）・エンコード時間（実時間・CPU時間）を MJPEG と比較できるよう計測
+    """
+
+    def __init__(self,
+                 frame_bus: FrameBus,
+                 render: Callable[[np.ndarray, Dict[str, Any], Optional[int]], np.ndarray],
+                 scale: float = 1.0,
+                 max_fps: float = 15.0,
+                 crf: int = 28,
+                 preset: str = 'ultrafast',
+                 keyframe_interval: float = 10.0,
+                 max_backlog: int = 60,
+                 stall_timeout: float = 10.0,
+                 on_encoded: Optional[Callable[[int], None]] = None):
+        """
+        Args:
+            frame_bus: フレームバス
+            render: (フレーム, 表示用検出結果, シーケンス番号) から描画済みフレームを返す関数
+            scale: 配信解像度の縮小率
+            max_fps: 最大エンコードFPS（0 は FrameBus の配信レートのまま）
+            crf: x264 の品質（大きいほど低ビットレート）
+            preset: x264 のプリセット
+            keyframe_interval: 視聴者の参加が無い場合のキーフレーム間隔（秒）
+            max_backlog: キーフレームからやり直すまでの視聴者ごとの滞留フラグメント数
+            stall_timeout: クライアントを切断するまでの無取得時間（秒）
+            on_encoded: フラグメント作成時に FrameBus シーケンス番号を渡して呼ぶ通知関数
+        """
+        self.frame_bus = frame_bus
+        self.render = render
+        self.scale = float(scale)
+        self.max_fps = float(max_fps)
+        self.crf = int(crf)
+        self.preset = preset
+        self.keyframe_interval = float(keyframe_interval)
+        self.max_backlog = max(1, int(max_backlog))
+        self.stall_timeout = float(stall_timeout)
+        self.on_encoded = on_encoded
+
+        self._condition = threading.Condition()
+        self._clients: Dict[int, H264StreamClient] = {}
+        self._client_ids = itertools.count(1)
+        self._force_keyframe = False
+
+        # エンコードセッション（エンコードスレッドのみが操作）
+        self._container = None
+        self._stream = None
+        self._sink: Optional[_FragmentSink] = None
+        self._session_size: Optional[Tuple[int, int]] = None
+        self._session_start: Optional[float] = None
+        self._last_pts = -1
+        self._last_encode_time = 0.0
+        self._pending_keyframes: Deque[bool] = deque()
+        self._init_segment: Optional[bytes] = None
+        self._init_boxes: List[bytes] = []
+
+        self._subscription = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        # 統計
+        self.session_count = 0
+        self.encoded_count = 0
+        self.keyframe_count = 0
+        self.fragment_bytes = 0
+        self.error_count = 0
+        self.evicted_count = 0
+        self.total_render_time = 0.0
+        self.total_encode_time = 0.0
+        self.total_encode_cpu_time = 0.0
+        self._bitrate_bps: Optional[float] = None
+        self._last_fragment_time: Optional[float] = None
+
+    @property
+    def available(self) -> bool:
+        """PyAV が利用可能か"""
+        return av is not None
+
+    def start(self) -> None:
+        """エンコードスレッドを開始する"""
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._subscription = self.frame_bus.subscribe('h264_stream')
+            self._thread = threading.Thread(target=self._run, name="h264-stream-encoder", daemon=True)
+            self._thread.start()
+        logger.info(f"H264StreamEncoder started (scale={self.scale}, max_fps={self.max_fps}, "
+                    f"crf={self.crf}, preset={self.preset})")
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """エンコードスレッドを停止し、全クライアントを切断する"""
+        self._stop_event.set()
+        if self._subscription is not None:
+            self.frame_bus.unsubscribe('h264_stream')
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        with self._condition:
+            for client in list(self._clients.values()):
+                self._close_client_locked(client, 'encoder_stopped')
+            self._condition.notify_all()
+        self._close_session()
+        logger.info("H264StreamEncoder stopped.")
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def open_client(self, name: Optional[str] = None) -> H264StreamClient:
+        """
+        視聴クライアントを登録する（初回呼び出しでエンコードスレッドを開始）
+
+        Args:
+            name: クライアント名（統計表示用）
+
+        Returns:
+            H264StreamClient: クライアントハンドル
+
+        Raises:
+            ServiceUnavailableError: PyAV が利用できない場合
+        """
+        if not self.available:
+            raise ServiceUnavailableError(
+                "H.264 stream requires PyAV (av) which is not installed",
+                details={'dependency': 'av'}
+            )
+        with self._condition:
+            client_id = next(self._client_ids)
+            client = H264StreamClient(self, client_id, name or f"h264-{client_id}")
+            self._clients[client_id] = client
+            # 参加直後から再生できるよう次のフレームをキーフレームにする
+            self._force_keyframe = True
+        if not self.is_running():
+            self.start()
+        logger.info(f"H.264 stream client opened: {client.name} (clients={len(self._clients)})")
+        return client
+
+    def _remove_client(self, client: H264StreamClient, reason: str) -> None:
+        with self._condition:
+            self._close_client_locked(client, reason)
+            self._condition.notify_all()
+
+    def _close_client_locked(self, client: H264StreamClient, reason: str) -> None:
+        if self._clients.pop(client.client_id, None) is not None:
+            client.closed = True
+            client.close_reason = reason
+            client._queue.clear()
+            logger.info(f"H.264 stream client closed: {client.name} ({reason}, sent={client.sent_count})")
+
+    def _wait_for_client(self, client: H264StreamClient, timeout: float) -> Optional[bytes]:
+        """クライアントの未送信フラグメントを待ってまとめて返す"""
+        with self._condition:
+            client.last_fetch_time = time.time()
+            if not client.closed and not client._queue:
+                self._condition.wait_for(lambda: client.closed or bool(client._queue), timeout=timeout)
+            if client.closed or not client._queue:
+                return None
+
+            chunks = list(client._queue)
+            client._queue.clear()
+            if client._needs_init:
+                chunks.insert(0, self._init_segment or b'')
+                client._needs_init = False
+            data = b''.join(chunks)
+            client.last_fetch_time = time.time()
+            client.sent_count += 1
+            client.sent_bytes += len(data)
+            return data
+
+    def _run(self) -> None:
+        """エンコードスレッドのメインループ"""
+        subscription = self._subscription
+        while not self._stop_event.is_set():
+            packet = subscription.get(timeout=0.5)
+            self._evict_stalled_clients()
+            if not self._clients:
+                # 視聴者がいなければセッションを閉じる（次の視聴者は新しいセッションから）
+                if self._container is not None:
+                    self._close_session()
+                continue
+            if packet is None:
+                continue
+            if self.max_fps and packet.timestamp - self._last_encode_time < 0.9 / self.max_fps:
+                continue
+            self._last_encode_time = packet.timestamp
+            self._encode(packet)
+
+    def _encode(self, packet: FramePacket) -> None:
+        """パケットのフレームを描画して H.264 へエンコードし、フラグメントを配信する"""
+        try:
+            start_time = time.perf_counter()
+            display_results = packet.extras.get('display_results') or packet.detection_results
+            rendered = self.render(packet.frame, display_results, packet.sequence)
+            self.total_render_time += time.perf_counter() - start_time
+
+            image = rendered
+            height, width = image.shape[:2]
+            if self.scale < 1.0:
+                width, height = max(2, int(width * self.scale)), max(2, int(height * self.scale))
+                image = cv2.resize(rendered, (width, height), interpolation=cv2.INTER_AREA)
+            # yuv420p は偶数サイズが必要
+            width, height = width - width % 2, height - height % 2
+            image = image[:height, :width]
+
+            if self._session_size != (width, height):
+                self._open_session(width, height, packet.timestamp)
+
+            start_time = time.perf_counter()
+            start_cpu = time.thread_time()
+            frame = av.VideoFrame.from_ndarray(np.ascontiguousarray(image), format='bgr24')
+            pts = int((packet.timestamp - self._session_start) / PTS_TIME_BASE)
+            frame.pts = max(pts, self._last_pts + 1)
+            frame.time_base = PTS_TIME_BASE
+            self._last_pts = frame.pts
+            with self._condition:
+                force_keyframe, self._force_keyframe = self._force_keyframe, False
+            if force_keyframe:
+                self._mark_keyframe(frame)
+            for encoded_packet in self._stream.encode(frame):
+                self._pending_keyframes.append(bool(encoded_packet.is_keyframe))
+                self._container.mux(encoded_packet)
+            self.encoded_count += 1
+            self.total_encode_time += time.perf_counter() - start_time
+            self.total_encode_cpu_time += time.thread_time() - start_cpu
+        except Exception as e:
+            self.error_count += 1
+            encoding_error = wrap_exception(
+                e, RenderingError,
+                "Error encoding stream frame to H.264",
+                details={
+                    'sequence': packet.sequence,
+                    'frame_shape': packet.frame.shape if packet.frame is not None else None,
+                    'session_size': self._session_size
+                }
+            )
+            logger.error(f"H.264 stream encoding error: {encoding_error.to_dict()}")
+            # コーデック状態が不明なため次のフレームでセッションを作り直す
+            self._close_session()
+            return
+
+        self._distribute(packet.sequence)
+
+    def _distribute(self, sequence: int) -> None:
+        """出力されたボックスを初期化セグメント・フラグメントに分けて視聴者へ配る"""
+        fragments: List[Tuple[bytes, bool]] = []
+        moof = None
+        for box_type, box in self._sink.take():
+            if self._init_segment is None:
+                if box_type in (b'ftyp', b'moov'):
+                    self._init_boxes.append(box)
+                    if box_type == b'moov':
+                        self._init_segment = b''.join(self._init_boxes)
+                    continue
+            if box_type == b'moof':
+                moof = box
+            elif box_type == b'mdat' and moof is not None:
+                keyframe = self._pending_keyframes.popleft() if self._pending_keyframes else False
+                fragments.append((moof + box, keyframe))
+                moof = None
+        if not fragments:
+            return
+
+        now = time.time()
+        size = sum(len(fragment) for fragment, _ in fragments)
+        if self._last_fragment_time is not None and now > self._last_fragment_time:
+            rate = size * 8 / (now - self._last_fragment_time)
+            self._bitrate_bps = rate if self._bitrate_bps is None else 0.1 * rate + 0.9 * self._bitrate_bps
+        self._last_fragment_time = now
+        self.fragment_bytes += size
+        self.keyframe_count += sum(1 for _, keyframe in fragments if keyframe)
+
+        with self._condition:
+            for client in self._clients.values():
+                for fragment, keyframe in fragments:
+                    if client._waiting_keyframe:
+                        if not keyframe:
+                            client.dropped_count += 1
+                            continue
+                        client._waiting_keyframe = False
+                    client._queue.append(fragment)
+                if len(client._queue) > self.max_backlog:
+                    # 追いつけない視聴者は滞留分を捨ててキーフレームから再開
+                    client.dropped_count += len(client._queue)
+                    client._queue.clear()
+                    client._waiting_keyframe = True
+                    self._force_keyframe = True
+            self._condition.notify_all()
+        if self.on_encoded is not None:
+            self.on_encoded(sequence)
+
+    def _open_session(self, width: int, height: int, timestamp: float) -> None:
+        """コンテナ・コーデックを作成する（旧セッションの初期化セグメントを受信済みの視聴者は切断）"""
+        self._close_session()
+        with self._condition:
+            for client in list(self._clients.values()):
+                if not client._needs_init:
+                    self._close_client_locked(client, 'session_restarted')
+            self._condition.notify_all()
+
+        self._sink = _FragmentSink()
+        self._container = av.open(self._sink, mode='w', format='mp4', options={'movflags': FMP4_MOVFLAGS})
+        stream = self._container.add_stream('libx264', rate=max(1, int(round(self.max_fps or 30))))
+        stream.width = width
+        stream.height = height
+        stream.pix_fmt = 'yuv420p'
+        stream.codec_context.time_base = PTS_TIME_BASE
+        stream.codec_context.gop_size = max(1, int(self.keyframe_interval * (self.max_fps or 30)))
+        stream.codec_context.options = {
+            'preset': self.preset,
+            'tune': 'zerolatency',
+            'crf': str(self.crf),
+            'forced-idr': '1',
+        }
+        self._stream = stream
+        self._session_size = (width, height)
+        self._session_start = timestamp
+        self._last_pts = -1
+        self._pending_keyframes.clear()
+        self._init_segment = None
+        self._init_boxes = []
+        self._force_keyframe = True
+        self.session_count += 1
+        logger.info(f"H.264 stream session opened: {width}x{height}")
+
+    def _close_session(self) -> None:
+        """エンコードセッションを閉じる"""
+        if self._container is None:
+            return
+        try:
+            self._container.close()
+        except Exception as e:  # noqa: BLE001
+            logger.debug(f"H.264 stream container close error: {e}")
+        self._container = None
+        self._stream = None
+        self._sink = None
+        self._session_size = None
+        self._init_segment = None
+        self._last_fragment_time = None
+
+    @staticmethod
+    def _mark_keyframe(frame) -> None:
+        """フレームを I ピクチャとしてエンコードさせる（PyAV のバージョン差を吸収）"""
+        picture_type = getattr(getattr(av.video.frame, 'PictureType', None), 'I', None)
+        frame.pict_type = picture_type if picture_type is not None else 'I'
+
+    def _evict_stalled_clients(self) -> None:
+        """stall_timeout 秒以上取りに来ていないクライアントを切断する"""
+        now = time.time()
+        with self._condition:
+            stalled = [client for client in self._clients.values()
+                       if now - client.last_fetch_time > self.stall_timeout]
+            for client in stalled:
+                self._close_client_locked(client, 'stalled')
+                self.evicted_count += 1
+            if stalled:
+                self._condition.notify_all()
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    @property
+    def bitrate_bps(self) -> Optional[float]:
+        """直近の出力ビットレート（bit/秒、EWMA）"""
+        return self._bitrate_bps
+
+    def get_stats(self) -> Dict[str, Any]:
+        """エンコーダ・クライアント統計を取得"""
+        with self._condition:
+            clients = [client.get_stats() for client in self._clients.values()]
+        encoded = self.encoded_count
+        return {
+            'available': self.available,
+            'running': self.is_running(),
+            'session_size': self._session_size,
+            'scale': self.scale,
+            'max_fps': self.max_fps,
+            'crf': self.crf,
+            'preset': self.preset,
+            'sessions': self.session_count,
+            'encoded_frames': encoded,
+            'keyframes': self.keyframe_count,
+            'fragment_bytes': self.fragment_bytes,
+            'avg_frame_bytes': self.fragment_bytes / encoded if encoded else 0.0,
+            'bitrate_bps': self._bitrate_bps,
+            'errors': self.error_count,
+            'evicted_clients': self.evicted_count,
+            'avg_render_ms': (self.total_render_time / encoded * 1000) if encoded else 0.0,
+            'avg_encode_ms': (self.total_encode_time / encoded * 1000) if encoded else 0.0,
+            'avg_encode_cpu_ms': (self.total_encode_cpu_time / encoded * 1000) if encoded else 0.0,
+            'client_count': len(clients),
+            'clients': clients,
+        }
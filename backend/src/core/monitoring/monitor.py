@@ -14,22 +14,28 @@ from .camera import Camera
 from core.detection import Detector, DetectionManager
 from services.communication.alert_manager import AlertManager
 from core.management import StateManager
-from web.websocket import broadcast_status, socketio
-from PIL import Image, ImageDraw, ImageFont
+from web.websocket import broadcast_status, socketio, has_subscribers, get_websocket_stats
+from web.subscriptions import TOPIC_BEHAVIOR_DATA, TOPIC_ANALYSIS_RESULTS
 import numpy as np
-import platform
-import os
 from utils.config_manager import ConfigManager
 from typing import Any, Dict, Optional, List, Tuple
 
 # 新しく分割されたクラスをインポート
 from core.optimization import FrameProcessor
+from core.rendering.text_overlay import TextOverlayCache, find_system_font
+from models.storage_engine import get_database_writer
 from .status_broadcaster import StatusBroadcaster
 from core.management import ScheduleChecker
 from .threshold_manager import ThresholdManager
+from .frame_bus import FrameBus
+from .detection_pipeline import DetectionPipeline
+from .multi_camera import MultiCameraMonitor, create_multi_camera_monitor
 
 logger = setup_logger(__name__)
 
+# 傾向分析・分析ブロードキャストで BehaviorLog から読み込む列
+_TREND_COLUMNS = ('timestamp', 'focus_level', 'presence_status', 'smartphone_detected')
+
 
 class Monitor:
     """
@@ -52,7 +58,8 @@ class Monitor:
                  schedule_manager=None,
                  data_collector=None,
                  storage_service=None,
-                 flask_app=None):
+                 flask_app=None,
+                 frame_bus: Optional[FrameBus] = None):
         """モニターの初期化 (依存性注入・ConfigManager 版)"""
         self.config_manager = config_manager
         self.camera = camera
@@ -64,6 +71,8 @@ class Monitor:
         self.flask_app = flask_app
         self.data_collector = data_collector
         self.storage_service = storage_service
+        # 検出結果の配信バス（DataCollector 等と共有。未指定時は専用バスを作成）
+        self.frame_bus = frame_bus if frame_bus is not None else FrameBus()
         
         # DataCollector開始
         if self.data_collector:
@@ -94,7 +103,13 @@ class Monitor:
             detector=detector,
             state_manager=state,
             camera=camera,
-            config_manager=config_manager
+            config_manager=config_manager,
+            frame_bus=self.frame_bus
+        )
+
+        # 日本語ステータス文字列のスプライトキャッシュ（フォントはサイズごとに 1 回だけ読み込む）
+        self.text_overlay = TextOverlayCache(
+            max_sprites=config_manager.get('display.text_overlay.max_sprites', 64) if config_manager else 64
         )
         
         self.schedule_checker = ScheduleChecker(
@@ -111,7 +126,30 @@ class Monitor:
         self.last_analysis_broadcast = time.time()
         self.analysis_broadcast_interval = 10  # 10秒間隔で分析データ配信
         
-        logger.info(f"Monitor initialized with target FPS: {self.target_fps}")
+        # パイプライン実行（オプトイン）: キャプチャ・前処理・推論・描画を段ごとに並行実行
+        self.pipeline: Optional[DetectionPipeline] = None
+        if config_manager.get('optimization.pipeline.enabled', False):
+            self.pipeline = DetectionPipeline(
+                camera=camera,
+                object_detector=detector.object_detector,
+                detection_manager=detection,
+                on_result=self._on_pipeline_result,
+                queue_size=config_manager.get('optimization.pipeline.queue_size', 1),
+                target_fps=self.target_fps
+            )
+        
+        # 複数カメラモード（オプトイン）: 追加カメラのフレームをまとめてバッチ推論
+        self.multi_camera: Optional[MultiCameraMonitor] = None
+        if config_manager.get('multi_camera.enabled', False):
+            self.multi_camera = create_multi_camera_monitor(
+                config_manager,
+                detector,
+                alert_manager,
+                primary_device_index=getattr(camera, 'device_index', None)
+            )
+        
+        logger.info(f"Monitor initialized with target FPS: {self.target_fps} (pipeline: {self.pipeline is not None}, "
+                    f"multi_camera: {self.multi_camera is not None})")
 
     def update_detection_results(self, results):
         """検出結果を更新（互換性のため）"""
@@ -122,6 +160,22 @@ class Monitor:
         detection_results = self.frame_processor.get_detection_results()
         return self.status_broadcaster.get_current_frame(detection_results)
 
+    def get_snapshot(self, max_age_ms=None):
+        """最新フレームのエンコード済み JPEG を (シーケンス番号, JPEG, 時刻) で取得（未取得時はNone）"""
+        return self.status_broadcaster.get_snapshot(max_age_ms)
+
+    def open_stream_client(self, name=None, profile=None):
+        """映像ストリームの視聴クライアントを登録（共有エンコーダが無効な場合はNone）"""
+        return self.status_broadcaster.open_stream_client(name, profile)
+
+    def open_h264_stream_client(self, name=None):
+        """H.264（fMP4）ストリームの視聴クライアントを登録（無効な場合はNone）"""
+        return self.status_broadcaster.open_h264_client(name)
+
+    def get_stream_report(self):
+        """MJPEG / H.264 ストリームの帯域・エンコード負荷の比較を取得"""
+        return self.status_broadcaster.get_stream_report()
+
     def extend_absence_threshold(self, extension_time):
         """absence_thresholdを延長するメソッド（互換性のため）"""
         return self.threshold_manager.extend_absence_threshold(extension_time)
@@ -129,6 +183,13 @@ class Monitor:
     def run(self):
         """メインループ - FPS制御対応"""
         try:
+            if self.multi_camera is not None:
+                self.multi_camera.start()
+            
+            if self.pipeline is not None:
+                self._run_pipelined()
+                return
+
             frame_count = 0
             fps_start_time = time.time()
             
@@ -146,24 +207,7 @@ class Monitor:
                     continue
                     
                 frame, detections_list = processed_data
-
-                # フレーム処理結果の更新
-                self.frame_processor.update_detection_results(detections_list)
-                detection_results = self.frame_processor.get_detection_results()
-
-                # フレームバッファ更新とステータスブロードキャスト
-                self.status_broadcaster.update_frame_buffer(frame)
-                self.status_broadcaster.broadcast_status()
-
-                if current_time - self.last_analysis_broadcast >= self.analysis_broadcast_interval:
-                    self._broadcast_analysis_data(detection_results)
-                    self.last_analysis_broadcast = current_time
-
-                # OpenCVウィンドウ表示
-                self.status_broadcaster.display_frame(frame, detection_results)
-                
-                # スケジュールチェック（一定間隔ごとに実行）
-                self.schedule_checker.check_if_needed()
+                self._handle_processed_frame(frame, detections_list, current_time)
                 
                 # FPS統計更新
                 frame_count += 1
@@ -180,8 +224,63 @@ class Monitor:
         finally:
             self.cleanup()
 
+    def _run_pipelined(self):
+        """パイプライン実行モードのメインループ（各段は専用スレッドで動作）"""
+        self.pipeline.start()
+        while self.pipeline.is_running():
+            time.sleep(0.5)
+        logger.warning("DetectionPipeline stopped unexpectedly.")
+
+    def _on_pipeline_result(self, frame, detections_list):
+        """パイプラインの描画/配信段から 1 フレームごとに呼ばれる"""
+        self.state.update_detection_state(detections_list)
+        self._handle_processed_frame(frame, detections_list, time.time())
+
+    def _handle_processed_frame(self, frame, detections_list, current_time):
+        """
+        検出済みフレームの後処理（状態反映・配信・描画・スケジュール確認）
+        
+        Args:
+            frame: カメラフレーム
+            detections_list: DetectionManager 形式の検出結果リスト
+            current_time: 処理時刻
+        """
+        # フレーム処理結果の更新
+        self.frame_processor.update_detection_results(detections_list)
+        detection_results = self.frame_processor.get_detection_results()
+
+        # 検出結果をFrameBusへ1回だけ配信（購読者は検出を再実行しない）
+        packet = self.frame_bus.publish(
+            frame,
+            detection_results=self.detection.get_last_detector_results(),
+            detections_list=detections_list,
+            state_snapshot=self.state.get_status_summary(),
+            display_results=detection_results
+        )
+
+        # ステータスブロードキャスト（フレームバッファはFrameBus経由で参照）
+        self.status_broadcaster.broadcast_status()
+
+        if current_time - self.last_analysis_broadcast >= self.analysis_broadcast_interval:
+            self._broadcast_analysis_data(detection_results)
+            self.last_analysis_broadcast = current_time
+
+        # OpenCVウィンドウ表示
+        self.status_broadcaster.display_frame(frame, detection_results, sequence=packet.sequence)
+        
+        # スケジュールチェック（一定間隔ごとに実行）
+        self.schedule_checker.check_if_needed()
+
     def cleanup(self):
         """リソースのクリーンアップ"""
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        
+        if self.multi_camera is not None:
+            self.multi_camera.stop()
+        
+        self.status_broadcaster.stop()
+        
         if self.data_collector:
             self.data_collector.stop_collection()
             logger.info("DataCollector stopped")
@@ -192,17 +291,6 @@ class Monitor:
 
     def draw_detection_results(self, frame):
         """検出結果を画面に描画する（互換性のため）"""
-        # PILイメージに変換
-        pil_image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        draw = ImageDraw.Draw(pil_image)
-        
-        # フォントの設定（システムにインストールされているフォントのパスを指定）
-        try:
-            font_path = self._get_system_font()
-            font = ImageFont.truetype(font_path, 32)
-        except Exception:
-            font = ImageFont.load_default()  # デフォルトフォント
-        
         # 状態テキストのリスト
         status_text = []
         
@@ -226,47 +314,13 @@ class Monitor:
         if display_info['should_display']:
             status_text.append(f"しきい値延長: +{display_info['extension_time']}秒")
 
-        # テキストを描画
+        # キャッシュ済みスプライトを BGR フレームへ直接合成（赤字）
         for i, text in enumerate(status_text):
-            draw.text((10, 30 + i * 40), text, font=font, fill=(255, 0, 0))
-        
-        # OpenCV形式に戻す
-        frame[:] = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+            self.text_overlay.draw_text(frame, text, (10, 30 + i * 40), size=32, color=(0, 0, 255))
 
     def _get_system_font(self):
         """OSに応じたフォントパスを返す"""
-        system = platform.system()
-        try:
-            if system == "Windows":
-                font_paths = [
-                    "C:\\Windows\\Fonts\\msgothic.ttc",  # MSゴシック
-                    "C:\\Windows\\Fonts\\meiryo.ttc",    # メイリオ
-                    "C:\\Windows\\Fonts\\arial.ttf"      # Arial
-                ]
-            elif system == "Darwin":  # macOS
-                font_paths = [
-                    "/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc",
-                    "/System/Library/Fonts/Arial.ttf",
-                    "/System/Library/Fonts/Helvetica.ttc"
-                ]
-            else:  # Linux
-                font_paths = [
-                    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
-                    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-                    "/usr/share/fonts/TTF/arial.ttf"
-                ]
-            
-            # 利用可能なフォントを検索
-            for font_path in font_paths:
-                if os.path.exists(font_path):
-                    return font_path
-            
-            # フォールバック: デフォルトフォント用のパス
-            return font_paths[0] if font_paths else ""
-            
-        except Exception as e:
-            logger.warning(f"システムフォント取得中にエラー: {e}")
-            return ""
+        return find_system_font()
 
     def analyze_behavior(self, frame, person_detected, smartphone_in_use):
         """
@@ -298,7 +352,7 @@ class Monitor:
             # 4. DBに保存
             if self.flask_app:
                 with self.flask_app.app_context():
-                    from models.behavior_log import BehaviorLog
+                    from services.data.storage_service import bulk_insert_behavior_logs
                     
                     # 検出オブジェクト情報
                     detected_objects = []
@@ -313,24 +367,19 @@ class Monitor:
                     # セッションID（日付ベース）
                     session_id = now.strftime('%Y%m%d')
                     
-                    # 行動ログ保存
-                    log_entry = BehaviorLog.create_log(
-                        timestamp=now,
-                        detected_objects=detected_objects,
-                        focus_level=focus_level,
-                        posture_data=posture_data,
-                        smartphone_detected=smartphone_in_use,
-                        presence_status=presence_status,
-                        session_id=session_id,
-                        processing_time=10.5,  # 処理時間（ミリ秒）
-                        notes="Realtime behavior analysis"
-                    )
-                    
-                    # DBセッションに追加して保存
-                    from models import db
-                    db.session.add(log_entry)
-                    db.session.commit()
-                    logger.info(f"Behavior log saved: focus={focus_level:.2f}, smartphone={smartphone_in_use}")
+                    # 行動ログ保存（書き込み専用スレッドへ登録し、完了は待たない）
+                    bulk_insert_behavior_logs([{
+                        'timestamp': now,
+                        'detected_objects': detected_objects,
+                        'focus_level': focus_level,
+                        'posture_data': posture_data,
+                        'smartphone_detected': smartphone_in_use,
+                        'presence_status': presence_status,
+                        'session_id': session_id,
+                        'processing_time': 10.5,  # 処理時間（ミリ秒）
+                        'notes': "Realtime behavior analysis"
+                    }], wait=False)
+                    logger.info(f"Behavior log queued: focus={focus_level:.2f}, smartphone={smartphone_in_use}")
             
             # 5. 分析結果の生成
             analysis_result = {
@@ -427,16 +476,19 @@ class Monitor:
             analysis_result: 分析結果辞書
         """
         try:
+            # 購読者がいなければ BehaviorLog の集計を行わない
+            if not has_subscribers(TOPIC_ANALYSIS_RESULTS):
+                return
             # 最近のログを取得して傾向分析を追加
             if self.flask_app:
                 with self.flask_app.app_context():
                     from models.behavior_log import BehaviorLog
                     
                     # 最近30分のログを取得
-                    recent_logs = BehaviorLog.get_recent_logs(hours=0.5)
+                    recent_logs = BehaviorLog.get_recent_columns(_TREND_COLUMNS, hours=0.5)
                     
                     # 集中度の傾向を抽出
-                    focus_trends = self._extract_focus_trends(recent_logs[-5:] if len(recent_logs) >= 5 else recent_logs)
+                    focus_trends = self._extract_focus_trends(recent_logs.rows(slice(-5, None)))
                     
                     # 直近の在席・スマホ使用率を計算
                     presence_ratio = self._calculate_presence_ratio(recent_logs)
@@ -456,8 +508,8 @@ class Monitor:
                     }
                     
                     # WebSocket経由で配信
-                    from web.websocket import socketio
-                    socketio.emit('realtime_analysis', enhanced_result)
+                    from web.websocket import emit_topic
+                    emit_topic(TOPIC_ANALYSIS_RESULTS, 'realtime_analysis', enhanced_result)
                     logger.debug(f"Realtime analysis broadcasted: focus={analysis_result['focus_level']:.2f}")
             
         except Exception as e:
@@ -514,6 +566,17 @@ class Monitor:
         status.update({
             'frame_processor_status': self.frame_processor.get_detection_results(),
             'frame_buffer_status': self.status_broadcaster.get_frame_buffer_status(),
+            'frame_bus_status': self.frame_bus.get_stats(),
+            'stream_encoder_status': (self.status_broadcaster.stream_encoder.get_stats()
+                                      if self.status_broadcaster.stream_encoder is not None else None),
+            'h264_stream_status': (self.status_broadcaster.h264_encoder.get_stats()
+                                   if self.status_broadcaster.h264_encoder is not None else None),
+            'camera_capture_status': self.camera.get_capture_stats(),
+            'text_overlay_status': self.text_overlay.get_stats(),
+            'database_writer_status': get_database_writer().get_stats() if get_database_writer() else None,
+            'websocket_status': get_websocket_stats(),
+            'pipeline_status': self.pipeline.get_stats() if self.pipeline is not None else None,
+            'multi_camera_status': self.multi_camera.get_stats() if self.multi_camera is not None else None,
             'schedule_checker_status': self.schedule_checker.get_status(),
             'threshold_manager_status': self.threshold_manager.get_status()
         })
@@ -531,6 +594,9 @@ class Monitor:
             if not self.flask_app:
                 logger.warning("Flask app not available for analysis broadcast")
                 return
+            # 購読者がいなければ BehaviorLog の取得・集計を行わない
+            if not has_subscribers(TOPIC_BEHAVIOR_DATA, TOPIC_ANALYSIS_RESULTS):
+                return
                 
             with self.flask_app.app_context():
                 # BehaviorLogから最近のデータを取得
@@ -538,14 +604,14 @@ class Monitor:
                 from datetime import datetime
                 
                 # 最近10件のログを取得
-                recent_logs = BehaviorLog.get_recent_logs(hours=1)
-                if not recent_logs:
+                recent_logs = BehaviorLog.get_recent_columns(_TREND_COLUMNS, hours=1)
+                if not len(recent_logs):
                     logger.debug("No recent behavior logs for analysis broadcast")
                     return
                 
                 # 最近10件のデータを分析用に変換
                 behavior_data = {
-                    'focus_trends': self._extract_focus_trends(recent_logs[-10:]),
+                    'focus_trends': self._extract_focus_trends(recent_logs.rows(slice(-10, None))),
                     'current_status': {
                         'presence_status': self.state.get_status_summary().get('presence_status', 'unknown'),
                         'smartphone_detected': current_detection_results.get('smartphone_detected', False),
@@ -603,18 +669,16 @@ class Monitor:
         return 0.6  # デフォルト値
     
     def _calculate_presence_ratio(self, logs):
-        """在席時間の比率を計算"""
-        if not logs:
+        """在席時間の比率を計算（logs は列射影した LogColumns）"""
+        if not len(logs):
             return 0.0
-        present_count = sum(1 for log in logs if log.presence_status == 'present')
-        return present_count / len(logs)
+        return logs.count_equal('presence_status', 'present') / len(logs)
     
     def _calculate_smartphone_ratio(self, logs):
-        """スマートフォン使用の比率を計算"""
-        if not logs:
+        """スマートフォン使用の比率を計算（logs は列射影した LogColumns）"""
+        if not len(logs):
             return 0.0
-        smartphone_count = sum(1 for log in logs if log.smartphone_detected)
-        return smartphone_count / len(logs)
+        return float(logs['smartphone_detected'].mean())
     
     def _generate_quick_insights(self, logs):
         """簡単な分析結果を生成"""
@@ -0,0 +1,304 @@
+"""
+複数カメラ監視モジュール
+
+複数の Camera インスタンスから集めたフレームを BatchProcessor でまとめ、
+1 回の YOLO バッチ推論で処理します。推論結果はソースごとの
+DetectionSmoother / StateManager へ振り分けます（デマルチプレクス）。
+ハードウェア選定の目安として、CPU コアあたりのスループットを計測します。
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+import psutil
+
+from core.detection import DetectionManager
+from core.detection.detection_smoother import DetectionSmoother
+from core.management import StateManager
+from utils.logger import setup_logger
+from utils.exceptions import BatchProcessingError, wrap_exception
+from .camera import Camera
+
+logger = setup_logger(__name__)
+
+
+class CameraSource:
+    """
+    バッチ推論の入力ソース（カメラ 1 台分）
+    - ソースごとに平滑化器・状態管理を持ち、他のカメラの結果と混ざらない
+    - 収集スレッドがカメラのフレームをコピーして BatchProcessor へ投入
+    """
+
+    def __init__(self,
+                 source_id: str,
+                 camera: Camera,
+                 detection_manager: DetectionManager,
+                 state_manager: StateManager,
+                 detection_smoother: Optional[DetectionSmoother] = None):
+        """
+        Args:
+            source_id: ソースID（設定の multi_camera.sources[].id）
+            camera: カメラインスタンス
+            detection_manager: 結果をリスト形式へ変換する DetectionManager（ソース専用）
+            state_manager: ソース専用の StateManager
+            detection_smoother: ソース専用の平滑化器（無効時は None）
+        """
+        self.source_id = source_id
+        self.camera = camera
+        self.detection_manager = detection_manager
+        self.state_manager = state_manager
+        self.detection_smoother = detection_smoother
+
+        self.captured_count = 0
+        self.processed_count = 0
+        self.last_result_time: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def handle_results(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        バッチ推論の結果（このソースの 1 フレーム分）を反映する
+
+        Args:
+            results: ObjectDetector.detect_objects_batch() の 1 要素
+
+        Returns:
+            List[Dict[str, Any]]: DetectionManager 形式の検出結果リスト
+        """
+        if self.detection_smoother:
+            results = self.detection_smoother.smooth_detections(results)
+        detections_list = self.detection_manager.convert_detector_results(results)
+        self.state_manager.update_detection_state(detections_list)
+        self.processed_count += 1
+        self.last_result_time = time.time()
+        return detections_list
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ソースの統計・状態を取得"""
+        return {
+            'source_id': self.source_id,
+            'device_index': self.camera.device_index,
+            'captured': self.captured_count,
+            'processed': self.processed_count,
+            'last_result_time': self.last_result_time,
+            'state': self.state_manager.get_status_summary(),
+        }
+
+
+class MultiCameraMonitor:
+    """
+    複数カメラのバッチ推論監視（オプトイン）
+    - ソースごとの収集スレッド: 目標FPSでフレームを取得し BatchProcessor へ投入
+      （未処理のフレームは同じソースの新しいフレームで置き換え）
+    - 推論スレッド: batch_size 枚、または timeout_ms 経過でバッチを確定して 1 回で推論
+    - 結果はソースIDでデマルチプレクスして各ソースの平滑化器・状態管理へ反映
+    """
+
+    def __init__(self,
+                 sources: List[CameraSource],
+                 object_detector,
+                 batch_processor,
+                 target_fps: float = 15.0,
+                 stats_window: int = 100):
+        """
+        Args:
+            sources: 入力ソースのリスト
+            object_detector: ObjectDetector インスタンス（YOLOモデルを全ソースで共有）
+            batch_processor: AIOptimizer の BatchProcessor
+            target_fps: ソースごとの目標FPS
+            stats_window: 統計の移動窓サイズ
+        """
+        self.sources = {source.source_id: source for source in sources}
+        self.object_detector = object_detector
+        self.batch_processor = batch_processor
+        self.batch_processor.enabled = True
+        self.frame_time = 1.0 / target_fps if target_fps > 0 else 0.0
+
+        self._stop_event = threading.Event()
+        self._inference_thread: Optional[threading.Thread] = None
+        self._batch_latencies: Deque[float] = deque(maxlen=stats_window)
+        self._batch_sizes: Deque[int] = deque(maxlen=stats_window)
+        self._completed_count = 0
+        self._error_count = 0
+        self._started_at: Optional[float] = None
+        self._cpu_times_at_start = None
+
+        # ハードウェア選定用（物理コアが取得できない環境では論理コア数）
+        self.cpu_cores = psutil.cpu_count(logical=False) or os.cpu_count() or 1
+
+        logger.info(f"MultiCameraMonitor initialized: sources={list(self.sources)}, "
+                    f"batch_size={batch_processor.batch_size}, timeout_ms={batch_processor.timeout_ms}")
+
+    def start(self) -> None:
+        """収集スレッドと推論スレッドを開始する"""
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._started_at = time.time()
+        self._cpu_times_at_start = psutil.Process().cpu_times()
+        for source in self.sources.values():
+            source._thread = threading.Thread(
+                target=self._collect_loop, args=(source,),
+                name=f"multi-camera-{source.source_id}", daemon=True
+            )
+            source._thread.start()
+        self._inference_thread = threading.Thread(
+            target=self._inference_loop, name="multi-camera-inference", daemon=True
+        )
+        self._inference_thread.start()
+        logger.info("MultiCameraMonitor started.")
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """全スレッドを停止し、追加カメラを解放する"""
+        self._stop_event.set()
+        threads = [source._thread for source in self.sources.values()] + [self._inference_thread]
+        for thread in threads:
+            if thread is not None and thread.is_alive():
+                thread.join(timeout=timeout)
+        for source in self.sources.values():
+            source.camera.release()
+        logger.info("MultiCameraMonitor stopped.")
+
+    def is_running(self) -> bool:
+        return (not self._stop_event.is_set()
+                and self._inference_thread is not None and self._inference_thread.is_alive())
+
+    def _collect_loop(self, source: CameraSource) -> None:
+        """収集スレッド: ソースのフレームを目標FPSで BatchProcessor へ投入する"""
+        last_capture_time = 0.0
+        while not self._stop_event.is_set():
+            wait = self.frame_time - (time.time() - last_capture_time)
+            if wait > 0:
+                self._stop_event.wait(wait)
+            last_capture_time = time.time()
+
+            ret, frame = source.camera.get_frame()
+            if not ret or frame is None:
+                continue
+            # カメラのフレームは読み取り専用の共有バッファで、参照中は上書きされないためコピー不要
+            self.batch_processor.put(source.source_id, frame)
+            source.captured_count += 1
+
+    def _inference_loop(self) -> None:
+        """推論スレッド: バッチを確定して推論し、結果をソースへ振り分ける"""
+        while not self._stop_event.is_set():
+            batch = self.batch_processor.wait_batch(timeout=0.1)
+            if not batch:
+                continue
+
+            start_time = time.perf_counter()
+            try:
+                source_ids = [source_id for source_id, _ in batch]
+                frames = [frame for _, frame in batch]
+                batch_results = self.object_detector.detect_objects_batch(frames)
+                for source_id, results in zip(source_ids, batch_results):
+                    self.sources[source_id].handle_results(results)
+            except Exception as e:
+                self._error_count += 1
+                batch_error = wrap_exception(
+                    e, BatchProcessingError,
+                    "Multi-camera batch processing failed",
+                    details={'batch_size': len(batch)}
+                )
+                logger.error(f"Multi-camera batch error: {batch_error.to_dict()}")
+                continue
+
+            self._batch_latencies.append((time.perf_counter() - start_time) * 1000)
+            self._batch_sizes.append(len(batch))
+            self._completed_count += len(batch)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        バッチ推論の統計を取得
+
+        Returns:
+            Dict[str, Any]: スループット（全体・CPUコアあたり）、バッチ統計、ソースごとの状態
+        """
+        elapsed = time.time() - self._started_at if self._started_at else 0.0
+        throughput = self._completed_count / elapsed if elapsed > 0 else 0.0
+        latencies = list(self._batch_latencies)
+        sizes = list(self._batch_sizes)
+        avg_latency = float(np.mean(latencies)) if latencies else 0.0
+        avg_size = float(np.mean(sizes)) if sizes else 0.0
+
+        # プロセスの CPU 使用率（全コア合計に対する割合）
+        cpu_utilization = None
+        if self._cpu_times_at_start is not None and elapsed > 0:
+            cpu_times = psutil.Process().cpu_times()
+            cpu_seconds = (cpu_times.user - self._cpu_times_at_start.user
+                           + cpu_times.system - self._cpu_times_at_start.system)
+            cpu_utilization = cpu_seconds / (elapsed * self.cpu_cores)
+
+        return {
+            'running': self.is_running(),
+            'source_count': len(self.sources),
+            'completed_frames': self._completed_count,
+            'errors': self._error_count,
+            'throughput_fps': throughput,
+            'cpu_cores': self.cpu_cores,
+            'throughput_per_core_fps': throughput / self.cpu_cores,
+            'cpu_utilization': cpu_utilization,
+            'avg_batch_latency_ms': avg_latency,
+            'avg_batch_size': avg_size,
+            'avg_frame_latency_ms': avg_latency / avg_size if avg_size else 0.0,
+            'batch_processor': self.batch_processor.get_stats(),
+            'sources': [source.get_stats() for source in self.sources.values()],
+        }
+
+
+def create_multi_camera_monitor(config_manager,
+                                detector,
+                                alert_manager,
+                                primary_device_index: Optional[int] = None) -> Optional[MultiCameraMonitor]:
+    """
+    設定（multi_camera.sources）からソースを作成し MultiCameraMonitor を構築する
+
+    メインカメラと同じデバイス番号のソースは二重に読み出さないよう除外する。
+
+    Args:
+        config_manager: 設定管理インスタンス
+        detector: Detector インスタンス（YOLOモデルを共有）
+        alert_manager: ソースごとの StateManager が使用する AlertManager
+        primary_device_index: メインカメラのデバイス番号
+
+    Returns:
+        Optional[MultiCameraMonitor]: 有効なソースが無い場合・AIOptimizer が無い場合は None
+    """
+    object_detector = detector.object_detector
+    if object_detector.ai_optimizer is None:
+        logger.warning("Multi-camera mode requires AIOptimizer; disabled.")
+        return None
+
+    sources = []
+    for index, source_config in enumerate(config_manager.get('multi_camera.sources', []) or []):
+        device_index = source_config.get('device_index', index)
+        source_id = str(source_config.get('id', f"camera-{device_index}"))
+        if device_index == primary_device_index:
+            logger.warning(f"Multi-camera source '{source_id}' uses the primary camera device; skipped.")
+            continue
+        smoother = DetectionSmoother(config_manager) if config_manager.get('detection_smoother.enabled', True) else None
+        sources.append(CameraSource(
+            source_id=source_id,
+            camera=Camera(config_manager, device_index=device_index),
+            detection_manager=DetectionManager(detector),
+            state_manager=StateManager(config_manager, alert_manager),
+            detection_smoother=smoother
+        ))
+
+    if not sources:
+        logger.warning("Multi-camera mode enabled but no additional sources configured.")
+        return None
+
+    batch_processor = object_detector.ai_optimizer.batch_processor
+    if not config_manager.has('optimization.batch_processing.batch_size'):
+        # 既定のバッチサイズはソース数（全カメラ 1 フレームずつで確定）
+        batch_processor.batch_size = len(sources)
+    return MultiCameraMonitor(
+        sources=sources,
+        object_detector=object_detector,
+        batch_processor=batch_processor,
+        target_fps=config_manager.get('multi_camera.target_fps', 15.0)
+    )
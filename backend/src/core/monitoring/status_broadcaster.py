@@ -7,14 +7,20 @@ WebSocket を介したステータス・行動・分析結果の配信、およ
 
 import threading
 import cv2
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 import time
 import numpy as np
 from utils.logger import setup_logger
 from .camera import Camera
+from .frame_bus import FrameBus
+from .frame_pool import FramePool, freeze
+from .stream_encoder import AUTO_PROFILE, MJPEGStreamEncoder, StreamClient, build_stream_profiles
+from .h264_stream import H264StreamClient, H264StreamEncoder
 from core.detection import Detector
 from core.management import StateManager
-from web.websocket import broadcast_status
+from web.websocket import broadcast_status, has_subscribers
+from web.subscriptions import TOPIC_STATUS, TOPIC_BEHAVIOR_DATA, TOPIC_ANALYSIS_RESULTS
+from web.server_mode import hub_bridge
 from utils.config_manager import ConfigManager
 from utils.exceptions import (
     NetworkError, RenderingError, StateError,
@@ -30,14 +36,15 @@ class StatusBroadcaster:
     ステータス配信専門クラス
     - フレームバッファ管理
     - WebSocket通信
-    - 描画済みフレーム提供
+    - 描画済みフレーム提供（映像ストリームは共有エンコーダで 1 回だけエンコード）
     """
     
     def __init__(self,
                  detector: Detector,
                  state_manager: StateManager,
                  camera: Camera,
-                 config_manager: ConfigManager):
+                 config_manager: ConfigManager,
+                 frame_bus: Optional[FrameBus] = None):
         """
         初期化
         
@@ -46,6 +53,7 @@ class StatusBroadcaster:
             state_manager: 状態管理インスタンス
             camera: カメラインスタンス
             config_manager: 設定管理インスタンス
+            frame_bus: フレームバス（指定時は最新パケットをフレームバッファとして参照）
         """
         self.detector = detector
         self.state = state_manager
@@ -56,6 +64,23 @@ class StatusBroadcaster:
         self.frame_buffer = None
         self.frame_lock = threading.Lock()
 
+        # 描画済みフレームの共有（FrameBus シーケンスごとに 1 回だけ描画し、表示・配信で再利用）
+        self._render_lock = threading.Lock()
+        self._rendered: Optional[Tuple[int, np.ndarray]] = None
+        self.render_count = 0
+        self.render_reuse_count = 0
+        # スナップショット（静止画）: 共有エンコーダの出力が無い場合に描画・エンコードした最新 JPEG
+        self._snapshot_lock = threading.Lock()
+        self._snapshot: Optional[Tuple[int, bytes, float]] = None
+        self.snapshot_stats = {'served_encoded': 0, 'served_cached': 0, 'rendered': 0}
+
+        # 描画先の作業用バッファ（描画済みフレームを保持する配信側が手放すとプールへ戻る）
+        self.render_pool = FramePool('render', max_buffers=4)
+
+        # FrameBus 購読（最新値ポリシー: 配信レートは本クラスが決める）
+        self.frame_bus = frame_bus
+        self._frame_subscription = frame_bus.subscribe('status_broadcaster') if frame_bus else None
+
         # 配信の最低間隔（サーバー負荷軽減のため、既定10Hz）
         try:
             default_interval = 0.1  # 10Hz
@@ -65,6 +90,38 @@ class StatusBroadcaster:
         except Exception:
             self.broadcast_min_interval = 0.1
         self._last_broadcast_time = 0.0
+
+        # 映像ストリームの共有エンコーダ（新しいフレームを 1 回だけ描画し、プロファイルごとに 1 回だけエンコード）
+        get = self.config_manager.get if self.config_manager else (lambda key, default=None: default)
+        self.stream_quality = int(get('streaming.jpeg_quality', 80))
+        self.stream_encoder: Optional[MJPEGStreamEncoder] = None
+        if frame_bus is not None and get('streaming.shared_encoder', True):
+            self.stream_encoder = MJPEGStreamEncoder(
+                frame_bus,
+                self.render_frame,
+                profiles=build_stream_profiles(get('streaming.profiles', None), default_quality=self.stream_quality),
+                default_profile=get('streaming.default_profile', AUTO_PROFILE),
+                auto_ladder=get('streaming.auto_ladder', None),
+                stall_timeout=get('streaming.stall_timeout', 10.0),
+                switch_hold_off=get('streaming.profile_switch_hold_off', 3.0),
+                on_encoded=hub_bridge.notify
+            )
+
+        # H.264（fMP4）ストリームの共有エンコーダ（オプトイン: streaming.h264.enabled、
+        # 視聴者の接続時にのみエンコード、PyAV 必須）
+        self.h264_encoder: Optional[H264StreamEncoder] = None
+        if frame_bus is not None and get('streaming.h264.enabled', False):
+            self.h264_encoder = H264StreamEncoder(
+                frame_bus,
+                self.render_frame,
+                scale=get('streaming.h264.scale', 1.0),
+                max_fps=get('streaming.h264.max_fps', 15.0),
+                crf=get('streaming.h264.crf', 28),
+                preset=get('streaming.h264.preset', 'ultrafast'),
+                keyframe_interval=get('streaming.h264.keyframe_interval', 10.0),
+                stall_timeout=get('streaming.stall_timeout', 10.0),
+                on_encoded=hub_bridge.notify
+            )
         
         logger.info("StatusBroadcaster initialized.")
 
@@ -77,7 +134,21 @@ class StatusBroadcaster:
         """
         if frame is not None:
             with self.frame_lock:
-                self.frame_buffer = frame.copy()
+                # 読み取り専用の共有フレームは上書きされないため参照のみ保持する
+                self.frame_buffer = frame if not frame.flags.writeable else frame.copy()
+
+    def _get_buffered_frame(self) -> Optional[np.ndarray]:
+        """
+        描画元となる最新フレームを取得する（FrameBus 優先、共有バッファのため読み取り専用）
+        
+        Returns:
+            Optional[np.ndarray]: 最新フレーム、未取得時はNone
+        """
+        if self._frame_subscription is not None:
+            packet = self._frame_subscription.peek_latest()
+            if packet is not None:
+                return packet.frame
+        return self.frame_buffer
 
     def broadcast_status(self) -> None:
         """
@@ -88,8 +159,13 @@ class StatusBroadcaster:
             now = time.time()
             if (now - self._last_broadcast_time) < self.broadcast_min_interval:
                 return
+            # 購読者がいなければステータスの集計自体を行わない
+            if not has_subscribers(TOPIC_STATUS):
+                return
 
-            status = self.state.get_status_summary()
+            # FrameBus 配信済みの状態スナップショットがあれば再計算しない
+            packet = self._frame_subscription.get(timeout=0) if self._frame_subscription else None
+            status = packet.state_snapshot if packet is not None and packet.state_snapshot else self.state.get_status_summary()
             broadcast_status(status)
             self._last_broadcast_time = now
         except Exception as e:
@@ -111,10 +187,9 @@ class StatusBroadcaster:
             behavior_data: 行動データの辞書
         """
         try:
-            from web.websocket import socketio
-            if socketio:
-                socketio.emit('behavior_data', behavior_data)
-                logger.debug(f"Behavior data broadcasted: {len(str(behavior_data))} bytes")
+            from web.websocket import emit_topic
+            if emit_topic(TOPIC_BEHAVIOR_DATA, 'behavior_data', behavior_data):
+                logger.debug("Behavior data broadcasted")
         except Exception as e:
             logger.error(f"Behavior data broadcast error: {e}")
 
@@ -127,9 +202,8 @@ class StatusBroadcaster:
         """
         try:
             # analysis_results イベントとして配信
-            from web.websocket import socketio
-            if socketio:
-                socketio.emit('analysis_results', analysis_results)
+            from web.websocket import emit_topic
+            if emit_topic(TOPIC_ANALYSIS_RESULTS, 'analysis_results', analysis_results):
                 logger.debug(f"Analysis results event sent: {len(analysis_results)} items")
         except Exception as e:
             logger.error(f"Failed to broadcast analysis results: {e}", exc_info=True)
@@ -142,25 +216,25 @@ class StatusBroadcaster:
             enhanced_status: behavior_data, analysis_results等を含む拡張ステータス
         """
         try:
-            # 通常のstatus配信
-            from web.websocket import socketio
-            if not socketio:
-                logger.warning("WebSocket not available for enhanced status broadcast")
+            from web.websocket import emit_topic
+            # 購読者がいなければ変換（MediaPipe オブジェクトの走査）自体を行わない
+            if not has_subscribers(TOPIC_BEHAVIOR_DATA, TOPIC_ANALYSIS_RESULTS):
                 return
             
             # MediaPipeオブジェクトを安全な形式に変換
             safe_status = create_websocket_safe_status(enhanced_status)
             
-            socketio.emit('status', safe_status)
+            # 通常のstatus配信（analysis_results トピックの互換イベント）
+            emit_topic(TOPIC_ANALYSIS_RESULTS, 'status', safe_status)
             
             # 個別イベントとしても配信
             if 'behavior_data' in safe_status:
-                socketio.emit('behavior_data', safe_status['behavior_data'])
-                logger.debug("Behavior data event sent")
+                if emit_topic(TOPIC_BEHAVIOR_DATA, 'behavior_data', safe_status['behavior_data']):
+                    logger.debug("Behavior data event sent")
                 
             if 'analysis_results' in safe_status:
-                socketio.emit('analysis_results', safe_status['analysis_results'])
-                logger.debug("Analysis results event sent")
+                if emit_topic(TOPIC_ANALYSIS_RESULTS, 'analysis_results', safe_status['analysis_results']):
+                    logger.debug("Analysis results event sent")
                 
             logger.debug(f"Enhanced status broadcasted with {len(safe_status)} sections")
         except Exception as e:
@@ -174,6 +248,120 @@ class StatusBroadcaster:
             )
             logger.error(f"Enhanced status broadcast error: {broadcast_error.to_dict()}")
 
+    def render_frame(self,
+                     frame: np.ndarray,
+                     detection_results: Dict[str, Any],
+                     sequence: Optional[int] = None) -> np.ndarray:
+        """
+        フレームのコピーに検出結果・ステータスを描画する（入力フレームは書き換えない）
+        
+        sequence を指定した場合、同じ FrameBus シーケンスの描画は 1 回だけ行い、
+        OpenCVウィンドウ表示・映像ストリーム・フレーム取得で結果を共有する。
+        描画済みフレームは読み取り専用ビューで、参照中は作業用バッファが再利用されない。
+        
+        Args:
+            frame: 描画元フレーム
+            detection_results: 検出結果の辞書
+            sequence: フレームの FrameBus シーケンス番号（None の場合は共有しない）
+            
+        Returns:
+            np.ndarray: 描画済みフレーム
+        """
+        if sequence is None:
+            return self._render(frame, detection_results)
+
+        with self._render_lock:
+            if self._rendered is not None and self._rendered[0] == sequence:
+                self.render_reuse_count += 1
+                return self._rendered[1]
+            rendered = self._render(frame, detection_results)
+            self._rendered = (sequence, rendered)
+            return rendered
+
+    def _render(self, frame: np.ndarray, detection_results: Dict[str, Any]) -> np.ndarray:
+        """フレームのコピーへ描画する（ランドマークのキーを detector が認識できる形に戻す）"""
+        results_copy = detection_results.copy()
+
+        # detection_results['landmarks'] からランドマークデータを取得し、
+        # detector.py が認識できるキー (pose_landmarks など) に戻す
+        landmarks = results_copy.get('landmarks', {})
+        if isinstance(landmarks, dict):
+            if 'pose' in landmarks:
+                results_copy['pose_landmarks'] = landmarks.get('pose')
+            if 'hands' in landmarks:
+                results_copy['hands_landmarks'] = landmarks.get('hands')
+            if 'face' in landmarks:
+                results_copy['face_landmarks'] = landmarks.get('face')
+        logger.debug(f"Render results keys: {list(results_copy.keys())}")
+
+        # 入力フレームは共有バッファのため、プールの作業用バッファへコピーして描画する
+        scratch = self.render_pool.acquire(frame.shape, frame.dtype)
+        np.copyto(scratch, frame)
+        self.render_count += 1
+        return freeze(self.detector.draw_detections(scratch, results_copy))
+
+    def open_stream_client(self, name: Optional[str] = None, profile: Optional[str] = None) -> Optional[StreamClient]:
+        """
+        映像ストリームの視聴クライアントを登録する
+        
+        Args:
+            name: クライアント名（統計表示用）
+            profile: 配信プロファイル名、または 'auto'（None は streaming.default_profile）
+            
+        Returns:
+            Optional[StreamClient]: クライアントハンドル。共有エンコーダが無効な場合はNone
+        """
+        if self.stream_encoder is None:
+            return None
+        return self.stream_encoder.open_client(name, profile)
+
+    def open_h264_client(self, name: Optional[str] = None) -> Optional[H264StreamClient]:
+        """
+        H.264（fMP4）ストリームの視聴クライアントを登録する
+        
+        Args:
+            name: クライアント名（統計表示用）
+            
+        Returns:
+            Optional[H264StreamClient]: クライアントハンドル。H.264 ストリームが無効な場合はNone
+        """
+        if self.h264_encoder is None:
+            return None
+        return self.h264_encoder.open_client(name)
+
+    def get_stream_report(self) -> Dict[str, Any]:
+        """
+        MJPEG と H.264 ストリームの帯域・エンコード負荷を比較する
+        
+        Returns:
+            Dict[str, Any]: 各方式の統計と、同じ縮小率の MJPEG プロファイルに対する H.264 の比率
+        """
+        mjpeg = self.stream_encoder.get_stats() if self.stream_encoder is not None else None
+        h264 = self.h264_encoder.get_stats() if self.h264_encoder is not None else None
+        comparison = None
+        if mjpeg is not None and h264 is not None and h264['bitrate_bps']:
+            # 同じ縮小率の MJPEG プロファイル（なければ full）と比較
+            profile_name = next((name for name, profile in self.stream_encoder.profiles.items()
+                                 if profile.scale == self.h264_encoder.scale), 'full')
+            mjpeg_bandwidth = self.stream_encoder.estimate_bandwidth(profile_name)
+            mjpeg_bps = mjpeg_bandwidth * 8 if mjpeg_bandwidth else None
+            comparison = {
+                'mjpeg_profile': profile_name,
+                'mjpeg_bitrate_bps': mjpeg_bps,
+                'h264_bitrate_bps': h264['bitrate_bps'],
+                'bandwidth_ratio': h264['bitrate_bps'] / mjpeg_bps if mjpeg_bps else None,
+                'mjpeg_encode_cpu_ms': mjpeg['avg_encode_cpu_ms'],
+                'h264_encode_cpu_ms': h264['avg_encode_cpu_ms'],
+            }
+        return {'mjpeg': mjpeg, 'h264': h264, 'comparison': comparison}
+
+    def stop(self) -> None:
+        """共有エンコーダを停止する"""
+        if self.stream_encoder is not None:
+            self.stream_encoder.stop()
+        if self.h264_encoder is not None:
+            self.h264_encoder.stop()
+
     def get_current_frame(self, detection_results: Dict[str, Any]) -> Optional[bytes]:
         """
         WebUIで使用する描画済みのフレームを取得
@@ -184,37 +372,25 @@ class StatusBroadcaster:
         Returns:
             Optional[bytes]: JPEG形式のフレームデータ、失敗時はNone
         """
+        if self.stream_encoder is not None and self.frame_bus is not None:
+            # 視聴中のストリーム向けに最新フレームがエンコード済みなら再利用する
+            sequence, jpeg = self.stream_encoder.get_latest('full')
+            if jpeg is not None and sequence == self.frame_bus.sequence:
+                return jpeg
+
         frame_to_encode = None
-        with self.frame_lock:
-            if self.frame_buffer is not None:
-                # 現在のフレームバッファをコピー
-                frame_copy = self.frame_buffer.copy()
-                # 最新の検出/ステータス結果を取得
-                results_copy = detection_results.copy()
-
-                # detection_results['landmarks'] からランドマークデータを取得し、
-                # detector.py が認識できるキー (pose_landmarks など) に戻す
-                landmarks = results_copy.get('landmarks', {})
-                logger.debug(f"Original landmarks data: {landmarks}")
-                if isinstance(landmarks, dict):
-                    if 'pose' in landmarks:
-                        results_copy['pose_landmarks'] = landmarks.get('pose')
-                        logger.debug(f"Converted pose landmarks: {landmarks.get('pose') is not None}")
-                    if 'hands' in landmarks:
-                        results_copy['hands_landmarks'] = landmarks.get('hands')
-                        logger.debug(f"Converted hands landmarks: {landmarks.get('hands') is not None}")
-                    if 'face' in landmarks:
-                        results_copy['face_landmarks'] = landmarks.get('face')
-                        logger.debug(f"Converted face landmarks: {landmarks.get('face') is not None}")
-                logger.debug(f"Final results_copy keys: {list(results_copy.keys())}")
-
-                # Detectorに描画を依頼 (修正済みの results_copy を使用)
-                frame_to_encode = self.detector.draw_detections(frame_copy, results_copy)
+        packet = self._frame_subscription.peek_latest() if self._frame_subscription is not None else None
+        if packet is not None:
+            frame_to_encode = self.render_frame(packet.frame, detection_results, sequence=packet.sequence)
+        else:
+            with self.frame_lock:
+                if self.frame_buffer is not None:
+                    frame_to_encode = self.render_frame(self.frame_buffer, detection_results)
 
         if frame_to_encode is not None:
             try:
                 # JPEG形式にエンコード（品質を少し下げてCPU負荷を軽減）
-                encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 80]
+                encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), self.stream_quality]
                 _, buffer = cv2.imencode('.jpg', frame_to_encode, encode_param)
                 return buffer.tobytes()
             except Exception as e:
@@ -223,7 +399,7 @@ class StatusBroadcaster:
                     "Error encoding frame to JPEG",
                     details={
                         'frame_shape': frame_to_encode.shape if frame_to_encode is not None else None,
-                        'encoding_quality': 90
+                        'encoding_quality': self.stream_quality
                     }
                 )
                 logger.error(f"Frame encoding error: {encoding_error.to_dict()}")
@@ -232,37 +408,79 @@ class StatusBroadcaster:
             # フレームがない場合は空のバイト列などを返すか、Noneを返す
             return None
 
-    def display_frame(self, frame: np.ndarray, detection_results: Dict[str, Any]) -> None:
+    def get_snapshot(self, max_age_ms: Optional[float] = None) -> Optional[Tuple[int, bytes, float]]:
+        """
+        最新フレームのエンコード済み JPEG を取得する（スナップショット API 用）
+
+        共有エンコーダ（full プロファイル）または前回のスナップショットの JPEG が
+        最新フレームのもの、もしくはフレームの経過時間が max_age_ms 以内であれば
+        そのまま返し、描画・エンコードは行わない。
+
+        Args:
+            max_age_ms: 許容するフレームの経過時間（ミリ秒）。None の場合は最新フレームのみ許容
+
+        Returns:
+            Optional[Tuple[int, bytes, float]]: (FrameBus シーケンス番号, JPEG データ, フレームの時刻)。
+                フレーム未取得時はNone
+        """
+        if self.frame_bus is None:
+            return None
+
+        encoded = self.stream_encoder.get_latest_variant('full') if self.stream_encoder is not None else None
+        cached = self._snapshot
+        latest = encoded
+        if cached is not None and (latest is None or cached[0] > latest[0]):
+            latest = cached
+
+        if latest is not None:
+            fresh = latest[0] >= self.frame_bus.sequence
+            if not fresh and max_age_ms is not None:
+                fresh = (time.time() - latest[2]) * 1000 <= max_age_ms
+            if fresh:
+                self.snapshot_stats['served_encoded' if latest is encoded else 'served_cached'] += 1
+                return latest
+
+        packet = self._frame_subscription.peek_latest() if self._frame_subscription is not None else None
+        if packet is None:
+            return latest
+
+        with self._snapshot_lock:
+            # 同時に来たポーリングは 1 回の描画・エンコードを共有する
+            if self._snapshot is not None and self._snapshot[0] >= packet.sequence:
+                self.snapshot_stats['served_cached'] += 1
+                return self._snapshot
+            display_results = packet.extras.get('display_results') or packet.detection_results
+            rendered = self.render_frame(packet.frame, display_results, sequence=packet.sequence)
+            try:
+                encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), self.stream_quality]
+                _, buffer = cv2.imencode('.jpg', rendered, encode_param)
+            except Exception as e:
+                encoding_error = wrap_exception(
+                    e, RenderingError,
+                    "Error encoding snapshot to JPEG",
+                    details={'sequence': packet.sequence, 'encoding_quality': self.stream_quality}
+                )
+                logger.error(f"Snapshot encoding error: {encoding_error.to_dict()}")
+                return latest
+            self._snapshot = (packet.sequence, buffer.tobytes(), packet.timestamp)
+            self.snapshot_stats['rendered'] += 1
+            return self._snapshot
+
+    def display_frame(self,
+                      frame: np.ndarray,
+                      detection_results: Dict[str, Any],
+                      sequence: Optional[int] = None) -> None:
         """
         OpenCVウィンドウにフレームを表示する（設定が有効な場合）
         
         Args:
             frame: 表示するフレーム
             detection_results: 検出結果の辞書
+            sequence: フレームの FrameBus シーケンス番号（映像ストリームと描画を共有）
         """
         if self.config_manager.get('display.show_opencv_window', True):
-            display_frame = frame.copy()
-            # 更新された detection_results を使って描画
-            results_for_draw = detection_results.copy()
-                 
-            # detection_results['landmarks'] からランドマークデータを取得し、
-            # detector.py が認識できるキー (pose_landmarks など) に戻す
-            landmarks = results_for_draw.get('landmarks', {})
-            logger.debug(f"Display frame landmarks data: {landmarks}")
-            if isinstance(landmarks, dict):
-                if 'pose' in landmarks:
-                    results_for_draw['pose_landmarks'] = landmarks.get('pose')
-                    logger.debug(f"Display pose landmarks converted: {landmarks.get('pose') is not None}")
-                if 'hands' in landmarks:
-                    results_for_draw['hands_landmarks'] = landmarks.get('hands')
-                    logger.debug(f"Display hands landmarks converted: {landmarks.get('hands') is not None}")
-                if 'face' in landmarks:
-                    results_for_draw['face_landmarks'] = landmarks.get('face')
-                    logger.debug(f"Display face landmarks converted: {landmarks.get('face') is not None}")
-            logger.debug(f"Display frame results keys: {list(results_for_draw.keys())}")
-                 
-            # draw_detections にステータス情報が含まれたデータを渡す
-            display_frame = self.detector.draw_detections(display_frame, results_for_draw)
+            # 更新された detection_results を使って描画（ステータス情報を含む）
+            display_frame = self.render_frame(frame, detection_results, sequence=sequence)
             # 再度有効化
             self.camera.show_frame(display_frame)
 
@@ -280,8 +498,13 @@ class StatusBroadcaster:
             Dict[str, Any]: フレームバッファの状態情報
         """
         with self.frame_lock:
+            buffered_frame = self._get_buffered_frame()
             return {
-                'has_frame': self.frame_buffer is not None,
-                'frame_shape': self.frame_buffer.shape if self.frame_buffer is not None else None,
-                'buffer_size': self.frame_buffer.nbytes if self.frame_buffer is not None else 0
+                'has_frame': buffered_frame is not None,
+                'frame_shape': buffered_frame.shape if buffered_frame is not None else None,
+                'buffer_size': buffered_frame.nbytes if buffered_frame is not None else 0,
+                'render_count': self.render_count,
+                'render_reuse_count': self.render_reuse_count,
+                'render_pool': self.render_pool.get_stats(),
+                'snapshot': dict(self.snapshot_stats)
             } 
\ No newline at end of file
@@ -0,0 +1,570 @@
+"""
+MJPEG ストリームエンコーダモジュール
+
+FrameBus に配信された新しいフレームを、シーケンス番号ごとに 1 回だけ
+描画し、配信プロファイル（縮小率・JPEG 品質・最大FPS）ごとに 1 回だけ
+エンコードして、同じプロファイルの視聴クライアントへ同じバイト列を配信します。
+視聴者数が増えてもエンコード回数は増えません。
+auto プロファイルのクライアントは送信スループットの実測値から
+プロファイルの段階（ラダー）を自動で上げ下げします。
+処理が追いつかないクライアントはクライアント単位で中間フレームを読み飛ばし、
+長時間フレームを取りに来ないクライアントは切断します。
+"""
+
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from utils.logger import setup_logger
+from utils.exceptions import RenderingError, ValidationError, wrap_exception
+from .frame_bus import FrameBus, FramePacket
+
+logger = setup_logger(__name__)
+
+AUTO_PROFILE = 'auto'
+
+
+@dataclass(frozen=True)
+class StreamProfile:
+    """映像ストリームの配信プロファイル
+
+    max_fps が 0 の場合は FrameBus の配信レートに従う。
+    """
+    name: str
+    scale: float
+    quality: int
+    max_fps: float = 0.0
+
+
+# 既定のプロファイル（streaming.profiles で上書き・追加可能）
+DEFAULT_STREAM_PROFILES: Dict[str, Dict[str, Any]] = {
+    'full': {'scale': 1.0, 'quality': 80, 'max_fps': 0.0},
+    'medium': {'scale': 0.75, 'quality': 70, 'max_fps': 15.0},
+    'low': {'scale': 0.5, 'quality': 55, 'max_fps': 10.0},
+    'thumbnail': {'scale': 0.25, 'quality': 50, 'max_fps': 2.0},
+}
+# auto で使用する段階（高品質 → 低品質の順）
+DEFAULT_AUTO_LADDER = ('full', 'medium', 'low')
+
+
+def build_stream_profiles(overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+                          default_quality: Optional[int] = None) -> Dict[str, StreamProfile]:
+    """
+    既定値と設定値からプロファイル一覧を作成する
+
+    Args:
+        overrides: プロファイル名 → {scale, quality, max_fps} の上書き・追加
+        default_quality: full プロファイルの JPEG 品質（streaming.jpeg_quality）
+
+    Returns:
+        Dict[str, StreamProfile]: プロファイル名 → プロファイル
+    """
+    merged = {name: dict(values) for name, values in DEFAULT_STREAM_PROFILES.items()}
+    if default_quality is not None:
+        merged['full']['quality'] = int(default_quality)
+    for name, values in (overrides or {}).items():
+        merged.setdefault(name, {'scale': 1.0, 'quality': 80, 'max_fps': 0.0}).update(values or {})
+
+    profiles = {}
+    for name, values in merged.items():
+        profiles[name] = StreamProfile(
+            name=name,
+            scale=min(1.0, max(0.05, float(values.get('scale', 1.0)))),
+            quality=min(100, max(1, int(values.get('quality', 80)))),
+            max_fps=max(0.0, float(values.get('max_fps', 0.0) or 0.0)),
+        )
+    return profiles
+
+
+class StreamClient:
+    """
+    映像ストリームの視聴クライアント（HTTP 接続 1 本分）
+    - next_frame() で前回受け取ったシーケンスより新しいフレームを待つ
+    - 複数シーケンス分遅れた場合は最新のみを受け取り、差分をドロップとして数える
+    - auto の場合は送信スループット（フレームを渡してから次の要求までの時間）を計測し、
+      現在のプロファイルの必要帯域が収まらなければ下げ、余裕があれば上げる
+    """
+
+    # 必要帯域 / 実測スループットの閾値
+    DOWNGRADE_RATIO = 0.9
+    UPGRADE_RATIO = 0.5
+    THROUGHPUT_EWMA_ALPHA = 0.3
+
+    def __init__(self,
+                 encoder: 'MJPEGStreamEncoder',
+                 client_id: int,
+                 profile: StreamProfile,
+                 auto: bool = False,
+                 name: Optional[str] = None):
+        """
+        Args:
+            encoder: 共有エンコーダ
+            client_id: クライアントID
+            profile: 初期プロファイル
+            auto: 送信スループットに応じてプロファイルを自動選択するか
+            name: クライアント名（統計表示用。リモートアドレスなど）
+        """
+        self._encoder = encoder
+        self.client_id = client_id
+        self.name = name or f"client-{client_id}"
+        self.profile = profile
+        self.auto = auto
+        self.last_sequence = 0
+        self.opened_at = time.time()
+        self.last_fetch_time = self.opened_at
+        self.closed = False
+        self.close_reason: Optional[str] = None
+
+        # 送信スループット計測（auto のプロファイル選択に使用）
+        self.throughput_bps: Optional[float] = None
+        self._last_return_time: Optional[float] = None
+        self._last_frame_bytes = 0
+        self._last_switch_time = self.opened_at
+
+        # 統計
+        self.sent_count = 0
+        self.dropped_count = 0
+        self.sent_bytes = 0
+        self.profile_switch_count = 0
+
+    def next_frame(self, timeout: float = 1.0) -> Optional[bytes]:
+        """
+        次のフレームの JPEG バイト列を取得する
+
+        Args:
+            timeout: 新しいフレームを待つ最大秒数
+
+        Returns:
+            Optional[bytes]: JPEG データ。タイムアウト・切断時は None
+        """
+        return self._encoder._wait_for_client(self, timeout)
+
+    def close(self, reason: str = 'closed') -> None:
+        """視聴を終了する"""
+        self._encoder._remove_client(self, reason)
+
+    def _record_send(self, now: float) -> None:
+        """前回渡したフレームの送信時間からスループットを更新する（_condition 保持中に呼ぶ）"""
+        if self._last_return_time is None or not self._last_frame_bytes:
+            return
+        send_time = max(now - self._last_return_time, 1e-3)
+        rate = self._last_frame_bytes / send_time
+        if self.throughput_bps is None:
+            self.throughput_bps = rate
+        else:
+            alpha = self.THROUGHPUT_EWMA_ALPHA
+            self.throughput_bps = alpha * rate + (1 - alpha) * self.throughput_bps
+        self._last_return_time = None
+        if self.auto:
+            self._adapt_profile(now)
+
+    def _adapt_profile(self, now: float) -> None:
+        """実測スループットに合わせてラダー上のプロファイルを 1 段上げ下げする"""
+        ladder = self._encoder.auto_ladder
+        if self.profile.name not in ladder or now - self._last_switch_time < self._encoder.switch_hold_off:
+            return
+        index = ladder.index(self.profile.name)
+        required = self._encoder.estimate_bandwidth(self.profile.name)
+        if required is None:
+            return
+
+        target = None
+        if required > self.throughput_bps * self.DOWNGRADE_RATIO and index < len(ladder) - 1:
+            target = ladder[index + 1]
+        elif index > 0:
+            upper = self._encoder.estimate_bandwidth(ladder[index - 1])
+            if upper is not None and upper < self.throughput_bps * self.UPGRADE_RATIO:
+                target = ladder[index - 1]
+
+        if target is not None:
+            logger.info(f"MJPEG stream client {self.name}: profile {self.profile.name} -> {target} "
+                        f"(throughput={self.throughput_bps / 1024:.0f}KB/s, required={required / 1024:.0f}KB/s)")
+            self.profile = self._encoder.profiles[target]
+            self._last_switch_time = now
+            self.profile_switch_count += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """クライアント統計を取得"""
+        return {
+            'client_id': self.client_id,
+            'name': self.name,
+            'profile': self.profile.name,
+            'auto': self.auto,
+            'closed': self.closed,
+            'close_reason': self.close_reason,
+            'last_sequence': self.last_sequence,
+            'sent': self.sent_count,
+            'dropped': self.dropped_count,
+            'sent_bytes': self.sent_bytes,
+            'throughput_bps': self.throughput_bps,
+            'profile_switches': self.profile_switch_count,
+            'connected_seconds': time.time() - self.opened_at,
+            'idle_seconds': time.time() - self.last_fetch_time,
+        }
+
+
+class MJPEGStreamEncoder:
+    """
+    映像ストリームの共有エンコーダ
+    - エンコードスレッドが FrameBus の新しいパケットを 1 回だけ描画し、
+      視聴中のプロファイルごとに 1 回だけ縮小・JPEG エンコード
+    - 結果はプロファイルごとに (シーケンス番号, バイト列) として保持し、Condition で通知
+    - プロファイルの max_fps を超える頻度ではエンコードしない（同プロファイルの全員に適用）
+    - 視聴クライアントがいない間は描画・エンコードを行わない
+    - stall_timeout 秒以上フレームを取りに来ないクライアント（送信詰まり）は切断
+    """
+
+    def __init__(self,
+                 frame_bus: FrameBus,
+                 render: Callable[[np.ndarray, Dict[str, Any], Optional[int]], np.ndarray],
+                 profiles: Optional[Dict[str, StreamProfile]] = None,
+                 default_profile: str = AUTO_PROFILE,
+                 auto_ladder: Optional[List[str]] = None,
+                 stall_timeout: float = 10.0,
+                 switch_hold_off: float = 3.0,
+                 on_encoded: Optional[Callable[[int], None]] = None):
+        """
+        Args:
+            frame_bus: フレームバス
+            render: (フレーム, 表示用検出結果, シーケンス番号) から描画済みフレームを返す関数
+                （入力フレームは書き換えず、戻り値は読み取り専用として扱う）
+            profiles: 配信プロファイル（None は既定値）
+            default_profile: プロファイル未指定のクライアントに使うプロファイル名（'auto' 可）
+            auto_ladder: auto で使用するプロファイル名（高品質 → 低品質の順）
+            stall_timeout: クライアントを切断するまでの無取得時間（秒）
+            switch_hold_off: auto のプロファイル切り替え後、次の切り替えまでの最短時間（秒）
+            on_encoded: エンコード完了時に FrameBus シーケンス番号を渡して呼ぶ通知関数
+                （協調モードのサーバーで待機中の視聴者を起こす。エンコードスレッドから呼ばれる）
+        """
+        self.frame_bus = frame_bus
+        self.render = render
+        self.profiles = profiles or build_stream_profiles()
+        self.auto_ladder = [name for name in (auto_ladder or DEFAULT_AUTO_LADDER) if name in self.profiles]
+        if not self.auto_ladder:
+            self.auto_ladder = [next(iter(self.profiles))]
+        self.default_profile = default_profile
+        self.stall_timeout = float(stall_timeout)
+        self.switch_hold_off = float(switch_hold_off)
+        self.on_encoded = on_encoded
+
+        self._condition = threading.Condition()
+        self._clients: Dict[int, StreamClient] = {}
+        self._client_ids = itertools.count(1)
+        # プロファイル名 → (シーケンス番号, JPEG, エンコード時刻)
+        self._variants: Dict[str, Tuple[int, bytes, float]] = {}
+        # プロファイル名 → 1 フレームあたりのバイト数（EWMA、帯域見積もり用）
+        self._frame_bytes: Dict[str, float] = {}
+        self._source_fps: Optional[float] = None
+        self._last_packet_time: Optional[float] = None
+
+        self._subscription = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        # 統計
+        self.rendered_count = 0
+        self.encoded_counts: Dict[str, int] = {}
+        self.idle_skipped_count = 0
+        self.rate_limited_count = 0
+        self.error_count = 0
+        self.evicted_count = 0
+        self.total_render_time = 0.0
+        self.total_encode_time = 0.0
+        self.total_encode_cpu_time = 0.0
+
+    def start(self) -> None:
+        """エンコードスレッドを開始する"""
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._subscription = self.frame_bus.subscribe('mjpeg_stream')
+            self._thread = threading.Thread(target=self._run, name="mjpeg-stream-encoder", daemon=True)
+            self._thread.start()
+        logger.info(f"MJPEGStreamEncoder started (profiles={list(self.profiles)}, auto_ladder={self.auto_ladder}, "
+                    f"stall_timeout={self.stall_timeout}s)")
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """エンコードスレッドを停止し、全クライアントを切断する"""
+        self._stop_event.set()
+        if self._subscription is not None:
+            self.frame_bus.unsubscribe('mjpeg_stream')
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        with self._condition:
+            for client in list(self._clients.values()):
+                self._close_client_locked(client, 'encoder_stopped')
+            self._condition.notify_all()
+        logger.info("MJPEGStreamEncoder stopped.")
+
+    def is_running(self) -> bool:
+        return not self._stop_event.is_set() and self._thread is not None and self._thread.is_alive()
+
+    def open_client(self, name: Optional[str] = None, profile: Optional[str] = None) -> StreamClient:
+        """
+        視聴クライアントを登録する（エンコードスレッドは初回登録時に開始）
+
+        Args:
+            name: クライアント名（統計表示用）
+            profile: プロファイル名、または 'auto'（None は既定プロファイル）
+
+        Returns:
+            StreamClient: クライアントハンドル
+
+        Raises:
+            ValidationError: 未知のプロファイル名が指定された場合
+        """
+        profile_name = profile or self.default_profile
+        auto = profile_name == AUTO_PROFILE
+        if auto:
+            profile_name = self.auto_ladder[0]
+        if profile_name not in self.profiles:
+            raise ValidationError(
+                f"Unknown stream profile: {profile_name}",
+                details={'available_profiles': [AUTO_PROFILE] + list(self.profiles)}
+            )
+
+        if not self.is_running():
+            self.start()
+        with self._condition:
+            client = StreamClient(self, next(self._client_ids), self.profiles[profile_name], auto=auto, name=name)
+            self._clients[client.client_id] = client
+        logger.info(f"MJPEG stream client connected: {client.name} (profile={profile_name}, auto={auto}, "
+                    f"clients={len(self._clients)})")
+        return client
+
+    def _remove_client(self, client: StreamClient, reason: str) -> None:
+        with self._condition:
+            self._close_client_locked(client, reason)
+            self._condition.notify_all()
+
+    def _close_client_locked(self, client: StreamClient, reason: str) -> None:
+        """クライアントを切断状態にする（_condition 保持中に呼ぶこと）"""
+        if self._clients.pop(client.client_id, None) is None:
+            return
+        client.closed = True
+        client.close_reason = reason
+        logger.info(f"MJPEG stream client disconnected: {client.name} ({reason}, sent={client.sent_count}, "
+                    f"dropped={client.dropped_count})")
+
+    def _variant_sequence(self, client: StreamClient) -> int:
+        variant = self._variants.get(client.profile.name)
+        return variant[0] if variant is not None else 0
+
+    def _wait_for_client(self, client: StreamClient, timeout: float) -> Optional[bytes]:
+        """クライアントのプロファイルで前回シーケンスより新しいフレームを待って返す"""
+        with self._condition:
+            now = time.time()
+            client.last_fetch_time = now
+            client._record_send(now)
+            if not client.closed and self._variant_sequence(client) <= client.last_sequence:
+                self._condition.wait_for(
+                    lambda: client.closed or self._variant_sequence(client) > client.last_sequence,
+                    timeout=timeout
+                )
+            variant = self._variants.get(client.profile.name)
+            if client.closed or variant is None or variant[0] <= client.last_sequence:
+                return None
+
+            sequence, jpeg, _ = variant
+            if client.last_sequence:
+                # 遅れている間・max_fps で間引かれた間のフレームは送らない（最新へ追いつく）
+                client.dropped_count += sequence - client.last_sequence - 1
+            client.last_sequence = sequence
+            client.last_fetch_time = client._last_return_time = time.time()
+            client._last_frame_bytes = len(jpeg)
+            client.sent_count += 1
+            client.sent_bytes += len(jpeg)
+            return jpeg
+
+    def get_latest(self, profile: str = 'full') -> Tuple[int, Optional[bytes]]:
+        """
+        指定プロファイルで最後にエンコードしたフレームを返す
+
+        Args:
+            profile: プロファイル名
+
+        Returns:
+            Tuple[int, Optional[bytes]]: (FrameBus シーケンス番号, JPEG データ)。未エンコード時は (0, None)
+        """
+        with self._condition:
+            variant = self._variants.get(profile)
+            return (variant[0], variant[1]) if variant is not None else (0, None)
+
+    def get_latest_variant(self, profile: str = 'full') -> Optional[Tuple[int, bytes, float]]:
+        """
+        指定プロファイルで最後にエンコードしたフレームを撮影時刻付きで返す
+
+        Args:
+            profile: プロファイル名
+
+        Returns:
+            Optional[Tuple[int, bytes, float]]: (FrameBus シーケンス番号, JPEG データ, フレームの時刻)。未エンコード時はNone
+        """
+        with self._condition:
+            return self._variants.get(profile)
+
+    def estimate_bandwidth(self, profile_name: str) -> Optional[float]:
+        """
+        プロファイルの必要帯域（バイト/秒）を見積もる
+
+        未エンコードのプロファイルは、エンコード済みプロファイルのフレームサイズを
+        縮小率の 2 乗で換算して見積もる。
+
+        Args:
+            profile_name: プロファイル名
+
+        Returns:
+            Optional[float]: 必要帯域。見積もりに使える実績が無い場合はNone
+        """
+        profile = self.profiles[profile_name]
+        frame_bytes = self._frame_bytes.get(profile_name)
+        if frame_bytes is None:
+            for known_name, known_bytes in self._frame_bytes.items():
+                known_scale = self.profiles[known_name].scale
+                frame_bytes = known_bytes * (profile.scale / known_scale) ** 2
+                break
+        if frame_bytes is None:
+            return None
+        fps = self._source_fps or 0.0
+        if profile.max_fps:
+            fps = min(fps, profile.max_fps) if fps else profile.max_fps
+        return frame_bytes * fps
+
+    def _run(self) -> None:
+        """エンコードスレッドのメインループ"""
+        subscription = self._subscription
+        while not self._stop_event.is_set():
+            packet = subscription.get(timeout=0.5)
+            self._evict_stalled_clients()
+            if packet is None:
+                continue
+            self._update_source_fps(packet.timestamp)
+
+            with self._condition:
+                active = {client.profile.name for client in self._clients.values()}
+            if not active:
+                self.idle_skipped_count += 1
+                continue
+            due = [name for name in active if self._is_due(name, packet.timestamp)]
+            if not due:
+                self.rate_limited_count += 1
+                continue
+
+            encoded = self._encode(packet, due)
+            if not encoded:
+                continue
+            with self._condition:
+                for name, jpeg in encoded.items():
+                    self._variants[name] = (packet.sequence, jpeg, packet.timestamp)
+                    previous = self._frame_bytes.get(name)
+                    self._frame_bytes[name] = len(jpeg) if previous is None else 0.2 * len(jpeg) + 0.8 * previous
+                self._condition.notify_all()
+            if self.on_encoded is not None:
+                self.on_encoded(packet.sequence)
+
+    def _update_source_fps(self, timestamp: float) -> None:
+        """FrameBus の配信レートを EWMA で更新する"""
+        if self._last_packet_time is not None and timestamp > self._last_packet_time:
+            fps = 1.0 / (timestamp - self._last_packet_time)
+            self._source_fps = fps if self._source_fps is None else 0.2 * fps + 0.8 * self._source_fps
+        self._last_packet_time = timestamp
+
+    def _is_due(self, profile_name: str, timestamp: float) -> bool:
+        """プロファイルの max_fps に対して次のエンコード時刻に達しているか"""
+        profile = self.profiles[profile_name]
+        variant = self._variants.get(profile_name)
+        if not profile.max_fps or variant is None:
+            return True
+        # 配信間隔の揺らぎで 1 フレーム分遅れないよう 10% の余裕を持たせる
+        return timestamp - variant[2] >= 0.9 / profile.max_fps
+
+    def _encode(self, packet: FramePacket, profile_names: List[str]) -> Dict[str, bytes]:
+        """パケットのフレームを 1 回描画し、プロファイルごとに縮小して JPEG へエンコードする"""
+        encoded: Dict[str, bytes] = {}
+        try:
+            start_time = time.perf_counter()
+            display_results = packet.extras.get('display_results') or packet.detection_results
+            rendered = self.render(packet.frame, display_results, packet.sequence)
+            self.rendered_count += 1
+            self.total_render_time += time.perf_counter() - start_time
+
+            height, width = rendered.shape[:2]
+            for name in profile_names:
+                start_time = time.perf_counter()
+                start_cpu = time.thread_time()
+                profile = self.profiles[name]
+                image = rendered
+                if profile.scale < 1.0:
+                    size = (max(1, int(width * profile.scale)), max(1, int(height * profile.scale)))
+                    image = cv2.resize(rendered, size, interpolation=cv2.INTER_AREA)
+                ok, buffer = cv2.imencode('.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), profile.quality])
+                if not ok:
+                    raise RuntimeError(f"cv2.imencode returned False for profile {name}")
+                encoded[name] = buffer.tobytes()
+                self.encoded_counts[name] = self.encoded_counts.get(name, 0) + 1
+                self.total_encode_time += time.perf_counter() - start_time
+                self.total_encode_cpu_time += time.thread_time() - start_cpu
+        except Exception as e:
+            self.error_count += 1
+            encoding_error = wrap_exception(
+                e, RenderingError,
+                "Error encoding stream frame to JPEG",
+                details={
+                    'sequence': packet.sequence,
+                    'frame_shape': packet.frame.shape if packet.frame is not None else None,
+                    'profiles': profile_names
+                }
+            )
+            logger.error(f"Stream frame encoding error: {encoding_error.to_dict()}")
+        return encoded
+
+    def _evict_stalled_clients(self) -> None:
+        """stall_timeout 秒以上フレームを取りに来ていないクライアントを切断する"""
+        now = time.time()
+        with self._condition:
+            stalled = [client for client in self._clients.values()
+                       if now - client.last_fetch_time > self.stall_timeout]
+            for client in stalled:
+                self._close_client_locked(client, 'stalled')
+                self.evicted_count += 1
+            if stalled:
+                self._condition.notify_all()
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """エンコーダ・プロファイル・クライアント統計を取得"""
+        with self._condition:
+            clients = [client.get_stats() for client in self._clients.values()]
+            variants = {name: {'sequence': sequence, 'frame_bytes': len(jpeg)}
+                        for name, (sequence, jpeg, _) in self._variants.items()}
+        total_encoded = sum(self.encoded_counts.values())
+        return {
+            'running': self.is_running(),
+            'default_profile': self.default_profile,
+            'auto_ladder': self.auto_ladder,
+            'profiles': {name: {'scale': p.scale, 'quality': p.quality, 'max_fps': p.max_fps,
+                                'estimated_bandwidth_bps': self.estimate_bandwidth(name)}
+                         for name, p in self.profiles.items()},
+            'variants': variants,
+            'source_fps': self._source_fps,
+            'rendered': self.rendered_count,
+            'encoded': dict(self.encoded_counts),
+            'idle_skipped': self.idle_skipped_count,
+            'rate_limited': self.rate_limited_count,
+            'errors': self.error_count,
+            'evicted_clients': self.evicted_count,
+            'avg_render_ms': (self.total_render_time / self.rendered_count * 1000) if self.rendered_count else 0.0,
+            'avg_encode_ms': (self.total_encode_time / total_encoded * 1000) if total_encoded else 0.0,
+            'avg_encode_cpu_ms': (self.total_encode_cpu_time / total_encoded * 1000) if total_encoded else 0.0,
+            'client_count': len(clients),
+            'clients': clients,
+        }
@@ -3,7 +3,9 @@ AI処理最適化モジュール
 - YOLO推論の最適化
 - MediaPipeパイプライン最適化
 - フレームスキップ機能
-- バッチ処理の導入
+- 静止フレームでの推論省略（モーションゲート）
+- 被写体追従ROIでの推論（ROIトラッキング）
+- バッチ処理の導入（複数カメラのフレームを 1 回のYOLO推論にまとめる）
 """
 
 import cv2
@@ -83,9 +85,15 @@ class PerformanceMonitor:
 
 class FrameSkipper:
     """
-    動的フレームスキップ機構
+    適応フレームスキップ制御（AIMD）
     
-    現在のFPSに基づいて処理するフレームを動的に調整します。
+    推論 1 回あたりの処理時間（推論開始〜終了）をレイテンシ予算と比較し、処理間隔を調整します：
+    - 予算超過: 処理間隔を乗算的に広げ、ホールドオフ期間は再調整しない
+    - 余裕あり: adjustment_interval ごとに処理間隔を加算的に縮める
+    - 処理間隔は小数（位相アキュムレータで 1.5 なら 3 フレーム中 2 フレームを処理）
+    - モデルごとの実行周期（処理フレーム何回に 1 回実行するか）を持つ
+    
+    フレームごとの判定は should_process_frame() を 1 回だけ呼ぶ前提です。
     """
     
     def __init__(self, 
@@ -93,93 +101,438 @@ class FrameSkipper:
                  min_fps: float = 10.0, 
                  max_skip_rate: int = 5,
                  adjustment_interval: float = 2.0,
-                 adaptive_mode: bool = True):
+                 adaptive_mode: bool = True,
+                 latency_budget_ms: Optional[float] = None,
+                 backoff_factor: float = 1.5,
+                 recovery_step: float = 0.25,
+                 headroom: float = 0.2,
+                 hold_off_ms: float = 2000,
+                 ewma_alpha: float = 0.3,
+                 model_cadence: Optional[Dict[str, int]] = None):
         """
         初期化
         
         Args:
             target_fps: 目標FPS
-            min_fps: 最小許容FPS
-            max_skip_rate: 最大スキップレート
-            adjustment_interval: 調整間隔（秒）
-            adaptive_mode: 適応モードの有効/無効
+            min_fps: 最小許容FPS（ログ表示用）
+            max_skip_rate: 最大スキップレート（処理間隔の上限）
+            adjustment_interval: 処理間隔を縮める調整の間隔（秒）
+            adaptive_mode: 適応モードの有効/無効（無効時は current_skip_rate 固定）
+            latency_budget_ms: 1 フレームあたりのレイテンシ予算（None は 1000 / target_fps）
+            backoff_factor: 予算超過時に処理間隔へ掛ける係数
+            recovery_step: 余裕がある場合に処理間隔から引く量
+            headroom: 処理間隔を縮める条件の余裕率（予算の (1 - headroom) 以内に収まる場合のみ）
+            hold_off_ms: 処理間隔を広げた後に再調整しない期間（ミリ秒）
+            ewma_alpha: 処理時間の指数移動平均の係数
+            model_cadence: モデル名 → 実行周期（処理フレーム何回に 1 回か。未指定は毎回）
         """
         self.target_fps = target_fps
         self.min_fps = min_fps
         self.max_skip_rate = max_skip_rate
         self.adjustment_interval = adjustment_interval
         self.adaptive_mode = adaptive_mode
+        self.latency_budget_ms = latency_budget_ms
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+        self.headroom = headroom
+        self.hold_off_ms = hold_off_ms
+        self.ewma_alpha = ewma_alpha
+        self.model_cadence = dict(model_cadence or {})
         
         # 現在の設定
-        self.current_skip_rate = 1  # 初期値は1（全フレーム処理）
+        self.skip_interval = 1.0  # 初期値は1（全フレーム処理）
         self.frame_counter = 0
+        self.processed_counter = 0
         self.last_adjustment_time = time.time()
+        self.hold_off_until = 0.0
+        self.ewma_latency_ms: Optional[float] = None
+        self.last_decision: Optional[bool] = None
+        self._phase = 0.0
         
-        logger.info(f"FrameSkipper initialized: target_fps={target_fps}, min_fps={min_fps}, "
-                   f"max_skip_rate={max_skip_rate}")
+        # 判定履歴
+        self.decisions: deque = deque(maxlen=20)
+        self.model_runs: Dict[str, int] = {}
+        self.model_skips: Dict[str, int] = {}
         
-    def should_process_frame(self, current_fps: float) -> bool:
+        logger.info(f"FrameSkipper initialized: target_fps={target_fps}, budget={self.get_latency_budget_ms():.1f}ms, "
+                   f"max_skip_rate={max_skip_rate}, model_cadence={self.model_cadence}")
+    
+    @property
+    def current_skip_rate(self) -> float:
+        """現在の処理間隔（1 は全フレーム処理、2 は 2 フレームに 1 回）"""
+        return round(self.skip_interval, 2)
+    
+    @current_skip_rate.setter
+    def current_skip_rate(self, value: float) -> None:
+        self.skip_interval = max(1.0, float(value))
+    
+    def get_latency_budget_ms(self) -> float:
+        """1 フレームあたりのレイテンシ予算（ミリ秒）"""
+        if self.latency_budget_ms:
+            return float(self.latency_budget_ms)
+        return 1000.0 / self.target_fps if self.target_fps > 0 else 100.0
+        
+    def should_process_frame(self, current_fps: Optional[float] = None) -> bool:
         """
-        現在のフレームを処理すべきかどうかを判定
+        現在のフレームを処理すべきかどうかを判定（1 フレームにつき 1 回だけ呼ぶ）
         
         Args:
-            current_fps: 現在のFPS
+            current_fps: 現在のFPS（ログ表示用）
             
         Returns:
             bool: 処理すべきならTrue、スキップすべきならFalse
         """
-        # 適応モードが無効の場合は、現在のカウンター値で判定してからインクリメント
-        if not self.adaptive_mode:
-            should_process = (self.frame_counter % self.current_skip_rate == 0)
-            self.frame_counter += 1
-            return should_process
-        
-        # 適応モードではインクリメントしてから適応調整
         self.frame_counter += 1
         
-        # 定期的にスキップレートを調整
-        current_time = time.time()
-        if current_time - self.last_adjustment_time > self.adjustment_interval:
-            self._adjust_skip_rate(current_fps)
-            self.last_adjustment_time = current_time
+        # 処理が遅れていない場合は処理間隔を縮める
+        if self.adaptive_mode:
+            self._maybe_recover(time.time(), current_fps)
         
-        # カウンターに基づくスキップ
-        return self.frame_counter % self.current_skip_rate == 0
+        # 位相アキュムレータ: 処理間隔分のフレームが溜まったら処理
+        self._phase = min(self._phase, self.skip_interval) + 1.0
+        should_process = self._phase >= self.skip_interval - 1e-9
+        if should_process:
+            self._phase -= self.skip_interval
+            self.processed_counter += 1
+        self.last_decision = should_process
+        return should_process
     
-    def _adjust_skip_rate(self, current_fps: float) -> None:
+    def should_run_model(self, name: str) -> bool:
         """
-        現在のFPSに基づいてスキップレートを調整
+        処理するフレームで指定モデルを実行するかを判定（モデル別の実行周期）
         
         Args:
-            current_fps: 現在のFPS
+            name: モデル名（'yolo', 'pose', 'hands', 'face' など）
+            
+        Returns:
+            bool: 実行するならTrue、前回の出力を再利用するならFalse
         """
-        if current_fps <= 0:
-            return  # 有効なFPSがない場合は調整しない
+        cadence = max(1, int(self.model_cadence.get(name, 1)))
+        should_run = (self.processed_counter - 1) % cadence == 0
+        counter = self.model_runs if should_run else self.model_skips
+        counter[name] = counter.get(name, 0) + 1
+        return should_run
+    
+    def record_latency(self, latency_ms: float) -> None:
+        """
+        処理したフレームのレイテンシを記録し、予算超過なら処理間隔を広げる
         
-        old_skip_rate = self.current_skip_rate
+        Args:
+            latency_ms: 推論開始から終了までの時間（ミリ秒）
+        """
+        if self.ewma_latency_ms is None:
+            self.ewma_latency_ms = latency_ms
+        else:
+            self.ewma_latency_ms = self.ewma_alpha * latency_ms + (1 - self.ewma_alpha) * self.ewma_latency_ms
         
-        if current_fps < self.min_fps:
-            # FPSが低すぎる場合はスキップレートを上げる
-            self.current_skip_rate = min(self.current_skip_rate + 1, self.max_skip_rate)
-        elif current_fps > self.target_fps * 1.2:
-            # FPSが十分高い場合はスキップレートを下げる
-            self.current_skip_rate = max(self.current_skip_rate - 1, 1)
+        if not self.adaptive_mode:
+            return
+        current_time = time.time()
+        if current_time < self.hold_off_until:
+            return
         
-        # スキップレートが変化した場合にログ出力
-        if old_skip_rate != self.current_skip_rate:
-            logger.info(f"Skip rate adjusted: {old_skip_rate} -> {self.current_skip_rate} "
-                      f"(current FPS: {current_fps:.1f}, target: {self.target_fps})")
+        # 処理間隔あたりの予算（処理間隔 k なら k フレーム分の時間を使える）を超過
+        if self.ewma_latency_ms > self.get_latency_budget_ms() * self.skip_interval \
+                and self.skip_interval < self.max_skip_rate:
+            new_interval = min(self.skip_interval * self.backoff_factor, float(self.max_skip_rate))
+            self._record_adjustment('backoff', new_interval, current_time)
+            self.hold_off_until = current_time + self.hold_off_ms / 1000.0
+    
+    def _maybe_recover(self, current_time: float, current_fps: Optional[float]) -> None:
+        """縮めた処理間隔でも予算に余裕がある場合、処理間隔を加算的に縮める"""
+        if self.skip_interval <= 1.0 or self.ewma_latency_ms is None:
+            return
+        if current_time < self.hold_off_until or current_time - self.last_adjustment_time < self.adjustment_interval:
+            return
+        new_interval = max(1.0, self.skip_interval - self.recovery_step)
+        if self.ewma_latency_ms <= self.get_latency_budget_ms() * new_interval * (1 - self.headroom):
+            self._record_adjustment('recover', new_interval, current_time, current_fps)
+    
+    def _record_adjustment(self, action: str, new_interval: float, current_time: float,
+                           current_fps: Optional[float] = None) -> None:
+        """処理間隔を変更し、判定履歴に記録する"""
+        old_interval = self.skip_interval
+        self.skip_interval = new_interval
+        self.last_adjustment_time = current_time
+        self.decisions.append({
+            'time': current_time,
+            'action': action,
+            'from': round(old_interval, 2),
+            'to': round(new_interval, 2),
+            'latency_ms': round(self.ewma_latency_ms or 0.0, 1),
+            'budget_ms': round(self.get_latency_budget_ms(), 1),
+        })
+        logger.info(f"Skip rate adjusted ({action}): {old_interval:.2f} -> {new_interval:.2f} "
+                    f"(latency: {self.ewma_latency_ms:.1f}ms, budget: {self.get_latency_budget_ms():.1f}ms"
+                    + (f", current FPS: {current_fps:.1f}" if current_fps else "") + ")")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """制御状態と判定履歴を取得"""
+        hold_off_remaining = max(0.0, self.hold_off_until - time.time()) * 1000
+        return {
+            'mode': 'aimd' if self.adaptive_mode else 'fixed',
+            'skip_interval': self.current_skip_rate,
+            'processing_ratio': 1.0 / self.skip_interval,
+            'latency_budget_ms': self.get_latency_budget_ms(),
+            'ewma_latency_ms': self.ewma_latency_ms,
+            'hold_off': hold_off_remaining > 0,
+            'hold_off_remaining_ms': hold_off_remaining,
+            'frames': self.frame_counter,
+            'processed': self.processed_counter,
+            'skipped': self.frame_counter - self.processed_counter,
+            'last_decision': None if self.last_decision is None else ('process' if self.last_decision else 'skip'),
+            'recent_adjustments': list(self.decisions),
+            'model_cadence': dict(self.model_cadence),
+            'model_runs': dict(self.model_runs),
+            'model_skips': dict(self.model_skips),
+        }
     
     def reset(self) -> None:
         """状態をリセット"""
-        self.current_skip_rate = 1
+        self.skip_interval = 1.0
         self.frame_counter = 0
+        self.processed_counter = 0
         self.last_adjustment_time = time.time()
+        self.hold_off_until = 0.0
+        self.ewma_latency_ms = None
+        self.last_decision = None
+        self._phase = 0.0
+        self.decisions.clear()
+        self.model_runs.clear()
+        self.model_skips.clear()
         logger.info("FrameSkipper reset to initial state")
 
 
+class MotionGate:
+    """
+    静止フレーム判定（モーションゲート）
+    
+    縮小グレースケールのサムネイルを直前に推論したフレームと比較し、
+    変化が閾値未満なら推論を省略して前回結果を再利用できると判定します。
+    前回推論から max_age_ms を超えた場合は変化がなくても推論させます。
+    """
+    
+    def __init__(self,
+                 thumbnail_size: Tuple[int, int] = (64, 48),
+                 pixel_threshold: int = 25,
+                 changed_ratio: float = 0.01,
+                 max_age_ms: float = 2000.0):
+        """
+        初期化
+        
+        Args:
+            thumbnail_size: 比較用サムネイルの (幅, 高さ)
+            pixel_threshold: 画素を「変化した」とみなす輝度差（0-255）
+            changed_ratio: 変化画素の割合がこれを超えたら動きありと判定
+            max_age_ms: 前回結果を再利用できる最大経過時間（ミリ秒）
+        """
+        self.thumbnail_size = tuple(thumbnail_size)
+        self.pixel_threshold = pixel_threshold
+        self.changed_ratio = changed_ratio
+        self.max_age_ms = max_age_ms
+        
+        self.reference_thumbnail: Optional[np.ndarray] = None
+        self.reference_time = 0.0
+        self._pending_thumbnail: Optional[np.ndarray] = None
+        self.last_changed_ratio = 0.0
+        
+        # 統計
+        self.check_count = 0
+        self.hit_count = 0
+        self.expired_count = 0
+        
+        logger.info(f"MotionGate initialized: thumbnail={self.thumbnail_size}, "
+                   f"pixel_threshold={pixel_threshold}, changed_ratio={changed_ratio}, max_age_ms={max_age_ms}")
+    
+    def _make_thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """比較用の縮小グレースケール画像を作成"""
+        if frame.dtype != np.uint8:
+            frame = np.clip(frame * 255.0, 0, 255).astype(np.uint8)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+    
+    def is_static(self, frame: np.ndarray) -> bool:
+        """
+        フレームが前回推論時から変化していないかを判定
+        
+        動きありと判定したフレームは、実際に推論した時点で mark_inferred() により
+        次回比較の基準になります（フレームスキップで推論されなかったフレームは基準にしない）。
+        
+        Args:
+            frame: 入力フレーム（BGR形式）
+            
+        Returns:
+            bool: 静止しており前回結果を再利用できるならTrue
+        """
+        self.check_count += 1
+        thumbnail = self._make_thumbnail(frame)
+        now = time.time()
+        
+        if self.reference_thumbnail is not None and self.reference_thumbnail.shape == thumbnail.shape:
+            diff = cv2.absdiff(thumbnail, self.reference_thumbnail)
+            self.last_changed_ratio = float(np.count_nonzero(diff > self.pixel_threshold)) / diff.size
+            if self.last_changed_ratio <= self.changed_ratio:
+                if (now - self.reference_time) * 1000 <= self.max_age_ms:
+                    self.hit_count += 1
+                    return True
+                self.expired_count += 1
+        
+        self._pending_thumbnail = thumbnail
+        return False
+    
+    def mark_inferred(self) -> None:
+        """直前に is_static() で動きありと判定したフレームを推論したことを記録"""
+        if self._pending_thumbnail is not None:
+            self.reference_thumbnail = self._pending_thumbnail
+            self.reference_time = time.time()
+            self._pending_thumbnail = None
+    
+    def reset(self) -> None:
+        """基準フレームをクリア（次のフレームは必ず推論）"""
+        self.reference_thumbnail = None
+        self.reference_time = 0.0
+        self._pending_thumbnail = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """ヒット率などの統計を取得"""
+        return {
+            'checks': self.check_count,
+            'hits': self.hit_count,
+            'expired': self.expired_count,
+            'hit_rate': self.hit_count / self.check_count if self.check_count else 0.0,
+            'last_changed_ratio': self.last_changed_ratio,
+        }
+
+
+class ROITracker:
+    """
+    被写体追従ROI（ROIトラッキング）
+    
+    直近に検出した人物・スマートフォンを内包する拡張領域を次フレームの推論領域とし、
+    一定フレームごと、または見失い・信頼度低下時はフレーム全体を再走査します。
+    """
+    
+    def __init__(self,
+                 full_scan_interval: int = 15,
+                 expand_ratio: float = 0.25,
+                 min_size_ratio: float = 0.3,
+                 min_confidence: float = 0.5):
+        """
+        初期化
+        
+        Args:
+            full_scan_interval: 全体再走査の間隔（フレーム数）
+            expand_ratio: 検出領域の幅・高さに対する各辺の拡張率
+            min_size_ratio: ROIの最小サイズ（フレーム幅・高さに対する比率）
+            min_confidence: 人物信頼度がこれを下回ったら全体再走査
+        """
+        self.full_scan_interval = max(1, int(full_scan_interval))
+        self.expand_ratio = expand_ratio
+        self.min_size_ratio = min_size_ratio
+        self.min_confidence = min_confidence
+        
+        self.roi: Optional[Tuple[int, int, int, int]] = None
+        self.roi_frame_shape: Optional[Tuple[int, int]] = None
+        self.frames_since_full_scan = 0
+        
+        # 統計
+        self.full_scan_count = 0
+        self.roi_frame_count = 0
+        self.lost_count = 0
+        self.roi_area_ratios = deque(maxlen=30)
+        
+        logger.info(f"ROITracker initialized: full_scan_interval={self.full_scan_interval}, "
+                   f"expand_ratio={expand_ratio}, min_size_ratio={min_size_ratio}")
+    
+    def next_roi(self, frame_shape: Tuple[int, ...]) -> Optional[Tuple[int, int, int, int]]:
+        """
+        次フレームの推論領域を取得
+        
+        Args:
+            frame_shape: フレーム形状
+            
+        Returns:
+            Optional[Tuple[int, int, int, int]]: (x1, y1, x2, y2)、全体走査の場合はNone
+        """
+        if (self.roi is None or
+                self.roi_frame_shape != tuple(frame_shape[:2]) or
+                self.frames_since_full_scan >= self.full_scan_interval):
+            self.frames_since_full_scan = 0
+            self.full_scan_count += 1
+            return None
+        
+        self.frames_since_full_scan += 1
+        self.roi_frame_count += 1
+        return self.roi
+    
+    def update(self,
+               boxes: List[Tuple[int, int, int, int]],
+               confidence: Optional[float],
+               frame_shape: Tuple[int, ...]) -> None:
+        """
+        検出結果（フレーム座標）から次の推論領域を更新
+        
+        Args:
+            boxes: 追従対象のバウンディングボックス (x1, y1, x2, y2) のリスト
+            confidence: 人物検出の信頼度（不明な場合はNone）
+            frame_shape: フレーム形状
+        """
+        if not boxes or (confidence is not None and confidence < self.min_confidence):
+            if self.roi is not None:
+                self.lost_count += 1
+            self.roi = None
+            return
+        
+        height, width = frame_shape[:2]
+        box_array = np.asarray(boxes, dtype=np.float32)
+        x1, y1 = box_array[:, 0].min(), box_array[:, 1].min()
+        x2, y2 = box_array[:, 2].max(), box_array[:, 3].max()
+        
+        # 検出領域を拡張し、最小サイズを確保
+        margin_x = (x2 - x1) * self.expand_ratio
+        margin_y = (y2 - y1) * self.expand_ratio
+        roi_w = max(x2 - x1 + 2 * margin_x, width * self.min_size_ratio)
+        roi_h = max(y2 - y1 + 2 * margin_y, height * self.min_size_ratio)
+        center_x, center_y = (x1 + x2) / 2, (y1 + y2) / 2
+        
+        roi_x1 = int(max(0, center_x - roi_w / 2))
+        roi_y1 = int(max(0, center_y - roi_h / 2))
+        roi_x2 = int(min(width, center_x + roi_w / 2))
+        roi_y2 = int(min(height, center_y + roi_h / 2))
+        if roi_x2 - roi_x1 < 2 or roi_y2 - roi_y1 < 2:
+            self.roi = None
+            return
+        
+        self.roi = (roi_x1, roi_y1, roi_x2, roi_y2)
+        self.roi_frame_shape = (height, width)
+        self.roi_area_ratios.append(((roi_x2 - roi_x1) * (roi_y2 - roi_y1)) / float(width * height))
+    
+    def reset(self) -> None:
+        """追従を解除（次のフレームは全体走査）"""
+        self.roi = None
+        self.frames_since_full_scan = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """追従統計を取得"""
+        total = self.full_scan_count + self.roi_frame_count
+        return {
+            'tracking': self.roi is not None,
+            'roi': self.roi,
+            'full_scans': self.full_scan_count,
+            'roi_frames': self.roi_frame_count,
+            'roi_frame_rate': self.roi_frame_count / total if total else 0.0,
+            'lost': self.lost_count,
+            'avg_roi_area_ratio': float(np.mean(self.roi_area_ratios)) if self.roi_area_ratios else None,
+        }
+
+
 class BatchProcessor:
-    """バッチ処理機能"""
+    """
+    バッチ処理機能
+    - batch_size 枚集まるか、前回バッチから timeout_ms 経過した時点でバッチを確定
+    - ソースID付きで投入した場合は 1 バッチにつき 1 ソース 1 フレーム（新しいフレームで置き換え）
+    - 複数カメラの収集スレッドから投入し、推論スレッドが wait_batch() で取り出す
+    """
     
     def __init__(self, batch_size: int = 4, timeout_ms: int = 50):
         """
@@ -190,32 +543,126 @@ class BatchProcessor:
         self.batch_size = batch_size
         self.timeout_ms = timeout_ms
         self.frame_buffer = []
+        self.source_buffer = []
         self.last_batch_time = time.time()
         self.enabled = False  # デフォルトは無効（実験的機能）
+        self._condition = threading.Condition()
         
-    def add_frame(self, frame: np.ndarray) -> Optional[List[np.ndarray]]:
+        # 統計
+        self.batch_count = 0
+        self.batched_frame_count = 0
+        self.replaced_frame_count = 0
+        self.timeout_batch_count = 0
+    
+    def _append(self, frame: np.ndarray, source_id: Any) -> None:
+        """バッファへ追加（同じソースのフレームが未処理なら置き換える）"""
+        if source_id is not None and source_id in self.source_buffer:
+            self.frame_buffer[self.source_buffer.index(source_id)] = frame
+            self.replaced_frame_count += 1
+            return
+        self.frame_buffer.append(frame)
+        self.source_buffer.append(source_id)
+    
+    def _is_ready(self, current_time: float) -> bool:
+        """バッチが確定できるか（バッチサイズ到達、またはタイムアウト）"""
+        if not self.frame_buffer:
+            return False
+        return (len(self.frame_buffer) >= self.batch_size or
+                (current_time - self.last_batch_time) * 1000 > self.timeout_ms)
+    
+    def _take_batch(self, current_time: float) -> List[Tuple[Any, np.ndarray]]:
+        """バッファの内容をバッチとして取り出す"""
+        if len(self.frame_buffer) < self.batch_size:
+            self.timeout_batch_count += 1
+        batch = list(zip(self.source_buffer, self.frame_buffer))
+        self.frame_buffer = []
+        self.source_buffer = []
+        self.last_batch_time = current_time
+        self.batch_count += 1
+        self.batched_frame_count += len(batch)
+        return batch
+        
+    def add_frame(self, frame: np.ndarray, source_id: Any = None) -> Optional[List[np.ndarray]]:
         """
         フレームをバッファに追加し、バッチが準備できたら返す
         
+        Args:
+            frame: 入力フレーム
+            source_id: フレームの送信元（指定時は同じソースの未処理フレームを置き換える）
+        
         Returns:
             バッチが準備できた場合はフレームリスト、そうでなければNone
         """
         if not self.enabled:
             return [frame]  # バッチ処理が無効の場合は即座に返す
-            
-        self.frame_buffer.append(frame)
-        current_time = time.time()
         
-        # バッチサイズに達した、またはタイムアウトした場合
-        if (len(self.frame_buffer) >= self.batch_size or 
-            (current_time - self.last_batch_time) * 1000 > self.timeout_ms):
+        with self._condition:
+            self._append(frame, source_id)
+            current_time = time.time()
             
-            batch = self.frame_buffer.copy()
-            self.frame_buffer.clear()
-            self.last_batch_time = current_time
-            return batch
+            # バッチサイズに達した、またはタイムアウトした場合
+            if self._is_ready(current_time):
+                return [frame for _, frame in self._take_batch(current_time)]
             
         return None
+    
+    def put(self, source_id: Any, frame: np.ndarray) -> None:
+        """
+        ソースのフレームを投入し、待機中の推論スレッドへ通知する（複数ソースモード）
+        
+        Args:
+            source_id: フレームの送信元
+            frame: 入力フレーム（呼び出し側で所有権を渡したもの）
+        """
+        with self._condition:
+            self._append(frame, source_id)
+            self._condition.notify_all()
+    
+    def wait_batch(self, timeout: Optional[float] = None) -> List[Tuple[Any, np.ndarray]]:
+        """
+        バッチが確定するまで待機して取り出す（複数ソースモード）
+        
+        バッチサイズに達しなくても、前回バッチから timeout_ms 経過した時点で
+        集まっている分だけを確定する。
+        
+        Args:
+            timeout: 最大待機秒数（停止判定のため呼び出し側で周期的に戻る）
+            
+        Returns:
+            List[Tuple[Any, np.ndarray]]: (ソースID, フレーム) のリスト。時間切れ時は空リスト
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        with self._condition:
+            while True:
+                current_time = time.time()
+                if self._is_ready(current_time):
+                    return self._take_batch(current_time)
+                
+                # 次に確定し得る時刻（タイムアウト）まで、または新しいフレームまで待機
+                wait = None
+                if self.frame_buffer:
+                    wait = max(0.0, self.last_batch_time + self.timeout_ms / 1000.0 - current_time) + 0.001
+                if deadline is not None:
+                    remaining = deadline - current_time
+                    if remaining <= 0:
+                        return []
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._condition.wait(timeout=wait)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """バッチ処理の統計を取得"""
+        with self._condition:
+            return {
+                'enabled': self.enabled,
+                'batch_size': self.batch_size,
+                'timeout_ms': self.timeout_ms,
+                'batches': self.batch_count,
+                'frames': self.batched_frame_count,
+                'avg_batch_size': self.batched_frame_count / self.batch_count if self.batch_count else 0.0,
+                'timeout_batches': self.timeout_batch_count,
+                'replaced_frames': self.replaced_frame_count,
+                'pending': len(self.frame_buffer),
+            }
 
 
 class AIOptimizer:
@@ -226,6 +673,9 @@ class AIOptimizer:
     1. FPSカウンター: 推論速度を常時監視
     2. 動的フレームスキップ: 負荷に応じて自動的にフレーム処理率を調整
     3. 推論前処理最適化: メモリ使用量削減・処理速度向上
+    4. モーションゲート: 静止フレームでは推論を省略し前回結果を再利用
+    5. ROIトラッキング: 被写体周辺の切り出し領域のみをYOLOで推論（MediaPipeはフレーム全体）
+    6. バッチ処理: 複数ソースのフレームをまとめて推論
     """
     
     def __init__(self, config_manager: Optional[ConfigManager] = None):
@@ -248,11 +698,18 @@ class AIOptimizer:
             # フレームスキップ設定
             'frame_skipper': {
                 'target_fps': 15.0,  # 目標FPS（高すぎると点滅する可能性）
-                'min_fps': 10.0,     # 最小FPS（これを下回るとスキップ率上昇）
-                 'max_skip_rate': 2,  # 最大スキップ率（1:処理、2:2フレームごとに1回処理）
-                'adjustment_interval': 2.0,  # 調整間隔（秒）
-                'adaptive_mode': True,  # 適応モード（システム負荷に応じて自動調整）
+                'min_fps': 10.0,     # 最小FPS
+                'max_skip_rate': 4,  # 最大スキップ率（1:処理、2:2フレームごとに1回処理。スキップ時は前回結果を再利用）
+                'adjustment_interval': 2.0,  # 処理間隔を縮める調整の間隔（秒）
+                'adaptive_mode': True,  # 適応モード（レイテンシ予算に応じて自動調整）
                 'enabled': True,
+                'latency_budget_ms': None,  # 1フレームのレイテンシ予算（None は 1000 / target_fps）
+                'backoff_factor': 1.5,      # 予算超過時に処理間隔へ掛ける係数
+                'recovery_step': 0.25,      # 余裕がある場合に処理間隔から引く量
+                'headroom': 0.2,            # 処理間隔を縮める際に残す余裕率
+                'hold_off_ms': 2000,        # 処理間隔を広げた後に再調整しない期間
+                # モデル別の実行周期（処理フレーム何回に 1 回実行するか。例: face を 3 にすると 3 回に 1 回）
+                'model_cadence': {'yolo': 1, 'pose': 1, 'hands': 1, 'face': 1},
             },
             
             # フレーム前処理設定
@@ -263,6 +720,32 @@ class AIOptimizer:
                 'normalize_enabled': True,  # 正規化有効（高速推論）
                 'roi_enabled': False,    # 関心領域処理（実験的）
             },
+            
+            # モーションゲート設定（静止フレームでの推論省略）
+            'motion_gate': {
+                'enabled': False,
+                'thumbnail_width': 64,    # 比較用サムネイル幅
+                'thumbnail_height': 48,   # 比較用サムネイル高さ
+                'pixel_threshold': 25,    # 変化とみなす輝度差
+                'changed_ratio': 0.01,    # 動きありと判定する変化画素の割合
+                'max_age_ms': 2000,       # 前回結果を再利用できる最大経過時間（スキップ時も共通）
+            },
+            
+            # ROIトラッキング設定（被写体周辺のみ推論）
+            'roi_tracking': {
+                'enabled': False,
+                'full_scan_interval': 15,  # 全体再走査の間隔（フレーム数）
+                'expand_ratio': 0.25,      # 検出領域の拡張率
+                'min_size_ratio': 0.3,     # ROIの最小サイズ（フレーム比）
+                'min_confidence': 0.5,     # これを下回ったら全体再走査
+            },
+            
+            # バッチ処理設定（複数カメラモード）
+            'batch_processing': {
+                'enabled': False,
+                'batch_size': 4,      # 1 回の推論にまとめる最大フレーム数
+                'timeout_ms': 50,     # バッチ蓄積のタイムアウト（ミリ秒）
+            },
         }
         
         # パフォーマンスモニタリング（設定読み込み前に初期化）
@@ -282,9 +765,41 @@ class AIOptimizer:
             min_fps=self.settings['frame_skipper']['min_fps'],
             max_skip_rate=self.settings['frame_skipper']['max_skip_rate'],
             adjustment_interval=self.settings['frame_skipper']['adjustment_interval'],
-            adaptive_mode=self.settings['frame_skipper']['adaptive_mode']
+            adaptive_mode=self.settings['frame_skipper']['adaptive_mode'],
+            latency_budget_ms=self.settings['frame_skipper']['latency_budget_ms'],
+            backoff_factor=self.settings['frame_skipper']['backoff_factor'],
+            recovery_step=self.settings['frame_skipper']['recovery_step'],
+            headroom=self.settings['frame_skipper']['headroom'],
+            hold_off_ms=self.settings['frame_skipper']['hold_off_ms'],
+            model_cadence=self.settings['frame_skipper']['model_cadence']
+        )
+        
+        # モーションゲート
+        motion_settings = self.settings['motion_gate']
+        self.motion_gate = MotionGate(
+            thumbnail_size=(motion_settings['thumbnail_width'], motion_settings['thumbnail_height']),
+            pixel_threshold=motion_settings['pixel_threshold'],
+            changed_ratio=motion_settings['changed_ratio'],
+            max_age_ms=motion_settings['max_age_ms']
+        )
+        
+        # ROIトラッカー
+        roi_settings = self.settings['roi_tracking']
+        self.roi_tracker = ROITracker(
+            full_scan_interval=roi_settings['full_scan_interval'],
+            expand_ratio=roi_settings['expand_ratio'],
+            min_size_ratio=roi_settings['min_size_ratio'],
+            min_confidence=roi_settings['min_confidence']
         )
         
+        # バッチ処理
+        batch_settings = self.settings['batch_processing']
+        self.batch_processor = BatchProcessor(
+            batch_size=batch_settings['batch_size'],
+            timeout_ms=batch_settings['timeout_ms']
+        )
+        self.batch_processor.enabled = batch_settings['enabled']
+        
         # システムモニタリング（メモリ、CPU、GPU）
         self.system_stats = {
             'memory_percent': 0.0,
@@ -321,16 +836,27 @@ class AIOptimizer:
                 
                 # フレームスキッパーの設定更新
                 if hasattr(self, 'frame_skipper'):
-                    self.frame_skipper.target_fps = self.settings['frame_skipper']['target_fps']
-                    self.frame_skipper.min_fps = self.settings['frame_skipper']['min_fps']
-                    self.frame_skipper.max_skip_rate = self.settings['frame_skipper']['max_skip_rate']
-                    self.frame_skipper.adjustment_interval = self.settings['frame_skipper']['adjustment_interval']
-                    self.frame_skipper.adaptive_mode = self.settings['frame_skipper']['adaptive_mode']
+                    self._apply_frame_skipper_settings()
             
             # 前処理設定
             if self.config_manager.has('optimization.preprocessing'):
                 preproc_config = self.config_manager.get('optimization.preprocessing', {})
                 self.settings['preprocessing'].update(preproc_config)
+            
+            # モーションゲート設定
+            if self.config_manager.has('optimization.motion_gate'):
+                motion_config = self.config_manager.get('optimization.motion_gate', {})
+                self.settings['motion_gate'].update(motion_config)
+            
+            # ROIトラッキング設定
+            if self.config_manager.has('optimization.roi_tracking'):
+                roi_config = self.config_manager.get('optimization.roi_tracking', {})
+                self.settings['roi_tracking'].update(roi_config)
+            
+            # バッチ処理設定
+            if self.config_manager.has('optimization.batch_processing'):
+                batch_config = self.config_manager.get('optimization.batch_processing', {})
+                self.settings['batch_processing'].update(batch_config)
                 
             logger.info("AI optimizer settings loaded successfully")
             
@@ -342,48 +868,84 @@ class AIOptimizer:
             )
             logger.warning(f"Configuration error: {config_error.to_dict()}")
     
-    def optimize_yolo_inference(self, model: Any, frame: np.ndarray) -> Optional[Any]:
+    def _apply_frame_skipper_settings(self) -> None:
+        """フレームスキップ設定をフレームスキッパーへ反映"""
+        skip_settings = self.settings['frame_skipper']
+        self.frame_skipper.target_fps = skip_settings['target_fps']
+        self.frame_skipper.min_fps = skip_settings['min_fps']
+        self.frame_skipper.max_skip_rate = skip_settings['max_skip_rate']
+        self.frame_skipper.adjustment_interval = skip_settings['adjustment_interval']
+        self.frame_skipper.adaptive_mode = skip_settings['adaptive_mode']
+        self.frame_skipper.latency_budget_ms = skip_settings['latency_budget_ms']
+        self.frame_skipper.backoff_factor = skip_settings['backoff_factor']
+        self.frame_skipper.recovery_step = skip_settings['recovery_step']
+        self.frame_skipper.headroom = skip_settings['headroom']
+        self.frame_skipper.hold_off_ms = skip_settings['hold_off_ms']
+        self.frame_skipper.model_cadence = dict(skip_settings['model_cadence'] or {})
+        self.frame_skipper.skip_interval = min(self.frame_skipper.skip_interval, float(skip_settings['max_skip_rate']))
+    
+    def optimize_yolo_inference(self, model: Any, frame: np.ndarray,
+                                predict_args: Optional[Dict[str, Any]] = None) -> Optional[Any]:
         """
         YOLO推論の最適化
         
-        フレームスキップ判定とGPU最適化を適用したYOLO推論を実行します。
+        GPU最適化・前処理を適用したYOLO推論を実行します。
+        フレームスキップ・実行周期の判定は begin_detection() 時にフレーム単位で 1 回だけ行うため、
+        ここでは判定しません（FPS・推論時間の統計も end_inference_timer() でフレーム単位に計上）。
         
         Args:
             model: YOLOモデル
             frame: 入力フレーム（BGR形式）
+            predict_args: 推論時に追加で渡す引数（対象クラス指定など）
             
         Returns:
-            推論結果、フレームスキップ時はNone
+            推論結果
         """
-        if not self.settings['frame_skipper']['enabled'] or not hasattr(self, 'frame_skipper'):
-            # フレームスキップが無効の場合は全フレーム処理
-            return self._run_inference(model, frame)
-        
-        # フレームスキップ判定（FPSに基づく動的スキップ）
-        should_process = self.frame_skipper.should_process_frame(self.current_fps)
-        if not should_process:
-            # スマホ検出のためのフレームスキップ状況をログに出力
-            logger.debug(f"⏭️ フレームスキップ: FPS={self.current_fps:.1f}, skip_rate={self.frame_skipper.current_skip_rate}, frame_counter={self.frame_skipper.frame_counter}")
-            return None
+        return self._run_inference(model, frame, predict_args)
+    
+    def optimize_yolo_batch(self, model: Any, frames: List[np.ndarray],
+                            predict_args: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """
+        複数フレームをまとめたYOLO推論
         
-        # 推論実行と統計更新
-        start_time = time.time()
-        results = self._run_inference(model, frame)
-        inference_time = time.time() - start_time
+        各フレームに単体推論と同じ前処理を適用し、1 回のモデル呼び出しで推論します。
+        バッチの確定自体が処理ペースを決めるため、フレームスキップ判定は行いません。
+        単体推論（メインカメラ）のFPS統計には計上せず、計測は呼び出し側で行います。
         
-        # 統計更新
-        self._update_fps_stats()
-        self.inference_times.append(inference_time)
+        Args:
+            model: YOLOモデル
+            frames: 入力フレーム（BGR形式）のリスト
+            predict_args: 推論時に追加で渡す引数（対象クラス指定など）
+            
+        Returns:
+            List[Any]: フレームごとの推論結果（入力と同じ順序）
+        """
+        if not frames:
+            return []
         
-        return results
+        preprocessed_frames = [self._optimize_frame_preprocessing(frame) for frame in frames]
+        try:
+            results = model(preprocessed_frames, verbose=False, **(predict_args or {}))
+        except Exception as e:
+            raise wrap_exception(
+                e, OptimizationError,
+                "Batched inference failed",
+                details={
+                    'model_type': str(type(model)),
+                    'batch_size': len(frames)
+                }
+            )
+        return list(results)
     
-    def _run_inference(self, model: Any, frame: np.ndarray) -> Any:
+    def _run_inference(self, model: Any, frame: np.ndarray,
+                       predict_args: Optional[Dict[str, Any]] = None) -> Any:
         """
         最適化設定を適用した推論実行
         
         Args:
             model: 推論モデル
             frame: 入力フレーム
+            predict_args: 推論時に追加で渡す引数
             
         Returns:
             推論結果
@@ -395,11 +957,11 @@ class AIOptimizer:
             # 対応するバックエンドを判定して適切な推論を実行
             if hasattr(model, '__class__') and model.__class__.__name__ == 'YOLO':
                 # YOLO推論
-                results = model(preprocessed_frame, verbose=False)
+                results = model(preprocessed_frame, verbose=False, **(predict_args or {}))
                 return results
             else:
                 # 一般的なモデル推論
-                return model(preprocessed_frame)
+                return model(preprocessed_frame, **(predict_args or {}))
                 
         except Exception as e:
             inference_error = wrap_exception(
@@ -414,7 +976,7 @@ class AIOptimizer:
             
             # エラー時は元のフレームで直接推論を試みる
             try:
-                return model(frame)
+                return model(frame, **(predict_args or {}))
             except Exception as fallback_error:
                 raise wrap_exception(
                     fallback_error, OptimizationError,
@@ -464,8 +1026,9 @@ class AIOptimizer:
                 if optimized_frame.dtype != np.float32:
                     optimized_frame = optimized_frame.astype(np.float32) / 255.0
             
-            # 関心領域処理（実験的）
-            if preprocessing['roi_enabled']:
+            # 関心領域処理（実験的・固定の中央領域）
+            # ROIトラッキング有効時は呼び出し側で被写体領域を切り出し済みのため適用しない
+            if preprocessing['roi_enabled'] and not self.settings['roi_tracking']['enabled']:
                 # 画像の中央部分を抽出（例: 中央70%）
                 h, w = optimized_frame.shape[:2]
                 roi_w, roi_h = int(w * 0.7), int(h * 0.7)
@@ -491,6 +1054,9 @@ class AIOptimizer:
         """
         MediaPipe推論パイプラインの最適化
         
+        フレームスキップ判定は begin_detection() 時にフレーム単位で 1 回だけ行うため、
+        ここでは判定しません（統計も end_inference_timer() でフレーム単位に計上）。
+        
         Args:
             mediapipe_component: MediaPipeコンポーネント
             frame: 入力フレーム（RGB形式）
@@ -499,28 +1065,13 @@ class AIOptimizer:
             MediaPipe推論結果
         """
         if not self.settings['frame_skipper']['enabled'] or not hasattr(self, 'frame_skipper'):
-            # フレームスキップが無効の場合は全フレーム処理
+            # フレームスキップが無効の場合は前処理なしで処理
             return mediapipe_component.process(frame)
         
-        # フレームスキップ判定
-        if not self.frame_skipper.should_process_frame(self.current_fps):
-            return None
-        
-        # 推論実行と統計更新
-        start_time = time.time()
-        
         # フレーム前処理
         preprocessed_frame = self._optimize_frame_preprocessing(frame, for_mediapipe=True)
         
-        results = mediapipe_component.process(preprocessed_frame)
-        
-        inference_time = time.time() - start_time
-        
-        # 統計更新
-        self._update_fps_stats()
-        self.inference_times.append(inference_time)
-        
-        return results
+        return mediapipe_component.process(preprocessed_frame)
     
     def _update_fps_stats(self) -> None:
         """FPS統計を更新"""
@@ -615,6 +1166,8 @@ class AIOptimizer:
             'gpu_percent': self.system_stats['gpu_percent'],
             'used_memory_mb': self.system_stats['used_memory_mb'],
             'total_memory_mb': self.system_stats['total_memory_mb'],
+            'motion_gate': self.motion_gate.get_stats() if hasattr(self, 'motion_gate') else None,
+            'roi_tracking': self.roi_tracker.get_stats() if hasattr(self, 'roi_tracker') else None,
             'settings': self.get_settings()
         }
         
@@ -650,11 +1203,32 @@ class AIOptimizer:
             
             # フレームスキッパーの更新
             if hasattr(self, 'frame_skipper') and 'frame_skipper' in new_settings:
-                self.frame_skipper.target_fps = self.settings['frame_skipper']['target_fps']
-                self.frame_skipper.min_fps = self.settings['frame_skipper']['min_fps']
-                self.frame_skipper.max_skip_rate = self.settings['frame_skipper']['max_skip_rate']
-                self.frame_skipper.adjustment_interval = self.settings['frame_skipper']['adjustment_interval']
-                self.frame_skipper.adaptive_mode = self.settings['frame_skipper']['adaptive_mode']
+                self._apply_frame_skipper_settings()
+            
+            # モーションゲートの更新
+            if hasattr(self, 'motion_gate') and 'motion_gate' in new_settings:
+                motion_settings = self.settings['motion_gate']
+                self.motion_gate.thumbnail_size = (motion_settings['thumbnail_width'], motion_settings['thumbnail_height'])
+                self.motion_gate.pixel_threshold = motion_settings['pixel_threshold']
+                self.motion_gate.changed_ratio = motion_settings['changed_ratio']
+                self.motion_gate.max_age_ms = motion_settings['max_age_ms']
+                self.motion_gate.reset()
+            
+            # ROIトラッカーの更新
+            if hasattr(self, 'roi_tracker') and 'roi_tracking' in new_settings:
+                roi_settings = self.settings['roi_tracking']
+                self.roi_tracker.full_scan_interval = max(1, int(roi_settings['full_scan_interval']))
+                self.roi_tracker.expand_ratio = roi_settings['expand_ratio']
+                self.roi_tracker.min_size_ratio = roi_settings['min_size_ratio']
+                self.roi_tracker.min_confidence = roi_settings['min_confidence']
+                self.roi_tracker.reset()
+            
+            # バッチ処理の更新
+            if hasattr(self, 'batch_processor') and 'batch_processing' in new_settings:
+                batch_settings = self.settings['batch_processing']
+                self.batch_processor.batch_size = max(1, int(batch_settings['batch_size']))
+                self.batch_processor.timeout_ms = batch_settings['timeout_ms']
+                self.batch_processor.enabled = batch_settings['enabled']
             
             logger.info("AIOptimizer settings updated successfully")
             
@@ -677,26 +1251,109 @@ class AIOptimizer:
         if not self.settings['frame_skipper']['enabled']:
             return False
         
-        # フレームスキッパーがあればそのロジックを使用
+        # フレームスキッパーがあればそのロジックを使用（フレームごとに 1 回だけ判定）
         if hasattr(self, 'frame_skipper'):
             return not self.frame_skipper.should_process_frame(self.current_fps)
         
         return False
+    
+    def should_run_model(self, name: str) -> bool:
+        """
+        処理するフレームで指定モデルを実行するか（モデル別の実行周期）
+        
+        Args:
+            name: モデル名（'yolo', 'pose', 'hands', 'face'）
+            
+        Returns:
+            bool: 実行するならTrue、前回の出力を再利用するならFalse
+        """
+        if not self.settings['frame_skipper']['enabled'] or not hasattr(self, 'frame_skipper'):
+            return True
+        return self.frame_skipper.should_run_model(name)
+
+    def is_static_frame(self, frame: np.ndarray) -> bool:
+        """
+        前回推論時からフレームが変化していないかを判定（モーションゲート）
+        
+        Args:
+            frame: 入力フレーム（BGR形式）
+            
+        Returns:
+            bool: 静止しており前回結果を再利用できるならTrue
+        """
+        if not self.settings['motion_gate']['enabled'] or not hasattr(self, 'motion_gate'):
+            return False
+        try:
+            return self.motion_gate.is_static(frame)
+        except Exception as e:
+            gate_error = wrap_exception(
+                e, OptimizationError,
+                "Motion gate check failed, running inference",
+                details={'frame_shape': frame.shape if frame is not None else None}
+            )
+            logger.warning(f"Motion gate error: {gate_error.to_dict()}")
+            return False
+
+    def get_tracking_roi(self, frame_shape: Tuple[int, ...]) -> Optional[Tuple[int, int, int, int]]:
+        """
+        ROIトラッキングの推論領域を取得
+        
+        Args:
+            frame_shape: フレーム形状
+            
+        Returns:
+            Optional[Tuple[int, int, int, int]]: (x1, y1, x2, y2)、全体走査・無効時はNone
+        """
+        if not self.settings['roi_tracking']['enabled'] or not hasattr(self, 'roi_tracker'):
+            return None
+        return self.roi_tracker.next_roi(frame_shape)
+
+    def update_tracking_roi(self,
+                            boxes: List[Tuple[int, int, int, int]],
+                            confidence: Optional[float],
+                            frame_shape: Tuple[int, ...]) -> None:
+        """
+        検出結果からROIトラッキングの推論領域を更新
+        
+        Args:
+            boxes: 追従対象のバウンディングボックス（フレーム座標）
+            confidence: 人物検出の信頼度
+            frame_shape: フレーム形状
+        """
+        if self.settings['roi_tracking']['enabled'] and hasattr(self, 'roi_tracker'):
+            self.roi_tracker.update(boxes, confidence, frame_shape)
+
+    def get_carry_over_max_age(self) -> float:
+        """前回結果を再利用できる最大経過時間（秒）"""
+        return self.settings['motion_gate']['max_age_ms'] / 1000.0
 
     def start_inference_timer(self) -> None:
         """
         推論時間計測を開始
+        
+        推論を実行するフレームが確定した時点で呼ばれるため、
+        モーションゲートの比較基準もこのフレームに更新する。
         """
         self.inference_start_time = time.time()
+        if self.settings['motion_gate']['enabled'] and hasattr(self, 'motion_gate'):
+            self.motion_gate.mark_inferred()
         
-    def end_inference_timer(self) -> None:
+    def end_inference_timer(self, start_time: Optional[float] = None) -> None:
         """
         推論時間計測を終了し、統計を更新
+        
+        Args:
+            start_time: 計測開始時刻（複数フレームを並行処理する場合にフレームごとに指定）
         """
-        if hasattr(self, 'inference_start_time'):
-            inference_time = time.time() - self.inference_start_time
+        if start_time is None:
+            start_time = getattr(self, 'inference_start_time', None)
+        if start_time is not None:
+            inference_time = time.time() - start_time
             self.inference_times.append(inference_time)
             self._update_fps_stats()
+            # 処理時間をフレームスキップ制御へフィードバック
+            if self.settings['frame_skipper']['enabled'] and hasattr(self, 'frame_skipper'):
+                self.frame_skipper.record_latency(inference_time * 1000)
             
     def get_performance_metrics(self) -> Dict[str, Any]:
         """
@@ -715,4 +1372,13 @@ class AIOptimizer:
             'cpu_percent': self.system_stats['cpu_percent']
         }
         
+        if self.settings['frame_skipper']['enabled'] and hasattr(self, 'frame_skipper'):
+            metrics['frame_skipper'] = self.frame_skipper.get_stats()
+        if self.settings['motion_gate']['enabled'] and hasattr(self, 'motion_gate'):
+            metrics['motion_gate'] = self.motion_gate.get_stats()
+        if self.settings['roi_tracking']['enabled'] and hasattr(self, 'roi_tracker'):
+            metrics['roi_tracking'] = self.roi_tracker.get_stats()
+        if self.settings['batch_processing']['enabled'] and hasattr(self, 'batch_processor'):
+            metrics['batch_processing'] = self.batch_processor.get_stats()
+        
         return metrics 
\ No newline at end of file
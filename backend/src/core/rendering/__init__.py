@@ -5,7 +5,10 @@ Rendering Module - 描画関連モジュール
 """
 
 from .detection_renderer import DetectionRenderer
+from .text_overlay import TextOverlayCache, TextSprite
 
 __all__ = [
     'DetectionRenderer',
+    'TextOverlayCache',
+    'TextSprite',
 ]
@@ -2,13 +2,16 @@
 描画モジュール
 
 MediaPipe ランドマーク、YOLO バウンディングボックス、ステータス情報の
-描画を行います。
+描画を行います。オーバーレイキャッシュ有効時は、描画内容（ボックス座標・ラベル・
+ランドマークのピクセル位置）が前フレームと同じであれば、ラスタライズ済みの
+RGBA レイヤーを合成するだけで描画を済ませます。
 """
 
+import threading
 import cv2
 import mediapipe as mp
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from utils.logger import setup_logger
 from utils.config_manager import ConfigManager
 from utils.exceptions import (
@@ -18,6 +21,10 @@ from utils.exceptions import (
 
 logger = setup_logger(__name__)
 
+# mediapipe.solutions.drawing_utils がランドマークを描画しない visibility / presence の閾値
+LANDMARK_VISIBILITY_THRESHOLD = 0.5
+LANDMARK_PRESENCE_THRESHOLD = 0.5
+
 
 class DetectionRenderer:
     """
@@ -25,6 +32,7 @@ class DetectionRenderer:
     - ランドマーク描画（MediaPipe）
     - バウンディングボックス描画（YOLO）
     - ステータス情報描画
+    - オーバーレイキャッシュ（オプトイン）: 描画状態のキーが変わった時だけ RGBA レイヤーを再生成
     """
     
     def __init__(self, 
@@ -54,7 +62,17 @@ class DetectionRenderer:
         if self.use_mediapipe:
             self._setup_mediapipe_drawing()
         
-        logger.info(f"DetectionRenderer initialized (MediaPipe: {use_mediapipe}, YOLO: {use_yolo})")
+        # オーバーレイキャッシュ（描画状態キー → ラスタライズ済みレイヤー）
+        self.overlay_cache_enabled = bool(
+            config_manager.get('optimization.overlay_cache.enabled', False) if config_manager else False
+        )
+        self._overlay_lock = threading.Lock()
+        self._overlay_key = None
+        self._overlay_layer: Optional[Tuple[int, int, np.ndarray, np.ndarray]] = None
+        self.overlay_cache_stats = {'hits': 0, 'misses': 0, 'uncacheable': 0}
+        
+        logger.info(f"DetectionRenderer initialized (MediaPipe: {use_mediapipe}, YOLO: {use_yolo}, "
+                    f"overlay_cache: {self.overlay_cache_enabled})")
 
     def _setup_mediapipe_drawing(self) -> None:
         """MediaPipe描画コンポーネントの初期化"""
@@ -99,19 +117,10 @@ class DetectionRenderer:
                         f"face={results.get('face_landmarks') is not None}")
             logger.debug(f"[DEBUG] Detections available: {list(results.get('detections', {}).keys())}")
             
-            # ランドマーク描画（MediaPipe）
-            if self.use_mediapipe:
-                self._draw_landmarks(frame, results)
-            
-            # 人物検出状態の表示
-            # self._draw_person_status(frame, results)
-            
-            # 物体検出描画（YOLO）
-            if self.use_yolo:
-                self._draw_object_detections(frame, results)
-            
-            # ステータス情報描画
-            # self._draw_status_info(frame, results)
+            if self.overlay_cache_enabled:
+                self._draw_cached_overlay(frame, results)
+            else:
+                self._draw_overlay(frame, results)
             
             return frame
             
@@ -129,6 +138,177 @@ class DetectionRenderer:
             logger.error(f"Detection drawing error: {render_error.to_dict()}")
             return frame
 
+    def _draw_overlay(self, frame: np.ndarray, results: Dict[str, Any]) -> None:
+        """
+        オーバーレイ（ランドマーク・バウンディングボックス）をフレームへ直接描画
+        
+        Args:
+            frame: 描画対象フレーム
+            results: 検出結果
+        """
+        # ランドマーク描画（MediaPipe）
+        if self.use_mediapipe:
+            self._draw_landmarks(frame, results)
+        
+        # 人物検出状態の表示
+        # self._draw_person_status(frame, results)
+        
+        # 物体検出描画（YOLO）
+        if self.use_yolo:
+            self._draw_object_detections(frame, results)
+        
+        # ステータス情報描画
+        # self._draw_status_info(frame, results)
+
+    def _draw_cached_overlay(self, frame: np.ndarray, results: Dict[str, Any]) -> None:
+        """
+        キャッシュ済みのオーバーレイレイヤーを合成する（描画状態が変わった場合のみ再ラスタライズ）
+        
+        Args:
+            frame: 描画対象フレーム
+            results: 検出結果
+        """
+        key = self._overlay_state_key(frame.shape, results)
+        if key is None:
+            # キー化できない描画状態（未知のランドマーク形式など）は毎回直接描画する
+            self.overlay_cache_stats['uncacheable'] += 1
+            self._draw_overlay(frame, results)
+            return
+
+        with self._overlay_lock:
+            if key == self._overlay_key:
+                self.overlay_cache_stats['hits'] += 1
+            else:
+                self.overlay_cache_stats['misses'] += 1
+                self._overlay_layer = self._rasterize_overlay(frame.shape, results)
+                self._overlay_key = key
+            layer = self._overlay_layer
+
+        if layer is not None:
+            top, left, bgra, mask = layer
+            height, width = mask.shape
+            np.copyto(frame[top:top + height, left:left + width], bgra[:, :, :3], where=mask[:, :, None])
+
+    def _rasterize_overlay(self, frame_shape: Tuple[int, ...],
+                           results: Dict[str, Any]) -> Optional[Tuple[int, int, np.ndarray, np.ndarray]]:
+        """
+        オーバーレイを RGBA（BGRA）レイヤーへラスタライズする
+        
+        黒・白のキャンバスそれぞれへ描画し、どちらかで値が変わった画素を描画画素とする
+        （描画色に 0 や 255 の成分が含まれても漏れなく抽出するため）。
+        レイヤーは描画画素を囲む矩形に切り詰めて保持する。
+        
+        Args:
+            frame_shape: フレーム形状
+            results: 検出結果
+            
+        Returns:
+            Optional[Tuple[int, int, np.ndarray, np.ndarray]]: (上端, 左端, BGRA レイヤー, 描画マスク)。
+                描画対象が無い場合はNone
+        """
+        dark = np.zeros(frame_shape, dtype=np.uint8)
+        light = np.full(frame_shape, 255, dtype=np.uint8)
+        self._draw_overlay(dark, results)
+        self._draw_overlay(light, results)
+
+        mask = (dark != 0).any(axis=2) | (light != 255).any(axis=2)
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        if rows.size == 0:
+            return None
+
+        top, bottom, left, right = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+        mask = np.ascontiguousarray(mask[top:bottom, left:right])
+        bgra = np.dstack([dark[top:bottom, left:right], mask.astype(np.uint8) * 255])
+        return int(top), int(left), bgra, mask
+
+    def _overlay_state_key(self, frame_shape: Tuple[int, ...], results: Dict[str, Any]) -> Optional[tuple]:
+        """
+        描画内容を決める状態からキャッシュキーを作成する
+        
+        Args:
+            frame_shape: フレーム形状
+            results: 検出結果
+            
+        Returns:
+            Optional[tuple]: キャッシュキー。キー化できない場合はNone
+        """
+        frame_height, frame_width = frame_shape[:2]
+        key = [tuple(frame_shape)]
+
+        if self.use_mediapipe and hasattr(self, 'mp_drawing'):
+            for name in ('pose', 'hands', 'face'):
+                landmarks = results.get(f'{name}_landmarks')
+                if not landmarks or not self.landmark_settings.get(name, {}).get('enabled', False):
+                    key.append(None)
+                    continue
+                points = self._quantize_landmarks(landmarks, frame_width, frame_height)
+                if points is None:
+                    return None
+                key.append(points)
+
+        if self.use_yolo:
+            for obj_key, detections in sorted(results.get('detections', {}).items()):
+                if obj_key == 'person' or not self.detection_objects.get(obj_key):
+                    continue
+                for det in detections:
+                    bbox = det.get('bbox')
+                    if not isinstance(bbox, (list, tuple)) or len(bbox) != 4:
+                        continue
+                    try:
+                        box = tuple(map(int, bbox))
+                    except (ValueError, TypeError):
+                        continue
+                    key.append((
+                        obj_key, box,
+                        f"{det.get('confidence', 0.0):.2f}",
+                        bool(det.get('smoothed', False)),
+                        bool(det.get('interpolated', False)),
+                        det.get('frames_interpolated', 0),
+                    ))
+        return tuple(key)
+
+    @staticmethod
+    def _quantize_landmarks(landmarks: Any, frame_width: int, frame_height: int) -> Optional[bytes]:
+        """
+        ランドマーク（単体またはリスト）をピクセル座標と描画有無へ量子化したバイト列に変換する
+        
+        描画有無は drawing_utils と同じく visibility / presence が閾値未満の点を描画しないものとする
+        （同じ位置でも可視性が変われば描画内容が変わるため）。
+        
+        Returns:
+            Optional[bytes]: 量子化した (x, y, 描画有無) 列。未知の形式の場合はNone
+        """
+        landmark_lists = landmarks if isinstance(landmarks, (list, tuple)) else [landmarks]
+        points = []
+        for landmark_list in landmark_lists:
+            if not hasattr(landmark_list, 'landmark'):
+                return None
+            points.extend((lm.x, lm.y, DetectionRenderer._is_landmark_drawn(lm)) for lm in landmark_list.landmark)
+            # 複数の手・顔の境界を区別する
+            points.append((-1.0, -1.0, 0.0))
+        coords = np.asarray(points, dtype=np.float32) * np.float32((frame_width, frame_height, 1))
+        return np.rint(coords).astype(np.int32).tobytes()
+
+    @staticmethod
+    def _is_landmark_drawn(landmark: Any) -> float:
+        """drawing_utils.draw_landmarks がこのランドマークを描画するか（1.0 / 0.0）"""
+        has_field = getattr(landmark, 'HasField', None)
+        for name, threshold in (('visibility', LANDMARK_VISIBILITY_THRESHOLD),
+                                ('presence', LANDMARK_PRESENCE_THRESHOLD)):
+            if has_field is not None:
+                if has_field(name) and getattr(landmark, name) < threshold:
+                    return 0.0
+            elif getattr(landmark, name, None) is not None and getattr(landmark, name) < threshold:
+                return 0.0
+        return 1.0
+
+    def invalidate_overlay_cache(self) -> None:
+        """オーバーレイキャッシュを破棄する（描画設定の変更時）"""
+        with self._overlay_lock:
+            self._overlay_key = None
+            self._overlay_layer = None
+
     def _draw_landmarks(self, frame: np.ndarray, results: Dict[str, Any]) -> None:
         """
         ランドマーク描画処理
@@ -354,17 +534,41 @@ class DetectionRenderer:
             thickness: 線の太さ
             dash_length: 点線の長さ
         """
+        segments = self._dashed_rectangle_segments(pt1, pt2, dash_length)
+        if len(segments):
+            # 全ての破線を 1 回の polylines 呼び出しでまとめて描画
+            cv2.polylines(frame, list(segments), False, color, thickness)
+
+    @staticmethod
+    def _dashed_rectangle_segments(pt1: tuple, pt2: tuple, dash_length: int = 10) -> np.ndarray:
+        """
+        点線矩形の破線区間をまとめて計算する（_draw_dashed_line と同じ区切り方）
+        
+        Args:
+            pt1: 矩形の左上角
+            pt2: 矩形の右下角
+            dash_length: 点線の長さ
+            
+        Returns:
+            np.ndarray: (N, 2, 2) の int32 配列（各破線の始点・終点）
+        """
         x1, y1 = pt1
         x2, y2 = pt2
-        
-        # 上辺
-        self._draw_dashed_line(frame, (x1, y1), (x2, y1), color, thickness, dash_length)
-        # 右辺
-        self._draw_dashed_line(frame, (x2, y1), (x2, y2), color, thickness, dash_length)
-        # 下辺
-        self._draw_dashed_line(frame, (x2, y2), (x1, y2), color, thickness, dash_length)
-        # 左辺
-        self._draw_dashed_line(frame, (x1, y2), (x1, y1), color, thickness, dash_length)
+        # 上辺 → 右辺 → 下辺 → 左辺
+        corners = np.array([(x1, y1), (x2, y1), (x2, y2), (x1, y2), (x1, y1)], dtype=np.float64)
+        segments = []
+        for start, end in zip(corners[:-1], corners[1:]):
+            length = float(np.hypot(*(end - start)))
+            if length == 0:
+                continue
+            unit = (end - start) / length
+            offsets = np.arange(0.0, length, 2 * dash_length)
+            ends = np.minimum(offsets + dash_length, length)
+            segments.append(np.stack([start + offsets[:, None] * unit,
+                                      start + ends[:, None] * unit], axis=1).astype(np.int32))
+        if not segments:
+            return np.empty((0, 2, 2), dtype=np.int32)
+        return np.concatenate(segments)
         
     def _draw_dashed_line(self, frame: np.ndarray, pt1: tuple, pt2: tuple, color: tuple, thickness: int, dash_length: int = 10) -> None:
         """
@@ -480,6 +684,7 @@ class DetectionRenderer:
         if self.config_manager:
             self.landmark_settings = self.config_manager.get_landmark_settings()
             self.detection_objects = self.config_manager.get_detection_objects()
+        self.invalidate_overlay_cache()
         
         logger.info(f"Renderer settings updated (MediaPipe: {self.use_mediapipe}, YOLO: {self.use_yolo})")
 
@@ -495,5 +700,6 @@ class DetectionRenderer:
             'use_yolo': self.use_yolo,
             'has_mediapipe_drawing': hasattr(self, 'mp_drawing'),
             'landmark_settings': self.landmark_settings,
-            'detection_objects': self.detection_objects
+            'detection_objects': self.detection_objects,
+            'overlay_cache': dict(self.overlay_cache_stats, enabled=self.overlay_cache_enabled)
         } 
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""
+テキストオーバーレイモジュール
+
+日本語のステータス文字列を BGR フレームへ描画します。フォントはサイズごとに 1 回だけ
+読み込み、文字列ごとに小さな RGBA スプライトへ事前描画して (文字列, サイズ, 色) で
+LRU キャッシュします。描画時はスプライトの範囲だけを numpy 上でアルファ合成するため、
+フレーム全体の BGR→RGB→PIL→numpy→BGR 変換を行いません。
+"""
+
+import os
+import platform
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def find_system_font() -> str:
+    """
+    OSに応じた日本語表示用フォントのパスを返す
+
+    Returns:
+        str: 見つかったフォントのパス（見つからない場合は候補の先頭、取得失敗時は空文字）
+    """
+    system = platform.system()
+    try:
+        if system == "Windows":
+            font_paths = [
+                "C:\\Windows\\Fonts\\msgothic.ttc",  # MSゴシック
+                "C:\\Windows\\Fonts\\meiryo.ttc",    # メイリオ
+                "C:\\Windows\\Fonts\\arial.ttf"      # Arial
+            ]
+        elif system == "Darwin":  # macOS
+            font_paths = [
+                "/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc",
+                "/System/Library/Fonts/Arial.ttf",
+                "/System/Library/Fonts/Helvetica.ttc"
+            ]
+        else:  # Linux
+            font_paths = [
+                "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+                "/usr/share/fonts/TTF/arial.ttf"
+            ]
+
+        # 利用可能なフォントを検索
+        for font_path in font_paths:
+            if os.path.exists(font_path):
+                return font_path
+
+        # フォールバック: デフォルトフォント用のパス
+        return font_paths[0] if font_paths else ""
+
+    except Exception as e:
+        logger.warning(f"システムフォント取得中にエラー: {e}")
+        return ""
+
+
+@dataclass(frozen=True)
+class TextSprite:
+    """
+    事前描画済みの文字列スプライト
+
+    premultiplied は色×アルファ、inverse_alpha は 255 − アルファ（いずれも uint16）で、
+    合成は (背景 × inverse_alpha + premultiplied) / 255 の整数演算のみで行う。
+    offset は描画基準点からスプライト左上までのずれ（PIL の draw.text と同じ位置に置くため）。
+    """
+    premultiplied: np.ndarray
+    inverse_alpha: np.ndarray
+    offset: Tuple[int, int]
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """(幅, 高さ)"""
+        return self.inverse_alpha.shape[1], self.inverse_alpha.shape[0]
+
+
+class TextOverlayCache:
+    """
+    文字列スプライトの LRU キャッシュ
+    - フォントはサイズごとに 1 回だけ読み込む（フォントファイルの探索も初回のみ）
+    - スプライトは (文字列, サイズ, 色) をキーに max_sprites 件まで保持
+    - draw_text(): スプライトの範囲だけを BGR フレームへアルファ合成（フレームはその場で書き換え）
+    """
+
+    def __init__(self, font_path: Optional[str] = None, max_sprites: int = 64):
+        """
+        Args:
+            font_path: フォントファイルのパス（None の場合はシステムフォントを探索）
+            max_sprites: 保持するスプライト数の上限
+        """
+        self._font_path = font_path
+        self.max_sprites = max(1, int(max_sprites))
+        self._lock = threading.Lock()
+        self._fonts: Dict[int, Any] = {}
+        self._sprites: "OrderedDict[Tuple[str, int, Tuple[int, int, int]], Optional[TextSprite]]" = OrderedDict()
+
+        # 統計
+        self.hit_count = 0
+        self.miss_count = 0
+        self.eviction_count = 0
+
+    def _get_font(self, size: int) -> Any:
+        """サイズに対応するフォントを取得（初回のみ読み込み）"""
+        font = self._fonts.get(size)
+        if font is None:
+            if self._font_path is None:
+                self._font_path = find_system_font()
+            try:
+                font = ImageFont.truetype(self._font_path, size)
+            except Exception:
+                logger.warning(f"Font '{self._font_path}' unavailable; using PIL default font")
+                font = ImageFont.load_default()  # デフォルトフォント
+            self._fonts[size] = font
+        return font
+
+    def _render_sprite(self, text: str, size: int, color: Tuple[int, int, int]) -> Optional[TextSprite]:
+        """
+        文字列を RGBA 画像へ描画してスプライトを作成する
+
+        Args:
+            text: 描画する文字列
+            size: フォントサイズ
+            color: 文字色（BGR）
+
+        Returns:
+            Optional[TextSprite]: スプライト。描画範囲が空の場合はNone
+        """
+        font = self._get_font(size)
+        left, top, right, bottom = font.getbbox(text)
+        width, height = right - left, bottom - top
+        if width <= 0 or height <= 0:
+            return None
+
+        image = Image.new('L', (width, height), 0)
+        ImageDraw.Draw(image).text((-left, -top), text, font=font, fill=255)
+        alpha = np.asarray(image, dtype=np.uint16)[:, :, None]
+        bgr = np.array(color, dtype=np.uint16).reshape(1, 1, 3)
+        return TextSprite(
+            premultiplied=np.ascontiguousarray(bgr * alpha),
+            inverse_alpha=np.ascontiguousarray(255 - alpha),
+            offset=(int(left), int(top))
+        )
+
+    def get_sprite(self, text: str, size: int = 32,
+                   color: Tuple[int, int, int] = (0, 0, 255)) -> Optional[TextSprite]:
+        """
+        文字列のスプライトを取得する（キャッシュに無い場合のみ描画）
+
+        Args:
+            text: 描画する文字列
+            size: フォントサイズ
+            color: 文字色（BGR）
+
+        Returns:
+            Optional[TextSprite]: スプライト。描画範囲が空の場合はNone
+        """
+        key = (text, int(size), tuple(int(c) for c in color))
+        with self._lock:
+            if key in self._sprites:
+                self._sprites.move_to_end(key)
+                self.hit_count += 1
+                return self._sprites[key]
+
+            self.miss_count += 1
+            sprite = self._render_sprite(text, key[1], key[2])
+            self._sprites[key] = sprite
+            while len(self._sprites) > self.max_sprites:
+                self._sprites.popitem(last=False)
+                self.eviction_count += 1
+            return sprite
+
+    def draw_text(self, frame: np.ndarray, text: str, position: Tuple[int, int],
+                  size: int = 32, color: Tuple[int, int, int] = (0, 0, 255)) -> np.ndarray:
+        """
+        BGR フレームへ文字列を描画する（PIL の draw.text と同じ基準点）
+
+        Args:
+            frame: 描画対象の BGR フレーム（その場で書き換える）
+            text: 描画する文字列
+            position: 描画基準点 (x, y)
+            size: フォントサイズ
+            color: 文字色（BGR）
+
+        Returns:
+            np.ndarray: 描画済みフレーム（frame と同一）
+        """
+        sprite = self.get_sprite(text, size, color)
+        if sprite is None:
+            return frame
+
+        width, height = sprite.size
+        x = position[0] + sprite.offset[0]
+        y = position[1] + sprite.offset[1]
+        # フレーム外にはみ出す部分を切り詰める
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, frame.shape[1]), min(y + height, frame.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return frame
+
+        sprite_region = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+        roi = frame[y0:y1, x0:x1]
+        # 背景 × (255 − α) + 色 × α は最大 255 × 255 のため uint16 に収まる
+        blended = roi.astype(np.uint16)
+        blended *= sprite.inverse_alpha[sprite_region]
+        blended += sprite.premultiplied[sprite_region]
+        blended += 127
+        blended //= 255
+        roi[:] = blended
+        return frame
+
+    def clear(self) -> None:
+        """スプライトとフォントのキャッシュを破棄する"""
+        with self._lock:
+            self._sprites.clear()
+            self._fonts.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """キャッシュ統計を取得"""
+        with self._lock:
+            total = self.hit_count + self.miss_count
+            return {
+                'font_path': self._font_path,
+                'loaded_font_sizes': sorted(self._fonts),
+                'sprites': len(self._sprites),
+                'max_sprites': self.max_sprites,
+                'hits': self.hit_count,
+                'misses': self.miss_count,
+                'evictions': self.eviction_count,
+                'hit_ratio': self.hit_count / total if total else 0.0,
+            }
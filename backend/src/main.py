@@ -1,12 +1,25 @@
-import threading
-import time
 import sys
 import os
+
+# 協調型サーバーモード（--server-mode eventlet / gevent）のモンキーパッチは
+# socket を使うモジュールより先に適用する
+from web.server_mode import resolve_server_mode, prepare_server_mode, SERVER_MODE_THREADING
+from utils.exceptions import ConfigError
+
+try:
+    SERVER_MODE = prepare_server_mode(resolve_server_mode(sys.argv[1:]))
+except ConfigError as e:
+    print(f"Invalid server mode: {e}", file=sys.stderr)
+    sys.exit(2)
+
+import threading
+import time
 from datetime import datetime
 from flask import current_app
 from web.app import create_app # create_app をインポート
 from core.monitoring import Monitor
 from core.monitoring import Camera
+from core.monitoring import FrameBus
 from core.detection import Detector, DetectionManager
 from core.management import StateManager
 from services.communication.alert_manager import AlertManager
@@ -18,7 +31,6 @@ from services.data.storage_service import StorageService
 from services.analysis.behavior_analyzer import BehaviorAnalyzer
 from utils.config_manager import ConfigManager
 from utils.logger import setup_logger
-from utils.exceptions import ConfigError
 from models import init_db
 import faulthandler
 
@@ -40,7 +52,8 @@ def run_periodic_analysis(app_instance):
                 if analyzer:
                     # 最近1時間のログを取得
                     from models.behavior_log import BehaviorLog
-                    recent_logs = BehaviorLog.get_recent_logs(hours=1)
+                    from services.analysis.behavior_analyzer import ANALYSIS_COLUMNS
+                    recent_logs = BehaviorLog.get_recent_columns(ANALYSIS_COLUMNS, hours=1).rows()
                     
                     if recent_logs and len(recent_logs) > 5:
                         # インサイト生成
@@ -155,13 +168,17 @@ if __name__ == '__main__':
         schedule_manager = ScheduleManager(config_manager)
         app_logger.info("ScheduleManager を初期化しました。")
 
+        # 検出結果の配信バス（Monitor が publish し、DataCollector 等が購読）
+        frame_bus = FrameBus()
+
         app_logger.info("DataCollector を初期化しています...")
         data_collector = DataCollector(
             camera=camera,
             detector=detector,
             state_manager=state,
             collection_interval=2.0,  # 2秒間隔
-            flask_app=app
+            flask_app=app,
+            frame_bus=frame_bus
         )
         
         # StorageService の初期化
@@ -183,7 +200,8 @@ if __name__ == '__main__':
             schedule_manager=schedule_manager,  # ScheduleManager を追加
             data_collector=data_collector,     
             storage_service=storage_service,   
-            flask_app=app                      
+            flask_app=app,
+            frame_bus=frame_bus
         )
         app_logger.info("Monitor インスタンスを作成しました。")
 
@@ -212,7 +230,12 @@ if __name__ == '__main__':
         # macOSでのOpenCV UIとSocketIOの相性問題を避けるため、環境変数でヘッドレス起動を許容
         # ヘッドレス時はフレーム表示を行わない
         os.environ.setdefault('KANSHICHAN_HEADLESS', '1')
-        socketio.run(app, host='0.0.0.0', port=port, debug=False, use_reloader=False, allow_unsafe_werkzeug=True)
+        run_options = {}
+        if SERVER_MODE == SERVER_MODE_THREADING:
+            # Werkzeug のスレッドサーバー（接続ごとに OS スレッドを占有）
+            run_options['allow_unsafe_werkzeug'] = True
+        app_logger.info(f"サーバーモード: {SERVER_MODE}")
+        socketio.run(app, host='0.0.0.0', port=port, debug=False, use_reloader=False, **run_options)
 
     except Exception as e:
         # アプリケーション開始前のエラーの場合はsetup_loggerを直接使用
@@ -145,9 +145,12 @@ def init_db(app):
         app: Flask アプリケーションインスタンス
     """
     db.init_app(app)
+    # SQLite の PRAGMA（WAL 等）を最初の接続より前に登録し、書き込み専用スレッドを起動
+    from .storage_engine import configure_storage_engine
+    configure_storage_engine(app, db)
     
     # モデルのインポート（循環インポート回避のため）
-    from . import behavior_log, analysis_result, user_profile, detection_log, detection_summary
+    from . import behavior_log, behavior_rollup, analysis_result, user_profile, detection_log, detection_summary
     # 設定用モデル（configバインド）
     try:
         from . import config_models  # noqa: F401
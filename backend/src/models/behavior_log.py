@@ -5,9 +5,10 @@ Behavior Log Model
 """
 
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 from sqlalchemy import Column, String, DateTime, Float, JSON, Text, Boolean, Index
 from .base_model import BaseModel
+from .log_columns import LogColumns, project_columns
 
 
 class BehaviorLog(BaseModel):
@@ -194,8 +195,31 @@ class BehaviorLog(BaseModel):
         Returns:
             List[BehaviorLog]: ログエントリのリスト
         """
+        return cls._recent_query(hours, user_id, session_id).all()
+    
+    @classmethod
+    def get_recent_columns(cls,
+                           columns: Iterable[str],
+                           hours: float = 24,
+                           user_id: Optional[str] = None,
+                           session_id: Optional[str] = None) -> LogColumns:
+        """最近のログを指定列だけの列指向データで取得（get_recent_logs と同じ条件・新しい順）
+        
+        Args:
+            columns: 取得する列名
+            hours: 取得する時間範囲（時間）
+            user_id: ユーザーID（オプション）
+            session_id: 特定のセッションのみ取得
+            
+        Returns:
+            LogColumns: 列ごとの numpy 配列
+        """
+        return project_columns(cls, cls._recent_query(hours, user_id, session_id), columns)
+    
+    @classmethod
+    def _recent_query(cls, hours: float, user_id: Optional[str], session_id: Optional[str]):
+        """get_recent_logs / get_recent_columns の共通クエリ"""
         from datetime import timedelta
-        from . import db
         
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         query = cls.query.filter(cls.timestamp >= cutoff_time)
@@ -206,7 +230,7 @@ class BehaviorLog(BaseModel):
         if session_id:
             query = query.filter(cls.session_id == session_id)
         
-        return query.order_by(cls.timestamp.desc()).all()
+        return query.order_by(cls.timestamp.desc())
     
     @classmethod
     def get_focus_statistics(cls, 
@@ -258,8 +282,72 @@ class BehaviorLog(BaseModel):
         Returns:
             List[BehaviorLog]: ログエントリのリスト
         """
-        from . import db
+        return cls._timerange_query(start_time, end_time, user_id).all()
+    
+    @classmethod
+    def get_columns_by_timerange(cls,
+                                 columns: Iterable[str],
+                                 start_time: datetime,
+                                 end_time: datetime,
+                                 user_id: Optional[str] = None) -> LogColumns:
+        """時間範囲のログを指定列だけの列指向データで取得（get_logs_by_timerange と同じ条件・新しい順）
         
+        Args:
+            columns: 取得する列名
+            start_time: 開始時刻
+            end_time: 終了時刻
+            user_id: ユーザーID（オプション）
+            
+        Returns:
+            LogColumns: 列ごとの numpy 配列
+        """
+        return project_columns(cls, cls._timerange_query(start_time, end_time, user_id), columns)
+    
+    @classmethod
+    def iter_column_pages(cls,
+                          columns: Iterable[str],
+                          start_time: datetime,
+                          end_time: datetime,
+                          user_id: Optional[str] = None,
+                          page_size: int = 1000) -> Iterator[LogColumns]:
+        """時間範囲のログを (timestamp, id) のキーセットページングで列指向データとして順に取得（新しい順）
+        
+        各ページは前ページ末尾の (timestamp, id) より古い行を LIMIT 付きで取得するため、
+        OFFSET と異なり後半のページでも読み飛ばしが発生しない。
+        
+        Args:
+            columns: 取得する列名（timestamp と id は常に含まれる）
+            start_time: 開始時刻
+            end_time: 終了時刻
+            user_id: ユーザーID（オプション）
+            page_size: 1 ページの行数
+            
+        Yields:
+            LogColumns: 1 ページ分の列ごとの numpy 配列
+        """
+        from sqlalchemy import and_, or_
+        
+        names = list(dict.fromkeys(['timestamp', 'id', *columns]))
+        page_size = max(1, int(page_size))
+        cursor: Optional[Tuple[datetime, int]] = None
+        while True:
+            query = cls._timerange_query(start_time, end_time, user_id).order_by(None)
+            if cursor is not None:
+                query = query.filter(or_(
+                    cls.timestamp < cursor[0],
+                    and_(cls.timestamp == cursor[0], cls.id < cursor[1])
+                ))
+            page = project_columns(cls, query.order_by(cls.timestamp.desc(), cls.id.desc()).limit(page_size), names)
+            if not len(page):
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            cursor = (page.datetime_at('timestamp', -1), int(page['id'][-1]))
+    
+    @classmethod
+    def _timerange_query(cls, start_time: datetime, end_time: datetime, user_id: Optional[str]):
+        """get_logs_by_timerange / get_columns_by_timerange の共通クエリ"""
         query = cls.query.filter(
             cls.timestamp.between(start_time, end_time)
         )
@@ -269,7 +357,7 @@ class BehaviorLog(BaseModel):
             # 現在は session_id でフィルタする仮実装
             query = query.filter(cls.session_id == user_id)
         
-        return query.order_by(cls.timestamp.desc()).all()
+        return query.order_by(cls.timestamp.desc())
     
     @classmethod
     def get_logs_with_pagination(cls,
@@ -416,7 +504,7 @@ class BehaviorLog(BaseModel):
     
     @classmethod
     def cleanup_old_data(cls, days_to_keep: int = 90) -> int:
-        """古いデータのクリーンアップ
+        """古いデータのクリーンアップ（ライタースレッドで削除し、完了を待つ）
         
         Args:
             days_to_keep: 保持する日数
@@ -425,15 +513,31 @@ class BehaviorLog(BaseModel):
             int: 削除されたレコード数
         """
         from datetime import timedelta
-        from . import db
+        from .storage_engine import submit_write
         
         cutoff_time = datetime.utcnow() - timedelta(days=days_to_keep)
         
         # 古いレコードを削除
-        deleted_count = db.session.query(cls).filter(
-            cls.timestamp < cutoff_time
-        ).delete(synchronize_session=False)
+        return submit_write(
+            lambda session: cls.delete_with_rollups(session, cls.timestamp < cutoff_time),
+            description='cleanup old behavior logs'
+        ).result()
+    
+    @classmethod
+    def delete_with_rollups(cls, session: Any, log_filter: Any) -> int:
+        """条件に合うログを削除し、削除したログを含む日の集計を作り直す（書き込みジョブ用）
         
-        db.session.commit()
+        Args:
+            session: 書き込みに使う Session（submit_write のジョブに渡される Session）
+            log_filter: 削除対象の条件式
+            
+        Returns:
+            int: 削除されたレコード数
+        """
+        from .behavior_rollup import BehaviorRollup
         
+        deleted_range = BehaviorRollup.log_time_range(session, log_filter)
+        deleted_count = session.query(cls).filter(log_filter).delete(synchronize_session=False)
+        if deleted_range is not None:
+            BehaviorRollup.rebuild(session, since=deleted_range[0], until=deleted_range[1])
         return deleted_count 
\ No newline at end of file
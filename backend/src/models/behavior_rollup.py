@@ -0,0 +1,378 @@
+"""
+Behavior Rollup Model
+
+行動ログの時間バケット集計（分・時・日）モデル - 統計系ルートは behavior_logs を走査せずにこの集計を読む
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, and_, func, or_
+
+from .base_model import BaseModel
+
+# 集計の粒度（細かい順）
+ROLLUP_GRANULARITIES = ('minute', 'hour', 'day')
+
+# 姿勢アラートとみなす posture_data['score'] の閾値
+POSTURE_ALERT_THRESHOLD = 0.6
+
+# 加算で合成する集計値
+_SUM_FIELDS = ('entry_count', 'focus_count', 'focus_sum', 'smartphone_count', 'presence_count', 'posture_alerts')
+# 最小値・最大値で合成する集計値（None は「値なし」）
+_MIN_FIELDS = ('focus_min', 'first_timestamp')
+_MAX_FIELDS = ('focus_max', 'last_timestamp')
+
+BucketKey = Tuple[str, datetime]
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """タイムスタンプが属するバケットの開始時刻
+
+    Args:
+        timestamp: 行動ログのタイムスタンプ（保存値そのまま）
+        granularity: 'minute' / 'hour' / 'day'
+
+    Returns:
+        datetime: バケットの開始時刻
+    """
+    if granularity == 'minute':
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def is_posture_alert(posture_data: Optional[Dict[str, Any]]) -> bool:
+    """姿勢データが姿勢アラート（score が閾値未満）に当たるか
+
+    Args:
+        posture_data: BehaviorLog.posture_data
+
+    Returns:
+        bool: アラート対象の場合True
+    """
+    if not posture_data or not isinstance(posture_data, dict):
+        return False
+    return posture_data.get('score', 1.0) < POSTURE_ALERT_THRESHOLD
+
+
+def _merge_values(target: Dict[str, Any], delta: Dict[str, Any]) -> None:
+    """集計値 delta を target へ合成する（target をその場で更新）"""
+    for name in _SUM_FIELDS:
+        target[name] = (target.get(name) or 0) + (delta.get(name) or 0)
+    for names, pick in ((_MIN_FIELDS, min), (_MAX_FIELDS, max)):
+        for name in names:
+            values = [v for v in (target.get(name), delta.get(name)) if v is not None]
+            target[name] = pick(values) if values else None
+
+
+def _row_values(row: Dict[str, Any]) -> Dict[str, Any]:
+    """行動ログ 1 行分の集計値"""
+    timestamp = row['timestamp']
+    focus_level = row.get('focus_level')
+    return {
+        'entry_count': 1,
+        'focus_count': 0 if focus_level is None else 1,
+        'focus_sum': focus_level or 0.0,
+        'focus_min': focus_level,
+        'focus_max': focus_level,
+        'smartphone_count': 1 if row.get('smartphone_detected') else 0,
+        'presence_count': 1 if row.get('presence_status') == 'present' else 0,
+        'posture_alerts': 1 if is_posture_alert(row.get('posture_data')) else 0,
+        'first_timestamp': timestamp,
+        'last_timestamp': timestamp,
+    }
+
+
+class BehaviorRollup(BaseModel):
+    """行動ログ集計モデル
+
+    (粒度, バケット開始時刻) ごとに以下を保持し、行動ログの一括挿入と同じ
+    トランザクションで加算更新（UPSERT）する
+    - エントリ数・集中度の件数/合計/最小/最大
+    - スマートフォン検出数・在席数・姿勢アラート数
+    - バケット内の最初と最後のタイムスタンプ
+    """
+
+    __tablename__ = 'behavior_rollups'
+
+    granularity = Column(String(10), nullable=False, comment="集計粒度 (minute/hour/day)")
+    bucket_start = Column(DateTime, nullable=False, comment="バケット開始時刻")
+
+    entry_count = Column(Integer, nullable=False, default=0, comment="行動ログ数")
+    focus_count = Column(Integer, nullable=False, default=0, comment="集中度が記録されたログ数")
+    focus_sum = Column(Float, nullable=False, default=0.0, comment="集中度の合計")
+    focus_min = Column(Float, nullable=True, comment="集中度の最小値")
+    focus_max = Column(Float, nullable=True, comment="集中度の最大値")
+    smartphone_count = Column(Integer, nullable=False, default=0, comment="スマートフォン検出数")
+    presence_count = Column(Integer, nullable=False, default=0, comment="在席 (present) 数")
+    posture_alerts = Column(Integer, nullable=False, default=0, comment="姿勢アラート数")
+    first_timestamp = Column(DateTime, nullable=True, comment="バケット内の最初のログ時刻")
+    last_timestamp = Column(DateTime, nullable=True, comment="バケット内の最後のログ時刻")
+
+    __table_args__ = (
+        Index('uq_rollup_bucket', 'granularity', 'bucket_start', unique=True),
+    )
+
+    @staticmethod
+    def accumulate(rows: Iterable[Dict[str, Any]],
+                   deltas: Optional[Dict[BucketKey, Dict[str, Any]]] = None) -> Dict[BucketKey, Dict[str, Any]]:
+        """行動ログの行を全粒度のバケットごとに集計する
+
+        Args:
+            rows: timestamp / focus_level / smartphone_detected / presence_status / posture_data を持つ行
+            deltas: 集計を追加する既存の結果（None の場合は新規）
+
+        Returns:
+            Dict[BucketKey, Dict[str, Any]]: (粒度, バケット開始時刻) ごとの集計値
+        """
+        deltas = {} if deltas is None else deltas
+        for row in rows:
+            timestamp = row['timestamp']
+            row_values = _row_values(row)
+            for granularity in ROLLUP_GRANULARITIES:
+                _merge_values(deltas.setdefault((granularity, bucket_start(timestamp, granularity)), {}), row_values)
+        return deltas
+
+    @classmethod
+    def apply_deltas(cls, session: Any, deltas: Dict[BucketKey, Dict[str, Any]]) -> int:
+        """集計値を UPSERT で既存のバケットへ加算する（呼び出し元のトランザクション内）
+
+        Args:
+            session: 書き込みに使う Session（ライタースレッドまたは db.session）
+            deltas: accumulate() の戻り値
+
+        Returns:
+            int: 更新したバケット数
+        """
+        if not deltas:
+            return 0
+        now = datetime.utcnow()
+        params = [dict(values, granularity=granularity, bucket_start=start, created_at=now, updated_at=now)
+                  for (granularity, start), values in deltas.items()]
+
+        dialect = session.get_bind().dialect.name
+        if dialect not in ('sqlite', 'postgresql'):
+            # ON CONFLICT 非対応の DB は既存行を読んで合成する
+            for (granularity, start), values in deltas.items():
+                rollup = session.query(cls).filter_by(granularity=granularity, bucket_start=start).one_or_none()
+                if rollup is None:
+                    session.add(cls(granularity=granularity, bucket_start=start, **values))
+                    continue
+                merged = {name: getattr(rollup, name) for name in _SUM_FIELDS + _MIN_FIELDS + _MAX_FIELDS}
+                _merge_values(merged, values)
+                for name, value in merged.items():
+                    setattr(rollup, name, value)
+            return len(deltas)
+
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as upsert_insert
+            # SQLite の複数引数 min()/max() は NULL を含むと NULL を返すため coalesce で補う
+            least, greatest = func.min, func.max
+        else:
+            from sqlalchemy.dialects.postgresql import insert as upsert_insert
+            least, greatest = func.least, func.greatest
+
+        table = cls.__table__
+        statement = upsert_insert(table)
+        excluded = statement.excluded
+        update_values = {name: table.c[name] + excluded[name] for name in _SUM_FIELDS}
+        for names, pick in ((_MIN_FIELDS, least), (_MAX_FIELDS, greatest)):
+            for name in names:
+                update_values[name] = func.coalesce(pick(table.c[name], excluded[name]), table.c[name], excluded[name])
+        update_values['updated_at'] = excluded.updated_at
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.granularity, table.c.bucket_start],
+            set_=update_values
+        )
+        session.execute(statement, params)
+        return len(params)
+
+    @classmethod
+    def apply_rows(cls, session: Any, rows: Iterable[Dict[str, Any]]) -> int:
+        """行動ログの行を集計してバケットへ加算する
+
+        Args:
+            session: 書き込みに使う Session
+            rows: 挿入した行動ログの行
+
+        Returns:
+            int: 更新したバケット数
+        """
+        return cls.apply_deltas(session, cls.accumulate(rows))
+
+    @classmethod
+    def rebuild(cls, session: Any, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                chunk_size: int = 5000) -> Dict[str, int]:
+        """behavior_logs から集計を作り直す（呼び出し元のトランザクション内）
+
+        since / until を指定した場合はその日（日バケット）の範囲だけを削除して再集計する。
+
+        Args:
+            session: 書き込みに使う Session
+            since: 再集計の開始時刻（None の場合は最初から）
+            until: 再集計の終了時刻（この時刻を含む日まで。None の場合は最後まで）
+            chunk_size: behavior_logs を読み出す単位
+
+        Returns:
+            Dict[str, int]: 読み込んだログ数と作成したバケット数
+        """
+        from .behavior_log import BehaviorLog
+
+        start = bucket_start(since, 'day') if since is not None else None
+        end = bucket_start(until, 'day') + timedelta(days=1) if until is not None else None
+        delete_query = session.query(cls)
+        if start is not None:
+            delete_query = delete_query.filter(cls.bucket_start >= start)
+        if end is not None:
+            delete_query = delete_query.filter(cls.bucket_start < end)
+        delete_query.delete(synchronize_session=False)
+
+        query = cls._log_query(session)
+        if start is not None:
+            query = query.filter(BehaviorLog.timestamp >= start)
+        if end is not None:
+            query = query.filter(BehaviorLog.timestamp < end)
+
+        deltas: Dict[BucketKey, Dict[str, Any]] = {}
+        log_count = 0
+        for row in query.yield_per(chunk_size):
+            cls.accumulate([row._asdict()], deltas)
+            log_count += 1
+        return {'logs': log_count, 'buckets': cls.apply_deltas(session, deltas)}
+
+    @classmethod
+    def log_time_range(cls, session: Any, log_filter: Any) -> Optional[Tuple[datetime, datetime]]:
+        """条件に合う行動ログの時刻範囲（ログの削除後に rebuild() で該当日を作り直すために使う）
+
+        Args:
+            session: 書き込みに使う Session
+            log_filter: 削除対象の BehaviorLog に対する条件式
+
+        Returns:
+            Optional[Tuple[datetime, datetime]]: 最古・最新のタイムスタンプ（対象が無い場合はNone）
+        """
+        from .behavior_log import BehaviorLog
+
+        oldest, newest = session.query(func.min(BehaviorLog.timestamp), func.max(BehaviorLog.timestamp)) \
+            .filter(log_filter).one()
+        return (oldest, newest) if oldest is not None else None
+
+    @staticmethod
+    def _log_query(session: Any) -> Any:
+        """集計に必要な behavior_logs の列だけを読むクエリ"""
+        from .behavior_log import BehaviorLog
+
+        return session.query(
+            BehaviorLog.timestamp,
+            BehaviorLog.focus_level,
+            BehaviorLog.smartphone_detected,
+            BehaviorLog.presence_status,
+            BehaviorLog.posture_data,
+        )
+
+    @staticmethod
+    def cover_range(start_time: datetime, end_time: datetime) -> List[Tuple[str, datetime, datetime]]:
+        """[start_time, end_time) に完全に含まれる分を重複なく覆うバケット範囲（日 > 時 > 分の順に粗いものを優先）
+
+        開始は分単位に切り上げ、終了は切り捨てる。端の端数（分の途中）は含まないため、
+        呼び出し側で behavior_logs から補う（summarize_range() 参照）。
+
+        Args:
+            start_time: 開始時刻
+            end_time: 終了時刻
+
+        Returns:
+            List[Tuple[str, datetime, datetime]]: (粒度, バケット開始の下限, 上限（含まない）)
+        """
+        def ceil_to(value: datetime, granularity: str, step: timedelta) -> datetime:
+            floor = bucket_start(value, granularity)
+            return floor if floor == value else floor + step
+
+        start, end = ceil_to(start_time, 'minute', timedelta(minutes=1)), bucket_start(end_time, 'minute')
+        if start >= end:
+            return []
+
+        hour_start, hour_end = ceil_to(start, 'hour', timedelta(hours=1)), bucket_start(end, 'hour')
+        if hour_start >= hour_end:
+            return [('minute', start, end)]
+
+        ranges = [('minute', start, hour_start), ('minute', hour_end, end)]
+        day_start, day_end = ceil_to(hour_start, 'day', timedelta(days=1)), bucket_start(hour_end, 'day')
+        if day_start >= day_end:
+            ranges.append(('hour', hour_start, hour_end))
+        else:
+            ranges += [('hour', hour_start, day_start), ('day', day_start, day_end), ('hour', day_end, hour_end)]
+        return [r for r in ranges if r[1] < r[2]]
+
+    @classmethod
+    def summarize_range(cls, start_time: datetime, end_time: datetime) -> Dict[str, Any]:
+        """期間の集計値を取得する（BehaviorLog.get_columns_by_timerange と同じ範囲）
+
+        完全に含まれる分は集計テーブルから 1 クエリで読み、端の分の端数（最大 2 分）だけ
+        behavior_logs を走査する。first_timestamp / last_timestamp は期間内に収まる。
+
+        Args:
+            start_time: 開始時刻
+            end_time: 終了時刻（含む）
+
+        Returns:
+            Dict[str, Any]: 集計値（entry_count が 0 の場合はデータなし）
+        """
+        from . import db
+        from .behavior_log import BehaviorLog
+
+        totals: Dict[str, Any] = {name: 0 for name in _SUM_FIELDS}
+        totals.update({name: None for name in _MIN_FIELDS + _MAX_FIELDS})
+        if start_time > end_time:
+            return totals
+
+        ranges = cls.cover_range(start_time, end_time)
+        if ranges:
+            columns = [func.sum(getattr(cls, name)).label(name) for name in _SUM_FIELDS]
+            columns += [func.min(getattr(cls, name)).label(name) for name in _MIN_FIELDS]
+            columns += [func.max(getattr(cls, name)).label(name) for name in _MAX_FIELDS]
+            result = db.session.query(*columns).filter(or_(*[
+                and_(cls.granularity == granularity, cls.bucket_start >= lower, cls.bucket_start < upper)
+                for granularity, lower, upper in ranges
+            ])).one()
+            _merge_values(totals, result._asdict())
+
+            # 集計済みの分 [covered_start, covered_end) の外側の端数
+            covered_start, covered_end = min(r[1] for r in ranges), max(r[2] for r in ranges)
+            edge_filter = or_(
+                and_(BehaviorLog.timestamp >= start_time, BehaviorLog.timestamp < covered_start),
+                and_(BehaviorLog.timestamp >= covered_end, BehaviorLog.timestamp <= end_time),
+            )
+        else:
+            edge_filter = BehaviorLog.timestamp.between(start_time, end_time)
+
+        for row in cls._log_query(db.session).filter(edge_filter):
+            _merge_values(totals, _row_values(row._asdict()))
+
+        if totals['first_timestamp'] is not None:
+            totals['first_timestamp'] = max(totals['first_timestamp'], start_time)
+            totals['last_timestamp'] = min(totals['last_timestamp'], end_time)
+        return totals
+
+    @classmethod
+    def get_buckets(cls, granularity: str, start_time: datetime, end_time: datetime) -> List['BehaviorRollup']:
+        """粒度を指定してバケットを時刻順に取得
+
+        Args:
+            granularity: 'minute' / 'hour' / 'day'
+            start_time: バケット開始時刻の下限
+            end_time: バケット開始時刻の上限（含まない）
+
+        Returns:
+            List[BehaviorRollup]: バケットのリスト
+        """
+        return cls.query.filter(
+            cls.granularity == granularity,
+            cls.bucket_start >= start_time,
+            cls.bucket_start < end_time
+        ).order_by(cls.bucket_start).all()
+
+    def __repr__(self) -> str:
+        return f"<BehaviorRollup {self.granularity} {self.bucket_start} count={self.entry_count}>"
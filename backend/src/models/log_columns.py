@@ -0,0 +1,170 @@
+"""
+Log Columns
+
+ログテーブルの列射影（指定した列だけを SELECT し、列ごとの numpy 配列で返す）
+
+分析処理が使わない JSON 列（face_landmarks・detected_objects・environment_data 等）を
+読み込まず、ORM オブジェクトも生成しません::
+
+    columns = BehaviorLog.get_recent_columns(['timestamp', 'focus_level', 'smartphone_detected'], hours=720)
+    focus = columns.valid('focus_level')              # NaN を除いた float64 配列
+    smartphone_rate = columns['smartphone_detected'].mean()
+"""
+
+from collections import namedtuple
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import Boolean, DateTime, Float, Integer
+
+from utils.exceptions import ValidationError
+
+
+def _column_array(column: Any, values: Sequence[Any]) -> np.ndarray:
+    """SQL 型に応じて値のリストを numpy 配列へ変換する
+
+    Args:
+        column: SQLAlchemy の Column
+        values: 列の値
+
+    Returns:
+        np.ndarray: Float は float64（NULL は NaN）、Boolean は bool（NULL は False）、
+            DateTime は datetime64[us]（NULL は NaT）、Integer は int64（NULL を含む場合は float64）、
+            それ以外（String・JSON 等）は object
+    """
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return np.fromiter((bool(v) for v in values), dtype=bool, count=len(values))
+    if isinstance(column_type, Float):
+        return np.fromiter((np.nan if v is None else v for v in values), dtype=np.float64, count=len(values))
+    if isinstance(column_type, Integer):
+        if any(v is None for v in values):
+            return np.fromiter((np.nan if v is None else v for v in values), dtype=np.float64, count=len(values))
+        return np.fromiter(values, dtype=np.int64, count=len(values))
+    if isinstance(column_type, DateTime):
+        return np.array(values, dtype='datetime64[us]')
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class LogColumns:
+    """
+    列指向のログ（struct-of-arrays）
+    - 列名ごとに同じ長さ・同じ並び順の numpy 配列を保持
+    - 集計は配列演算で行う（valid()・mean()・count_equal()）
+    - 行単位の処理が必要な既存コード向けに、指定列だけを持つ軽量な行（namedtuple）も生成できる
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        """
+        Args:
+            columns: 列名と配列（全て同じ長さ）
+        """
+        self._columns = columns
+        self._length = len(next(iter(columns.values()))) if columns else 0
+
+    @property
+    def names(self) -> List[str]:
+        """保持している列名"""
+        return list(self._columns)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise ValidationError(
+                f"Column '{name}' was not selected",
+                details={'column': name, 'selected': self.names}
+            )
+
+    def valid(self, name: str) -> np.ndarray:
+        """NULL（NaN・NaT・None）を除いた値"""
+        values = self[name]
+        if values.dtype.kind == 'f':
+            return values[~np.isnan(values)]
+        if values.dtype.kind == 'M':
+            return values[~np.isnat(values)]
+        if values.dtype == object:
+            return values[np.fromiter((v is not None for v in values), dtype=bool, count=len(values))]
+        return values
+
+    def mean(self, name: str, default: float = 0.0) -> float:
+        """NULL を除いた平均（値が無い場合は default）"""
+        values = self.valid(name)
+        return float(values.mean()) if len(values) else default
+
+    def count_equal(self, name: str, value: Any) -> int:
+        """列の値が value と等しい行数"""
+        return int(np.count_nonzero(self[name] == value))
+
+    def datetime_at(self, name: str, index: int) -> Optional[datetime]:
+        """日時列の index 番目を datetime で取得（NULL・範囲外はNone）"""
+        values = self[name]
+        if not -len(values) <= index < len(values) or np.isnat(values[index]):
+            return None
+        return values[index].astype('datetime64[us]').item()
+
+    def rows(self, index: Optional[slice] = None) -> List[Any]:
+        """行ごとの namedtuple（列名を属性として持つ。日時は datetime、NaN は None）
+
+        Args:
+            index: 取り出す範囲（None の場合は全行）
+
+        Returns:
+            List[Any]: 行のリスト
+        """
+        row_type = namedtuple('LogRow', self.names)
+        columns = []
+        for values in self._columns.values():
+            values = values if index is None else values[index]
+            if values.dtype.kind == 'M':
+                columns.append(values.astype(object).tolist())
+            elif values.dtype.kind == 'f':
+                columns.append([None if v != v else v for v in values.tolist()])
+            else:
+                columns.append(values.tolist())
+        return [row_type(*row) for row in zip(*columns)]
+
+    def row(self, index: int) -> Any:
+        """index 番目の行（namedtuple）"""
+        if not -self._length <= index < self._length:
+            raise IndexError(index)
+        position = index % self._length
+        return self.rows(slice(position, position + 1))[0]
+
+
+def project_columns(model: Any, query: Any, columns: Iterable[str]) -> LogColumns:
+    """クエリ条件を保ったまま指定列だけを SELECT して LogColumns にする
+
+    Args:
+        model: 対象のモデルクラス
+        query: フィルタ・並び順を設定済みの model.query
+        columns: 取得する列名
+
+    Returns:
+        LogColumns: 列ごとの配列
+
+    Raises:
+        ValidationError: 存在しない列名を指定した場合
+    """
+    names = list(dict.fromkeys(columns))
+    table_columns = model.__table__.columns
+    unknown = [name for name in names if name not in table_columns]
+    if unknown or not names:
+        raise ValidationError(
+            f"Unknown columns for {model.__tablename__}: {unknown}" if unknown else "No columns requested",
+            details={'columns': names, 'available': list(table_columns.keys())}
+        )
+
+    rows = query.with_entities(*[table_columns[name] for name in names]).all()
+    values = list(zip(*rows)) if rows else [() for _ in names]
+    return LogColumns({name: _column_array(table_columns[name], list(column_values))
+                       for name, column_values in zip(names, values)})
@@ -0,0 +1,415 @@
+"""
+SQLite ストレージエンジン設定モジュール
+
+SQLAlchemy エンジンの接続イベントで SQLite の PRAGMA（WAL・synchronous=NORMAL・
+mmap_size・cache_size・busy_timeout）を設定します。書き込みは専用接続を持つ
+単一のライタースレッドへ集約し、キューに溜まった書き込みを 1 トランザクションに
+まとめてコミットします。読み出しは Flask-SQLAlchemy エンジンの接続プールを使い、
+WAL によりライターのトランザクション中もブロックされません。
+
+    from models.storage_engine import submit_write
+    submit_write(lambda session: session.add_all(logs), description='behavior logs')
+"""
+
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from utils.logger import setup_logger
+from utils.exceptions import ServiceUnavailableError
+
+logger = setup_logger(__name__)
+
+WriteJob = Callable[[Session], Any]
+
+
+def build_sqlite_pragmas(config_manager: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    接続ごとに設定する PRAGMA を設定値から組み立てる
+
+    Args:
+        config_manager: 設定管理インスタンス（None の場合は既定値）
+
+    Returns:
+        Dict[str, Any]: PRAGMA 名と値
+    """
+    get = config_manager.get if config_manager else (lambda key, default=None: default)
+    return {
+        'journal_mode': get('database.sqlite.journal_mode', 'WAL'),
+        'synchronous': get('database.sqlite.synchronous', 'NORMAL'),
+        'mmap_size': int(get('database.sqlite.mmap_size_mb', 256)) * 1024 * 1024,
+        # 負の値は KiB 単位の指定
+        'cache_size': -int(get('database.sqlite.cache_size_mb', 64)) * 1024,
+        'busy_timeout': int(get('database.sqlite.busy_timeout_ms', 5000)),
+        'temp_store': get('database.sqlite.temp_store', 'MEMORY'),
+    }
+
+
+def build_engine_options(config_manager: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    読み出し用エンジン（Flask-SQLAlchemy）の SQLALCHEMY_ENGINE_OPTIONS を組み立てる
+
+    Args:
+        config_manager: 設定管理インスタンス（None の場合は既定値）
+
+    Returns:
+        Dict[str, Any]: create_engine() のオプション
+    """
+    get = config_manager.get if config_manager else (lambda key, default=None: default)
+    return {
+        'poolclass': QueuePool,
+        'pool_size': int(get('database.pool.size', 5)),
+        'max_overflow': int(get('database.pool.max_overflow', 10)),
+        'pool_timeout': float(get('database.pool.timeout_seconds', 30)),
+        'pool_pre_ping': False,
+        'connect_args': {
+            # プールの接続は複数スレッドで使い回す
+            'check_same_thread': False,
+            'timeout': int(get('database.sqlite.busy_timeout_ms', 5000)) / 1000.0,
+        },
+    }
+
+
+def install_sqlite_pragmas(engine: Engine, pragmas: Dict[str, Any]) -> bool:
+    """
+    エンジンの接続イベントに PRAGMA 設定を登録する（SQLite 以外は何もしない）
+
+    Args:
+        engine: 対象エンジン（接続前に呼ぶこと）
+        pragmas: build_sqlite_pragmas() の戻り値
+
+    Returns:
+        bool: 登録した場合True
+    """
+    if engine.dialect.name != 'sqlite':
+        return False
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                if value is not None:
+                    cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return True
+
+
+def _is_locked_error(error: Exception) -> bool:
+    """SQLite のロック競合（database is locked / table is locked）か"""
+    return isinstance(error, OperationalError) and 'locked' in str(error).lower()
+
+
+class DatabaseWriter:
+    """
+    単一ライタースレッド
+    - submit(): 書き込みジョブ（Session を受け取る関数）をキューへ積み Future を返す
+    - ライタースレッドは専用の接続で、溜まったジョブを最大 max_batch_jobs 件ずつ 1 トランザクションでコミット
+    - "database is locked"（他プロセスの書き込み・リストア・再集計との競合）はバックオフ付きで再試行
+    - まとめたトランザクションが失敗した場合はジョブごとに再実行し、失敗したジョブだけを Future で通知
+    - stop() 後の submit() は拒否し、書き込めなかったジョブの Future は例外で完了させる
+    - Session は expire_on_commit=False（コミット後も呼び出し元スレッドで属性を参照できる）
+    """
+
+    def __init__(self,
+                 database_url: str,
+                 pragmas: Optional[Dict[str, Any]] = None,
+                 max_batch_jobs: int = 256,
+                 max_queue_size: int = 10000,
+                 lock_retries: int = 5,
+                 lock_backoff: float = 0.1,
+                 max_lock_backoff: float = 2.0):
+        """
+        Args:
+            database_url: 書き込み先のデータベース URL
+            pragmas: 専用接続に設定する PRAGMA（None の場合は既定値）
+            max_batch_jobs: 1 トランザクションにまとめる最大ジョブ数
+            max_queue_size: キューの上限（超過時は submit() が ServiceUnavailableError）
+            lock_retries: "database is locked" で失敗したトランザクションの再試行回数
+            lock_backoff: 再試行の初回待機秒数（再試行ごとに倍）
+            max_lock_backoff: 再試行の最大待機秒数
+        """
+        self.database_url = database_url
+        self.max_batch_jobs = max(1, int(max_batch_jobs))
+        self.lock_retries = max(0, int(lock_retries))
+        self.lock_backoff = max(0.0, float(lock_backoff))
+        self.max_lock_backoff = max(self.lock_backoff, float(max_lock_backoff))
+        self.engine = create_engine(
+            database_url,
+            poolclass=QueuePool,
+            pool_size=1,
+            max_overflow=0,
+            connect_args={'check_same_thread': False}
+        )
+        install_sqlite_pragmas(self.engine, pragmas if pragmas is not None else build_sqlite_pragmas())
+        self._session_factory = sessionmaker(bind=self.engine, expire_on_commit=False)
+        self._queue: "queue.Queue[Tuple[WriteJob, Future, str]]" = queue.Queue(maxsize=max(1, int(max_queue_size)))
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # submit() と stop() の間で、停止後のジョブがキューに取り残されないようにする
+        self._submit_lock = threading.Lock()
+        self._closed = False
+
+        # 統計
+        self.submitted_count = 0
+        self.committed_jobs = 0
+        self.failed_jobs = 0
+        self.transaction_count = 0
+        self.retried_batches = 0
+        self.lock_retry_count = 0
+        self.total_commit_time = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """ライタースレッドを開始する"""
+        if self.running:
+            return
+        self._stop_event.clear()
+        with self._submit_lock:
+            self._closed = False
+        self._thread = threading.Thread(target=self._run, name='DatabaseWriter', daemon=True)
+        self._thread.start()
+        logger.info(f"DatabaseWriter started (max_batch_jobs={self.max_batch_jobs})")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """新しいジョブの受け付けを止め、キューに残ったジョブを書き込んでから停止する
+
+        timeout 内に書き込めなかったジョブの Future は ServiceUnavailableError で完了させる。
+        """
+        with self._submit_lock:
+            self._closed = True
+        if self.running:
+            self._stop_event.set()
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning(f"DatabaseWriter did not stop within {timeout}s")
+            self._thread = None
+            self.engine.dispose()
+        elif self._queue.empty():
+            return
+        abandoned = self._fail_pending()
+        logger.info(f"DatabaseWriter stopped (abandoned: {abandoned})")
+
+    def _fail_pending(self) -> int:
+        """キューに残ったジョブの Future を例外で完了させる"""
+        abandoned = 0
+        while True:
+            try:
+                _, future, description = self._queue.get_nowait()
+            except queue.Empty:
+                return abandoned
+            abandoned += 1
+            self.failed_jobs += 1
+            future.set_exception(ServiceUnavailableError(
+                "Database writer stopped before the job was written",
+                details={'description': description}
+            ))
+
+    def submit(self, job: WriteJob, description: str = '') -> Future:
+        """
+        書き込みジョブを登録する（任意のスレッドから呼び出し可）
+
+        Args:
+            job: ライタースレッドの Session を受け取り、add / execute を行う関数（commit は不要）
+            description: ログ用の説明
+
+        Returns:
+            Future: ジョブの戻り値（コミット後に完了）
+
+        Raises:
+            ServiceUnavailableError: キューが満杯の場合・停止後の場合
+        """
+        future: Future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise ServiceUnavailableError(
+                    "Database writer is stopped",
+                    details={'description': description}
+                )
+            try:
+                self._queue.put_nowait((job, future, description))
+            except queue.Full:
+                raise ServiceUnavailableError(
+                    "Database write queue is full",
+                    details={'queue_size': self._queue.qsize(), 'description': description}
+                )
+            self.submitted_count += 1
+        return future
+
+    def _run(self) -> None:
+        """ライタースレッド本体"""
+        while not (self._stop_event.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self.max_batch_jobs:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: List[Tuple[WriteJob, Future, str]]) -> None:
+        """ジョブ群を 1 トランザクションで書き込む（失敗時はジョブごとに再実行）"""
+        start_time = time.perf_counter()
+        try:
+            results = self._commit_jobs(batch)
+        except Exception as e:  # noqa: BLE001
+            if len(batch) > 1:
+                logger.warning(f"Batched write of {len(batch)} jobs failed ({e}); retrying jobs individually")
+                self.retried_batches += 1
+                for item in batch:
+                    self._write_batch([item])
+                return
+            _, future, description = batch[0]
+            self.failed_jobs += 1
+            logger.error(f"Database write failed ({description or 'job'}): {e}")
+            future.set_exception(e)
+            return
+
+        self.transaction_count += 1
+        self.committed_jobs += len(batch)
+        self.total_commit_time += time.perf_counter() - start_time
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def _commit_jobs(self, batch: List[Tuple[WriteJob, Future, str]]) -> List[Any]:
+        """ジョブ群を実行してコミットする（ロック競合は lock_retries 回までバックオフして再試行）
+
+        Returns:
+            List[Any]: ジョブごとの戻り値
+
+        Raises:
+            Exception: ジョブ・コミットの失敗（再試行後もロックが解けない場合を含む）
+        """
+        attempt = 0
+        while True:
+            session = self._session_factory()
+            try:
+                results = [job(session) for job, _, _ in batch]
+                session.commit()
+                return results
+            except OperationalError as e:
+                session.rollback()
+                if not _is_locked_error(e) or attempt >= self.lock_retries:
+                    raise
+                delay = min(self.lock_backoff * (2 ** attempt), self.max_lock_backoff)
+                attempt += 1
+                self.lock_retry_count += 1
+                logger.warning(f"Database is locked; retrying {len(batch)} jobs in {delay:.2f}s "
+                               f"({attempt}/{self.lock_retries})")
+                time.sleep(delay)
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ライター統計を取得"""
+        return {
+            'running': self.running,
+            'queued': self._queue.qsize(),
+            'submitted': self.submitted_count,
+            'committed_jobs': self.committed_jobs,
+            'failed_jobs': self.failed_jobs,
+            'transactions': self.transaction_count,
+            'retried_batches': self.retried_batches,
+            'lock_retries': self.lock_retry_count,
+            'avg_jobs_per_transaction': self.committed_jobs / self.transaction_count if self.transaction_count else 0.0,
+            'avg_transaction_ms': self.total_commit_time / self.transaction_count * 1000 if self.transaction_count else 0.0,
+        }
+
+
+_database_writer: Optional[DatabaseWriter] = None
+
+
+def get_database_writer() -> Optional[DatabaseWriter]:
+    """稼働中のライターを取得（未起動時はNone）"""
+    return _database_writer
+
+
+def configure_storage_engine(app: Any, db: Any) -> None:
+    """
+    Flask-SQLAlchemy の全エンジンへ PRAGMA を登録し、既定バインドのライターを起動する
+
+    db.init_app(app) の直後、最初の接続より前に呼ぶこと。
+
+    Args:
+        app: Flask アプリケーションインスタンス
+        db: SQLAlchemy インスタンス
+    """
+    global _database_writer
+
+    config_manager = app.config.get('config_manager')
+    pragmas = build_sqlite_pragmas(config_manager)
+    with app.app_context():
+        engines = list(db.engines.values()) if hasattr(db, 'engines') else [db.engine]
+        for engine in engines:
+            if install_sqlite_pragmas(engine, pragmas):
+                logger.info(f"SQLite pragmas installed for {engine.url.database}: {pragmas}")
+
+    get = config_manager.get if config_manager else (lambda key, default=None: default)
+    database_url = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if not get('database.writer.enabled', True) or not database_url:
+        return
+    if _database_writer is not None:
+        _database_writer.stop()
+    _database_writer = DatabaseWriter(
+        database_url,
+        pragmas=pragmas,
+        max_batch_jobs=get('database.writer.max_batch_jobs', 256),
+        max_queue_size=get('database.writer.max_queue_size', 10000),
+        lock_retries=get('database.writer.lock_retries', 5),
+        lock_backoff=int(get('database.writer.lock_backoff_ms', 100)) / 1000.0
+    )
+    _database_writer.start()
+    atexit.register(_database_writer.stop)
+
+
+def submit_write(job: WriteJob, description: str = '') -> Future:
+    """
+    書き込みジョブをライタースレッドへ登録する
+
+    ライター未起動時（スクリプト実行・設定で無効化時など）は、呼び出し元スレッドで
+    db.session を使って即時に実行・コミットする（Flask アプリコンテキストが必要）。
+    失敗はどちらの経路でもログへ記録されるため、結果を待たない呼び出し元は Future を捨ててよい。
+
+    Args:
+        job: Session を受け取り、add / execute を行う関数（commit は不要）
+        description: ログ用の説明
+
+    Returns:
+        Future: ジョブの戻り値（コミット後に完了）
+    """
+    writer = _database_writer
+    if writer is not None and writer.running:
+        future = writer.submit(job, description)
+    else:
+        from models import db
+        future = Future()
+        try:
+            result = job(db.session)
+            db.session.commit()
+            future.set_result(result)
+        except Exception as e:  # noqa: BLE001
+            db.session.rollback()
+            logger.error(f"Database write failed ({description or 'job'}): {e}")
+            future.set_exception(e)
+    return future
@@ -17,6 +17,9 @@ from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 分析が参照する BehaviorLog の列（列射影で読み込み、JSON 列の大半を読まない）
+ANALYSIS_COLUMNS = ('timestamp', 'focus_level', 'smartphone_detected', 'presence_status', 'posture_data')
+
 
 class BehaviorAnalyzer:
     """行動パターン分析エンジン
@@ -137,7 +140,7 @@ class BehaviorAnalyzer:
             }
             
             hours = hours_map.get(timeframe, 24)
-            logs = BehaviorLog.get_recent_logs(hours=hours)
+            logs = BehaviorLog.get_recent_columns(ANALYSIS_COLUMNS, hours=hours).rows()
             
             if not logs:
                 return {'message': 'データが不足しています'}
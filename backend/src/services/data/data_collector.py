@@ -13,7 +13,7 @@ import logging
 import json
 import uuid
 
-from core.monitoring import Camera
+from core.monitoring import Camera, FrameBus
 from core.detection import Detector
 from core.management import StateManager
 from models.behavior_log import BehaviorLog
@@ -33,7 +33,8 @@ class DataCollector:
                  detector: Detector,
                  state_manager: StateManager,
                  collection_interval: float = 2.0,
-                 flask_app=None):
+                 flask_app=None,
+                 frame_bus: Optional[FrameBus] = None):
         """初期化
         
         Args:
@@ -42,12 +43,16 @@ class DataCollector:
             state_manager: 状態管理インスタンス
             collection_interval: データ収集間隔（秒）- デフォルト2秒（リアルタイム性向上）
             flask_app: Flaskアプリケーションインスタンス
+            frame_bus: フレームバス（指定時は監視ループの検出結果を購読し、独自の検出は行わない）
         """
         self.camera = camera
         self.detector = detector
         self.state_manager = state_manager
         self.collection_interval = collection_interval
         self.flask_app = flask_app
+        # FrameBus 購読（最新値ポリシー: 収集間隔ごとに最新の検出結果のみ使用）
+        self.frame_bus = frame_bus
+        self._frame_subscription = frame_bus.subscribe('data_collector') if frame_bus else None
         # データ収集制御
         self._collecting = False
         self._collection_thread: Optional[threading.Thread] = None
@@ -240,6 +245,18 @@ class DataCollector:
         start_time = time.time()
         
         try:
+            # FrameBus 購読時は監視ループの検出結果を再利用（重複推論・カメラ競合を回避）
+            if self._frame_subscription is not None:
+                packet = self._frame_subscription.get(timeout=self.collection_interval)
+                if packet is None:
+                    logger.debug("No new frame published on FrameBus")
+                    return None
+                return self._structure_data(
+                    packet.detection_results,
+                    packet.state_snapshot,
+                    processing_time=(time.time() - start_time) * 1000
+                )
+
             # フレーム取得
             ret, frame = self.camera.get_frame()
             if not ret or frame is None:
@@ -619,63 +636,24 @@ class DataCollector:
                 logger.error(f"First batch item keys: {list(batch[0].keys()) if batch else 'No batch data'}")
     
     def _save_batch_to_database(self, batch):
-        """Flask app context内でバッチデータをデータベースに保存"""
+        """Flask app context内でバッチデータをデータベースに一括保存（Core の executemany・1 トランザクション）"""
         logger.debug(f"Starting database save operation for {len(batch)} items")
         
-        from models import db
-        logger.debug("Successfully imported db from models")
+        from services.data.storage_service import bulk_insert_behavior_logs
         
-        saved_count = 0
+        saved_keys = (
+            'timestamp', 'detected_objects', 'focus_level', 'posture_data', 'smartphone_detected',
+            'presence_status', 'session_id', 'face_landmarks', 'environment_data',
+            'confidence_scores', 'processing_time'
+        )
+        logs_data = [{key: data.get(key) for key in saved_keys} for data in batch]
         
         try:
-            logger.debug("Starting batch processing loop")
-            for i, data in enumerate(batch):
-                try:
-                    logger.debug(f"Processing batch item {i+1}/{len(batch)}")
-                    # 直接BehaviorLogインスタンスを作成
-                    from models.behavior_log import BehaviorLog
-                    from datetime import datetime
-                    
-                    logger.debug(f"Creating BehaviorLog instance with data keys: {list(data.keys())}")
-                    
-                    behavior_log = BehaviorLog(
-                        timestamp=data.get('timestamp') or datetime.utcnow(),
-                        detected_objects=data.get('detected_objects'),
-                        focus_level=data.get('focus_level'),
-                        posture_data=data.get('posture_data'),
-                        smartphone_detected=data.get('smartphone_detected', False),
-                        presence_status=data.get('presence_status'),
-                        session_id=data.get('session_id'),
-                        face_landmarks=data.get('face_landmarks'),
-                        environment_data=data.get('environment_data'),
-                        confidence_scores=data.get('confidence_scores'),
-                        processing_time=data.get('processing_time')
-                    )
-                    
-                    logger.debug(f"BehaviorLog instance created successfully for item {i+1}")
-                    db.session.add(behavior_log)
-                    logger.debug(f"Added BehaviorLog to session for item {i+1}")
-                    saved_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error creating BehaviorLog entry for item {i+1}: {e}", exc_info=True)
-                    continue
-            
-            logger.debug(f"Attempting to commit {saved_count} items to database")
-            # 一括コミット
-            db.session.commit()
+            # 一括コミット（ライタースレッドのトランザクション完了を待つ）
+            saved_count = bulk_insert_behavior_logs(logs_data)
             logger.info(f"データベース保存完了: {saved_count}件")
-            
         except Exception as e:
             logger.error(f"データベース保存処理エラー: {e}", exc_info=True)
-            logger.error(f"Database session state: {db.session}")
-            # ロールバック
-            try:
-                logger.debug("Attempting database rollback")
-                db.session.rollback()
-                logger.debug("Database rollback completed")
-            except Exception as rollback_error:
-                logger.error(f"ロールバックエラー: {rollback_error}")
     
     def _trigger_callbacks(self, data: Dict[str, Any]) -> None:
         """データコールバックを実行
@@ -717,17 +695,17 @@ class DataCollector:
         
         try:
             # セッション期間のログを取得
-            logs = BehaviorLog.get_recent_logs(
+            logs = BehaviorLog.get_recent_columns(
+                ('focus_level', 'smartphone_detected', 'presence_status'),
                 hours=24,  # 最大24時間
                 session_id=self.current_session_id
             )
             
-            if not logs:
+            if not len(logs):
                 return None
             
             # 統計計算
-            focus_scores = [log.focus_level for log in logs if log.focus_level is not None]
-            smartphone_usage_count = sum(1 for log in logs if log.smartphone_detected)
+            focus_scores = logs.valid('focus_level')
             
             duration = datetime.utcnow() - self.session_start_time
             
@@ -736,9 +714,9 @@ class DataCollector:
                 'start_time': self.session_start_time.isoformat(),
                 'duration_minutes': duration.total_seconds() / 60,
                 'total_entries': len(logs),
-                'average_focus': sum(focus_scores) / len(focus_scores) if focus_scores else None,
-                'smartphone_usage_rate': smartphone_usage_count / len(logs) if logs else 0,
-                'presence_rate': len([log for log in logs if log.presence_status == 'present']) / len(logs) if logs else 0
+                'average_focus': float(focus_scores.mean()) if len(focus_scores) else None,
+                'smartphone_usage_rate': float(logs['smartphone_detected'].mean()),
+                'presence_rate': logs.count_equal('presence_status', 'present') / len(logs)
             }
             
             return summary
@@ -778,5 +756,6 @@ class DataCollector:
             'session_start_time': self.session_start_time.isoformat() if self.session_start_time else None,
             'collection_interval': self.collection_interval,
             'pending_data_count': len(self._pending_data),
-            'callbacks_count': len(self._data_callbacks)
+            'callbacks_count': len(self._data_callbacks),
+            'frame_bus_subscription': self._frame_subscription.get_stats() if self._frame_subscription else None
         } 
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Rollup Service
+
+行動ログ集計テーブル（behavior_rollups）の再構築
+
+通常は行動ログの一括挿入と同じトランザクションで加算更新されます。集計導入前のログや
+バックアップから直接投入したログを反映するには、再構築コマンドで behavior_logs から
+作り直します::
+
+    # backend/src で実行（既定は backend/instance/kanshichan.db）
+    python -m services.data.rollup_service
+    python -m services.data.rollup_service --since 2026-10-01 --database /path/to/kanshichan.db
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.behavior_rollup import BehaviorRollup
+from models.storage_engine import build_sqlite_pragmas, install_sqlite_pragmas, submit_write
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_DATABASE_PATH = Path(__file__).resolve().parent.parent.parent.parent / 'instance' / 'kanshichan.db'
+
+
+def rebuild_behavior_rollups(since: Optional[datetime] = None, wait: bool = True) -> Optional[Dict[str, int]]:
+    """稼働中のアプリで集計を作り直す（ライタースレッドの 1 トランザクション）
+
+    Args:
+        since: 再集計の開始時刻（None の場合は全期間）
+        wait: 完了を待つか
+
+    Returns:
+        Optional[Dict[str, int]]: 読み込んだログ数と作成したバケット数（wait=False の場合はNone）
+    """
+    future = submit_write(lambda session: BehaviorRollup.rebuild(session, since=since),
+                          description='rebuild behavior rollups')
+    return future.result() if wait else None
+
+
+def rebuild_database(database_url: str, since: Optional[datetime] = None) -> Dict[str, Any]:
+    """データベースへ直接接続して集計を作り直す（アプリ外からの実行用）
+
+    Args:
+        database_url: 対象のデータベース URL
+        since: 再集計の開始時刻（None の場合は全期間）
+
+    Returns:
+        Dict[str, Any]: 読み込んだログ数・作成したバケット数・所要秒数
+    """
+    engine = create_engine(database_url)
+    install_sqlite_pragmas(engine, build_sqlite_pragmas())
+    try:
+        BehaviorRollup.__table__.create(engine, checkfirst=True)
+        start = time.perf_counter()
+        with sessionmaker(bind=engine)() as session:
+            result = BehaviorRollup.rebuild(session, since=since)
+            session.commit()
+        return dict(result, seconds=time.perf_counter() - start)
+    finally:
+        engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild KanshiChan behavior rollup tables")
+    parser.add_argument('--database', default=str(DEFAULT_DATABASE_PATH), help="SQLite データベースファイルのパス")
+    parser.add_argument('--since', default=None, help="この日以降だけを再集計する（ISO 形式、例: 2026-10-01）")
+    args = parser.parse_args(argv)
+
+    try:
+        since = datetime.fromisoformat(args.since) if args.since else None
+    except ValueError:
+        parser.error(f"invalid --since: {args.since}")
+    if not Path(args.database).exists():
+        print(f"database not found: {args.database}", file=sys.stderr)
+        return 1
+
+    result = rebuild_database(f"sqlite:///{Path(args.database).absolute()}", since=since)
+    print(f"rebuilt {result['buckets']} buckets from {result['logs']} behavior logs "
+          f"in {result['seconds']:.2f}s (since: {since.isoformat() if since else 'all'})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,17 +9,151 @@ import gzip
 import json
 import shutil
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 from pathlib import Path
 import logging
 
+from sqlalchemy import DateTime, insert
+
 from models.behavior_log import BehaviorLog
+from models.behavior_rollup import BehaviorRollup
+from models.detection_log import DetectionLog
 from models.analysis_result import AnalysisResult
 from models import db
+from models.storage_engine import submit_write
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 一括挿入で値を受け付けるカラム（id は自動採番）
+_BEHAVIOR_LOG_COLUMNS = tuple(c.name for c in BehaviorLog.__table__.columns if c.name != 'id')
+_DETECTION_LOG_COLUMNS = tuple(c.name for c in DetectionLog.__table__.columns if c.name != 'id')
+
+
+def behavior_log_row(log_data: Dict[str, Any]) -> Dict[str, Any]:
+    """行動ログの辞書を behavior_logs の 1 行へ変換する（BehaviorLog.create_log と同じ派生値を付与）
+
+    Args:
+        log_data: 行動ログデータ（未知のキーは無視）
+
+    Returns:
+        dict: 全カラムを持つ行（executemany のため全行でキーを揃える）
+    """
+    now = datetime.utcnow()
+    row = {name: log_data.get(name) for name in _BEHAVIOR_LOG_COLUMNS}
+    row['timestamp'] = row['timestamp'] or now
+    row['smartphone_detected'] = bool(row['smartphone_detected'])
+    row['created_at'] = row['created_at'] or now
+    row['updated_at'] = row['updated_at'] or now
+
+    detected_objects = row['detected_objects']
+    if row['object_count'] is None:
+        object_count: Dict[str, int] = {}
+        for obj in detected_objects or []:
+            obj_class = obj.get('class', 'unknown')
+            object_count[obj_class] = object_count.get(obj_class, 0) + 1
+        row['object_count'] = object_count
+    if row['attention_status'] is None:
+        row['attention_status'] = BehaviorLog._determine_attention_status(
+            row['focus_level'], row['smartphone_detected'], detected_objects
+        )
+    return row
+
+
+def detection_log_row(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """検出ログの辞書を detection_log の 1 行へ変換する（bbox は (x, y, width, height) を展開）
+
+    Args:
+        entry: 検出ログデータ（DetectionLog.create_from_detection と同じキー）
+
+    Returns:
+        dict: 全カラムを持つ行
+    """
+    now = datetime.utcnow()
+    row = {name: entry.get(name) for name in _DETECTION_LOG_COLUMNS}
+    bbox = entry.get('bbox')
+    if bbox is not None:
+        row['bbox_x'], row['bbox_y'], row['bbox_width'], row['bbox_height'] = bbox[:4]
+    row['timestamp'] = row['timestamp'] or now
+    row['is_smoothed'] = bool(row['is_smoothed'])
+    row['is_interpolated'] = bool(row['is_interpolated'])
+    row['created_at'] = row['created_at'] or now
+    row['updated_at'] = row['updated_at'] or now
+    return row
+
+
+def _backup_row_values(model: Any, data: Dict[str, Any]) -> Dict[str, Any]:
+    """バックアップ（to_dict() の JSON）の行を、日時列を datetime に戻してモデルの引数にする"""
+    values = dict(data)
+    for column in model.__table__.columns:
+        value = values.get(column.name)
+        if isinstance(column.type, DateTime) and isinstance(value, str):
+            values[column.name] = datetime.fromisoformat(value)
+    return values
+
+
+def bulk_insert_rows(model: Any, rows: List[Dict[str, Any]], wait: bool = True, description: str = '',
+                     after_insert: Optional[Callable[[Any, List[Dict[str, Any]]], Any]] = None) -> int:
+    """行の辞書リストを Core の insert() で一括挿入する（1 トランザクション・executemany）
+
+    書き込みは models.storage_engine のライタースレッドで実行する。
+
+    Args:
+        model: 挿入先のモデルクラス
+        rows: 全行で同じキーを持つ辞書のリスト
+        wait: コミット完了を待つか（False の場合は登録のみ行い、失敗はライターがログに記録）
+        description: ログ用の説明
+        after_insert: 挿入と同じトランザクションで実行する処理（Session と行を受け取る）
+
+    Returns:
+        int: 挿入した行数（wait=False の場合は登録した行数）
+
+    Raises:
+        Exception: wait=True で書き込みに失敗した場合
+    """
+    if not rows:
+        return 0
+    table = model.__table__
+
+    def _insert(session) -> int:
+        session.execute(insert(table), rows)
+        if after_insert is not None:
+            after_insert(session, rows)
+        return len(rows)
+
+    future = submit_write(_insert, description=description or f"bulk insert {table.name}")
+    return future.result() if wait else len(rows)
+
+
+def bulk_insert_behavior_logs(logs_data: List[Dict[str, Any]], wait: bool = True) -> int:
+    """行動ログを一括挿入する（集計テーブルも更新）
+
+    Args:
+        logs_data: 行動ログデータのリスト（BehaviorLog.create_log と同じキー）
+        wait: コミット完了を待つか
+
+    Returns:
+        int: 挿入（登録）した行数
+    """
+    rows = [behavior_log_row(log_data) for log_data in logs_data]
+    # 分・時・日の集計（behavior_rollups）も同じトランザクションで加算する
+    return bulk_insert_rows(BehaviorLog, rows, wait=wait, description='behavior logs',
+                            after_insert=BehaviorRollup.apply_rows)
+
+
+def bulk_insert_detection_logs(entries: List[Dict[str, Any]], wait: bool = False) -> int:
+    """検出ログを一括挿入する
+
+    Args:
+        entries: 検出ログデータのリスト（DetectionLog.create_from_detection と同じキー）
+        wait: コミット完了を待つか（既定は検出ループを止めないため待たない）
+
+    Returns:
+        int: 挿入（登録）した行数
+    """
+    rows = [detection_log_row(entry) for entry in entries]
+    return bulk_insert_rows(DetectionLog, rows, wait=wait, description='detection logs')
+
 
 class StorageService:
     """データ保存サービス
@@ -68,23 +202,13 @@ class StorageService:
             return True
         
         try:
-            db.session.begin()
-            
-            logs_to_save = []
-            for log_data in logs_data:
-                behavior_log = BehaviorLog.create_log(**log_data)
-                logs_to_save.append(behavior_log)
-            
-            # バッチ保存
-            db.session.add_all(logs_to_save)
-            db.session.commit()
-            
-            logger.debug(f"Batch saved {len(logs_to_save)} behavior logs")
+            # Core の一括挿入（1 トランザクション）
+            saved_count = bulk_insert_behavior_logs(logs_data)
+            logger.debug(f"Batch saved {saved_count} behavior logs")
             return True
             
         except Exception as e:
             logger.error(f"Error in batch save behavior logs: {e}")
-            db.session.rollback()
             return False
     
     def save_analysis_result(self, analysis_data: Dict[str, Any]) -> bool:
@@ -98,9 +222,16 @@ class StorageService:
         """
         try:
             analysis_result = AnalysisResult.create_analysis(**analysis_data)
-            analysis_result.save()
             
-            logger.debug(f"Saved analysis result: {analysis_result.id}")
+            def _save(session) -> int:
+                session.add(analysis_result)
+                session.flush()
+                return analysis_result.id
+            
+            # ライタースレッドで書き込み、採番された ID を待つ
+            result_id = submit_write(_save, description='analysis result').result()
+            
+            logger.debug(f"Saved analysis result: {result_id}")
             return True
             
         except Exception as e:
@@ -195,14 +326,15 @@ class StorageService:
             cutoff_date = datetime.utcnow() - timedelta(days=self.retention_days)
             
             # 古い行動ログを削除
-            old_logs = BehaviorLog.query.filter(
-                BehaviorLog.created_at < cutoff_date
-            )
+            old_logs_filter = BehaviorLog.created_at < cutoff_date
+            old_logs = BehaviorLog.query.filter(old_logs_filter)
             stats['deleted_logs'] = old_logs.count()
             
             if stats['deleted_logs'] > 0 and (force or self._confirm_deletion()):
-                old_logs.delete(synchronize_session=False)
-                db.session.commit()
+                stats['deleted_logs'] = submit_write(
+                    lambda session: BehaviorLog.delete_with_rollups(session, old_logs_filter),
+                    description='delete old behavior logs'
+                ).result()
                 logger.info(f"Deleted {stats['deleted_logs']} old behavior logs")
             
             # 古い分析結果を削除
@@ -212,8 +344,12 @@ class StorageService:
             stats['deleted_analyses'] = old_analyses.count()
             
             if stats['deleted_analyses'] > 0 and (force or self._confirm_deletion()):
-                old_analyses.delete(synchronize_session=False)
-                db.session.commit()
+                stats['deleted_analyses'] = submit_write(
+                    lambda session: session.query(AnalysisResult).filter(
+                        AnalysisResult.created_at < cutoff_date
+                    ).delete(synchronize_session=False),
+                    description='delete old analysis results'
+                ).result()
                 logger.info(f"Deleted {stats['deleted_analyses']} old analysis results")
             
             # 古いアーカイブファイルを削除
@@ -317,47 +453,68 @@ class StorageService:
             with gzip.open(backup_file, 'rt', encoding='utf-8') as f:
                 backup_data = json.load(f)
             
-            # データベーストランザクション開始
-            db.session.begin()
-            
-            # 行動ログの復元
-            behavior_logs_data = backup_data.get('behavior_logs', [])
-            for log_data in behavior_logs_data:
-                # 既存データとの重複チェック
-                existing_log = BehaviorLog.query.filter_by(
-                    timestamp=datetime.fromisoformat(log_data['timestamp'])
-                ).first()
-                
-                if not existing_log:
-                    # 新しいログとして追加
-                    log_data.pop('id', None)  # IDを除去して新規作成
-                    behavior_log = BehaviorLog(**log_data)
-                    db.session.add(behavior_log)
-            
-            # 分析結果の復元
-            analysis_results_data = backup_data.get('analysis_results', [])
-            for analysis_data in analysis_results_data:
-                # 既存データとの重複チェック
-                existing_analysis = AnalysisResult.query.filter_by(
-                    analysis_start_time=datetime.fromisoformat(analysis_data['analysis_start_time']),
-                    analysis_type=analysis_data['analysis_type']
-                ).first()
-                
-                if not existing_analysis:
-                    # 新しい分析結果として追加
-                    analysis_data.pop('id', None)  # IDを除去して新規作成
-                    analysis_result = AnalysisResult(**analysis_data)
-                    db.session.add(analysis_result)
-            
-            db.session.commit()
-            logger.info(f"Database restored from backup: {backup_file.name}")
+            # ライタースレッドの 1 トランザクションで復元し、集計も同じ接続で作り直す
+            restored = submit_write(
+                lambda session: self._restore_rows(session, backup_data),
+                description=f'restore backup {backup_file.name}'
+            ).result()
+            logger.info(f"Database restored from backup: {backup_file.name} "
+                        f"({restored['behavior_logs']} behavior logs, {restored['analysis_results']} analysis results)")
             return True
             
         except Exception as e:
             logger.error(f"Error restoring from backup: {e}")
-            db.session.rollback()
             return False
     
+    @staticmethod
+    def _restore_rows(session, backup_data: Dict[str, Any]) -> Dict[str, int]:
+        """バックアップの行を追加し、復元したログを含む日以降の集計を作り直す（書き込みジョブ）
+        
+        Args:
+            session: ライタースレッドの Session
+            backup_data: バックアップファイルの内容
+            
+        Returns:
+            dict: 復元した行動ログ数・分析結果数
+        """
+        restored = {'behavior_logs': 0, 'analysis_results': 0}
+        
+        # 行動ログの復元
+        restored_since: Optional[datetime] = None
+        for log_data in backup_data.get('behavior_logs', []):
+            # 既存データとの重複チェック
+            timestamp = datetime.fromisoformat(log_data['timestamp'])
+            existing_log = session.query(BehaviorLog).filter_by(
+                timestamp=timestamp
+            ).first()
+            
+            if not existing_log:
+                # 新しいログとして追加
+                log_data.pop('id', None)  # IDを除去して新規作成
+                session.add(BehaviorLog(**_backup_row_values(BehaviorLog, log_data)))
+                restored['behavior_logs'] += 1
+                restored_since = timestamp if restored_since is None else min(restored_since, timestamp)
+        
+        # 分析結果の復元
+        for analysis_data in backup_data.get('analysis_results', []):
+            # 既存データとの重複チェック
+            existing_analysis = session.query(AnalysisResult).filter_by(
+                analysis_start_time=datetime.fromisoformat(analysis_data['analysis_start_time']),
+                analysis_type=analysis_data['analysis_type']
+            ).first()
+            
+            if not existing_analysis:
+                # 新しい分析結果として追加
+                analysis_data.pop('id', None)  # IDを除去して新規作成
+                session.add(AnalysisResult(**_backup_row_values(AnalysisResult, analysis_data)))
+                restored['analysis_results'] += 1
+        
+        # 復元したログを含む日以降の集計を作り直す
+        if restored_since is not None:
+            session.flush()
+            BehaviorRollup.rebuild(session, since=restored_since)
+        return restored
+    
     def get_storage_stats(self) -> Dict[str, Any]:
         """ストレージ統計を取得
         
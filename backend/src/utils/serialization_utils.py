@@ -105,6 +105,9 @@ def serialize_detection_results(detection_results: Dict[str, Any]) -> Dict[str,
             elif isinstance(value, (np.integer, np.floating)):
                 # NumPyスカラーの変換
                 serialized_results[key] = value.item()
+            elif value is None or isinstance(value, (bool, int, float, str)):
+                # 基本型はそのまま（JSON変換可能性のテストを省略）
+                serialized_results[key] = value
             else:
                 # その他のデータは通常のJSON処理
                 try:
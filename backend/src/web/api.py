@@ -7,13 +7,14 @@
 
 from flask import Blueprint, jsonify, request, Response, current_app
 import cv2
-import time
 from utils.logger import setup_logger
 from utils.exceptions import (
     APIError, ConfigError, ValidationError, ScheduleError,
-    InitializationError, wrap_exception
+    InitializationError, ServiceUnavailableError, wrap_exception
 )
 from web.response_utils import success_response, error_response, error_from_exception
+from web.server_mode import hub_bridge
+from web.websocket import socketio
 
 logger = setup_logger(__name__)
 api = Blueprint('api', __name__)
@@ -151,35 +152,106 @@ def update_settings():
 
 @api.route('/video_feed')
 def video_feed():
-    """映像ストリームのエンドポイント"""
+    """映像ストリームのエンドポイント
+
+    Query:
+        profile: 配信プロファイル（full / medium / low / thumbnail / auto）。
+            未指定時は streaming.default_profile（既定は送信スループットで自動選択する auto）
+    """
     monitor = current_app.config.get('monitor_instance')
     if monitor is None:
         logger.error("Monitor instance not found in app config for video_feed.")
         return Response("Monitor not initialized", status=500)
 
+    try:
+        client = monitor.open_stream_client(request.remote_addr, request.args.get('profile'))
+    except ValidationError as e:
+        return error_from_exception(e, status_code=400, include_details=True)
+
     def generate():
         if monitor is None:
             return
         logger.info("Starting video stream generation...")
         try:
             while True:
-                frame_bytes = monitor.get_current_frame()
+                if client is not None:
+                    # 共有エンコーダが新しいフレームをエンコードするまで待つ（全視聴者で同じバイト列を共有）
+                    if client.closed:
+                        break
+                    if hub_bridge.enabled:
+                        # 協調モード: OS スレッドの条件変数では待たず、エンコード完了の通知で起こされる
+                        frame_bytes = hub_bridge.poll(lambda: client.next_frame(timeout=0), timeout=1.0)
+                    else:
+                        frame_bytes = client.next_frame(timeout=1.0)
+                else:
+                    frame_bytes = monitor.get_current_frame()
                 if frame_bytes is not None:
                     yield (b'--frame\r\n'
                            b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-                else:
-                    pass
-                time.sleep(1/30)
+                if client is None:
+                    socketio.sleep(1/30)
         except GeneratorExit:
             logger.info("Video stream generator closed.")
         except Exception as e:
             logger.error(f"Error in video stream generator: {e}", exc_info=True)
         finally:
+            if client is not None:
+                client.close()
             logger.info("Video stream generation finished.")
 
     return Response(generate(),
                    mimetype='multipart/x-mixed-replace; boundary=frame')
 
+@api.route('/video_stream')
+def video_stream():
+    """H.264 映像ストリーム（フラグメント化 MP4）のエンドポイント
+
+    描画済みフレームを 1 回だけ H.264 へエンコードし、全視聴者で共有する
+    （要 PyAV・streaming.h264.enabled: true。無効時は 503）。
+    MSE（Media Source Extensions）で再生する: 'video/mp4; codecs="avc1.42E01E"' 等。
+    """
+    monitor = current_app.config.get('monitor_instance')
+    if monitor is None:
+        logger.error("Monitor instance not found in app config for video_stream.")
+        return Response("Monitor not initialized", status=500)
+
+    try:
+        client = monitor.open_h264_stream_client(request.remote_addr)
+    except ServiceUnavailableError as e:
+        return error_from_exception(e, status_code=503, include_details=True)
+    if client is None:
+        return error_response('H.264 stream is disabled', code='SERVICE_UNAVAILABLE', status_code=503)
+
+    def generate():
+        logger.info("Starting H.264 stream generation...")
+        try:
+            while not client.closed:
+                if hub_bridge.enabled:
+                    chunk = hub_bridge.poll(lambda: client.next_chunk(timeout=0), timeout=1.0)
+                else:
+                    chunk = client.next_chunk(timeout=1.0)
+                if chunk:
+                    yield chunk
+        except GeneratorExit:
+            logger.info("H.264 stream generator closed.")
+        except Exception as e:
+            logger.error(f"Error in H.264 stream generator: {e}", exc_info=True)
+        finally:
+            client.close()
+            logger.info("H.264 stream generation finished.")
+
+    response = Response(generate(), mimetype='video/mp4')
+    response.headers['Cache-Control'] = 'no-cache, no-store'
+    return response
+
+@api.route('/video_stream/report', methods=['GET'])
+def video_stream_report():
+    """MJPEG と H.264 ストリームの帯域・エンコード負荷の比較を取得する"""
+    monitor = current_app.config.get('monitor_instance')
+    if monitor is None:
+        return error_response('Monitor not initialized', code='SERVICE_UNAVAILABLE', status_code=500)
+    return success_response(monitor.get_stream_report())
+
 # スケジュール関連のAPIエンドポイント
 @api.route('/schedules', methods=['GET'])
 def get_schedules():
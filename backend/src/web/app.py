@@ -31,6 +31,7 @@ from web.routes import (
     behavior_bp, monitor_bp
 )
 from web.routes.monitor import init_monitor_service
+from models.storage_engine import build_engine_options
 from web.websocket import (
     init_websocket, socketio, init_audio_streaming, init_system_metrics_broadcast
 )
@@ -139,6 +140,8 @@ def create_app(config_manager: ConfigManager):
     }
     logger.info(f"Configured SQLALCHEMY_BINDS['config'] -> {config_db_path.absolute()}")
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # 読み出し用の接続プール（書き込みは models.storage_engine のライタースレッドへ集約）
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(config_manager)
     
     # CORS設定
     # 環境変数からCORS許可オリジンを取得
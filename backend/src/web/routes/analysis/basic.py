@@ -12,6 +12,7 @@ from datetime import datetime, timedelta, timezone
 from flask import Blueprint, request, current_app
 
 from models.behavior_log import BehaviorLog
+from models.log_columns import LogColumns
 from models.user_profile import UserProfile
 from schemas.recommendation import RecommendationSchema, standardize_recommendations
 from utils.logger import setup_logger
@@ -52,7 +53,7 @@ def get_analysis_status():
         
         # データベース接続確認
         try:
-            recent_logs = BehaviorLog.get_recent_logs(hours=1)
+            BehaviorLog.get_recent_columns(['id'], hours=1)
             db_status = 'active'
         except Exception:
             db_status = 'error'
@@ -266,7 +267,8 @@ def get_daily_insights():
         start_time = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
         end_time = start_time + timedelta(days=1)
         
-        logs = BehaviorLog.get_logs_by_timerange(
+        logs = BehaviorLog.get_columns_by_timerange(
+            ('timestamp', 'focus_level', 'smartphone_detected', 'presence_status'),
             start_time=start_time,
             end_time=end_time,
             user_id=user_id
@@ -287,7 +289,7 @@ def get_daily_insights():
                 'target_date': date_str,
                 'logs_analyzed': 0,
                 'insights': minimal_insights,
-                'summary': _generate_daily_summary(minimal_insights, []),
+                'summary': _generate_daily_summary(minimal_insights, None),
                 'recommendations': []
             })
         
@@ -295,10 +297,9 @@ def get_daily_insights():
         if len(logs) < 5:
             try:
                 # 簡易スコア計算（この場で算出して依存を避ける）
-                focus_scores = [log.focus_level for log in logs if log.focus_level is not None]
-                avg_focus = sum(focus_scores) / len(focus_scores) if focus_scores else 0.0
-                presence_rate = sum(1 for log in logs if log.presence_status == 'present') / len(logs) if logs else 0.0
-                smartphone_penalty_rate = sum(1 for log in logs if log.smartphone_detected) / len(logs) if logs else 0.0
+                avg_focus = logs.mean('focus_level')
+                presence_rate = logs.count_equal('presence_status', 'present') / len(logs)
+                smartphone_penalty_rate = float(logs['smartphone_detected'].mean())
                 productivity_score = max(0.0, min(1.0, avg_focus * 0.6 + presence_rate * 0.3 - smartphone_penalty_rate * 0.1))
 
                 minimal_insights = {
@@ -397,7 +398,9 @@ def get_recommendations():
             return error_response('Page must be 1 or greater', code='VALIDATION_ERROR', status_code=400)
         
         # 最近の行動データ取得（過去1時間）
-        recent_logs = BehaviorLog.get_recent_logs(hours=1, user_id=user_id)
+        recent_logs = BehaviorLog.get_recent_columns(
+            ('timestamp', 'focus_level', 'smartphone_detected', 'presence_status'), hours=1, user_id=user_id
+        )
         
         # AdviceGeneratorインスタンス取得
         advice_generator = _get_advice_generator()
@@ -583,28 +586,25 @@ def _generate_trend_summary(focus_analysis: Dict[str, Any], timeframe: str) -> D
     }
 
 
-def _create_behavior_summary(logs: list) -> Dict[str, Any]:
-    """行動ログから行動サマリーを作成"""
-    if not logs:
+def _create_behavior_summary(logs: LogColumns) -> Dict[str, Any]:
+    """行動ログ（列射影・新しい順）から行動サマリーを作成"""
+    if not len(logs):
         return {}
     
     total_logs = len(logs)
-    focus_scores = [log.focus_level for log in logs if log.focus_level is not None]
-    smartphone_count = sum(1 for log in logs if log.smartphone_detected)
-    present_count = sum(1 for log in logs if log.presence_status == 'present')
     
     return {
         'total_entries': total_logs,
-        'average_focus': sum(focus_scores) / len(focus_scores) if focus_scores else 0,
-        'smartphone_usage_rate': smartphone_count / total_logs if total_logs > 0 else 0,
-        'presence_rate': present_count / total_logs if total_logs > 0 else 0,
+        'average_focus': logs.mean('focus_level'),
+        'smartphone_usage_rate': float(logs['smartphone_detected'].mean()),
+        'presence_rate': logs.count_equal('presence_status', 'present') / total_logs,
         'session_duration_minutes': total_logs * 0.5,  # 30秒間隔と仮定
-        'period_start': logs[-1].timestamp.isoformat() if logs else None,
-        'period_end': logs[0].timestamp.isoformat() if logs else None
+        'period_start': logs.datetime_at('timestamp', -1).isoformat(),
+        'period_end': logs.datetime_at('timestamp', 0).isoformat()
     }
 
 
-def _generate_daily_summary(insights_data: Dict[str, Any], logs: list) -> Dict[str, Any]:
+def _generate_daily_summary(insights_data: Dict[str, Any], logs: Optional[LogColumns]) -> Dict[str, Any]:
     """日次サマリーを生成"""
     productivity_analysis = insights_data.get('productivity_analysis', {})
     focus_analysis = insights_data.get('focus_analysis', {})
@@ -614,7 +614,7 @@ def _generate_daily_summary(insights_data: Dict[str, Any], logs: list) -> Dict[s
     productivity_score = productivity_analysis.get('productivity_score', 0)
     
     # バックエンド計算による生産性スコア（フォールバック）
-    if productivity_score == 0 and logs:
+    if productivity_score == 0 and logs is not None and len(logs):
         try:
             from ..behavior.utils import calculate_productivity_score
             productivity_score = calculate_productivity_score(logs)
@@ -631,7 +631,7 @@ def _generate_daily_summary(insights_data: Dict[str, Any], logs: list) -> Dict[s
     recommendation_dicts = [rec.to_dict() for rec in recommendations] if recommendations else []
     
     return {
-        'total_active_time': f"{len(logs) * 0.5:.1f} minutes",
+        'total_active_time': f"{(len(logs) if logs is not None else 0) * 0.5:.1f} minutes",
         'productivity_score': productivity_score,
         'average_focus': avg_focus,
         'key_insights_count': len(insights_data.get('key_insights', [])),
@@ -647,9 +647,9 @@ def _generate_daily_summary(insights_data: Dict[str, Any], logs: list) -> Dict[s
     }
 
 
-def _analyze_current_behavior(logs: list) -> Dict[str, Any]:
-    """現在の行動状況を分析"""
-    if not logs:
+def _analyze_current_behavior(logs: LogColumns) -> Dict[str, Any]:
+    """現在の行動状況を分析（列射影・新しい順）"""
+    if not len(logs):
         return {
             'status': 'no_data',
             'focus_level': 0,
@@ -658,7 +658,7 @@ def _analyze_current_behavior(logs: list) -> Dict[str, Any]:
             'presence_status': 'unknown'
         }
     
-    recent_log = logs[0]  # 最新のログ
+    recent_log = logs.row(0)  # 最新のログ
     
     return {
         'status': 'active',
@@ -255,8 +255,11 @@ def get_user_profile():
         if not profile_builder:
             return error_response('User profile builder not available', code='SERVICE_UNAVAILABLE', status_code=500)
         
-        # 行動ログ取得
-        logs = BehaviorLog.get_recent_logs(hours=720, user_id=user_id)  # 30日分
+        # 行動ログ取得（プロファイル構築が参照する列だけを射影した軽量な行）
+        logs = BehaviorLog.get_recent_columns(
+            ('timestamp', 'focus_level', 'smartphone_detected', 'presence_status', 'posture_data'),
+            hours=720, user_id=user_id  # 30日分
+        ).rows()
         
         # 包括的プロファイル構築
         comprehensive_profile = profile_builder.build_comprehensive_profile(user_id, logs)
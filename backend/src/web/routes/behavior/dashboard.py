@@ -2,7 +2,8 @@ from flask import request
 from ...response_utils import success_response, error_response
 from .blueprint import behavior_bp
 from models.behavior_log import BehaviorLog
-from .utils import timeframe_range, calculate_posture_alerts
+from models.behavior_rollup import BehaviorRollup
+from .utils import SUMMARY_COLUMNS, timeframe_range, calculate_posture_alerts
 
 
 @behavior_bp.route('/summary/dashboard', methods=['GET'])
@@ -32,15 +33,26 @@ def _get_daily_dashboard_data(timeframe: str, user_id: str = None):
         start_time, end_time = timeframe_range(timeframe)
         if isinstance(start_time, dict):
             return _empty_dashboard_data()
-        logs = BehaviorLog.get_logs_by_timerange(start_time, end_time, user_id)
-        if not logs:
-            return _empty_dashboard_data()
-        total_seconds = len(logs) * 2  # 5秒間隔と仮定
-        focus_scores = [log.focus_level for log in logs if log.focus_level is not None]
-        avg_focus = sum(focus_scores) / len(focus_scores) if focus_scores else 0
-        presence_rate = sum(1 for log in logs if log.presence_status == 'present') / len(logs)
-        smartphone_rate = sum(1 for log in logs if log.smartphone_detected) / len(logs)
-        posture_alerts = calculate_posture_alerts(logs)
+        if not user_id:
+            # 集計テーブル（時・分）から算出
+            totals = BehaviorRollup.summarize_range(start_time, end_time)
+            count = totals['entry_count']
+            if not count:
+                return _empty_dashboard_data()
+            avg_focus = totals['focus_sum'] / totals['focus_count'] if totals['focus_count'] else 0
+            presence_rate = totals['presence_count'] / count
+            smartphone_rate = totals['smartphone_count'] / count
+            posture_alerts = totals['posture_alerts']
+        else:
+            logs = BehaviorLog.get_columns_by_timerange(SUMMARY_COLUMNS, start_time, end_time, user_id)
+            if not len(logs):
+                return _empty_dashboard_data()
+            count = len(logs)
+            avg_focus = logs.mean('focus_level')
+            presence_rate = logs.count_equal('presence_status', 'present') / count
+            smartphone_rate = float(logs['smartphone_detected'].mean())
+            posture_alerts = calculate_posture_alerts(logs)
+        total_seconds = count * 2  # 5秒間隔と仮定
         dashboard_data = {
             'total_time': total_seconds,
             'focus_time': int(total_seconds * avg_focus),
@@ -1,23 +1,75 @@
-from flask import request, Response
-from typing import Dict, Any, List
+from flask import request, Response, stream_with_context
+from typing import Any, Dict, Iterable, Iterator, List
 from datetime import datetime
+import io
+import itertools
+import json
+import zlib
+from sqlalchemy import Boolean, DateTime, Float, JSON
 from .blueprint import behavior_bp
 from ...response_utils import success_response, error_response
 from models.behavior_log import BehaviorLog
+from models.log_columns import LogColumns
+from utils.logger import setup_logger
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except Exception:  # noqa: BLE001
+    pa = None  # optional dependency (parquet export disabled)
+    pq = None
+
+logger = setup_logger(__name__)
+
+# キーセットページングの 1 ページ（Parquet では 1 行グループ）の行数
+EXPORT_PAGE_SIZE = 1000
+
+_EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+_FIELD_FORMATTERS = {
+    'timestamp': lambda log: log.timestamp.isoformat(),
+    'focus_level': lambda log: log.focus_level,
+    'smartphone_detected': lambda log: log.smartphone_detected,
+    'presence_status': lambda log: log.presence_status,
+    'detected_objects': lambda log: log.detected_objects,
+    'posture_data': lambda log: log.posture_data,
+    'screen_activity': lambda log: log.screen_activity,
+}
 
 
 @behavior_bp.route('/export', methods=['GET'])
 def export_behavior_data():
+    """行動ログをエクスポートする（ストリーミング）
+
+    (timestamp, id) のキーセットページングで EXPORT_PAGE_SIZE 行ずつ読み出し、
+    ページごとに出力して全件をメモリに載せない。
+
+    Query:
+        format: csv / json / ndjson / parquet（parquet は要 pyarrow）
+        start_date, end_date: 期間（ISO 8601、最大 90 日）
+        fields: 出力する列（カンマ区切り）
+        compress: auto（Accept-Encoding に gzip があれば圧縮、既定）/ gzip / none
+    """
     try:
         export_format = request.args.get('format', 'csv')
         start_date_str = request.args.get('start_date')
         end_date_str = request.args.get('end_date')
         user_id = request.args.get('user_id')
         fields_str = request.args.get('fields', 'timestamp,focus_level,smartphone_detected,presence_status')
+        compress = request.args.get('compress', 'auto')
         if not start_date_str or not end_date_str:
             return error_response('start_date and end_date are required', code='VALIDATION_ERROR', status_code=400)
-        if export_format not in ['csv', 'json']:
-            return error_response('Invalid format. Must be csv or json', code='VALIDATION_ERROR', status_code=400)
+        if export_format not in _EXPORT_MIMETYPES:
+            return error_response('Invalid format. Must be csv, json, ndjson or parquet', code='VALIDATION_ERROR', status_code=400)
+        if compress not in ['auto', 'gzip', 'none']:
+            return error_response('Invalid compress. Must be auto, gzip or none', code='VALIDATION_ERROR', status_code=400)
+        if export_format == 'parquet' and pa is None:
+            return error_response('Parquet export requires pyarrow', code='SERVICE_UNAVAILABLE', status_code=503)
         try:
             start_time = datetime.fromisoformat(start_date_str.replace('Z', '+00:00'))
             end_time = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
@@ -25,66 +77,160 @@ def export_behavior_data():
             return error_response('Invalid date format. Use ISO 8601 format', code='VALIDATION_ERROR', status_code=400)
         if (end_time - start_time).days > 90:
             return error_response('Export period cannot exceed 90 days', code='VALIDATION_ERROR', status_code=400)
-        logs = BehaviorLog.get_logs_by_timerange(start_time=start_time, end_time=end_time, user_id=user_id)
-        if not logs:
+        fields = [f.strip() for f in fields_str.split(',') if f.strip() in _FIELD_FORMATTERS]
+
+        pages = BehaviorLog.iter_column_pages(fields, start_time, end_time, user_id, page_size=EXPORT_PAGE_SIZE)
+        # 先頭ページだけはレスポンス開始前に読み、データが無い場合は従来どおり JSON で返す
+        first_page = next(pages, None)
+        if first_page is None:
             return success_response({'message': 'No data found for the specified period', 'count': 0})
-        available_fields = {
-            'timestamp': lambda log: log.timestamp.isoformat(),
-            'focus_level': lambda log: log.focus_level,
-            'smartphone_detected': lambda log: log.smartphone_detected,
-            'presence_status': lambda log: log.presence_status,
-            'detected_objects': lambda log: log.detected_objects,
-            'posture_data': lambda log: log.posture_data,
-            'screen_activity': lambda log: log.screen_activity,
-        }
-        fields = [f.strip() for f in fields_str.split(',') if f.strip() in available_fields]
+        pages = itertools.chain([first_page], pages)
+
         if export_format == 'csv':
-            csv_data = _generate_csv_export(logs, fields, available_fields)
-            return csv_data
+            chunks = _csv_chunks(pages, fields)
+        elif export_format == 'ndjson':
+            chunks = _ndjson_chunks(pages, fields)
+        elif export_format == 'parquet':
+            chunks = _parquet_chunks(pages, fields)
         else:
-            json_data = _generate_json_export(logs, fields, available_fields)
-            return success_response({
-                'records': json_data,
-                'count': len(json_data),
-                'fields': fields,
-                'export_info': {
-                    'start_date': start_date_str,
-                    'end_date': end_date_str,
-                    'generated_at': datetime.utcnow().isoformat(),
-                },
+            chunks = _json_chunks(pages, fields, {
+                'start_date': start_date_str,
+                'end_date': end_date_str,
+                'generated_at': datetime.utcnow().isoformat(),
             })
-    except Exception:
+
+        # Parquet は列ごとに圧縮済みのため gzip しない
+        use_gzip = export_format != 'parquet' and (
+            compress == 'gzip' or (compress == 'auto' and request.accept_encodings['gzip'] > 0)
+        )
+        if use_gzip:
+            chunks = _gzip_chunks(chunks)
+
+        response = Response(stream_with_context(_guard_stream(chunks)), mimetype=_EXPORT_MIMETYPES[export_format])
+        response.headers['Content-Disposition'] = (
+            f'attachment; filename=behavior_logs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{export_format}'
+        )
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['Vary'] = 'Accept-Encoding'
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
+    except Exception as e:
+        logger.error(f"Error exporting behavior data: {e}", exc_info=True)
         return error_response('Failed to export behavior data', code='EXPORT_ERROR', status_code=500)
 
 
-def _generate_csv_export(logs: List, fields: List[str], field_map: Dict) -> Response:
-    import io
-    output = io.StringIO()
-    output.write(','.join(fields) + '\n')
-    for log in logs:
-        row_data = []
-        for field in fields:
-            value = field_map[field](log)
-            if isinstance(value, (dict, list)):
-                value = str(value).replace(',', ';')
-            row_data.append(str(value) if value is not None else '')
-        output.write(','.join(row_data) + '\n')
-    csv_content = output.getvalue()
-    output.close()
-    return Response(
-        csv_content,
-        mimetype='text/csv',
-        headers={'Content-Disposition': f'attachment; filename=behavior_logs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'},
-    )
-
-
-def _generate_json_export(logs: List, fields: List[str], field_map: Dict) -> List[Dict]:
-    export_data = []
-    for log in logs:
-        record = {}
-        for field in fields:
-            record[field] = field_map[field](log)
-        export_data.append(record)
-    return export_data
+def _guard_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """送信開始後のエラーはレスポンスを変更できないため、ログに記録して打ち切る"""
+    try:
+        yield from chunks
+    except Exception as e:
+        logger.error(f"Behavior export stream aborted: {e}", exc_info=True)
+
+
+def _page_records(page: LogColumns, fields: List[str]) -> Iterator[Dict[str, Any]]:
+    for log in page.rows():
+        yield {field: _FIELD_FORMATTERS[field](log) for field in fields}
+
+
+def _csv_chunks(pages: Iterable[LogColumns], fields: List[str]) -> Iterator[bytes]:
+    yield (','.join(fields) + '\n').encode('utf-8')
+    for page in pages:
+        output = io.StringIO()
+        for record in _page_records(page, fields):
+            row_data = []
+            for value in record.values():
+                if isinstance(value, (dict, list)):
+                    value = str(value).replace(',', ';')
+                row_data.append(str(value) if value is not None else '')
+            output.write(','.join(row_data) + '\n')
+        yield output.getvalue().encode('utf-8')
+
+
+def _ndjson_chunks(pages: Iterable[LogColumns], fields: List[str]) -> Iterator[bytes]:
+    for page in pages:
+        yield ''.join(json.dumps(record) + '\n' for record in _page_records(page, fields)).encode('utf-8')
+
+
+def _json_chunks(pages: Iterable[LogColumns], fields: List[str], export_info: Dict[str, Any]) -> Iterator[bytes]:
+    """success_response() と同じ形式のエンベロープを records 配列ごと逐次出力する"""
+    header = json.dumps({'success': True, 'status': 'success'})[:-1]
+    yield (header + ', "data": {"fields": ' + json.dumps(fields)
+           + ', "export_info": ' + json.dumps(export_info) + ', "records": [').encode('utf-8')
+    count = 0
+    for page in pages:
+        records = [json.dumps(record) for record in _page_records(page, fields)]
+        yield ((', ' if count else '') + ', '.join(records)).encode('utf-8')
+        count += len(records)
+    yield ('], "count": ' + str(count) + '}, "timestamp": ' + json.dumps(datetime.utcnow().isoformat()) + '}').encode('utf-8')
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter の出力先（書き込まれたバイト列を行グループごとに取り出す）"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_field(name: str) -> Any:
+    """列の SQL 型に対応する Arrow 型（JSON 列は JSON 文字列）"""
+    column_type = BehaviorLog.__table__.columns[name].type
+    if isinstance(column_type, DateTime):
+        return pa.timestamp('us')
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    return pa.string()
+
+
+def _parquet_chunks(pages: Iterable[LogColumns], fields: List[str]) -> Iterator[bytes]:
+    """ページごとに 1 行グループを書き、書き込まれたバイト列をそのまま送る"""
+    schema = pa.schema([(name, _parquet_field(name)) for name in fields])
+    json_fields = {name for name in fields if isinstance(BehaviorLog.__table__.columns[name].type, JSON)}
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for page in pages:
+            arrays = []
+            for name in fields:
+                values = page[name]
+                if name in json_fields:
+                    values = [None if v is None else json.dumps(v) for v in values]
+                # from_pandas=True で NaN（NULL の集中度）を null として書く
+                arrays.append(pa.array(values, type=schema.field(name).type, from_pandas=True))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
 
 
+def _gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """チャンク列を 1 つの gzip ストリームとして逐次圧縮する"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
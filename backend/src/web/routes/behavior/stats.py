@@ -1,10 +1,13 @@
 from flask import request
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
+import numpy as np
 from .blueprint import behavior_bp
 from ...response_utils import success_response, error_response
 from models.behavior_log import BehaviorLog
-from .utils import basic_summary, timeframe_range
+from models.behavior_rollup import BehaviorRollup
+from models.log_columns import LogColumns
+from .utils import SUMMARY_COLUMNS, basic_summary, rollup_summary, timeframe_range
 
 
 @behavior_bp.route('/summary', methods=['GET'])
@@ -20,7 +23,11 @@ def get_behavior_summary():
         )
         if isinstance(start_time, dict) and 'error' in start_time:
             return error_response(start_time.get('error', 'Invalid timeframe'), code=start_time.get('code', 'VALIDATION_ERROR'), status_code=400)
-        logs = BehaviorLog.get_logs_by_timerange(
+        if not include_details and not user_id:
+            # 集計テーブル（分・時・日）のみで算出し behavior_logs を走査しない
+            return success_response(rollup_summary(BehaviorRollup.summarize_range(start_time, end_time), timeframe))
+        logs = BehaviorLog.get_columns_by_timerange(
+            SUMMARY_COLUMNS,
             start_time=start_time,
             end_time=end_time,
             user_id=user_id,
@@ -63,13 +70,12 @@ def get_behavior_stats():
         return error_response('Failed to calculate behavior statistics', code='STATISTICS_ERROR', status_code=500)
 
 
-def _calculate_detailed_stats(logs: List[BehaviorLog]) -> Dict[str, Any]:
-    if not logs:
+def _calculate_detailed_stats(logs: LogColumns) -> Dict[str, Any]:
+    if not len(logs):
         return {}
-    focus_scores = [log.focus_level for log in logs if log.focus_level is not None]
-    if not focus_scores:
+    focus_scores = logs.valid('focus_level')
+    if not len(focus_scores):
         return {'message': 'No focus data available'}
-    import numpy as np
     return {
         'focus_statistics': {
             'mean': float(np.mean(focus_scores)),
@@ -83,30 +89,28 @@ def _calculate_detailed_stats(logs: List[BehaviorLog]) -> Dict[str, Any]:
     }
 
 
-def _calculate_hourly_breakdown(logs: List[BehaviorLog]) -> Dict[str, Any]:
-    hourly_data = {}
-    for log in logs:
-        hour = log.timestamp.hour
-        if hour not in hourly_data:
-            hourly_data[hour] = {'count': 0, 'focus_sum': 0, 'smartphone_count': 0}
-        hourly_data[hour]['count'] += 1
-        if log.focus_level is not None:
-            hourly_data[hour]['focus_sum'] += log.focus_level
-        if log.smartphone_detected:
-            hourly_data[hour]['smartphone_count'] += 1
+def _calculate_hourly_breakdown(logs: LogColumns) -> Dict[str, Any]:
+    if not len(logs):
+        return {}
+    hours = logs['timestamp'].astype('datetime64[h]').astype(np.int64) % 24
+    focus = np.nan_to_num(logs['focus_level'])
+    counts = np.bincount(hours, minlength=24)
+    focus_sums = np.bincount(hours, weights=focus, minlength=24)
+    smartphone_counts = np.bincount(hours, weights=logs['smartphone_detected'], minlength=24)
     hourly_stats = {}
-    for hour, data in hourly_data.items():
+    # 出現順（新しい順）に時間帯を並べる
+    for hour in dict.fromkeys(hours.tolist()):
         hourly_stats[str(hour)] = {
-            'entry_count': data['count'],
-            'average_focus': data['focus_sum'] / data['count'] if data['count'] > 0 else 0,
-            'smartphone_rate': data['smartphone_count'] / data['count'] if data['count'] > 0 else 0,
+            'entry_count': int(counts[hour]),
+            'average_focus': float(focus_sums[hour] / counts[hour]),
+            'smartphone_rate': float(smartphone_counts[hour] / counts[hour]),
         }
     return hourly_stats
 
 
-def _calculate_focus_distribution(logs: List[BehaviorLog]) -> Dict[str, Any]:
-    focus_scores = [log.focus_level for log in logs if log.focus_level is not None]
-    if not focus_scores:
+def _calculate_focus_distribution(logs: LogColumns) -> Dict[str, Any]:
+    focus_scores = logs.valid('focus_level')
+    if not len(focus_scores):
         return {}
     ranges = {
         'very_low': [0.0, 0.2],
@@ -118,7 +122,10 @@ def _calculate_focus_distribution(logs: List[BehaviorLog]) -> Dict[str, Any]:
     distribution = {}
     total = len(focus_scores)
     for range_name, (min_val, max_val) in ranges.items():
-        count = sum(1 for score in focus_scores if min_val <= score < max_val or (range_name == 'very_high' and score == 1.0))
+        in_range = (focus_scores >= min_val) & (focus_scores < max_val)
+        if range_name == 'very_high':
+            in_range |= focus_scores == 1.0
+        count = int(np.count_nonzero(in_range))
         distribution[range_name] = {
             'count': count,
             'percentage': (count / total) * 100 if total > 0 else 0,
@@ -142,22 +149,41 @@ def _get_period_statistics(period: str, limit: int, user_id: str, metrics: List[
         else:
             period_start = now - timedelta(days=(i+1)*30)
             period_end = now - timedelta(days=i*30)
-        logs = BehaviorLog.get_logs_by_timerange(start_time=period_start, end_time=period_end, user_id=user_id)
         period_stats = {
             'period_start': period_start.isoformat(),
             'period_end': period_end.isoformat(),
-            'data_count': len(logs),
         }
+        if not user_id:
+            # 集計テーブルから期間を覆うバケットだけを読む
+            period_stats.update(_period_stats_from_rollups(BehaviorRollup.summarize_range(period_start, period_end), metrics))
+            stats.append(period_stats)
+            continue
+        logs = BehaviorLog.get_columns_by_timerange(
+            ('focus_level', 'smartphone_detected', 'presence_status'),
+            start_time=period_start, end_time=period_end, user_id=user_id,
+        )
+        period_stats['data_count'] = len(logs)
         if 'focus' in metrics:
-            focus_scores = [log.focus_level for log in logs if log.focus_level is not None]
-            period_stats['average_focus'] = sum(focus_scores) / len(focus_scores) if focus_scores else 0
+            period_stats['average_focus'] = logs.mean('focus_level')
         if 'smartphone' in metrics:
-            period_stats['smartphone_usage_rate'] = sum(1 for log in logs if log.smartphone_detected) / len(logs) if logs else 0
+            period_stats['smartphone_usage_rate'] = float(logs['smartphone_detected'].mean()) if len(logs) else 0
         if 'presence' in metrics:
-            period_stats['presence_rate'] = sum(1 for log in logs if log.presence_status == 'present') / len(logs) if logs else 0
+            period_stats['presence_rate'] = logs.count_equal('presence_status', 'present') / len(logs) if len(logs) else 0
         if 'activity' in metrics:
             period_stats['activity_time_minutes'] = len(logs) * 0.5
         stats.append(period_stats)
     return stats
 
 
+def _period_stats_from_rollups(totals: Dict[str, Any], metrics: List[str]) -> Dict[str, Any]:
+    count = totals['entry_count']
+    period_stats = {'data_count': count}
+    if 'focus' in metrics:
+        period_stats['average_focus'] = totals['focus_sum'] / totals['focus_count'] if totals['focus_count'] else 0
+    if 'smartphone' in metrics:
+        period_stats['smartphone_usage_rate'] = totals['smartphone_count'] / count if count else 0
+    if 'presence' in metrics:
+        period_stats['presence_rate'] = totals['presence_count'] / count if count else 0
+    if 'activity' in metrics:
+        period_stats['activity_time_minutes'] = count * 0.5
+    return period_stats
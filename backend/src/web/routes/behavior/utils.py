@@ -1,68 +1,84 @@
-from typing import Dict, Any, List
+from typing import Dict, Any
 from datetime import datetime, timedelta
-from models.behavior_log import BehaviorLog
+from models.behavior_rollup import is_posture_alert
+from models.log_columns import LogColumns
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
-def calculate_posture_alerts(logs: List[BehaviorLog]) -> int:
+# 概要・生産性スコアの算出に必要な列（BehaviorLog の列射影に使う）
+SUMMARY_COLUMNS = ('timestamp', 'focus_level', 'smartphone_detected', 'presence_status', 'posture_data')
+
+
+def calculate_posture_alerts(logs: LogColumns) -> int:
     try:
-        alert_count = 0
-        for log in logs:
-            if hasattr(log, 'posture_data') and log.posture_data:
-                posture_score = log.posture_data.get('score', 1.0)
-                if posture_score < 0.6:
-                    alert_count += 1
-        return alert_count
+        return sum(1 for posture_data in logs['posture_data'] if is_posture_alert(posture_data))
     except Exception as e:
         logger.error(f"Error calculating posture alerts: {e}")
         return 0
 
 
-def calculate_productivity_score(logs: List[BehaviorLog]) -> float:
+def calculate_productivity_score(logs: LogColumns) -> float:
     try:
-        if not logs:
+        if not len(logs):
             return 0.0
-        focus_weight = 0.6
-        presence_weight = 0.3
-        smartphone_penalty = 0.1
-        focus_scores = [log.focus_level for log in logs if log.focus_level is not None]
-        avg_focus = sum(focus_scores) / len(focus_scores) if focus_scores else 0.0
-        presence_rate = sum(1 for log in logs if log.presence_status == 'present') / len(logs)
-        smartphone_penalty_rate = sum(1 for log in logs if log.smartphone_detected) / len(logs)
-        score = (avg_focus * focus_weight + presence_rate * presence_weight - smartphone_penalty_rate * smartphone_penalty)
-        return max(0.0, min(1.0, score))
+        avg_focus = logs.mean('focus_level')
+        presence_rate = logs.count_equal('presence_status', 'present') / len(logs)
+        smartphone_penalty_rate = float(logs['smartphone_detected'].mean())
+        return _productivity_score(avg_focus, presence_rate, smartphone_penalty_rate)
     except Exception as e:
         logger.error(f"Error calculating productivity score: {e}")
         return 0.0
 
 
-def basic_summary(logs: List[BehaviorLog], timeframe: str) -> Dict[str, Any]:
-    if not logs:
+def _productivity_score(avg_focus: float, presence_rate: float, smartphone_rate: float) -> float:
+    focus_weight = 0.6
+    presence_weight = 0.3
+    smartphone_penalty = 0.1
+    score = (avg_focus * focus_weight + presence_rate * presence_weight - smartphone_rate * smartphone_penalty)
+    return max(0.0, min(1.0, score))
+
+
+def basic_summary(logs: LogColumns, timeframe: str) -> Dict[str, Any]:
+    """SUMMARY_COLUMNS を射影したログ（新しい順）から概要を作る"""
+    focus_scores = logs.valid('focus_level')
+    return rollup_summary({
+        'entry_count': len(logs),
+        'focus_count': len(focus_scores),
+        'focus_sum': float(focus_scores.sum()),
+        'smartphone_count': int(logs['smartphone_detected'].sum()),
+        'presence_count': logs.count_equal('presence_status', 'present'),
+        'posture_alerts': calculate_posture_alerts(logs),
+        'first_timestamp': logs.datetime_at('timestamp', -1),
+        'last_timestamp': logs.datetime_at('timestamp', 0),
+    }, timeframe)
+
+
+def rollup_summary(totals: Dict[str, Any], timeframe: str) -> Dict[str, Any]:
+    """BehaviorRollup.summarize_range() の集計値から basic_summary() と同じ形式の概要を作る"""
+    total_logs = totals['entry_count']
+    if not total_logs:
         return {
             'timeframe': timeframe,
             'total_entries': 0,
             'message': 'No data available for the specified period'
         }
-    total_logs = len(logs)
-    focus_scores = [log.focus_level for log in logs if log.focus_level is not None]
-    smartphone_count = sum(1 for log in logs if log.smartphone_detected)
-    present_count = sum(1 for log in logs if log.presence_status == 'present')
-    posture_alerts = calculate_posture_alerts(logs)
-    productivity_score = calculate_productivity_score(logs)
+    average_focus = totals['focus_sum'] / totals['focus_count'] if totals['focus_count'] else 0
+    smartphone_rate = totals['smartphone_count'] / total_logs
+    presence_rate = totals['presence_count'] / total_logs
     return {
         'timeframe': timeframe,
-        'period_start': logs[-1].timestamp.isoformat(),
-        'period_end': logs[0].timestamp.isoformat(),
+        'period_start': totals['first_timestamp'].isoformat(),
+        'period_end': totals['last_timestamp'].isoformat(),
         'total_entries': total_logs,
-        'average_focus': sum(focus_scores) / len(focus_scores) if focus_scores else 0,
-        'smartphone_usage_rate': smartphone_count / total_logs,
-        'presence_rate': present_count / total_logs,
+        'average_focus': average_focus,
+        'smartphone_usage_rate': smartphone_rate,
+        'presence_rate': presence_rate,
         'active_time_minutes': total_logs * 0.5,
-        'data_completeness': len(focus_scores) / total_logs if total_logs > 0 else 0,
-        'posture_alerts': posture_alerts,
-        'productivity_score': productivity_score
+        'data_completeness': totals['focus_count'] / total_logs,
+        'posture_alerts': totals['posture_alerts'],
+        'productivity_score': _productivity_score(average_focus, presence_rate, smartphone_rate)
     }
 
 
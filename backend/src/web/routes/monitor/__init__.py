@@ -12,6 +12,7 @@ from . import control  # noqa: F401
 from . import metrics  # noqa: F401
 from . import performance  # noqa: F401
 from . import system_metrics  # noqa: F401
+from . import snapshot  # noqa: F401
 
 __all__ = ['monitor_bp', 'init_monitor_service']
 
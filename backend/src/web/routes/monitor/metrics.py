@@ -16,15 +16,16 @@ def get_monitoring_metrics():
             return error_response('Invalid timeframe. Must be one of: hour, day, week', code='VALIDATION_ERROR', status_code=400)
         hours_map = {'hour': 1, 'day': 24, 'week': 168}
         hours = hours_map[timeframe]
-        logs = BehaviorLog.get_recent_logs(hours=hours)
+        logs = BehaviorLog.get_recent_columns(['timestamp'], hours=hours)
+        last_activity = logs.datetime_at('timestamp', 0)
         metrics = {
-            'total_logs': len(logs) if logs else 0,
+            'total_logs': len(logs),
             'timeframe': timeframe,
             'period_hours': hours,
-            'collection_rate': len(logs) / hours if logs else 0,
-            'last_activity': logs[0].timestamp.isoformat() if logs else None,
+            'collection_rate': len(logs) / hours,
+            'last_activity': last_activity.isoformat() if last_activity else None,
             'data_coverage': {
-                'has_data': len(logs) > 0 if logs else False,
+                'has_data': len(logs) > 0,
                 'continuous_collection': True,
             },
         }
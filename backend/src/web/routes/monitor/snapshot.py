@@ -0,0 +1,53 @@
+import uuid
+from flask import Response, current_app, request
+from .blueprint import monitor_bp
+from ...response_utils import error_response
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# プロセスごとの識別子（再起動でフレームのシーケンス番号が 0 から振り直されても ETag が衝突しない）
+BOOT_ID = uuid.uuid4().hex[:12]
+
+
+@monitor_bp.route('/snapshot', methods=['GET'])
+def get_monitor_snapshot():
+    """最新フレームの静止画（JPEG）を取得する
+
+    共有エンコーダがエンコード済みの JPEG を返し、ETag にプロセスの BOOT_ID とフレームの
+    シーケンス番号を使う。
+    If-None-Match が一致する場合（新しいフレームが無い場合）は 304 を返す。
+
+    Query:
+        max_age_ms: 許容するフレームの経過時間（ミリ秒）。この範囲内のエンコード済み
+            フレームがあれば新しいフレームを描画・エンコードせずに返す
+    """
+    max_age_ms = request.args.get('max_age_ms')
+    if max_age_ms is not None:
+        try:
+            max_age_ms = float(max_age_ms)
+            if max_age_ms < 0:
+                raise ValueError(max_age_ms)
+        except ValueError:
+            return error_response('max_age_ms must be a non-negative number', code='VALIDATION_ERROR', status_code=400)
+
+    try:
+        monitor = current_app.config.get('monitor_instance')
+        if monitor is None:
+            logger.error("Monitor instance not found in app config for monitor/snapshot")
+            return error_response('Monitor not initialized', code='SERVICE_UNAVAILABLE', status_code=503)
+
+        snapshot = monitor.get_snapshot(max_age_ms)
+        if snapshot is None:
+            return error_response('No frame available yet', code='SERVICE_UNAVAILABLE', status_code=503)
+
+        sequence, jpeg, timestamp = snapshot
+        response = Response(jpeg, mimetype='image/jpeg')
+        response.set_etag(f'frame-{BOOT_ID}-{sequence}')
+        response.last_modified = timestamp
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Frame-Sequence'] = str(sequence)
+        return response.make_conditional(request)
+    except Exception as e:
+        logger.error(f"Error getting monitor snapshot: {e}", exc_info=True)
+        return error_response('Failed to get monitor snapshot', code='SNAPSHOT_ERROR', status_code=500)
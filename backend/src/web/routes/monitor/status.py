@@ -12,12 +12,14 @@ def get_monitor_status():
     try:
         monitor_status = 'active' if monitor_instance and monitor_instance.is_active else 'inactive'
         try:
-            recent_logs = BehaviorLog.get_recent_logs(hours=1)
-            data_collection_status = 'active' if recent_logs else 'inactive'
-            logs_count = len(recent_logs) if recent_logs else 0
+            recent_logs = BehaviorLog.get_recent_columns(['timestamp'], hours=1)
+            data_collection_status = 'active' if len(recent_logs) else 'inactive'
+            logs_count = len(recent_logs)
+            last_log_time = recent_logs.datetime_at('timestamp', 0)
         except Exception:
             data_collection_status = 'error'
             logs_count = 0
+            last_log_time = None
         camera_status = 'unknown'
         device_status = 'unknown'
         if monitor_instance:
@@ -39,7 +41,7 @@ def get_monitor_status():
             },
             'metrics': {
                 'recent_logs_count': logs_count,
-                'last_log_time': recent_logs[0].timestamp.isoformat() if recent_logs else None,
+                'last_log_time': last_log_time.isoformat() if last_log_time else None,
             },
             'last_check': datetime.utcnow().isoformat(),
         })
@@ -0,0 +1,253 @@
+"""
+サーバー起動モードモジュール
+
+Socket.IO とストリーミング応答を処理するサーバーの動作モードを選択します。
+
+    threading: Werkzeug のスレッドサーバー（既定）。視聴者・ロングポーリング接続ごとに OS スレッドを占有
+    eventlet / gevent: 協調型（グリーンスレッド）ワーカー。接続はハブ上の軽量スレッドで待機
+
+協調モードでもカメラ取得・推論・エンコードは従来通り OS スレッドで動かすため、
+モンキーパッチは socket / select に限定します（threading は置き換えない）。
+OS スレッドからハブへの受け渡し（emit の実行、新しいフレームの通知）は HubBridge が
+ハブ上の 1 本のグリーンスレッドでまとめて行います。
+
+モードは起動フラグ ``--server-mode`` または環境変数 ``KANSHICHAN_SERVER_MODE`` で指定し、
+他のモジュールより先に prepare_server_mode() を呼び出す必要があります::
+
+    python src/main.py --server-mode eventlet
+
+本モジュールはモンキーパッチ前に import されるため、socket / ssl を読み込む
+モジュール（utils.logger は werkzeug を読み込む）は初回使用時まで import しない。
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+from utils.exceptions import ConfigError
+
+_logger = None
+
+SERVER_MODE_THREADING = 'threading'
+SERVER_MODE_EVENTLET = 'eventlet'
+SERVER_MODE_GEVENT = 'gevent'
+SERVER_MODES = (SERVER_MODE_THREADING, SERVER_MODE_EVENTLET, SERVER_MODE_GEVENT)
+ASYNC_SERVER_MODES = (SERVER_MODE_EVENTLET, SERVER_MODE_GEVENT)
+
+SERVER_MODE_FLAG = '--server-mode'
+SERVER_MODE_ENV = 'KANSHICHAN_SERVER_MODE'
+
+_active_mode = SERVER_MODE_THREADING
+
+
+def resolve_server_mode(argv: Optional[List[str]] = None) -> str:
+    """
+    起動フラグ・環境変数からサーバーモードを決定する
+
+    Args:
+        argv: コマンドライン引数（sys.argv[1:]）。``--server-mode X`` / ``--server-mode=X`` を解釈
+
+    Returns:
+        str: サーバーモード（未指定時は threading）
+
+    Raises:
+        ConfigError: 不明なモードが指定された場合
+    """
+    mode = None
+    args = list(argv or [])
+    for index, arg in enumerate(args):
+        if arg == SERVER_MODE_FLAG and index + 1 < len(args):
+            mode = args[index + 1]
+        elif arg.startswith(SERVER_MODE_FLAG + '='):
+            mode = arg.split('=', 1)[1]
+    if mode is None:
+        mode = os.environ.get(SERVER_MODE_ENV, SERVER_MODE_THREADING)
+
+    mode = mode.strip().lower()
+    if mode not in SERVER_MODES:
+        raise ConfigError(f"Unknown server mode '{mode}' (expected one of {', '.join(SERVER_MODES)})",
+                          details={'server_mode': mode})
+    return mode
+
+
+def prepare_server_mode(mode: str) -> str:
+    """
+    協調モードのモンキーパッチを適用する（他のモジュールの import より前に呼ぶ）
+
+    threading は置き換えないため、カメラ・推論スレッドは OS スレッドのまま動作する。
+    eventlet / gevent が import できない場合は threading で起動する。
+
+    Args:
+        mode: resolve_server_mode() の戻り値
+
+    Returns:
+        str: 実際に使用するサーバーモード
+    """
+    global _active_mode
+
+    if mode == SERVER_MODE_EVENTLET:
+        try:
+            import eventlet  # type: ignore
+            eventlet.monkey_patch(socket=True, select=True)
+        except Exception as e:  # noqa: BLE001
+            _get_logger().warning(f"eventlet unavailable ({e}); falling back to threading server mode")
+            mode = SERVER_MODE_THREADING
+    elif mode == SERVER_MODE_GEVENT:
+        try:
+            from gevent import monkey  # type: ignore
+            monkey.patch_all(thread=False, time=False, os=False, subprocess=False, signal=False)
+        except Exception as e:  # noqa: BLE001
+            _get_logger().warning(f"gevent unavailable ({e}); falling back to threading server mode")
+            mode = SERVER_MODE_THREADING
+
+    _active_mode = mode
+    if mode in ASYNC_SERVER_MODES:
+        # socketio.run() を呼ぶスレッド（メインスレッド）がハブを持つ
+        hub_bridge.hub_thread_ident = threading.get_ident()
+    _get_logger().info(f"Server mode: {mode}")
+    return mode
+
+
+def _get_logger():
+    """ロガーを取得（パッチ適用後に初めて utils.logger を読み込む）"""
+    global _logger
+    if _logger is None:
+        from utils.logger import setup_logger
+        _logger = setup_logger(__name__)
+    return _logger
+
+
+def get_server_mode() -> str:
+    """現在のサーバーモードを取得"""
+    return _active_mode
+
+
+def is_async_mode() -> bool:
+    """協調型（eventlet / gevent）ワーカーで動作しているか"""
+    return _active_mode in ASYNC_SERVER_MODES
+
+
+class HubBridge:
+    """
+    OS スレッドと協調モードのハブとの橋渡し
+    - call_soon(): OS スレッドからの呼び出し（Socket.IO の emit など）をハブ上で実行
+    - notify(): 新しいフレームなどの更新を OS スレッドから通知（ロックなしのフラグ設定のみ）
+    - poll(): ハブ上のグリーンスレッドが、値が得られるまで通知を待つ（視聴者ごとのスリープ不要）
+    - 上記はハブ上の 1 本のグリーンスレッドが tick_interval ごとにまとめて処理
+    """
+
+    def __init__(self, tick_interval: float = 0.005):
+        """
+        Args:
+            tick_interval: 受け渡しキュー・通知を確認する間隔（秒）
+        """
+        self.tick_interval = float(tick_interval)
+        self.hub_thread_ident: Optional[int] = None
+
+        self._calls: Deque[Tuple[Callable, tuple, dict]] = deque()
+        self._notified = False
+        self._event = None
+        self._create_event: Optional[Callable[[], Any]] = None
+        self._sleep: Optional[Callable[[float], None]] = None
+        self._running = False
+
+        # 統計
+        self.dispatched_count = 0
+        self.wakeup_count = 0
+        self.error_count = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._running
+
+    def start(self,
+              spawn: Callable[[Callable], Any],
+              sleep: Callable[[float], None],
+              create_event: Callable[[], Any]) -> None:
+        """
+        ハブ上で受け渡しループを開始する（協調モードのみ）
+
+        Args:
+            spawn: バックグラウンドタスクの起動関数（socketio.start_background_task）
+            sleep: 協調スリープ関数（socketio.sleep）
+            create_event: ハブ用のイベントを作成する関数（engineio の create_event）
+        """
+        if self._running:
+            return
+        self._sleep = sleep
+        self._create_event = create_event
+        self._event = create_event()
+        self._running = True
+        spawn(self._run)
+        _get_logger().info(f"HubBridge started (tick_interval={self.tick_interval * 1000:.1f}ms)")
+
+    def stop(self) -> None:
+        self._running = False
+
+    def needs_dispatch(self) -> bool:
+        """呼び出し元がハブ以外の OS スレッドで、ハブへ受け渡す必要があるか"""
+        return self._running and threading.get_ident() != self.hub_thread_ident
+
+    def call_soon(self, fn: Callable, *args, **kwargs) -> None:
+        """ハブ上で fn(*args, **kwargs) を実行する（任意のスレッドから呼び出し可）"""
+        self._calls.append((fn, args, kwargs))
+
+    def notify(self, *_args) -> None:
+        """待機中のグリーンスレッドを次の tick で起こす（任意のスレッドから呼び出し可）"""
+        self._notified = True
+
+    def poll(self, fn: Callable[[], Any], timeout: float) -> Any:
+        """
+        fn() が None 以外を返すまで、notify() による通知を待って繰り返す（ハブ上で呼ぶ）
+
+        Args:
+            fn: ブロックしない取得関数
+            timeout: 最大待機秒数
+
+        Returns:
+            Any: fn() の戻り値。タイムアウト時は None
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            # 取得より先にイベントを取っておき、取得直後の通知を取りこぼさない
+            event = self._event
+            value = fn()
+            remaining = deadline - time.monotonic()
+            if value is not None or remaining <= 0 or event is None:
+                return value
+            event.wait(remaining)
+
+    def _run(self) -> None:
+        """受け渡しループ（ハブ上のグリーンスレッド）"""
+        while self._running:
+            while self._calls:
+                fn, args, kwargs = self._calls.popleft()
+                try:
+                    fn(*args, **kwargs)
+                    self.dispatched_count += 1
+                except Exception as e:  # noqa: BLE001
+                    self.error_count += 1
+                    _get_logger().error(f"HubBridge dispatch error: {e}", exc_info=True)
+            if self._notified:
+                self._notified = False
+                event, self._event = self._event, self._create_event()
+                event.set()
+                self.wakeup_count += 1
+            self._sleep(self.tick_interval)
+
+    def get_stats(self) -> dict:
+        """受け渡し統計を取得"""
+        return {
+            'server_mode': _active_mode,
+            'enabled': self._running,
+            'tick_interval_ms': self.tick_interval * 1000,
+            'queued_calls': len(self._calls),
+            'dispatched_calls': self.dispatched_count,
+            'wakeups': self.wakeup_count,
+            'errors': self.error_count,
+        }
+
+
+hub_bridge = HubBridge()
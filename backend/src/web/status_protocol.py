@@ -0,0 +1,299 @@
+"""
+ステータス配信プロトコル v2 モジュール
+
+プロトコル v2 を宣言したクライアントへ、ステータスを msgpack のバイナリで配信します。
+各クライアントが最後に受信確認（ack）したスナップショットからの差分（変更・削除された
+フィールドのみ）を送り、一定間隔・確認が途絶えた場合はキーフレーム（全体）を送って
+再同期します。
+
+メッセージ形式（msgpack の map）:
+    キーフレーム: {'v': 2, 'seq': S, 'kf': True, 'data': ステータス全体}
+    差分:         {'v': 2, 'seq': S, 'base': B, 'set': [[パス, 値], ...], 'del': [パス, ...]}
+
+パスはネストしたキーの配列。差分はシーケンス B（クライアントが ack 済み）の
+スナップショットに適用する。そのためクライアントは ack 済みのスナップショットを
+保持し、受信・適用したシーケンスを 'status_ack' イベントで返す。
+
+差分は 'del' を先に、'set' を後に適用する。'set' は途中のキーが無い・辞書でない場合に
+辞書を作成する。さらにサーバーは 'set' のパスと親子関係にある 'del'（値 → 辞書、
+空の辞書 → 値あり、辞書 → 値の置き換えで生じるもの）を送らないため、適用順に依らず
+同じ結果になる。
+"""
+
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import setup_logger
+from utils.exceptions import SerializationError, wrap_exception
+
+try:
+    import msgpack  # type: ignore
+except Exception:  # noqa: BLE001
+    msgpack = None  # optional dependency (v2 disabled)
+
+logger = setup_logger(__name__)
+
+PROTOCOL_VERSION = 2
+STATUS_V2_EVENT = 'status_v2'
+
+Path = Tuple[Any, ...]
+
+
+def to_plain(value: Any) -> Any:
+    """
+    numpy・日時などを msgpack で表現できる基本型へ変換する
+
+    Args:
+        value: 変換対象
+
+    Returns:
+        Any: dict / list / str / int / float / bool / None / bytes からなる値
+    """
+    if isinstance(value, np.generic):
+        # np.float64 は float のサブクラスのため基本型より先に判定する
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+
+def flatten_status(status: Dict[Any, Any], prefix: Path = ()) -> Dict[Path, Any]:
+    """
+    ネストした辞書を (キーのパス → 葉の値) に平坦化する（空の辞書・リストは葉として扱う）
+
+    Args:
+        status: to_plain() 済みのステータス
+        prefix: 親のパス
+
+    Returns:
+        Dict[Path, Any]: パス → 値
+    """
+    flat: Dict[Path, Any] = {}
+    for key, value in status.items():
+        path = prefix + (key,)
+        if isinstance(value, dict) and value:
+            flat.update(flatten_status(value, path))
+        else:
+            flat[path] = value
+    return flat
+
+
+class _ClientState:
+    """v2 クライアントごとの配信状態"""
+
+    def __init__(self, sid: str):
+        self.sid = sid
+        self.acked_sequence = 0
+        self.last_sent_sequence = 0
+        self.last_keyframe_time = 0.0
+        self.keyframe_count = 0
+        self.delta_count = 0
+        self.skipped_count = 0
+        self.sent_bytes = 0
+
+
+class StatusDeltaChannel:
+    """
+    ステータス差分配信チャネル
+    - publish() 1 回につきスナップショットを 1 回だけ平坦化して履歴に保持
+    - クライアントごとに ack 済みスナップショットとの差分を作成（変更が無ければ送らない）
+    - キーフレーム: 初回・keyframe_interval 経過・ack 済みスナップショットが履歴外・
+      未確認のシーケンスが max_unacked を超えた場合
+    - 同じ tick のキーフレームはエンコード結果を全クライアントで共有
+    """
+
+    def __init__(self,
+                 keyframe_interval: float = 5.0,
+                 history_size: int = 64,
+                 max_unacked: int = 32):
+        """
+        Args:
+            keyframe_interval: キーフレームの最大間隔（秒）
+            history_size: 差分の基準として保持するスナップショット数
+            max_unacked: キーフレームで再同期するまでの未確認シーケンス数
+        """
+        self.keyframe_interval = float(keyframe_interval)
+        self.history_size = max(1, int(history_size))
+        self.max_unacked = max(1, int(max_unacked))
+
+        self._lock = threading.Lock()
+        self._clients: Dict[str, _ClientState] = {}
+        self._history: 'OrderedDict[int, Dict[Path, Any]]' = OrderedDict()
+        self._sequence = 0
+        self.error_count = 0
+
+    @property
+    def available(self) -> bool:
+        """msgpack が利用可能か（利用できない場合 v2 は受け付けない）"""
+        return msgpack is not None
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def register(self, sid: str) -> bool:
+        """
+        v2 クライアントを登録する（次回の publish でキーフレームを送る）
+
+        Args:
+            sid: Socket.IO のセッションID
+
+        Returns:
+            bool: 登録できた場合 True（msgpack が無い場合 False）
+        """
+        if not self.available:
+            return False
+        with self._lock:
+            self._clients[sid] = _ClientState(sid)
+        logger.info(f"Status protocol v2 client registered: {sid}")
+        return True
+
+    def unregister(self, sid: str) -> None:
+        """v2 クライアントの登録を解除する"""
+        with self._lock:
+            self._clients.pop(sid, None)
+
+    def is_registered(self, sid: str) -> bool:
+        return sid in self._clients
+
+    def acknowledge(self, sid: str, sequence: int) -> None:
+        """
+        クライアントが受信・適用したシーケンスを記録する（以降の差分の基準になる）
+
+        Args:
+            sid: Socket.IO のセッションID
+            sequence: 適用済みのシーケンス番号
+        """
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is None:
+                return
+            sequence = int(sequence)
+            if client.acked_sequence < sequence <= client.last_sent_sequence:
+                client.acked_sequence = sequence
+
+    def publish(self, status: Dict[str, Any]) -> List[Tuple[str, bytes]]:
+        """
+        ステータスを履歴へ追加し、v2 クライアントごとの送信メッセージを作成する
+
+        Args:
+            status: ステータス辞書
+
+        Returns:
+            List[Tuple[str, bytes]]: (sid, msgpack メッセージ) のリスト。変更の無いクライアントは含まない
+        """
+        with self._lock:
+            if not self._clients:
+                return []
+
+            try:
+                plain = to_plain(status)
+                flat = flatten_status(plain)
+            except Exception as e:
+                self.error_count += 1
+                serialization_error = wrap_exception(
+                    e, SerializationError,
+                    "Failed to flatten status for protocol v2",
+                    details={'status_keys': list(status.keys()) if status else []}
+                )
+                logger.error(f"Status v2 serialization error: {serialization_error.to_dict()}")
+                return []
+
+            self._sequence += 1
+            sequence = self._sequence
+            self._history[sequence] = flat
+            while len(self._history) > self.history_size:
+                self._history.popitem(last=False)
+
+            now = time.time()
+            keyframe: Optional[bytes] = None
+            messages = []
+            for client in self._clients.values():
+                base = self._history.get(client.acked_sequence) if client.acked_sequence else None
+                if (base is None
+                        or now - client.last_keyframe_time >= self.keyframe_interval
+                        or sequence - client.acked_sequence > self.max_unacked):
+                    if keyframe is None:
+                        keyframe = self._pack({'v': PROTOCOL_VERSION, 'seq': sequence, 'kf': True, 'data': plain})
+                    data = keyframe
+                    client.last_keyframe_time = now
+                    client.keyframe_count += 1
+                else:
+                    changed = [[list(path), value] for path, value in flat.items()
+                               if path not in base or base[path] != value]
+                    removed = self._removed_paths(base, flat, changed)
+                    if not changed and not removed:
+                        client.skipped_count += 1
+                        continue
+                    data = self._pack({'v': PROTOCOL_VERSION, 'seq': sequence, 'base': client.acked_sequence,
+                                       'set': changed, 'del': removed})
+                    client.delta_count += 1
+
+                client.last_sent_sequence = sequence
+                client.sent_bytes += len(data)
+                messages.append((client.sid, data))
+            return messages
+
+    @staticmethod
+    def _removed_paths(base: Dict[Path, Any], flat: Dict[Path, Any], changed: List[List[Any]]) -> List[List[Any]]:
+        """
+        削除されたパス（'set' で置き換わる部分木の親・子にあたるパスは除く）
+
+        Args:
+            base: ack 済みスナップショット
+            flat: 今回のスナップショット
+            changed: 'set' に含めるパスと値
+
+        Returns:
+            List[List[Any]]: 'del' に含めるパス
+        """
+        set_paths = {tuple(path) for path, _ in changed}
+        # 'set' のパスの祖先（空の辞書・値から辞書になった場合、祖先の del は新しい部分木を消してしまう）
+        set_ancestors = {path[:i] for path in set_paths for i in range(1, len(path))}
+        removed = []
+        for path in base:
+            if path in flat or path in set_ancestors:
+                continue
+            # 辞書が値に置き換わった場合、子孫の del は 'set' で置き換え済み
+            if any(path[:i] in set_paths for i in range(1, len(path))):
+                continue
+            removed.append(list(path))
+        return removed
+
+    @staticmethod
+    def _pack(payload: Dict[str, Any]) -> bytes:
+        return msgpack.packb(payload, use_bin_type=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """チャネル統計を取得"""
+        with self._lock:
+            clients = [{
+                'sid': client.sid,
+                'acked_sequence': client.acked_sequence,
+                'last_sent_sequence': client.last_sent_sequence,
+                'keyframes': client.keyframe_count,
+                'deltas': client.delta_count,
+                'skipped': client.skipped_count,
+                'sent_bytes': client.sent_bytes,
+            } for client in self._clients.values()]
+            return {
+                'available': self.available,
+                'sequence': self._sequence,
+                'history_size': len(self._history),
+                'keyframe_interval': self.keyframe_interval,
+                'errors': self.error_count,
+                'clients': clients,
+            }
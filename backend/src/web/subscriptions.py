@@ -0,0 +1,386 @@
+"""
+WebSocket 購読管理モジュール
+
+Socket.IO のクライアントごとに購読トピックと最大配信レートを管理します。
+レート制限の無い購読者はトピックごとの Socket.IO ルームへ 1 回の emit で配信し、
+レート制限のある購読者へはクライアント単位で最新値のみを保持（コアレッシング）して
+次の配信可能時刻にまとめて送ります。購読者のいないトピックは配信せず、
+生成側は has_subscribers() で高コストな収集処理自体を省略できます。
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.logger import setup_logger
+from utils.exceptions import NetworkError, wrap_exception
+
+logger = setup_logger(__name__)
+
+TOPIC_STATUS = 'status'
+TOPIC_SYSTEM_METRICS = 'system_metrics'
+TOPIC_BEHAVIOR_DATA = 'behavior_data'
+TOPIC_ANALYSIS_RESULTS = 'analysis_results'
+TOPIC_AUDIO_STREAM = 'audio_stream'
+
+# トピックと配信イベント（互換エイリアスを含む）
+TOPIC_EVENTS: Dict[str, Tuple[str, ...]] = {
+    TOPIC_STATUS: ('status_update', 'detection_status', 'status_v2'),
+    TOPIC_SYSTEM_METRICS: ('system_metrics', 'performance_stats'),
+    TOPIC_BEHAVIOR_DATA: ('behavior_data',),
+    TOPIC_ANALYSIS_RESULTS: ('analysis_results', 'status', 'realtime_analysis'),
+    TOPIC_AUDIO_STREAM: ('audio_stream',),
+}
+TOPICS = tuple(TOPIC_EVENTS)
+
+# 最新値で上書きしてはいけないトピック（音声クリップは間引かない）
+UNTHROTTLED_TOPICS = frozenset({TOPIC_AUDIO_STREAM})
+
+
+def topic_room(topic: str) -> str:
+    """トピックの Socket.IO ルーム名"""
+    return f"topic:{topic}"
+
+
+class ClientSubscription:
+    """
+    クライアント 1 接続分の購読状態
+    - rates: 購読トピック → 最大配信レート（Hz、0 は無制限）
+    - direct: ルーム配信から外し、publish_to() でのみ受け取るトピック（ステータス v2 など）
+    - pending: レート制限中の (トピック, イベント名) → 最新ペイロード
+    """
+
+    def __init__(self, sid: str, topics: Iterable[str]):
+        self.sid = sid
+        self.rates: Dict[str, float] = {topic: 0.0 for topic in topics}
+        self.direct: Set[str] = set()
+        # subscribe イベントを一度も受けていない接続（従来通り全トピックを受信）
+        self.explicit = False
+        self.last_emit: Dict[Tuple[str, str], float] = {}
+        self.pending: Dict[Tuple[str, str], Any] = {}
+        self.connected_at = time.time()
+
+        # 統計
+        self.emitted_count = 0
+        self.coalesced_count = 0
+
+    def in_room(self, topic: str) -> bool:
+        """トピックのルーム（無制限・一括配信）に属するべきか"""
+        return topic in self.rates and not self.rates[topic] and topic not in self.direct
+
+    def interval(self, topic: str) -> float:
+        rate = self.rates.get(topic, 0.0)
+        return 1.0 / rate if rate > 0 else 0.0
+
+
+class SubscriptionRegistry:
+    """
+    トピック購読レジストリ
+    - クライアントの購読・解除とルーム参加の同期
+    - publish(): ルーム宛て 1 回 + レート制限クライアントへの個別配信（最新値優先）
+    - publish_to(): 特定クライアント宛て（購読・レート制限を適用）
+    - フラッシュスレッドが保留中の最新値を配信可能時刻に送信
+    """
+
+    def __init__(self,
+                 emit: Callable[[str, Any, str], None],
+                 enter_room: Callable[[str, str], None],
+                 leave_room: Callable[[str, str], None]):
+        """
+        Args:
+            emit: (イベント名, ペイロード, ルーム/sid) で送信する関数
+            enter_room: (sid, ルーム名) でルームへ参加させる関数
+            leave_room: (sid, ルーム名) でルームから外す関数
+        """
+        self._emit = emit
+        self._enter_room = enter_room
+        self._leave_room = leave_room
+
+        self._condition = threading.Condition()
+        self._clients: Dict[str, ClientSubscription] = {}
+        self._subscribers: Dict[str, Set[str]] = {topic: set() for topic in TOPICS}
+        self._flush_thread: Optional[threading.Thread] = None
+
+        # 統計
+        self.published_counts: Dict[str, int] = {topic: 0 for topic in TOPICS}
+        self.skipped_counts: Dict[str, int] = {topic: 0 for topic in TOPICS}
+
+    # ---- クライアント管理 ----
+
+    def add_client(self, sid: str) -> ClientSubscription:
+        """
+        接続したクライアントを登録する（subscribe されるまでは全トピックを無制限で購読）
+
+        Args:
+            sid: Socket.IO のセッションID
+
+        Returns:
+            ClientSubscription: 購読状態
+        """
+        with self._condition:
+            client = ClientSubscription(sid, TOPICS)
+            self._clients[sid] = client
+            for topic in TOPICS:
+                self._subscribers[topic].add(sid)
+        for topic in TOPICS:
+            self._enter_room(sid, topic_room(topic))
+        return client
+
+    def remove_client(self, sid: str) -> None:
+        """切断したクライアントを削除する（Socket.IO がルームから外すため leave は不要）"""
+        with self._condition:
+            client = self._clients.pop(sid, None)
+            if client is None:
+                return
+            for subscribers in self._subscribers.values():
+                subscribers.discard(sid)
+
+    def subscribe(self,
+                  sid: str,
+                  topics: Iterable[str],
+                  max_rate: Any = None) -> Dict[str, float]:
+        """
+        トピックを購読する（最初の subscribe で従来の全トピック購読を置き換える）
+
+        Args:
+            sid: Socket.IO のセッションID
+            topics: 購読するトピック
+            max_rate: 最大配信レート（Hz）。数値は全トピック共通、辞書はトピックごと。None/0 は無制限
+
+        Returns:
+            Dict[str, float]: 購読中のトピック → 最大レート
+        """
+        topics = [topic for topic in topics if topic in TOPIC_EVENTS]
+        with self._condition:
+            client = self._clients.get(sid)
+            if client is None:
+                return {}
+            if not client.explicit:
+                client.explicit = True
+                for topic in [t for t in client.rates if t not in topics]:
+                    self._unsubscribe_locked(client, topic)
+            for topic in topics:
+                rate = max_rate.get(topic, 0.0) if isinstance(max_rate, dict) else max_rate
+                if topic in UNTHROTTLED_TOPICS:
+                    rate = 0.0
+                client.rates[topic] = max(0.0, float(rate or 0.0))
+                self._subscribers[topic].add(sid)
+            rates = dict(client.rates)
+        self._sync_rooms(sid)
+        logger.info(f"WebSocket client {sid} subscriptions: {rates}")
+        return rates
+
+    def unsubscribe(self, sid: str, topics: Iterable[str]) -> Dict[str, float]:
+        """
+        トピックの購読を解除する
+
+        Args:
+            sid: Socket.IO のセッションID
+            topics: 解除するトピック
+
+        Returns:
+            Dict[str, float]: 購読中のトピック → 最大レート
+        """
+        with self._condition:
+            client = self._clients.get(sid)
+            if client is None:
+                return {}
+            client.explicit = True
+            for topic in topics:
+                self._unsubscribe_locked(client, topic)
+            rates = dict(client.rates)
+        self._sync_rooms(sid)
+        return rates
+
+    def _unsubscribe_locked(self, client: ClientSubscription, topic: str) -> None:
+        client.rates.pop(topic, None)
+        for key in [key for key in client.pending if key[0] == topic]:
+            del client.pending[key]
+        self._subscribers.get(topic, set()).discard(client.sid)
+
+    def set_direct(self, sid: str, topic: str, direct: bool) -> None:
+        """
+        トピックをルーム配信から外し、publish_to() でのみ配信するかを設定する
+
+        Args:
+            sid: Socket.IO のセッションID
+            topic: トピック
+            direct: True で個別配信のみ
+        """
+        with self._condition:
+            client = self._clients.get(sid)
+            if client is None:
+                return
+            if direct:
+                client.direct.add(topic)
+            else:
+                client.direct.discard(topic)
+        self._sync_rooms(sid)
+
+    def _sync_rooms(self, sid: str) -> None:
+        """購読状態に合わせてトピックルームへの参加・離脱を行う"""
+        with self._condition:
+            client = self._clients.get(sid)
+            if client is None:
+                return
+            membership = {topic: client.in_room(topic) for topic in TOPICS}
+        for topic, member in membership.items():
+            if member:
+                self._enter_room(sid, topic_room(topic))
+            else:
+                self._leave_room(sid, topic_room(topic))
+
+    def is_connected(self, sid: str) -> bool:
+        return sid in self._clients
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def has_subscribers(self, *topics: str) -> bool:
+        """いずれかのトピックに購読者がいるか（生成側が収集処理を省略する判定に使用）"""
+        return any(self._subscribers.get(topic) for topic in topics)
+
+    # ---- 配信 ----
+
+    def publish(self, topic: str, event: str, payload: Any) -> bool:
+        """
+        トピックの購読者へ配信する（direct 指定のクライアントを除く）
+
+        Args:
+            topic: トピック
+            event: イベント名
+            payload: ペイロード
+
+        Returns:
+            bool: 購読者がいて配信（または保留）した場合 True
+        """
+        now = time.time()
+        with self._condition:
+            subscribers = self._subscribers.get(topic)
+            if not subscribers:
+                self.skipped_counts[topic] = self.skipped_counts.get(topic, 0) + 1
+                return False
+            room_members = False
+            direct_targets = []
+            for sid in subscribers:
+                client = self._clients[sid]
+                if topic in client.direct:
+                    continue
+                if client.in_room(topic):
+                    room_members = True
+                    client.emitted_count += 1
+                elif self._due_locked(client, topic, event, payload, now):
+                    direct_targets.append(sid)
+            self.published_counts[topic] = self.published_counts.get(topic, 0) + 1
+
+        if room_members:
+            self._safe_emit(event, payload, topic_room(topic))
+        for sid in direct_targets:
+            self._safe_emit(event, payload, sid)
+        return True
+
+    def publish_to(self, sid: str, topic: str, event: str, payload: Any) -> bool:
+        """
+        特定クライアントへ配信する（購読していなければ送らず、レート制限中は最新値を保留）
+
+        Args:
+            sid: Socket.IO のセッションID
+            topic: トピック
+            event: イベント名
+            payload: ペイロード
+
+        Returns:
+            bool: 配信（または保留）した場合 True
+        """
+        with self._condition:
+            client = self._clients.get(sid)
+            if client is None or topic not in client.rates:
+                return False
+            due = client.rates[topic] == 0 or self._due_locked(client, topic, event, payload, time.time())
+            if due and client.rates[topic] == 0:
+                client.emitted_count += 1
+        if due:
+            self._safe_emit(event, payload, sid)
+        return True
+
+    def _due_locked(self, client: ClientSubscription, topic: str, event: str, payload: Any, now: float) -> bool:
+        """
+        レート制限クライアントへ今すぐ送れるか判定する（送れない場合は最新値として保留）
+
+        _condition 保持中に呼ぶこと。
+        """
+        key = (topic, event)
+        if now - client.last_emit.get(key, 0.0) >= client.interval(topic) and key not in client.pending:
+            client.last_emit[key] = now
+            client.emitted_count += 1
+            return True
+        if key in client.pending:
+            client.coalesced_count += 1
+        client.pending[key] = payload
+        self._ensure_flush_thread_locked()
+        self._condition.notify_all()
+        return False
+
+    def _ensure_flush_thread_locked(self) -> None:
+        if self._flush_thread is None or not self._flush_thread.is_alive():
+            self._flush_thread = threading.Thread(target=self._flush_loop, name="ws-subscription-flush",
+                                                  daemon=True)
+            self._flush_thread.start()
+
+    def _flush_loop(self) -> None:
+        """保留中の最新値を、クライアントごとの次の配信可能時刻に送信する"""
+        while True:
+            with self._condition:
+                due, next_time = self._collect_due_locked(time.time())
+                if not due:
+                    timeout = None if next_time is None else max(0.0, next_time - time.time())
+                    self._condition.wait(timeout=timeout)
+                    continue
+            for event, payload, sid in due:
+                self._safe_emit(event, payload, sid)
+
+    def _collect_due_locked(self, now: float) -> Tuple[List[Tuple[str, Any, str]], Optional[float]]:
+        """配信可能になった保留値を取り出し、次に配信可能になる時刻を返す"""
+        due = []
+        next_time = None
+        for client in self._clients.values():
+            for key in list(client.pending):
+                ready_at = client.last_emit.get(key, 0.0) + client.interval(key[0])
+                if ready_at <= now:
+                    due.append((key[1], client.pending.pop(key), client.sid))
+                    client.last_emit[key] = now
+                    client.emitted_count += 1
+                elif next_time is None or ready_at < next_time:
+                    next_time = ready_at
+        return due, next_time
+
+    def _safe_emit(self, event: str, payload: Any, room: str) -> None:
+        try:
+            self._emit(event, payload, room)
+        except Exception as e:
+            emit_error = wrap_exception(
+                e, NetworkError,
+                "Error emitting subscribed WebSocket event",
+                details={'event': event, 'room': room}
+            )
+            logger.error(f"WebSocket emit error: {emit_error.to_dict()}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """購読統計を取得"""
+        with self._condition:
+            return {
+                'client_count': len(self._clients),
+                'subscribers': {topic: len(sids) for topic, sids in self._subscribers.items()},
+                'published': dict(self.published_counts),
+                'skipped_no_subscribers': dict(self.skipped_counts),
+                'clients': [{
+                    'sid': client.sid,
+                    'explicit': client.explicit,
+                    'rates': dict(client.rates),
+                    'direct': sorted(client.direct),
+                    'pending': sorted(f"{topic}/{event}" for topic, event in client.pending),
+                    'emitted': client.emitted_count,
+                    'coalesced': client.coalesced_count,
+                } for client in self._clients.values()],
+            }
@@ -5,7 +5,7 @@ Flask-SocketIO による接続管理、音声ストリーミング、
 システムメトリクス配信、イベント通知を提供します。
 """
 
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask import request
 from utils.logger import setup_logger
 from utils.exceptions import (
@@ -20,10 +20,31 @@ from typing import Dict, Any, Optional, List
 from pathlib import Path
 import os
 from datetime import datetime
+from web.status_protocol import PROTOCOL_VERSION, STATUS_V2_EVENT, StatusDeltaChannel
+from web.server_mode import get_server_mode, is_async_mode, hub_bridge
+from web.subscriptions import (
+    SubscriptionRegistry, TOPICS, TOPIC_STATUS, TOPIC_SYSTEM_METRICS, TOPIC_AUDIO_STREAM
+)
 
 logger = setup_logger(__name__)
+
+
+class HubSafeSocketIO(SocketIO):
+    """
+    協調モード（eventlet / gevent）で OS スレッドからの emit をハブへ受け渡す SocketIO
+    - 監視・メトリクス・音声スレッドは OS スレッドのため、ハブのソケットを直接操作しない
+    - threading モードでは従来通りその場で emit
+    """
+
+    def emit(self, *args, **kwargs):
+        if hub_bridge.needs_dispatch():
+            hub_bridge.call_soon(super().emit, *args, **kwargs)
+            return None
+        return super().emit(*args, **kwargs)
+
+
 # ping/pong 間隔とタイムアウトを適度に延ばし、ポーリング頻度を下げる
-socketio = SocketIO(
+socketio = HubSafeSocketIO(
     cors_allowed_origins="*",
     ping_interval=25,   # default 25s だが明示
     ping_timeout=60,    # サーバ側タイムアウト許容
@@ -32,7 +53,16 @@ socketio = SocketIO(
 
 # 音声配信用のキューとスレッド管理
 audio_queue = queue.Queue()
-connected_clients: List[str] = []  # 接続中のクライアントID管理
+
+# 接続中クライアントのトピック購読管理（トピックごとのルーム・クライアント単位のレート制限）
+subscriptions = SubscriptionRegistry(
+    emit=lambda event, payload, room: socketio.emit(event, payload, room=room),
+    enter_room=lambda sid, room: join_room(room, sid=sid, namespace='/'),
+    leave_room=lambda sid, room: leave_room(room, sid=sid, namespace='/'),
+)
+
+# ステータス配信 v2（msgpack 差分）チャネル（キーフレーム間隔は init_websocket で設定から読む）
+status_channel = StatusDeltaChannel()
 
 # システムメトリクス配信用の設定
 metrics_broadcast_interval = 5.0  # 5秒ごとに配信
@@ -40,20 +70,78 @@ metrics_broadcast_enabled = True  # 配信有効フラグ
 
 def init_websocket(app):
     """WebSocketの初期化"""
-    socketio.init_app(app, cors_allowed_origins="*")
+    socketio.init_app(app, cors_allowed_origins="*", async_mode=get_server_mode())
+    config_manager = app.config.get('config_manager')
+    if config_manager is not None:
+        status_channel.keyframe_interval = float(
+            config_manager.get('streaming.status_keyframe_interval', status_channel.keyframe_interval)
+        )
+    if is_async_mode():
+        # OS スレッドからの emit・フレーム通知をハブ上でまとめて処理
+        hub_bridge.start(spawn=socketio.start_background_task, sleep=socketio.sleep,
+                         create_event=socketio.server.eio.create_event)
 
     @socketio.on('connect')
     def handle_connect():
         client_id = request.sid
-        connected_clients.append(client_id)
+        # subscribe されるまでは全トピックを購読（プロトコル宣言までは v1 クライアント）
+        subscriptions.add_client(client_id)
         logger.info(f'Client connected: {client_id}')
 
     @socketio.on('disconnect')
     def handle_disconnect():
         client_id = request.sid
-        if client_id in connected_clients:
-            connected_clients.remove(client_id)
+        subscriptions.remove_client(client_id)
+        status_channel.unregister(client_id)
         logger.info(f'Client disconnected: {client_id}')
+
+    @socketio.on('status_protocol')
+    def handle_status_protocol(data):
+        """クライアントのステータスプロトコル宣言（v2 は msgpack 差分配信）"""
+        client_id = request.sid
+        try:
+            version = int((data if isinstance(data, dict) else {}).get('version', 1))
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid status protocol version from {client_id}: {data!r}")
+            version = 1
+        if version >= PROTOCOL_VERSION and status_channel.register(client_id):
+            # v2 はクライアントごとの差分のみ受信（v1 のルーム配信から外す）
+            subscriptions.set_direct(client_id, TOPIC_STATUS, True)
+            return {'success': True, 'version': PROTOCOL_VERSION, 'event': STATUS_V2_EVENT,
+                    'keyframe_interval': status_channel.keyframe_interval}
+        status_channel.unregister(client_id)
+        subscriptions.set_direct(client_id, TOPIC_STATUS, False)
+        return {'success': version < PROTOCOL_VERSION, 'version': 1}
+
+    @socketio.on('subscribe')
+    def handle_subscribe(data):
+        """トピックを購読（最初の subscribe で従来の全トピック購読を置き換える）
+
+        data: {'topics': [...], 'max_rate': Hz または {topic: Hz}}
+        """
+        data = data or {}
+        topics = data.get('topics') or []
+        unknown = [topic for topic in topics if topic not in TOPICS]
+        rates = subscriptions.subscribe(request.sid, topics, data.get('max_rate'))
+        return {'success': not unknown, 'subscriptions': rates, 'unknown_topics': unknown,
+                'available_topics': list(TOPICS)}
+
+    @socketio.on('unsubscribe')
+    def handle_unsubscribe(data):
+        """トピックの購読を解除"""
+        rates = subscriptions.unsubscribe(request.sid, (data or {}).get('topics') or [])
+        return {'success': True, 'subscriptions': rates}
+
+    @socketio.on('status_ack')
+    def handle_status_ack(data):
+        """v2 クライアントが適用済みのシーケンスを受信"""
+        sequence = (data if isinstance(data, dict) else {}).get('seq')
+        if sequence is None:
+            return
+        try:
+            status_channel.acknowledge(request.sid, int(sequence))
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid status ack from {request.sid}: {data!r}")
     
     @socketio.on('audio_playback_status')
     def handle_audio_status(data):
@@ -92,11 +180,16 @@ def init_websocket(app):
         return {'success': True, 'enabled': metrics_broadcast_enabled, 'interval': metrics_broadcast_interval}
 
 def broadcast_status(status):
-    """検出状態の変更をブロードキャスト"""
+    """検出状態の変更をブロードキャスト（v1: JSON 全体、v2: msgpack 差分）"""
     try:
-        # 互換性のためエイリアスイベント名でも二重配信
-        socketio.emit('status_update', status)
-        socketio.emit('detection_status', status)
+        if not subscriptions.has_subscribers(TOPIC_STATUS):
+            return
+        # v1 クライアント: 互換性のためエイリアスイベント名でも二重配信
+        subscriptions.publish(TOPIC_STATUS, 'status_update', status)
+        subscriptions.publish(TOPIC_STATUS, 'detection_status', status)
+        # v2 クライアント: ack 済みスナップショットからの差分のみ（エイリアス配信なし）
+        for client_id, message in status_channel.publish(status):
+            subscriptions.publish_to(client_id, TOPIC_STATUS, STATUS_V2_EVENT, message)
     except Exception as e:
         broadcast_error = wrap_exception(
             e, NetworkError,
@@ -161,8 +254,8 @@ def broadcast_system_metrics():
         }
         
         # WebSocketで配信（互換エイリアス含む）
-        socketio.emit('system_metrics', system_metrics)
-        socketio.emit('performance_stats', system_metrics)
+        subscriptions.publish(TOPIC_SYSTEM_METRICS, 'system_metrics', system_metrics)
+        subscriptions.publish(TOPIC_SYSTEM_METRICS, 'performance_stats', system_metrics)
         
     except Exception as e:
         metrics_error = wrap_exception(
@@ -197,13 +290,12 @@ def broadcast_audio_stream(audio_data: bytes, audio_metadata: Dict[str, Any],
         if target_clients:
             # 特定クライアントに配信
             for client_id in target_clients:
-                if client_id in connected_clients:
-                    socketio.emit('audio_stream', payload, room=client_id)
+                subscriptions.publish_to(client_id, TOPIC_AUDIO_STREAM, 'audio_stream', payload)
             logger.info(f"Audio streamed to {len(target_clients)} specific clients")
         else:
-            # 全クライアントに配信
-            socketio.emit('audio_stream', payload)
-            logger.info(f"Audio streamed to {len(connected_clients)} connected clients")
+            # 購読中の全クライアントに配信
+            subscriptions.publish(TOPIC_AUDIO_STREAM, 'audio_stream', payload)
+            logger.info(f"Audio streamed to {subscriptions.client_count} connected clients")
             
     except Exception as e:
         audio_stream_error = wrap_exception(
@@ -211,7 +303,7 @@ def broadcast_audio_stream(audio_data: bytes, audio_metadata: Dict[str, Any],
             "Error broadcasting audio stream via WebSocket",
             details={
                 'audio_metadata': audio_metadata,
-                'connected_clients_count': len(connected_clients),
+                'connected_clients_count': subscriptions.client_count,
                 'target_clients': target_clients
             }
         )
@@ -337,7 +429,8 @@ def start_system_metrics_worker():
         """システムメトリクス配信ワーカー関数"""
         while True:
             try:
-                if metrics_broadcast_enabled and connected_clients:
+                # 購読者がいない間は psutil による収集（ブロッキング計測）自体を行わない
+                if metrics_broadcast_enabled and subscriptions.has_subscribers(TOPIC_SYSTEM_METRICS):
                     broadcast_system_metrics()
                 
                 # 設定された間隔で待機
@@ -347,7 +440,7 @@ def start_system_metrics_worker():
                 metrics_worker_error = wrap_exception(
                     e, NetworkError,
                     "Error in system metrics worker",
-                    details={'connected_clients': len(connected_clients)}
+                    details={'connected_clients': subscriptions.client_count}
                 )
                 logger.error(f"System metrics worker error: {metrics_worker_error.to_dict()}")
                 time.sleep(5)  # エラー発生時は5秒待機
@@ -359,7 +452,37 @@ def start_system_metrics_worker():
 
 def get_connected_clients_count() -> int:
     """接続中のクライアント数を取得"""
-    return len(connected_clients)
+    return subscriptions.client_count
+
+
+def get_websocket_stats() -> Dict[str, Any]:
+    """サーバーモード・購読・ハブ受け渡しの統計を取得"""
+    return {
+        'server_mode': get_server_mode(),
+        'subscriptions': subscriptions.get_stats(),
+        'hub_bridge': hub_bridge.get_stats(),
+        'status_protocol_v2': status_channel.get_stats(),
+    }
+
+
+def has_subscribers(*topics: str) -> bool:
+    """いずれかのトピックに購読者がいるか（配信データの生成を省略する判定に使用）"""
+    return subscriptions.has_subscribers(*topics)
+
+
+def emit_topic(topic: str, event: str, payload: Any) -> bool:
+    """
+    トピックの購読者へイベントを配信する
+    
+    Args:
+        topic: トピック
+        event: イベント名
+        payload: ペイロード
+        
+    Returns:
+        bool: 購読者がいて配信した場合 True
+    """
+    return subscriptions.publish(topic, event, payload)
 
 # 音声配信システムの初期化
 def init_audio_streaming():